@@ -1,22 +1,36 @@
 
 import sys
 import os
+import time
+import importlib
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from gui.startup_timeline import StartupTimeline
+
+# 启动时间线以模块导入时刻为起点
+_startup_timeline = StartupTimeline()
+
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from netkit.utils.admin_check import ensure_admin, check_admin_without_exit, auto_elevate
-from netkit.utils.network_monitor import start_network_monitoring, stop_network_monitoring
 from netkit.utils.ui_helper import ui_helper
-from gui.views.netconfig.netconfig_view import NetConfigView
-from gui.views.ping import VisualPingView
-from gui.views.route.route_view import RouteFrame
-from gui.views.subnet.subnet_view import SubnetView
 from datetime import datetime
 
+_startup_timeline.mark("GUI框架导入完成")
+
+# 视图注册表: 键 → (模块, 类名, 是否区分只读模式, 再次显示时调用的刷新方法)
+# 视图模块及其背后的服务在首次导航时才导入
+VIEW_SPECS = {
+    'netconfig': ('gui.views.netconfig.netconfig_view', 'NetConfigView', True, None),
+    'route': ('gui.views.route.route_view', 'RouteFrame', True, 'refresh_routes'),
+    'ping': ('gui.views.ping.visual_ping_view', 'VisualPingView', False, None),
+    'subnet': ('gui.views.subnet.subnet_view', 'SubnetView', False, None),
+}
+
 
 class MainWindow:
     def __init__(self, admin_status=None):
+        self.timeline = _startup_timeline
         self.app = tb.Window(themename='darkly')
         self.app.title('NetKit v2.1.0')
         
@@ -48,34 +62,102 @@ class MainWindow:
         # 当前显示的内容框架
         self.current_frame = None
         
-        # 视图实例缓存（防止扫描期间实例被销毁）
+        # 视图实例缓存（首次导航时创建，之后切换只隐藏/显示）
         self.cached_views = {}
         
+        # 网络监听是否已由后台任务启动
+        self.monitoring_started = False
+        
         # 状态栏变量已删除
         
         self.setup_ui()
+        self.timeline.mark("主窗口框架创建完成")
         
-        # 启动网络监听
-        start_network_monitoring()
-        
-        # 启动异步预加载以提升性能
-        from netkit.services.netconfig.interface_manager import start_preload
-        start_preload()
+        # 默认视图和后台预加载在窗口显示后的空闲时间进行，不阻塞启动
+        self.app.after_idle(self._on_first_idle)
         
         # 绑定窗口关闭事件
         self.app.protocol("WM_DELETE_WINDOW", self.on_closing)
+    
+    def _on_first_idle(self):
+        """窗口首次空闲：显示默认视图，然后逐个执行后台任务"""
+        self.timeline.mark("窗口首次空闲")
+        
+        # 默认显示IP切换功能
+        self.show_ip_switcher()
+        self.timeline.mark("默认视图显示完成")
+        
+        self._background_tasks = [
+            ("网络监听已启动", self._start_network_monitoring),
+            ("网卡预加载已启动", self._start_adapter_preload),
+        ]
+        self.app.after_idle(self._run_next_background_task)
+    
+    def _run_next_background_task(self):
+        """每次空闲只执行一个后台任务，保持界面响应"""
+        if not self._background_tasks:
+            self.timeline.mark("后台任务全部启动")
+            self.timeline.write()
+            return
+        
+        label, task = self._background_tasks.pop(0)
+        try:
+            task()
+            self.timeline.mark(label)
+        except Exception as e:
+            self.timeline.mark(f"{label}（失败: {e}）")
+        self.app.after_idle(self._run_next_background_task)
+    
+    def _start_network_monitoring(self):
+        """启动网络监听"""
+        from netkit.utils.network_monitor import start_network_monitoring
+        start_network_monitoring()
+        self.monitoring_started = True
+    
+    def _start_adapter_preload(self):
+        """启动网卡信息异步预加载（已由网卡配置视图启动时跳过）"""
+        from netkit.services.netconfig.async_manager import get_async_manager
+        async_manager = get_async_manager()
+        if not async_manager.preload_completed:
+            async_manager.start_preload()
+    
+    def _get_view(self, key):
+        """获取视图实例，首次访问时导入模块并创建"""
+        view = self.cached_views.get(key)
+        if view is not None:
+            return view, False
+        
+        module_name, class_name, readonly_aware, _ = VIEW_SPECS[key]
+        start = time.perf_counter()
+        view_class = getattr(importlib.import_module(module_name), class_name)
+        if readonly_aware:
+            view = view_class(self.content_area, readonly_mode=not self.is_admin)
+        else:
+            view = view_class(self.content_area)
+        self.cached_views[key] = view
+        self.timeline.mark(f"视图 {class_name} 首次创建 ({(time.perf_counter() - start) * 1000:.0f}ms)")
+        return view, True
+    
+    def _show_view(self, key):
+        """切换到指定视图"""
+        self.clear_content_area()
+        view, created = self._get_view(key)
+        
+        refresh_method = VIEW_SPECS[key][3]
+        if not created and refresh_method and hasattr(view, refresh_method):
+            getattr(view, refresh_method)()
+        
+        self.current_frame = view
+        view.pack(fill=BOTH, expand=True)
         
     def on_closing(self):
         """窗口关闭时的清理工作"""
         # 停止网络监听
-        stop_network_monitoring()
-        
-        # 清理当前视图
-        if hasattr(self, 'current_frame') and self.current_frame:
-            if hasattr(self.current_frame, 'cleanup'):
-                self.current_frame.cleanup()
+        if self.monitoring_started:
+            from netkit.utils.network_monitor import stop_network_monitoring
+            stop_network_monitoring()
         
-        # 清理缓存的视图
+        # 清理缓存的视图（包括当前视图）
         if hasattr(self, 'cached_views'):
             for view in self.cached_views.values():
                 if hasattr(view, 'cleanup'):
@@ -103,9 +185,6 @@ class MainWindow:
         
         # 底部状态栏已删除
         
-        # 默认显示IP切换功能
-        self.show_ip_switcher()
-        
     def setup_sidebar(self, parent):
         """设置左侧导航栏"""
         # 根据DPI动态调整导航栏宽度
@@ -214,66 +293,22 @@ class MainWindow:
         pass
             
     def clear_content_area(self):
-        """清空内容区域"""
+        """隐藏当前视图（视图实例保留在缓存中，正在进行的扫描不受影响）"""
         if self.current_frame:
-            # 检查是否是正在扫描的VisualPingView
-            if self._is_scanning_ping_view():
-                # 隐藏而不是销毁正在扫描的ping实例
-                self.current_frame.pack_forget()
-                self.cached_views['ping'] = self.current_frame
-            else:
-                # 正常清理其他实例
-                if hasattr(self.current_frame, 'cleanup'):
-                    self.current_frame.cleanup()
-                self.current_frame.destroy()
-            
+            self.current_frame.pack_forget()
             self.current_frame = None
             
-    def _is_scanning_ping_view(self):
-        """检查当前是否是正在扫描的VisualPingView"""
-        # 检查是否是VisualPingView实例
-        if not hasattr(self.current_frame, 'scan_controller'):
-            return False
-        
-        # 检查缓存保护时间戳（3秒保护期）
-        if hasattr(self.current_frame, '_from_cache_timestamp'):
-            import time
-            current_time = time.time()
-            time_since_cache = current_time - self.current_frame._from_cache_timestamp
-            if time_since_cache < 3.0:  # 3秒保护期
-                return True
-            
-        # 检查扫描状态
-        try:
-            is_scanning = (hasattr(self.current_frame.scan_controller, 'is_scanning') and 
-                          self.current_frame.scan_controller.is_scanning)
-            return is_scanning
-        except (AttributeError, Exception):
-            return False
-            
     def show_ip_switcher(self):
         """显示IP切换功能"""
-        self.clear_content_area()
         self.set_status("正在加载IP地址切换功能...")
         
         try:
             # 在创建界面之前就启动预加载，确保数据准备
-            from netkit.services.netconfig.interface_manager import start_preload
-            from netkit.services.netconfig.async_manager import get_async_manager
-            
-            # 获取异步管理器实例
-            async_manager = get_async_manager()
-            
-            # 如果预加载未完成，启动预加载
-            if not async_manager.preload_completed:
-                start_preload()
+            if 'netconfig' not in self.cached_views:
+                self._start_adapter_preload()
             
-            # 创建界面，传递权限状态
-            self.current_frame = NetConfigView(
-                self.content_area, 
-                readonly_mode=not self.is_admin
-            )
-            self.current_frame.pack(fill=BOTH, expand=True)
+            # 创建或复用界面（传递权限状态）
+            self._show_view('netconfig')
             
             if not self.is_admin:
                 self.set_status("IP地址切换功能已加载（只读模式）")
@@ -284,38 +319,21 @@ class MainWindow:
         
     def show_ping(self):
         """显示Ping测试功能"""
-        self.clear_content_area()
         self.set_status("正在加载Ping测试功能...")
         
         try:
-            # 优先使用缓存的实例
-            if 'ping' in self.cached_views:
-                self.current_frame = self.cached_views['ping']
-                del self.cached_views['ping']  # 从缓存中移除
-                
-                # 标记为从缓存恢复，短时间内保护不被清理
-                import time
-                self.current_frame._from_cache_timestamp = time.time()
-            else:
-                self.current_frame = VisualPingView(self.content_area)
-            
-            self.current_frame.pack(fill=BOTH, expand=True)
+            self._show_view('ping')
             self.set_status("Ping测试功能已加载")
         except Exception as e:
             self.set_status(f"加载Ping测试功能失败: {str(e)}")
         
     def show_route(self):
         """显示静态路由功能"""
-        self.clear_content_area()
         self.set_status("正在加载静态路由管理功能...")
         
         try:
-            # 创建路由管理界面，传递权限状态
-            self.current_frame = RouteFrame(
-                self.content_area,
-                readonly_mode=not self.is_admin
-            )
-            self.current_frame.pack(fill=BOTH, expand=True)
+            # 创建或复用路由管理界面（再次显示时刷新路由表）
+            self._show_view('route')
             
             if not self.is_admin:
                 self.set_status("静态路由管理功能已加载（只读模式）")
@@ -326,13 +344,10 @@ class MainWindow:
     
     def show_subnet(self):
         """显示子网计算功能"""
-        self.clear_content_area()
         self.set_status("正在加载子网计算功能...")
         
         try:
-            # 创建子网计算界面
-            self.current_frame = SubnetView(self.content_area)
-            self.current_frame.pack(fill=BOTH, expand=True)
+            self._show_view('subnet')
             self.set_status("子网计算功能已加载")
         except Exception as e:
             self.set_status(f"加载子网计算功能失败: {str(e)}")
@@ -430,6 +445,7 @@ class MainWindow:
     def run(self):
         """运行应用程序"""
         self.set_status("NetKit 启动完成，欢迎使用！")
+        self.timeline.mark("进入主循环")
         self.app.mainloop()
 
 
@@ -0,0 +1,64 @@
+"""
+启动时间线记录
+记录主窗口启动各阶段相对起点的耗时，并追加写入日志文件
+"""
+
+import os
+import time
+import logging
+import tempfile
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_log_dir() -> str:
+    """获取日志目录（Windows下为 %LOCALAPPDATA%\\NetKit\\logs）"""
+    local_app_data = os.environ.get('LOCALAPPDATA')
+    if local_app_data:
+        return os.path.join(local_app_data, 'NetKit', 'logs')
+    return os.path.join(os.path.expanduser('~'), '.netkit', 'logs')
+
+
+class StartupTimeline:
+    """启动时间线"""
+    
+    def __init__(self, origin: float = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.written = False
+    
+    def mark(self, label: str) -> float:
+        """记录一个阶段，返回相对起点的毫秒数"""
+        elapsed_ms = (time.perf_counter() - self.origin) * 1000
+        self.marks.append((label, elapsed_ms))
+        logger.debug(f"[启动] {label}: {elapsed_ms:.1f}ms")
+        return elapsed_ms
+    
+    def format(self) -> str:
+        """格式化为文本"""
+        lines = [f"=== NetKit 启动时间线 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ==="]
+        previous = 0.0
+        for label, elapsed_ms in self.marks:
+            lines.append(f"{elapsed_ms:9.1f}ms  (+{elapsed_ms - previous:7.1f}ms)  {label}")
+            previous = elapsed_ms
+        return "\n".join(lines) + "\n"
+    
+    def write(self, path: str = None) -> Optional[str]:
+        """追加写入日志文件，失败时写入临时目录，返回实际路径"""
+        candidates = [path] if path else [
+            os.path.join(get_log_dir(), 'startup.log'),
+            os.path.join(tempfile.gettempdir(), 'netkit_startup.log')
+        ]
+        text = self.format()
+        for candidate in candidates:
+            try:
+                os.makedirs(os.path.dirname(candidate), exist_ok=True)
+                with open(candidate, 'a', encoding='utf-8') as f:
+                    f.write(text)
+                self.written = True
+                return candidate
+            except OSError as e:
+                logger.warning(f"写入启动时间线失败({candidate}): {e}")
+        return None
@@ -0,0 +1,80 @@
+"""
+按帧批量处理的UI更新队列
+
+工作线程只向线程安全的队列追加数据，UI线程上的单个周期定时器（默认33ms，约30帧/秒）
+每帧取出全部待处理数据一次性应用，避免每条结果各自调度 after 回调淹没Tk事件循环
+"""
+
+import collections
+import tkinter as tk
+from typing import Any, Callable, List
+
+
+class UIUpdateQueue:
+    """线程安全的UI更新队列"""
+
+    def __init__(self, widget, on_frame: Callable[[List[Any]], bool], interval_ms: int = 33):
+        """
+        Args:
+            widget: 用于调度定时器的Tk控件
+            on_frame: 每帧回调，参数为本帧取出的数据（可能为空），
+                      返回True表示即使队列为空也继续计时
+            interval_ms: 帧间隔(毫秒)
+        """
+        self.widget = widget
+        self.on_frame = on_frame
+        self.interval_ms = interval_ms
+        self.items = collections.deque()
+        self.job = None
+        self.stats = {'frames': 0, 'items': 0, 'max_batch': 0}
+
+    def put(self, item: Any):
+        """追加数据（任意线程可调用）"""
+        self.items.append(item)
+
+    def start(self):
+        """开始按帧处理（在UI线程调用）"""
+        if self.job is None:
+            self._schedule()
+
+    def stop(self):
+        """停止计时并丢弃未处理的数据"""
+        if self.job is not None:
+            try:
+                self.widget.after_cancel(self.job)
+            except tk.TclError:
+                pass
+            self.job = None
+        self.items.clear()
+
+    def is_running(self) -> bool:
+        return self.job is not None
+
+    def drain(self) -> List[Any]:
+        """取出当前全部待处理数据"""
+        items = []
+        try:
+            while True:
+                items.append(self.items.popleft())
+        except IndexError:
+            pass
+        return items
+
+    def tick(self):
+        """处理一帧"""
+        self.job = None
+        items = self.drain()
+        self.stats['frames'] += 1
+        self.stats['items'] += len(items)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(items))
+
+        keep_running = self.on_frame(items)
+        if keep_running or self.items:
+            self._schedule()
+
+    def _schedule(self):
+        try:
+            self.job = self.widget.after(self.interval_ms, self.tick)
+        except tk.TclError:
+            # 控件已销毁
+            self.job = None
@@ -3,10 +3,12 @@ IP配置表单UI组件
 负责IP配置的输入和应用
 """
 
+import threading
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from netkit.utils.ui_helper import ui_helper
-from netkit.services.netconfig.ip_configurator import apply_profile, validate_ip_config
+from netkit.services.netconfig.ip_configurator import apply_profile, validate_ip_config, check_network_conflict
+from netkit.services.netconfig.address_probe import probe_address_in_use
 
 
 class ConfigFormWidget(tb.LabelFrame):
@@ -339,10 +341,27 @@ class ConfigFormWidget(tb.LabelFrame):
         
         self._append_status("-" * 50 + "\n")
         
+        # 静态IP应用前探测是否已有主机使用该地址；探测包含ARP和ping，
+        # 在工作线程中执行，结果通过after()回到界面线程后再继续应用
+        if ip_mode == "manual":
+            interface_name = self.current_interface
+            self.apply_button.config(state=DISABLED)
+            self._append_status("正在检查地址占用...\n")
+            threading.Thread(
+                target=self._run_preflight_checks,
+                args=(interface_name, ip_mode, dns_mode, ip_config, dns_config),
+                daemon=True
+            ).start()
+            return
+        
+        self._execute_apply(self.current_interface, ip_mode, dns_mode, ip_config, dns_config)
+    
+    def _execute_apply(self, interface_name, ip_mode, dns_mode, ip_config, dns_config):
+        """调用配置应用函数并报告结果"""
         try:
             # 调用新的配置应用函数
             result = apply_profile(
-                self.current_interface, 
+                interface_name, 
                 ip_mode, 
                 dns_mode, 
                 ip_config, 
@@ -353,12 +372,64 @@ class ConfigFormWidget(tb.LabelFrame):
                 self._append_status("✓ 网络配置应用成功!\n\n")
                 # 通知配置已应用
                 if self.on_config_applied:
-                    self.on_config_applied(self.current_interface)
+                    self.on_config_applied(interface_name)
             else:
                 self._append_status(f"✗ 网络配置失败: {result['error']}\n\n")
         except Exception as e:
             self._append_status(f"✗ 执行出错: {str(e)}\n\n")
     
+    def _run_preflight_checks(self, interface_name, ip_mode, dns_mode, ip_config, dns_config):
+        """地址占用预检（在工作线程中执行）"""
+        # 本机其他网卡的冲突（排除正在配置的网卡自身的当前地址）
+        conflict = check_network_conflict(
+            ip_config['ip'],
+            ip_config['mask'],
+            ip_config.get('gateway', ''),
+            exclude_interface=interface_name
+        )
+        
+        probe, probe_error = None, None
+        try:
+            probe = probe_address_in_use(
+                ip_config['ip'],
+                ip_config.get('gateway') or None,
+                exclude_interface=interface_name
+            )
+        except Exception as e:
+            probe_error = str(e)
+        
+        def finish():
+            try:
+                if self._report_preflight(ip_config, conflict, probe, probe_error):
+                    self._execute_apply(interface_name, ip_mode, dns_mode, ip_config, dns_config)
+            finally:
+                if not self.readonly_mode:
+                    self.apply_button.config(state=NORMAL)
+        
+        self.after(0, finish)
+    
+    def _report_preflight(self, ip_config, conflict, probe, probe_error):
+        """显示预检结果，IP已被本机其他网卡或局域网主机占用时返回False"""
+        if any(detail['type'] == 'ip' for detail in conflict.get('details', [])):
+            self._append_status(f"✗ {conflict['conflicts'][0]}，已取消应用\n\n")
+            return False
+        for message in conflict['conflicts']:
+            self._append_status(f"提示: {message}\n")
+        
+        if probe_error is not None:
+            self._append_status(f"提示: 地址占用探测失败，继续应用: {probe_error}\n")
+            return True
+        
+        if probe['ip_in_use']:
+            self._append_status(
+                f"✗ IP地址 {ip_config['ip']} 已被局域网中的其他主机使用，已取消应用\n\n"
+            )
+            return False
+        
+        if probe['gateway_reachable'] is False:
+            self._append_status(f"提示: 网关 {ip_config['gateway']} 当前无应答\n")
+        return True
+    
     def get_current_config(self):
         """获取当前配置"""
         return {
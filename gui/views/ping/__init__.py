@@ -3,21 +3,40 @@ NetKit Ping GUI模块
 
 提供可视化ping测试的图形用户界面组件：
 - 可视化ping界面：智能动态方格网络状态显示
-- 方格单元格：单个IP状态显示组件
+- 单画布方格网格：所有IP方格绘制在同一个Canvas上
+- 方格布局：方格几何计算和命中测试（不依赖Tk）
+- 扫描热力图：大范围扫描的可缩放热力图及其多级细节模型
+- 方格单元格：单个IP状态显示组件（兼容保留）
 - 扫描控制器：扫描逻辑和状态管理
 - UI组件：弹窗、菜单等界面元素
 """
 
-from .visual_ping_view import VisualPingView
-from .grid_cell import IPGridCell
-from .scan_controller import ScanController
-from .ui_components import IPDetailWindow, IPContextMenu, ScanResultDialog
+from netkit.utils.lazy_import import lazy_module
+
+_EXPORTS = {
+    'VisualPingView': '.visual_ping_view',
+    'IPGridCanvas': '.ip_grid_canvas',
+    'GridLayout': '.grid_layout',
+    'HeatmapCanvas': '.heatmap_canvas',
+    'HeatmapModel': '.heatmap_model',
+    'IPGridCell': '.grid_cell',
+    'ScanController': '.scan_controller',
+    'IPDetailWindow': '.ui_components',
+    'IPContextMenu': '.ui_components',
+    'ScanResultDialog': '.ui_components',
+}
 
 __all__ = [
     'VisualPingView',
+    'IPGridCanvas',
+    'GridLayout',
+    'HeatmapCanvas',
+    'HeatmapModel',
     'IPGridCell',
     'ScanController',
     'IPDetailWindow',
     'IPContextMenu', 
     'ScanResultDialog'
-] 
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
@@ -3,27 +3,24 @@ IP方格单元格组件
 
 用于可视化ping测试界面的单个IP状态显示
 支持状态切换、闪烁动画和鼠标交互
+（可视化Ping界面已改用单画布渲染器 IPGridCanvas，本组件保留用于兼容）
 """
 
 import tkinter as tk
+from . import grid_layout
 
 
 class IPGridCell(tk.Canvas):
     """IP方格单元格"""
     
-    # 状态常量
-    STATE_INITIAL = "initial"
-    STATE_SCANNING = "scanning"  
-    STATE_ONLINE = "online"
-    STATE_OFFLINE = "offline"
+    # 状态常量（与单画布渲染器共用）
+    STATE_INITIAL = grid_layout.STATE_INITIAL
+    STATE_SCANNING = grid_layout.STATE_SCANNING
+    STATE_ONLINE = grid_layout.STATE_ONLINE
+    STATE_OFFLINE = grid_layout.STATE_OFFLINE
     
     # 颜色方案
-    COLORS = {
-        STATE_INITIAL: "#CCCCCC",
-        STATE_SCANNING: "#FFFF00", 
-        STATE_ONLINE: "#00AA00",
-        STATE_OFFLINE: "#CC0000"
-    }
+    COLORS = grid_layout.COLORS
     
     def __init__(self, master, ip_suffix, size=30, **kwargs):
         super().__init__(master, width=size, height=size, highlightthickness=1, 
@@ -0,0 +1,99 @@
+"""
+IP方格布局
+
+方格的状态/配色常量和几何计算（位置、命中测试），不依赖Tk，
+供单画布方格渲染器和扫描控制器共用
+"""
+
+import math
+from typing import Optional, Tuple
+
+# 状态常量
+STATE_INITIAL = "initial"
+STATE_SCANNING = "scanning"
+STATE_ONLINE = "online"
+STATE_OFFLINE = "offline"
+
+# 颜色方案
+COLORS = {
+    STATE_INITIAL: "#CCCCCC",
+    STATE_SCANNING: "#FFFF00",
+    STATE_ONLINE: "#00AA00",
+    STATE_OFFLINE: "#CC0000"
+}
+
+# 扫描中闪烁的暗色
+BLINK_COLOR = "#CCAA00"
+
+# 方格内数字颜色
+TEXT_COLORS = {
+    STATE_INITIAL: "black",
+    STATE_SCANNING: "black",
+    STATE_ONLINE: "white",
+    STATE_OFFLINE: "white"
+}
+
+# 悬停提示中的状态文字和颜色
+STATUS_TEXT = {
+    STATE_INITIAL: "未扫描",
+    STATE_SCANNING: "扫描中...",
+    STATE_ONLINE: "在线",
+    STATE_OFFLINE: "离线"
+}
+
+STATUS_COLORS = {
+    STATE_INITIAL: "#CCCCCC",
+    STATE_SCANNING: "#FFFF00",
+    STATE_ONLINE: "#00FF00",
+    STATE_OFFLINE: "#FF6666"
+}
+
+
+class GridLayout:
+    """按行优先排列的等大方格布局"""
+
+    def __init__(self, count: int, cols: int, cell_size: int, spacing: int = 2, margin: int = 1):
+        self.count = count
+        self.cols = max(1, cols)
+        self.cell_size = cell_size
+        self.spacing = spacing
+        self.margin = margin
+        self.pitch = cell_size + spacing
+
+    @property
+    def rows(self) -> int:
+        return math.ceil(self.count / self.cols) if self.count else 0
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """整个网格的像素尺寸(宽, 高)"""
+        cols = min(self.cols, self.count) if self.count else 0
+        width = self.margin * 2 + cols * self.pitch - (self.spacing if cols else 0)
+        height = self.margin * 2 + self.rows * self.pitch - (self.spacing if self.rows else 0)
+        return width, height
+
+    def cell_rect(self, index: int) -> Tuple[int, int, int, int]:
+        """第index个方格的矩形(x0, y0, x1, y1)"""
+        row, col = divmod(index, self.cols)
+        x0 = self.margin + col * self.pitch
+        y0 = self.margin + row * self.pitch
+        return x0, y0, x0 + self.cell_size, y0 + self.cell_size
+
+    def cell_center(self, index: int) -> Tuple[float, float]:
+        x0, y0, x1, y1 = self.cell_rect(index)
+        return (x0 + x1) / 2, (y0 + y1) / 2
+
+    def index_at(self, x: float, y: float) -> Optional[int]:
+        """
+        命中测试：坐标所在方格的序号，落在间隙或网格外时返回None
+        """
+        x -= self.margin
+        y -= self.margin
+        if x < 0 or y < 0:
+            return None
+        col, dx = divmod(int(x), self.pitch)
+        row, dy = divmod(int(y), self.pitch)
+        if col >= self.cols or dx >= self.cell_size or dy >= self.cell_size:
+            return None
+        index = row * self.cols + col
+        return index if index < self.count else None
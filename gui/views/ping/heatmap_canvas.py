@@ -0,0 +1,294 @@
+"""
+大范围扫描热力图画布
+
+整张热力图只有一个图片画布项：按视口内可见的方块生成一张小图（每个方块一个像素），
+再由 PhotoImage.zoom 放大到当前缩放级别；状态变化合并到下一次空闲时处理，
+少量变化只修补对应像素，滚动、缩放或大量变化时重绘视口
+"""
+
+import tkinter as tk
+from typing import Callable, Dict, Optional
+
+from .grid_layout import STATUS_TEXT, STATUS_COLORS, STATE_SCANNING, STATE_ONLINE, STATE_OFFLINE
+from .heatmap_model import HeatmapModel, BACKGROUND_COLOR
+
+
+class HeatmapCanvas(tk.Canvas):
+    """可缩放的扫描热力图"""
+
+    HOVER_DELAY = 200    # 悬停提示延迟(ms)
+    PATCH_LIMIT = 2000   # 单次修补的最大方块数，超过则重绘视口
+
+    def __init__(self, master, on_double_click: Callable = None, on_context_menu: Callable = None,
+                 describe: Callable[[int], str] = None, cols: int = 256, **kwargs):
+        kwargs.setdefault('highlightthickness', 0)
+        kwargs.setdefault('background', BACKGROUND_COLOR)
+        super().__init__(master, **kwargs)
+
+        self.on_double_click = on_double_click
+        self.on_context_menu = on_context_menu
+        self.describe = describe or str
+        self.cols = cols
+
+        self.model: Optional[HeatmapModel] = None
+        self.scale = 1
+        self.results: Dict[int, dict] = {}
+
+        # 当前视口图片：(列起, 行起, 列止, 行止, 方块边长, 像素边长)
+        self.viewport = None
+        self.source_image = None
+        self.image = None
+        self.image_item = self.create_image(0, 0, anchor="nw")
+
+        # 合并的重绘请求
+        self.dirty = set()
+        self.full_redraw = True
+        self.redraw_job = None
+        self.stats = {'redraws': 0, 'patches': 0}
+
+        # 外部滚动条
+        self.xscrollbar = None
+        self.yscrollbar = None
+
+        # 悬停提示
+        self.hover_index = None
+        self.hover_job = None
+        self.tooltip_window = None
+
+        self.configure(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
+        self.bind("<Configure>", lambda event: self.request_redraw())
+        self.bind("<Control-MouseWheel>", self._on_zoom_wheel)
+        self.bind("<Motion>", self._on_motion)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<Double-Button-1>", self._on_double_click)
+        self.bind("<Button-3>", self._on_right_click)
+
+    def attach_scrollbars(self, xscrollbar=None, yscrollbar=None):
+        """关联滚动条（滚动时同步重绘视口）"""
+        self.xscrollbar = xscrollbar
+        self.yscrollbar = yscrollbar
+
+    # ------------------------------------------------------------ 构建与缩放
+
+    def build(self, count: int, scale: float = None):
+        """创建热力图（状态重置为初始），默认缩放到一行恰好放下"""
+        self._hide_tooltip()
+        self.model = HeatmapModel(count, self.cols)
+        self.results = {}
+        width = self.winfo_width()
+        self.scale = scale or (self.model.fit_scale(width) if width > 1 else 1)
+        self._update_scrollregion()
+        self.xview_moveto(0)
+        self.yview_moveto(0)
+        self.request_redraw()
+
+    def set_scale(self, scale: float, anchor_x: int = 0, anchor_y: int = 0):
+        """切换缩放级别，保持锚点(窗口坐标)下的主机位置不变"""
+        if self.model is None or scale == self.scale:
+            return
+        host_x = self.canvasx(anchor_x) / self.scale
+        host_y = self.canvasy(anchor_y) / self.scale
+        self.scale = scale
+        width, height = self._update_scrollregion()
+        if width:
+            self.xview_moveto(max(0.0, (host_x * scale - anchor_x) / width))
+        if height:
+            self.yview_moveto(max(0.0, (host_y * scale - anchor_y) / height))
+        self.request_redraw()
+
+    def zoom(self, steps: int, anchor_x: int = 0, anchor_y: int = 0):
+        """按缩放级别表放大(正)或缩小(负)若干级"""
+        levels = HeatmapModel.ZOOM_LEVELS
+        current = levels.index(self.scale) if self.scale in levels else levels.index(1)
+        target = max(0, min(len(levels) - 1, current + steps))
+        self.set_scale(levels[target], anchor_x, anchor_y)
+
+    def _update_scrollregion(self):
+        width, height = self.model.canvas_size(self.scale)
+        self.configure(scrollregion=(0, 0, width, height))
+        return width, height
+
+    # ------------------------------------------------------------ 状态
+
+    def has_cell(self, key: int) -> bool:
+        return self.model is not None and 0 <= key < self.model.count
+
+    def get_state(self, key: int) -> Optional[str]:
+        return self.model.get_state(key) if self.has_cell(key) else None
+
+    def get_result(self, key: int) -> Optional[dict]:
+        return self.results.get(key)
+
+    def set_state(self, key: int, state: str, result: dict = None):
+        """设置主机状态（绘制合并到下一次空闲时）"""
+        if not self.has_cell(key):
+            return
+        if result is not None:
+            self.results[key] = result
+        if self.model.set_state(key, state):
+            self.dirty.add(key)
+            self._schedule()
+
+    def reset(self):
+        """全部恢复初始状态"""
+        if self.model is None:
+            return
+        self.model.reset()
+        self.results = {}
+        self.request_redraw()
+
+    def stop_blinking(self):
+        """热力图不闪烁，与方格网格接口保持一致"""
+
+    # ------------------------------------------------------------ 绘制
+
+    def request_redraw(self):
+        """请求重绘整个视口"""
+        self.full_redraw = True
+        self._schedule()
+
+    def _schedule(self):
+        if self.redraw_job is None:
+            self.redraw_job = self.after_idle(self.flush)
+
+    def _on_xscroll(self, first, last):
+        if self.xscrollbar is not None:
+            self.xscrollbar.set(first, last)
+        self.request_redraw()
+
+    def _on_yscroll(self, first, last):
+        if self.yscrollbar is not None:
+            self.yscrollbar.set(first, last)
+        self.request_redraw()
+
+    def flush(self):
+        """处理积累的重绘请求"""
+        self.redraw_job = None
+        if self.model is None:
+            return
+        if self.full_redraw or self.viewport is None or len(self.dirty) > self.PATCH_LIMIT:
+            self._redraw_viewport()
+        else:
+            self._patch_dirty()
+        self.dirty.clear()
+        self.full_redraw = False
+
+    def _redraw_viewport(self):
+        """只渲染视口内可见的方块"""
+        bx0, by0, bx1, by1 = self.model.visible_blocks(
+            self.canvasx(0), self.canvasy(0),
+            max(1, self.winfo_width()), max(1, self.winfo_height()), self.scale
+        )
+        size = HeatmapModel.block_size(self.scale)
+        pixels = HeatmapModel.pixel_size(self.scale)
+        self.viewport = (bx0, by0, bx1, by1, size, pixels)
+        if bx1 <= bx0 or by1 <= by0:
+            self.itemconfigure(self.image_item, image="")
+            self.source_image = self.image = None
+            return
+
+        rows = self.model.render(bx0, by0, bx1, by1, size)
+        source = tk.PhotoImage(master=self, width=bx1 - bx0, height=by1 - by0)
+        source.put(" ".join("{" + " ".join(row) + "}" for row in rows))
+        image = source.zoom(pixels) if pixels > 1 else source
+
+        self.source_image, self.image = source, image
+        self.itemconfigure(self.image_item, image=image)
+        self.coords(self.image_item, bx0 * pixels, by0 * pixels)
+        self.stats['redraws'] += 1
+
+    def _patch_dirty(self):
+        """只修补发生变化且在视口内的方块"""
+        if self.image is None:
+            return
+        bx0, by0, bx1, by1, size, pixels = self.viewport
+        blocks = {self.model.block_of(index, size) for index in self.dirty}
+        for bx, by in blocks:
+            if not (bx0 <= bx < bx1 and by0 <= by < by1):
+                continue
+            color = self.model.block_color(bx, by, size)
+            x, y = bx - bx0, by - by0
+            if self.source_image is not self.image:
+                self.source_image.put(color, to=(x, y, x + 1, y + 1))
+            self.image.put(color, to=(x * pixels, y * pixels, (x + 1) * pixels, (y + 1) * pixels))
+            self.stats['patches'] += 1
+
+    # ------------------------------------------------------------ 鼠标交互
+
+    def key_at(self, x: int, y: int) -> Optional[int]:
+        """窗口坐标处的主机序号（考虑滚动偏移）"""
+        if self.model is None:
+            return None
+        return self.model.index_at(self.canvasx(x), self.canvasy(y), self.scale)
+
+    def _on_zoom_wheel(self, event):
+        self.zoom(1 if event.delta > 0 else -1, event.x, event.y)
+
+    def _on_motion(self, event):
+        index = self.key_at(event.x, event.y)
+        if index == self.hover_index:
+            return
+        self.hover_index = index
+        self._hide_tooltip()
+        if index is not None:
+            self.hover_job = self.after(self.HOVER_DELAY, lambda: self._show_tooltip(index, event))
+
+    def _on_leave(self, event):
+        self.hover_index = None
+        self._hide_tooltip()
+
+    def _on_double_click(self, event):
+        key = self.key_at(event.x, event.y)
+        if key is not None and self.on_double_click:
+            self.on_double_click(key)
+
+    def _on_right_click(self, event):
+        key = self.key_at(event.x, event.y)
+        if key is not None and self.on_context_menu:
+            self.on_context_menu(key, event)
+
+    def _show_tooltip(self, index: int, event):
+        """显示悬停提示，缩小查看时附带所在方块的统计"""
+        self.hover_job = None
+        if self.model is None or index >= self.model.count:
+            return
+        state = self.model.get_state(index)
+
+        self.tooltip_window = tk.Toplevel(self)
+        self.tooltip_window.wm_overrideredirect(True)
+        self.tooltip_window.configure(bg="#333333")
+        self.tooltip_window.geometry(f"+{self.winfo_rootx() + event.x + 12}+{self.winfo_rooty() + event.y + 12}")
+
+        frame = tk.Frame(self.tooltip_window, bg="#333333", padx=8, pady=6)
+        frame.pack()
+        tk.Label(frame, text=f"IP: {self.describe(index)}", font=('微软雅黑', 9, 'bold'),
+                 fg="white", bg="#333333").pack(anchor="w")
+        tk.Label(frame, text=f"状态: {STATUS_TEXT.get(state, '未知')}", font=('微软雅黑', 9),
+                 fg=STATUS_COLORS.get(state, "#CCCCCC"), bg="#333333").pack(anchor="w")
+
+        result = self.results.get(index)
+        if result and result.get('times'):
+            tk.Label(frame, text=f"响应: {result['times'][0]}ms", font=('微软雅黑', 9),
+                     fg="white", bg="#333333").pack(anchor="w")
+
+        size = HeatmapModel.block_size(self.scale)
+        if size > 1:
+            summary = self.model.block_summary(*self.model.block_of(index, size), size)
+            tk.Label(frame, text=(f"区块({size}x{size}): 在线 {summary[STATE_ONLINE]} / "
+                                  f"离线 {summary[STATE_OFFLINE]} / 扫描中 {summary[STATE_SCANNING]}"),
+                     font=('微软雅黑', 9), fg="#CCCCCC", bg="#333333").pack(anchor="w")
+
+    def _hide_tooltip(self):
+        if self.hover_job is not None:
+            self.after_cancel(self.hover_job)
+            self.hover_job = None
+        if self.tooltip_window is not None:
+            self.tooltip_window.destroy()
+            self.tooltip_window = None
+
+    def destroy(self):
+        self._hide_tooltip()
+        if self.redraw_job is not None:
+            self.after_cancel(self.redraw_job)
+            self.redraw_job = None
+        super().destroy()
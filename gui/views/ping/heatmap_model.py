@@ -0,0 +1,191 @@
+"""
+大范围扫描热力图模型
+
+每个主机对应热力图中的一个点（按行优先排列，默认每行256个，/16网段时一行即一个/24），
+缩小时按边长为2/4/8/16的方块聚合显示（多级细节），各级方块的状态计数随单点状态变化增量维护，
+渲染时只计算视口内可见的方块，不依赖Tk
+"""
+
+import math
+from array import array
+from typing import List, Optional, Tuple
+
+from .grid_layout import (
+    STATE_INITIAL,
+    STATE_SCANNING,
+    STATE_ONLINE,
+    STATE_OFFLINE,
+    COLORS,
+)
+
+# 状态编码（按字节存储，65536个主机只占64KB）
+STATE_CODES = {
+    STATE_INITIAL: 0,
+    STATE_SCANNING: 1,
+    STATE_ONLINE: 2,
+    STATE_OFFLINE: 3,
+}
+CODE_STATES = [STATE_INITIAL, STATE_SCANNING, STATE_ONLINE, STATE_OFFLINE]
+CODE_COLORS = [COLORS[state] for state in CODE_STATES]
+
+# 网格范围外的背景色
+BACKGROUND_COLOR = "#FFFFFF"
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
+
+
+def blend_color(start: str, end: str, ratio: float) -> str:
+    """按比例在两种颜色之间插值"""
+    (r0, g0, b0), (r1, g1, b1) = _rgb(start), _rgb(end)
+    return "#%02X%02X%02X" % (
+        round(r0 + (r1 - r0) * ratio),
+        round(g0 + (g1 - g0) * ratio),
+        round(b0 + (b1 - b0) * ratio),
+    )
+
+
+class HeatmapModel:
+    """热力图状态与多级细节聚合"""
+
+    # 缩放级别：每个主机占的像素数，小于1时按 1/缩放 边长的方块聚合
+    ZOOM_LEVELS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 4, 8, 16, 32)
+    BLOCK_SIZES = (2, 4, 8, 16)
+
+    def __init__(self, count: int, cols: int = 256):
+        self.count = count
+        self.cols = max(1, min(cols, count)) if count else 1
+        self.rows = math.ceil(count / self.cols) if count else 0
+        self.codes = bytearray(count)
+
+        # 方块边长 -> [扫描中, 在线, 离线] 各方块计数
+        self.block_counts = {}
+        self.reset()
+
+    def reset(self):
+        """全部恢复初始状态"""
+        self.codes = bytearray(self.count)
+        for size in self.BLOCK_SIZES:
+            blocks = self.block_cols(size) * self.block_rows(size)
+            self.block_counts[size] = [array('I', bytes(4 * blocks)) for _ in range(3)]
+
+    # ------------------------------------------------------------ 几何
+
+    def block_cols(self, size: int) -> int:
+        return math.ceil(self.cols / size)
+
+    def block_rows(self, size: int) -> int:
+        return math.ceil(self.rows / size)
+
+    @staticmethod
+    def block_size(scale: float) -> int:
+        """缩放级别对应的聚合方块边长"""
+        return 1 if scale >= 1 else int(round(1 / scale))
+
+    @staticmethod
+    def pixel_size(scale: float) -> int:
+        """缩放级别下每个方块的像素边长"""
+        return int(scale) if scale >= 1 else 1
+
+    def canvas_size(self, scale: float) -> Tuple[int, int]:
+        """整个热力图的像素尺寸(宽, 高)"""
+        size, pixels = self.block_size(scale), self.pixel_size(scale)
+        return self.block_cols(size) * pixels, self.block_rows(size) * pixels
+
+    def fit_scale(self, width: int) -> float:
+        """能完整放下一行的最大缩放级别"""
+        fitting = [scale for scale in self.ZOOM_LEVELS if self.canvas_size(scale)[0] <= width]
+        return fitting[-1] if fitting else self.ZOOM_LEVELS[0]
+
+    def block_of(self, index: int, size: int) -> Tuple[int, int]:
+        """主机所在方块的(列, 行)"""
+        row, col = divmod(index, self.cols)
+        return col // size, row // size
+
+    def visible_blocks(self, x: float, y: float, width: int, height: int,
+                       scale: float) -> Tuple[int, int, int, int]:
+        """视口内可见的方块范围(列起, 行起, 列止, 行止)，止为开区间"""
+        size, pixels = self.block_size(scale), self.pixel_size(scale)
+        cols, rows = self.block_cols(size), self.block_rows(size)
+        bx0 = min(cols, max(0, int(x // pixels)))
+        by0 = min(rows, max(0, int(y // pixels)))
+        bx1 = min(cols, max(bx0, math.ceil((x + width) / pixels)))
+        by1 = min(rows, max(by0, math.ceil((y + height) / pixels)))
+        return bx0, by0, bx1, by1
+
+    def index_at(self, x: float, y: float, scale: float) -> Optional[int]:
+        """像素坐标处的主机序号"""
+        if x < 0 or y < 0:
+            return None
+        col, row = int(x / scale), int(y / scale)
+        if col >= self.cols:
+            return None
+        index = row * self.cols + col
+        return index if index < self.count else None
+
+    # ------------------------------------------------------------ 状态
+
+    def get_state(self, index: int) -> str:
+        return CODE_STATES[self.codes[index]]
+
+    def set_state(self, index: int, state: str) -> bool:
+        """设置主机状态，返回是否发生变化"""
+        new = STATE_CODES[state]
+        old = self.codes[index]
+        if old == new:
+            return False
+        self.codes[index] = new
+
+        row, col = divmod(index, self.cols)
+        for size, counters in self.block_counts.items():
+            block = (row // size) * self.block_cols(size) + col // size
+            if old:
+                counters[old - 1][block] -= 1
+            if new:
+                counters[new - 1][block] += 1
+        return True
+
+    def block_summary(self, bx: int, by: int, size: int) -> dict:
+        """方块内各状态的主机数"""
+        if size == 1:
+            index = by * self.cols + bx
+            state = self.get_state(index) if index < self.count else None
+            return {state: 1} if state else {}
+        block = by * self.block_cols(size) + bx
+        scanning, online, offline = (counter[block] for counter in self.block_counts[size])
+        return {STATE_SCANNING: scanning, STATE_ONLINE: online, STATE_OFFLINE: offline}
+
+    # ------------------------------------------------------------ 配色与渲染
+
+    def block_color(self, bx: int, by: int, size: int) -> str:
+        """
+        方块颜色：单点直接用状态色；聚合方块按已探测主机中的在线比例在离线红和在线绿之间插值，
+        尚无结果时显示扫描中或初始色
+        """
+        first = by * size * self.cols + bx * size
+        if first >= self.count:
+            return BACKGROUND_COLOR
+        if size == 1:
+            return CODE_COLORS[self.codes[first]]
+
+        block = by * self.block_cols(size) + bx
+        scanning, online, offline = (counter[block] for counter in self.block_counts[size])
+        probed = online + offline
+        if probed:
+            return blend_color(COLORS[STATE_OFFLINE], COLORS[STATE_ONLINE], online / probed)
+        return COLORS[STATE_SCANNING] if scanning else COLORS[STATE_INITIAL]
+
+    def render(self, bx0: int, by0: int, bx1: int, by1: int, size: int) -> List[List[str]]:
+        """视口内方块的颜色矩阵（按行）"""
+        if size == 1:
+            colors = CODE_COLORS
+            codes = self.codes
+            rows = []
+            for by in range(by0, by1):
+                start = by * self.cols
+                row = [colors[code] for code in codes[start + bx0:min(start + bx1, self.count)]]
+                row.extend([BACKGROUND_COLOR] * (bx1 - bx0 - len(row)))
+                rows.append(row)
+            return rows
+        return [[self.block_color(bx, by, size) for bx in range(bx0, bx1)] for by in range(by0, by1)]
@@ -0,0 +1,265 @@
+"""
+单画布IP方格渲染器
+
+所有方格绘制在同一个Canvas上，每个地址对应一对画布项（矩形+数字），
+扫描中的方格共用一个闪烁定时器，悬停、双击和右键通过坐标命中测试定位方格，
+调整大小时只移动画布项，不重建控件，方格状态得以保留
+"""
+
+import tkinter as tk
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from .grid_layout import (
+    GridLayout,
+    STATE_INITIAL,
+    STATE_SCANNING,
+    COLORS,
+    BLINK_COLOR,
+    TEXT_COLORS,
+    STATUS_TEXT,
+    STATUS_COLORS,
+)
+
+
+class IPGridCanvas(tk.Canvas):
+    """单画布IP方格网格"""
+
+    BLINK_INTERVAL = 333  # 闪烁间隔(ms)，1秒3次
+    HOVER_DELAY = 200     # 悬停提示延迟(ms)
+
+    def __init__(self, master, on_double_click: Callable = None, on_context_menu: Callable = None,
+                 describe: Callable[[Hashable], str] = None, **kwargs):
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(master, **kwargs)
+
+        self.on_double_click = on_double_click
+        self.on_context_menu = on_context_menu
+        self.describe = describe or str
+
+        self.layout: Optional[GridLayout] = None
+        self.keys: List[Hashable] = []
+        self.index_of: Dict[Hashable, int] = {}
+        self.rect_ids: List[int] = []
+        self.text_ids: List[int] = []
+        self.states: List[str] = []
+        self.results: Dict[Hashable, dict] = {}
+
+        # 共用的闪烁定时器
+        self.blinking = set()
+        self.blink_phase = False
+        self.blink_job = None
+
+        # 悬停提示
+        self.hover_index = None
+        self.hover_job = None
+        self.tooltip_window = None
+
+        self.bind("<Motion>", self._on_motion)
+        self.bind("<Leave>", self._on_leave)
+        self.bind("<Double-Button-1>", self._on_double_click)
+        self.bind("<Button-3>", self._on_right_click)
+
+    # ------------------------------------------------------------ 构建与布局
+
+    def build(self, keys: Iterable[Hashable], cols: int, cell_size: int,
+              labels: Iterable[str] = None):
+        """创建全部方格（状态重置为初始）"""
+        self.stop_blinking()
+        self._hide_tooltip()
+        self.delete("all")
+
+        self.keys = list(keys)
+        self.index_of = {key: index for index, key in enumerate(self.keys)}
+        labels = list(labels) if labels is not None else [str(key) for key in self.keys]
+        self.states = [STATE_INITIAL] * len(self.keys)
+        self.results = {}
+        self.layout = GridLayout(len(self.keys), cols, cell_size)
+
+        font = self._font(cell_size)
+        self.rect_ids = []
+        self.text_ids = []
+        for index, label in enumerate(labels):
+            x0, y0, x1, y1 = self.layout.cell_rect(index)
+            self.rect_ids.append(self.create_rectangle(
+                x0 + 1, y0 + 1, x1 - 1, y1 - 1,
+                fill=COLORS[STATE_INITIAL], outline="#333333", width=1, tags=("cell",)
+            ))
+            self.text_ids.append(self.create_text(
+                (x0 + x1) / 2, (y0 + y1) / 2, text=label, font=font,
+                fill=TEXT_COLORS[STATE_INITIAL], tags=("label",)
+            ))
+        self._update_scrollregion()
+
+    def relayout(self, cols: int, cell_size: int = None):
+        """按新的列数/方格大小移动已有画布项"""
+        if self.layout is None:
+            return
+        cell_size = cell_size or self.layout.cell_size
+        if cols == self.layout.cols and cell_size == self.layout.cell_size:
+            return
+
+        size_changed = cell_size != self.layout.cell_size
+        self.layout = GridLayout(len(self.keys), cols, cell_size)
+        for index, (rect_id, text_id) in enumerate(zip(self.rect_ids, self.text_ids)):
+            x0, y0, x1, y1 = self.layout.cell_rect(index)
+            self.coords(rect_id, x0 + 1, y0 + 1, x1 - 1, y1 - 1)
+            self.coords(text_id, (x0 + x1) / 2, (y0 + y1) / 2)
+        if size_changed:
+            self.itemconfigure("label", font=self._font(cell_size))
+        self._update_scrollregion()
+
+    @staticmethod
+    def _font(cell_size: int):
+        return ('微软雅黑', max(8, cell_size // 4), 'bold')
+
+    def _update_scrollregion(self):
+        width, height = self.layout.size
+        self.configure(scrollregion=(0, 0, width, height))
+
+    # ------------------------------------------------------------ 状态
+
+    def has_cell(self, key: Hashable) -> bool:
+        return key in self.index_of
+
+    def get_state(self, key: Hashable) -> Optional[str]:
+        index = self.index_of.get(key)
+        return self.states[index] if index is not None else None
+
+    def get_result(self, key: Hashable) -> Optional[dict]:
+        return self.results.get(key)
+
+    def set_state(self, key: Hashable, state: str, result: dict = None):
+        """设置方格状态"""
+        index = self.index_of.get(key)
+        if index is None:
+            return
+
+        # 状态不变时也保存结果（邻居表判定在线后又被探测确认，统计和探测方式需更新）
+        if result is not None:
+            self.results[key] = result
+        if self.states[index] == state:
+            return
+
+        self.states[index] = state
+        self.itemconfigure(self.rect_ids[index], fill=COLORS[state])
+        self.itemconfigure(self.text_ids[index], fill=TEXT_COLORS[state])
+
+        if state == STATE_SCANNING:
+            self.blinking.add(index)
+            self._ensure_blinking()
+        else:
+            self.blinking.discard(index)
+
+    def reset(self):
+        """全部方格恢复初始状态"""
+        self.stop_blinking()
+        self.states = [STATE_INITIAL] * len(self.keys)
+        self.results = {}
+        self.itemconfigure("cell", fill=COLORS[STATE_INITIAL])
+        self.itemconfigure("label", fill=TEXT_COLORS[STATE_INITIAL])
+
+    # ------------------------------------------------------------ 闪烁
+
+    def _ensure_blinking(self):
+        if self.blink_job is None:
+            self.blink_job = self.after(self.BLINK_INTERVAL, self._blink_tick)
+
+    def _blink_tick(self):
+        """所有扫描中的方格共用的闪烁节拍"""
+        self.blink_job = None
+        if not self.blinking:
+            return
+        self.blink_phase = not self.blink_phase
+        color = BLINK_COLOR if self.blink_phase else COLORS[STATE_SCANNING]
+        for index in self.blinking:
+            self.itemconfigure(self.rect_ids[index], fill=color)
+        self.blink_job = self.after(self.BLINK_INTERVAL, self._blink_tick)
+
+    def stop_blinking(self):
+        """停止闪烁"""
+        if self.blink_job is not None:
+            try:
+                self.after_cancel(self.blink_job)
+            except tk.TclError:
+                pass
+            self.blink_job = None
+        for index in self.blinking:
+            self.itemconfigure(self.rect_ids[index], fill=COLORS[self.states[index]])
+        self.blinking.clear()
+
+    # ------------------------------------------------------------ 鼠标交互
+
+    def key_at(self, x: int, y: int) -> Optional[Hashable]:
+        """窗口坐标处的方格（考虑滚动偏移）"""
+        if self.layout is None:
+            return None
+        index = self.layout.index_at(self.canvasx(x), self.canvasy(y))
+        return self.keys[index] if index is not None else None
+
+    def _on_motion(self, event):
+        index = None
+        if self.layout is not None:
+            index = self.layout.index_at(self.canvasx(event.x), self.canvasy(event.y))
+        if index == self.hover_index:
+            return
+
+        self.hover_index = index
+        self._hide_tooltip()
+        if index is not None:
+            self.hover_job = self.after(self.HOVER_DELAY, lambda: self._show_tooltip(index))
+
+    def _on_leave(self, event):
+        self.hover_index = None
+        self._hide_tooltip()
+
+    def _on_double_click(self, event):
+        key = self.key_at(event.x, event.y)
+        if key is not None and self.on_double_click:
+            self.on_double_click(key)
+
+    def _on_right_click(self, event):
+        key = self.key_at(event.x, event.y)
+        if key is not None and self.on_context_menu:
+            self.on_context_menu(key, event)
+
+    def _show_tooltip(self, index: int):
+        """显示悬停提示"""
+        self.hover_job = None
+        if index >= len(self.keys):
+            return
+        key = self.keys[index]
+        state = self.states[index]
+
+        self.tooltip_window = tk.Toplevel(self)
+        self.tooltip_window.wm_overrideredirect(True)
+        self.tooltip_window.configure(bg="#333333")
+
+        x0, y0, x1, _ = self.layout.cell_rect(index)
+        x = self.winfo_rootx() + int(x1 - self.canvasx(0)) + 5
+        y = self.winfo_rooty() + int(y0 - self.canvasy(0))
+        self.tooltip_window.geometry(f"+{x}+{y}")
+
+        frame = tk.Frame(self.tooltip_window, bg="#333333", padx=8, pady=6)
+        frame.pack()
+        tk.Label(frame, text=f"IP: {self.describe(key)}", font=('微软雅黑', 9, 'bold'),
+                 fg="white", bg="#333333").pack(anchor="w")
+        tk.Label(frame, text=f"状态: {STATUS_TEXT.get(state, '未知')}", font=('微软雅黑', 9),
+                 fg=STATUS_COLORS.get(state, "#CCCCCC"), bg="#333333").pack(anchor="w")
+
+        result = self.results.get(key)
+        if result and result.get('times'):
+            tk.Label(frame, text=f"响应: {result['times'][0]}ms", font=('微软雅黑', 9),
+                     fg="white", bg="#333333").pack(anchor="w")
+
+    def _hide_tooltip(self):
+        if self.hover_job is not None:
+            self.after_cancel(self.hover_job)
+            self.hover_job = None
+        if self.tooltip_window is not None:
+            self.tooltip_window.destroy()
+            self.tooltip_window = None
+
+    def destroy(self):
+        self.stop_blinking()
+        self._hide_tooltip()
+        super().destroy()
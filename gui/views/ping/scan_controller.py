@@ -2,28 +2,121 @@
 扫描控制器组件
 
 负责ping扫描的控制逻辑、状态管理和结果处理
+
+扫描线程只把结果放入线程安全的队列，UI线程每帧（约33ms）统一应用：
+方格状态变化批量提交，每帧最多刷新一次统计；"扫描中"的展示时长
+按每个方格的结果到达时间戳计算，而不是为每个主机单独挂定时器
+
+扫描目标可以是 /24 网段前缀（兼容旧输入）、CIDR 或起止范围，
+方格按目标在列表中的序号索引
+
+扫描开始前先读取系统邻居表(ARP缓存)，其中的主机立即显示为在线，
+探测时未知地址排在前面，邻居表中的主机最后再确认，
+全部探测方式都无应答时视为过期的缓存表项，改为离线；
+全部探测结束后再批量反向解析在线主机的名称，不占用探测时间，
+并从邻居表取得在线主机的MAC地址，悬停提示中显示对应的厂商
 """
 
+import collections
+import ipaddress
+import logging
+import re
 import threading
+import time
 import tkinter as tk
-from netkit.services.ping import PingService
+from netkit.services.ping import (
+    PingService,
+    parse_ip_range,
+    count_ip_range,
+    read_neighbor_table,
+    split_by_neighbors,
+    get_reverse_dns_resolver,
+)
+from netkit.utils.oui_lookup import lookup_vendor
+from gui.ui_queue import UIUpdateQueue
+
+logger = logging.getLogger(__name__)
+
+# 单次可视化扫描的最大主机数（一个/16网段）
+MAX_SCAN_HOSTS = 65536
+
+_PREFIX_PATTERN = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}$')
+
+
+def parse_scan_targets(text, max_hosts=MAX_SCAN_HOSTS):
+    """
+    解析可视化扫描的目标
+    
+    Args:
+        text (str): 网段前缀(如 192.168.1)、CIDR(如 10.0.0.0/16)或起止范围
+        max_hosts (int): 允许的最大主机数
+        
+    Returns:
+        list: IP地址列表
+        
+    Raises:
+        ValueError: 输入无效或范围过大时
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("请输入扫描目标")
+    
+    # 兼容只输入前三段的 /24 网段
+    if _PREFIX_PATTERN.match(text):
+        text = f"{text}.0/24"
+    
+    # 先计算主机数，避免展开过大的范围
+    total = count_ip_range(text)
+    if total > max_hosts:
+        raise ValueError(f"扫描范围过大（{total} 个地址），最多支持 {max_hosts} 个")
+    
+    targets = parse_ip_range(text)
+    if len(targets) == 1 and '/' not in text and '-' not in text:
+        # 单个目标必须是IPv4地址，不支持主机名
+        try:
+            ipaddress.IPv4Address(targets[0])
+        except ValueError:
+            raise ValueError("请输入IPv4地址、网段前缀、CIDR或起止范围")
+    if not targets:
+        raise ValueError("扫描范围内没有可用的主机地址")
+    return targets
 
 
 class ScanController:
     """扫描控制器"""
+
+    FRAME_INTERVAL = 33   # UI帧间隔(ms)
+    RESULT_DELAY = 0.5    # 结果显示前保持"扫描中"的时长(秒)，让用户看到扫描过程
     
     def __init__(self, view):
         self.view = view
         self.ping_service = PingService()
+        self.resolver = get_reverse_dns_resolver()
         self.scan_thread = None
         self.is_scanning = False
         
+        # 扫描代号，每次开始扫描时递增；停止后立即重新扫描时，旧扫描线程据此丢弃自己的结果
+        self.generation = 0
+        self.targets = []
+        self.index_of = {}
+
+        # 扫描线程 -> UI线程的结果队列，以及等待显示结果的方格(到期时间, 序号, 统计)
+        self.updates = UIUpdateQueue(view, self.apply_frame, self.FRAME_INTERVAL)
+        self.pending_results = collections.deque()
+        self.batch_finished = False
+        self.scan_error = None
+
+        # 已显示最终结果的方格：序号 -> 是否在线
+        self.results = {}
+        
+        # 仅凭邻居表显示为在线、尚未被探测确认的方格序号
+        self.neighbor_only = set()
+        
+        # 邻居表中取得的MAC地址：IP -> MAC
+        self.macs = {}
+        
         # 统计数据
-        self.stats = {
-            'online_count': 0,
-            'offline_count': 0,
-            'total_count': 254
-        }
+        self.reset_stats()
     
     def get_root_window(self):
         """获取主窗口引用"""
@@ -46,27 +139,43 @@ class ScanController:
             # 控件已销毁或不可访问，忽略更新
             pass
     
-    def start_scan(self, network_prefix):
-        """开始扫描"""
+    def start_scan(self, targets):
+        """
+        开始扫描
+        
+        Args:
+            targets (list): IP地址列表，序号即方格索引
+        """
         if self.is_scanning:
             return False
         
         try:
             # 立即设置扫描状态
             self.is_scanning = True
-            self.network_prefix = network_prefix
+            self.generation += 1
+            self.targets = list(targets)
+            self.index_of = {ip: index for index, ip in enumerate(self.targets)}
             
-            # 重置统计
+            # 重置统计和结果队列
             self.reset_stats()
+            self.updates.stop()
+            self.pending_results.clear()
+            self.results.clear()
+            self.neighbor_only.clear()
+            self.macs = {}
+            self.batch_finished = False
+            self.scan_error = None
+            self.updates.start()
             
             # 启动扫描线程
-            self.scan_thread = threading.Thread(target=self.scan_network, daemon=True)
+            self.scan_thread = threading.Thread(target=self.scan_network, args=(self.generation,), daemon=True)
             self.scan_thread.start()
             
             return True
         except Exception as e:
             # 如果启动失败，重置状态
             self.is_scanning = False
+            self.updates.stop()
             return False
     
     def stop_scan(self):
@@ -79,91 +188,205 @@ class ScanController:
         self.stats = {
             'online_count': 0,
             'offline_count': 0,
-            'total_count': 254
+            'total_count': len(self.targets)
         }
     
-    def scan_network(self):
-        """扫描网络（在后台线程中运行）"""
+    def load_neighbors(self):
+        """读取系统邻居表"""
+        return read_neighbor_table()
+    
+    def scan_network(self, generation=None):
+        """
+        扫描网络（在后台线程中运行）
+        
+        Args:
+            generation: 本次扫描的代号，默认为当前代号
+        """
+        if generation is None:
+            generation = self.generation
+        
+        def current():
+            return generation == self.generation
+        
+        # 停止后立即开始的新扫描会替换这些属性，旧线程只使用自己的副本
+        targets, index_of, macs = self.targets, self.index_of, self.macs
+        neighbors = {}
+        known = []
+        results = {}
+        online = []
         try:
-            # 生成IP列表
-            ip_list = []
-            for i in range(1, 255):  # 1-254
-                ip = f"{self.network_prefix}.{i}"
-                ip_list.append(ip)
+            # 邻居表中的主机不等探测，按已到期的时间戳入队，下一帧即显示为在线
+            neighbors = self.load_neighbors()
+            unknown, known = split_by_neighbors(targets, neighbors)
+            received = time.monotonic() - self.RESULT_DELAY
+            for host in known:
+                entry = neighbors[host]
+                macs[host] = entry['mac']
+                stats = {'host': host, 'success': True, 'method': 'neighbor', 'mac': entry['mac'], 'times': []}
+                if current():
+                    self.updates.put((index_of[host], stats, received))
             
-            # 使用ping服务进行批量扫描
+            # 使用ping服务进行批量主机发现
             def on_progress(host, result, stats, completed, total):
-                if not self.is_scanning:
+                if not self.is_scanning or not current():
                     return
                     
-                # 提取IP后缀
-                ip_suffix = int(host.split('.')[-1])
-                
-                # 在主线程中更新UI（使用主窗口调度）
-                self.safe_ui_update(lambda: self.update_cell_result(ip_suffix, result, stats))
+                # 目标序号连同到达时间放入队列，由UI帧统一处理
+                index = index_of.get(host)
+                if index is not None:
+                    self.updates.put((index, stats, time.monotonic()))
             
-            # 执行批量ping
-            self.ping_service.batch_ping(
-                ip_list,
-                count=1,  # 每个IP只ping一次
+            # 已被新扫描取代时不再开始探测，以免替换新扫描的探测任务
+            if not current():
+                return
+            
+            # 执行主机发现，禁ping的主机通过邻居表或TCP端口也能判定在线
+            results = self.ping_service.batch_discover(
+                unknown + known,  # 未知地址优先探测
                 timeout=1000,  # 1秒超时
                 max_workers=25,  # 25个并发
                 progress_callback=on_progress
+            ) or {}
+            online.extend(
+                host for host in unknown
+                if host in results and results[host]['stats']['success']
             )
             
         except Exception as e:
-            self.safe_ui_update(lambda: self.view.show_error(f"扫描过程中出现错误: {str(e)}"))
+            if current():
+                self.scan_error = f"扫描过程中出现错误: {str(e)}"
         finally:
-            if self.is_scanning:
-                # 延迟500ms调用scan_completed，确保用户有时间切换tab
-                self.safe_ui_update(self.scan_completed, 500)
-    
-    def update_cell_result(self, ip_suffix, result, stats):
-        """更新方格扫描结果"""        
-        # 通知视图更新方格状态（使用主窗口调度）
-        def update_scanning():
-            try:
-                # 检查特定IP的控件是否存在
-                if ip_suffix not in self.view.grid_cells:
-                    return
-                
-                cell = self.view.grid_cells[ip_suffix]
-                if not cell.winfo_exists():
-                    return
-                
-                self.view.update_cell_scanning(ip_suffix)
-            except (tk.TclError, AttributeError):
-                # 控件已销毁或不可访问，忽略更新
-                pass
+            # 由UI帧在全部结果显示完后调用scan_completed
+            if current():
+                self.batch_finished = True
         
-        self.safe_ui_update(update_scanning)
+        if not current():
+            return
         
-        # 延迟显示结果，让用户看到扫描过程
-        def show_result():
-            try:
-                # 检查特定IP的控件是否存在
-                if ip_suffix not in self.view.grid_cells:
-                    return
-                
-                cell = self.view.grid_cells[ip_suffix]
-                if not cell.winfo_exists():
-                    return
-                
-                if stats['success']:
-                    self.view.update_cell_online(ip_suffix, stats)
-                    self.stats['online_count'] += 1
-                else:
-                    self.view.update_cell_offline(ip_suffix, stats)
-                    self.stats['offline_count'] += 1
-                
-                # 更新统计显示
+        # 邻居表中的主机被探测否定时是过期表项，不再解析名称；未来得及探测的仍按在线处理
+        online.extend(
+            host for host in known
+            if host not in results or results[host]['stats']['success']
+        )
+        self.record_macs(online)
+        self.resolve_names(online)
+    
+    def record_macs(self, hosts):
+        """探测过的在线主机此时已进入邻居表，记录其MAC地址"""
+        missing = [host for host in hosts if host not in self.macs]
+        if not missing:
+            return
+        neighbors = self.load_neighbors()
+        for host in missing:
+            entry = neighbors.get(host)
+            if entry:
+                self.macs[host] = entry['mac']
+    
+    def lookup_vendor(self, ip_address):
+        """主机MAC地址对应的厂商（MAC未知或不在OUI库中时为None）"""
+        mac = self.macs.get(ip_address)
+        return lookup_vendor(mac) if mac else None
+    
+    def resolve_names(self, hosts):
+        """反向解析主机名，结果进入解析器缓存，悬停提示显示时从缓存读取"""
+        if not hosts:
+            return
+        try:
+            self.resolver.resolve_many(hosts)
+        except Exception as e:
+            logger.warning(f"反向解析主机名失败: {e}")
+    
+    def lookup_name(self, ip_address):
+        """已解析的主机名（只查缓存）"""
+        return self.resolver.lookup_cached(ip_address)
+    
+    def apply_frame(self, items, now=None):
+        """
+        应用一帧的扫描结果（在UI线程中由队列定时调用）
+
+        Args:
+            items: 本帧取出的(序号, 统计, 到达时间)
+            now: 当前时间(time.monotonic)，测试时可传入
+
+        Returns:
+            bool: 是否需要继续计时
+        """
+        now = time.monotonic() if now is None else now
+        try:
+            # 新到达的结果先显示为扫描中（已到期的直接显示），已有结果的方格（邻居表中的主机）直接更新
+            changed = False
+            for index, stats, received in items:
+                if not self.view.has_cell(index):
+                    continue
+                if index in self.results:
+                    changed = self.apply_result(index, stats) or changed
+                    continue
+                due = received + self.RESULT_DELAY
+                if due > now:
+                    self.view.update_cell_scanning(index)
+                self.pending_results.append((due, index, stats))
+
+            # 到期的方格显示最终结果，按到达顺序入队，因此到期时间单调递增
+            while self.pending_results and self.pending_results[0][0] <= now:
+                _, index, stats = self.pending_results.popleft()
+                if not self.view.has_cell(index):
+                    continue
+                changed = self.apply_result(index, stats) or changed
+
+            # 每帧最多刷新一次统计显示
+            if changed:
                 self.view.update_stats(self.stats)
-            except (tk.TclError, AttributeError):
-                # 控件已销毁或不可访问，忽略更新
-                pass
+
+            if self.scan_error:
+                message, self.scan_error = self.scan_error, None
+                self.view.show_error(message)
+
+            if self.batch_finished and not self.pending_results and not self.updates.items:
+                self.batch_finished = False
+                if self.is_scanning:
+                    self.scan_completed()
+                return False
+        except (tk.TclError, AttributeError):
+            # 控件已销毁或不可访问，停止更新
+            self.pending_results.clear()
+            return False
+
+        return self.is_scanning or bool(self.pending_results)
+    
+    def apply_result(self, index, stats):
+        """
+        显示方格的最终结果并更新计数
+        
+        Returns:
+            bool: 统计是否变化
+        """
+        online = stats['success']
+        previous = self.results.get(index)
+        if previous and not online and index not in self.neighbor_only:
+            # 已被探测确认在线的方格不被之后的无应答覆盖
+            return False
+        
+        # 仅凭邻居表显示在线的方格，探测完成且全部无应答时是过期表项，改为离线
+        if online and stats.get('method') == 'neighbor':
+            self.neighbor_only.add(index)
+        else:
+            self.neighbor_only.discard(index)
         
-        # 延迟500ms显示结果（使用主窗口调度）
-        self.safe_ui_update(show_result, 500)
+        if online:
+            self.view.update_cell_online(index, stats)
+        else:
+            self.view.update_cell_offline(index, stats)
+        self.results[index] = online
+        
+        if previous is None:
+            self.stats['online_count' if online else 'offline_count'] += 1
+            return True
+        if previous != online:
+            delta = 1 if online else -1
+            self.stats['online_count'] += delta
+            self.stats['offline_count'] -= delta
+            return True
+        return False
     
     def scan_completed(self):
         """扫描完成"""
@@ -172,13 +395,18 @@ class ScanController:
         # 通知视图扫描完成
         self.view.on_scan_completed(self.stats)
     
-    def ping_single_ip(self, network_prefix, ip_suffix):
+    def ping_single_ip(self, ip_address):
         """单独ping某个IP"""
-        ip_address = f"{network_prefix}.{ip_suffix}"
-        
         def do_ping():
             try:
                 result = self.ping_service.ping_with_stats(ip_address, count=4, timeout=1000)
+                # 不等待反向解析：与ping同时进行的解析已完成时显示主机名，否则之后出现在悬停提示中
+                result['hostname'] = self.lookup_name(ip_address)
+                entry = self.load_neighbors().get(ip_address)
+                if entry:
+                    self.macs[ip_address] = entry['mac']
+                result['mac'] = self.macs.get(ip_address)
+                result['vendor'] = self.lookup_vendor(ip_address)
                 
                 # 在主线程中显示结果（使用主窗口调度）
                 self.safe_ui_update(lambda: self.view.show_single_ping_result(ip_address, result))
@@ -186,7 +414,8 @@ class ScanController:
             except Exception as e:
                 self.safe_ui_update(lambda: self.view.show_error(f"Ping {ip_address} 失败: {str(e)}"))
         
-        # 在后台线程中执行ping
+        # 在后台线程中执行ping，反向解析在另一线程中进行（已缓存时直接返回），结果进入解析器缓存
+        threading.Thread(target=self.resolve_names, args=([ip_address],), daemon=True).start()
         threading.Thread(target=do_ping, daemon=True).start()
         
         return True 
\ No newline at end of file
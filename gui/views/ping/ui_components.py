@@ -121,17 +121,22 @@ class ScanResultDialog:
     def show_single_ping_result(parent, ip_address, result):
         """显示单独ping的结果"""
         stats = result['stats']
+        host_info = f"主机名: {result['hostname']}\n" if result.get('hostname') else ""
+        if result.get('mac'):
+            vendor = f" ({result['vendor']})" if result.get('vendor') else ""
+            host_info += f"MAC地址: {result['mac']}{vendor}\n"
         
         if stats['success']:
             message = (
                 f"Ping {ip_address} 成功!\n\n"
+                f"{host_info}"
                 f"数据包: 已发送 {stats['packets_sent']}, 已接收 {stats['packets_received']}\n"
                 f"丢包率: {stats['packet_loss']:.1f}%\n"
                 f"响应时间: 最小 {stats['min_time']}ms, 最大 {stats['max_time']}ms, 平均 {stats['avg_time']}ms"
             )
             messagebox.showinfo("Ping结果", message)
         else:
-            messagebox.showerror("Ping结果", f"Ping {ip_address} 失败\n\n目标主机无响应")
+            messagebox.showerror("Ping结果", f"Ping {ip_address} 失败\n\n{host_info}目标主机无响应")
     
     @staticmethod
     def show_ping_in_progress(parent, ip_address):
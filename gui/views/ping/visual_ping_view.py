@@ -3,26 +3,36 @@
 
 采用智能动态布局，根据窗口大小自动调整行列数，直观显示网段内所有IP的ping状态
 设计简洁，交互友好，适合快速网络扫描
+
+扫描目标支持 /24 网段前缀、CIDR 和起止范围：较小的范围用带编号的方格显示，
+超过 GRID_CELL_LIMIT 个地址时切换为可缩放的热力图（最大一个/16网段）
 """
 
 import math
+import tkinter as tk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from ttkbootstrap.scrolled import ScrolledFrame
 from netkit.utils.ui_helper import ui_helper
-from .grid_cell import IPGridCell
-from .scan_controller import ScanController
+from .grid_layout import STATE_SCANNING, STATE_ONLINE, STATE_OFFLINE
+from .ip_grid_canvas import IPGridCanvas
+from .heatmap_canvas import HeatmapCanvas
+from .scan_controller import ScanController, parse_scan_targets
 from .ui_components import IPDetailWindow, IPContextMenu, ScanResultDialog
 
 
 class VisualPingView(tb.Frame):
     """可视化Ping测试主界面"""
+
+    GRID_CELL_LIMIT = 1024  # 超过该数量的地址改用热力图显示
     
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
         
         self.network_prefix = "192.168.1"  # 默认网段
-        self.grid_cells = {}  # IP后缀 -> IPGridCell
+        self.targets = parse_scan_targets(self.network_prefix)  # 方格序号 -> IP地址
+        self.grid_canvas = None  # 单画布方格网格（按目标序号索引）
+        self.heatmap_canvas = None  # 大范围热力图（按目标序号索引）
+        self.active_canvas = None  # 当前显示的网格
         self.scan_controller = ScanController(self)
         
         # 布局缓存和性能优化
@@ -56,13 +66,15 @@ class VisualPingView(tb.Frame):
         input_section = tb.Frame(main_control_frame)
         input_section.pack(side=LEFT, fill=X, expand=True)
         
-        tb.Label(input_section, text="网段:").pack(side=LEFT)
+        tb.Label(input_section, text="扫描目标:").pack(side=LEFT)
         
-        self.network_entry = tb.Entry(input_section, width=15)
+        self.network_entry = tb.Entry(input_section, width=30)
         self.network_entry.pack(side=LEFT, padx=(ui_helper.get_padding(10), 0))
         self.network_entry.insert(0, self.network_prefix)
         
-        tb.Label(input_section, text="/24", bootstyle=SECONDARY).pack(side=LEFT, padx=(ui_helper.get_padding(5), 0))
+        tb.Label(
+            input_section, text="如 192.168.1、10.0.0.0/16、10.0.0.1-10.0.3.254", bootstyle=SECONDARY
+        ).pack(side=LEFT, padx=(ui_helper.get_padding(5), 0))
         
         # 右侧：控制按钮
         button_section = tb.Frame(main_control_frame)
@@ -91,36 +103,95 @@ class VisualPingView(tb.Frame):
         """设置方格显示区域"""
         grid_frame = tb.LabelFrame(self, text="网络状态", padding=ui_helper.get_padding(10))
         grid_frame.pack(fill=BOTH, expand=True, pady=(0, ui_helper.get_padding(15)))
+        self.grid_frame = grid_frame
         
-        # 创建滚动框架容器
-        self.scrolled_frame = ScrolledFrame(grid_frame, autohide=True)
-        self.scrolled_frame.pack(fill=BOTH, expand=True)
+        # 所有方格绘制在同一个画布上
+        self.grid_container = tb.Frame(grid_frame)
+        self.grid_canvas = IPGridCanvas(
+            self.grid_container,
+            on_double_click=self.ping_single_ip,
+            on_context_menu=self.show_context_menu,
+            describe=self.describe_cell
+        )
+        scrollbar = tb.Scrollbar(self.grid_container, orient=VERTICAL, command=self.grid_canvas.yview)
+        self.grid_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.grid_canvas.pack(side=LEFT, fill=BOTH, expand=True)
+        self.grid_canvas.bind("<MouseWheel>", self.on_grid_mousewheel)
+        
+        # 大范围扫描的热力图（Ctrl+滚轮缩放）
+        self.heatmap_container = tb.Frame(grid_frame)
+        self.heatmap_canvas = HeatmapCanvas(
+            self.heatmap_container,
+            on_double_click=self.ping_single_ip,
+            on_context_menu=self.show_context_menu,
+            describe=self.describe_cell
+        )
+        heatmap_ybar = tb.Scrollbar(self.heatmap_container, orient=VERTICAL, command=self.heatmap_canvas.yview)
+        heatmap_xbar = tb.Scrollbar(self.heatmap_container, orient=HORIZONTAL, command=self.heatmap_canvas.xview)
+        self.heatmap_canvas.attach_scrollbars(heatmap_xbar, heatmap_ybar)
+        heatmap_ybar.pack(side=RIGHT, fill=Y)
+        heatmap_xbar.pack(side=BOTTOM, fill=X)
+        self.heatmap_canvas.pack(side=LEFT, fill=BOTH, expand=True)
+        self.heatmap_canvas.bind("<MouseWheel>", self.on_grid_mousewheel)
         
-        # 获取滚动框架内的实际容器
-        self.grid_container = self.scrolled_frame
-        
-        # 初始化网格，延迟到窗口显示后再创建
-        self.grid_cells = {}
-        self.grid_frame = grid_frame
+        self.show_canvas(self.grid_canvas)
         
         # 绑定容器大小变化事件（绑定到外层容器）
         grid_frame.bind('<Configure>', self.on_grid_container_configure)
         
-        # 为网格容器添加回调方法
-        self.grid_container.ping_single_ip = self.ping_single_ip
-        self.grid_container.show_context_menu = self.show_context_menu
-        
         # 延迟创建网格（确保容器已经有实际尺寸）
         self.after(100, self.create_adaptive_grid)
     
+    def show_canvas(self, canvas):
+        """切换显示方格网格或热力图"""
+        if canvas is self.active_canvas:
+            return
+        if self.active_canvas is not None:
+            self.active_canvas.stop_blinking()
+            self.active_canvas.master.pack_forget()
+        canvas.master.pack(fill=BOTH, expand=True)
+        self.active_canvas = canvas
+    
+    def describe_target(self, index):
+        """方格序号对应的IP地址"""
+        return self.targets[index] if 0 <= index < len(self.targets) else str(index)
+    
+    def describe_cell(self, index):
+        """悬停提示中的地址，已知主机名和网卡厂商时一并显示"""
+        ip_address = self.describe_target(index)
+        details = [
+            detail for detail in (self.scan_controller.lookup_name(ip_address),
+                                  self.scan_controller.lookup_vendor(ip_address))
+            if detail
+        ]
+        return f"{ip_address} ({', '.join(details)})" if details else ip_address
+    
+    def set_targets(self, targets):
+        """设置扫描目标，按数量选择方格网格或热力图"""
+        changed = targets != self.targets
+        self.targets = targets
+        self.total_label.config(text=str(len(targets)))
+        
+        if len(targets) > self.GRID_CELL_LIMIT:
+            self.show_canvas(self.heatmap_canvas)
+            if changed or self.heatmap_canvas.model is None:
+                self.heatmap_canvas.build(len(targets))
+        else:
+            self.show_canvas(self.grid_canvas)
+            if changed:
+                self.layout_cache.clear()
+                self.grid_canvas.layout = None
+                self.create_adaptive_grid()
+    
+    def on_grid_mousewheel(self, event):
+        """鼠标滚轮滚动方格区域"""
+        self.active_canvas.yview_scroll(int(-event.delta / 120) or (-1 if event.delta > 0 else 1), "units")
+    
     def on_grid_container_configure(self, event):
         """响应容器大小变化"""
         # 只响应外层框架的配置事件，避免子控件事件干扰
         if event.widget == self.grid_frame:
-            # 扫描期间阻止网格重建
-            if hasattr(self, 'scan_controller') and self.scan_controller.is_scanning:
-                return
-                
             # 延迟调整，避免频繁触发
             if hasattr(self, '_resize_job'):
                 self.after_cancel(self._resize_job)
@@ -140,7 +211,7 @@ class VisualPingView(tb.Frame):
         cell_size = ui_helper.scale_size(44)  # 固定44px方格
         spacing = 2  # padx=1, pady=1，总间距2px
         padding = ui_helper.get_padding(10) * 2  # 左右内边距
-        total_ips = 254
+        total_ips = len(self.targets)
         
         # 计算可用空间
         available_width = max(0, container_width - padding)
@@ -173,113 +244,38 @@ class VisualPingView(tb.Frame):
         return layout
     
     def create_adaptive_grid(self):
-        """创建智能动态布局的网格"""
-        print(f"DEBUG: create_adaptive_grid被调用，当前网格数量：{len(self.grid_cells)}")
-        try:
-            # 获取容器的实际尺寸
-            container_width = self.grid_frame.winfo_width()
-            container_height = self.grid_frame.winfo_height()
-            print(f"DEBUG: 容器尺寸 {container_width}x{container_height}")
-            
-            # 如果容器还没有实际尺寸，延迟执行
-            if container_width <= 1 or container_height <= 1:
-                self.after(50, self.create_adaptive_grid)
-                return
-            
-            # 扫描保护机制：如果正在扫描，不允许重建网格
-            if hasattr(self, 'scan_controller') and self.scan_controller and self.scan_controller.is_scanning:
-                print("DEBUG: 扫描正在进行，跳过网格重建")
-                return
-                
-            # 时间戳保护机制
-            import time
-            current_time = time.time()
-            protection_timestamp = getattr(self, '_grid_protection_timestamp', 0)
-            if current_time - protection_timestamp < 5.0:  # 5秒保护期
-                print(f"DEBUG: 保护期内({current_time - protection_timestamp:.1f}s)，跳过网格重建")
-                return
-            
-            # 计算最优布局
-            layout = self.calculate_optimal_grid_layout(container_width, container_height)
-            
-            # 性能优化：检查布局是否真正改变
-            if (self.last_layout and 
-                self.last_layout['cols'] == layout['cols'] and 
-                self.last_layout['rows'] == layout['rows'] and
-                self.grid_cells):
-                print("DEBUG: 布局未变，跳过重建")
-                return  # 布局未变，跳过重建
-            
-            # 如果有现有网格且只是重新排列，智能调整
-            if (self.grid_cells and self.last_layout and 
-                len(self.grid_cells) == 254):  # 现有cell数量正确
-                self._rearrange_existing_grid(layout)
-            else:
-                self._create_new_grid(layout)
-            
-            # ScrolledFrame会自动管理滚动区域，无需手动设置scrollregion
-            
-            # 记录当前布局
-            self.last_layout = layout
-            
-        except Exception as e:
-            # 异常情况下强制重建
-            print(f"DEBUG: 网格创建异常: {e}")
-            self.force_rebuild_grid()
-    
-    def _rearrange_existing_grid(self, layout):
-        """重新排列现有网格cell的位置"""
-        cols = layout['cols']
-        cell_size = layout['cell_size']
-        
-        # 重新排列所有cell
-        for ip_suffix, cell in self.grid_cells.items():
-            row = (ip_suffix - 1) // cols
-            col = (ip_suffix - 1) % cols
-            
-            # 更新方格大小和位置
-            cell.configure(width=cell_size, height=cell_size)
-            cell.grid(row=row, column=col, padx=1, pady=1)
-    
-    def _create_new_grid(self, layout):
-        """创建全新的网格"""
-        print("DEBUG: ===== 开始销毁现有网格 =====")
-        # 清除现有网格
-        for cell in self.grid_cells.values():
-            cell.destroy()
-        self.grid_cells.clear()
-        print("DEBUG: ===== 网格销毁完成 =====")
-        
-        cols = layout['cols']
-        rows = layout['rows']
-        cell_size = layout['cell_size']
-        
-        # 创建新网格：动态行列数
-        for ip_suffix in range(1, 255):  # IP 1-254
-            row = (ip_suffix - 1) // cols
-            col = (ip_suffix - 1) % cols
-            
-            cell = IPGridCell(self.grid_container, ip_suffix, size=cell_size)
-            cell.grid(row=row, column=col, padx=1, pady=1)
-            
-            self.grid_cells[ip_suffix] = cell
+        """按容器宽度排列方格（已有方格只移动位置，保留扫描状态）"""
+        if self.active_canvas is not self.grid_canvas:
+            return  # 热力图随画布大小自行重绘视口
+        
+        container_width = self.grid_frame.winfo_width()
+        container_height = self.grid_frame.winfo_height()
+        
+        # 如果容器还没有实际尺寸，延迟执行
+        if container_width <= 1 or container_height <= 1:
+            self.after(50, self.create_adaptive_grid)
+            return
+        
+        # 计算最优布局
+        layout = self.calculate_optimal_grid_layout(container_width, container_height)
         
-        print("DEBUG: 网格创建完成")
+        if self.grid_canvas.layout is None:
+            # 方格内显示地址的最后一段，悬停提示显示完整地址
+            self.grid_canvas.build(
+                range(len(self.targets)), layout['cols'], layout['cell_size'],
+                labels=[ip.rsplit('.', 1)[-1] for ip in self.targets]
+            )
+        else:
+            self.grid_canvas.relayout(layout['cols'], layout['cell_size'])
+        
+        # 记录当前布局
+        self.last_layout = layout
     
     def force_rebuild_grid(self):
         """强制重建网格（用于异常情况）"""
-        # 清除现有网格
-        for cell in self.grid_cells.values():
-            cell.destroy()
-        self.grid_cells.clear()
-        
-        # 清除缓存
         self.layout_cache.clear()
         self.last_layout = None
-        if hasattr(self, '_last_cell_size'):
-            delattr(self, '_last_cell_size')
-        
-        # 重新创建
+        self.grid_canvas.layout = None
         self.create_adaptive_grid()
     
     def setup_stats_panel(self):
@@ -303,19 +299,21 @@ class VisualPingView(tb.Frame):
         
         # 总数
         tb.Label(stats_grid, text="总数:").grid(row=0, column=4, sticky=W, padx=(0, ui_helper.get_padding(5)))
-        self.total_label = tb.Label(stats_grid, text="254", bootstyle=INFO, font=('微软雅黑', ui_helper.scale_size(12), 'bold'))
+        self.total_label = tb.Label(stats_grid, text=str(len(self.targets)), bootstyle=INFO, font=('微软雅黑', ui_helper.scale_size(12), 'bold'))
         self.total_label.grid(row=0, column=5, sticky=W)
         
 
     
     def start_scan(self):
         """开始扫描"""
-        # 验证输入
+        # 解析扫描目标
         network_prefix = self.network_entry.get().strip()
-        if not self.validate_network_input(network_prefix):
+        targets = self.resolve_targets(network_prefix)
+        if targets is None:
             return
             
         self.network_prefix = network_prefix
+        self.set_targets(targets)
         
         # 更新按钮状态
         self.start_btn.config(state=DISABLED)
@@ -327,7 +325,7 @@ class VisualPingView(tb.Frame):
 
         
         # 启动扫描
-        self.scan_controller.start_scan(network_prefix)
+        self.scan_controller.start_scan(targets)
     
     def stop_scan(self):
         """停止扫描"""
@@ -339,57 +337,45 @@ class VisualPingView(tb.Frame):
         self.stop_btn.config(state=DISABLED)
         
         # 停止所有闪烁
-        for cell in self.grid_cells.values():
-            cell.stop_blinking()
+        self.active_canvas.stop_blinking()
         
 
     
-    def validate_network_input(self, network_prefix):
-        """验证网络输入"""
-        if not network_prefix:
-            ScanResultDialog.show_validation_error(self, "请输入网段前缀")
-            return False
-            
-        # 验证IP格式
-        parts = network_prefix.split('.')
-        if len(parts) != 3:
-            ScanResultDialog.show_validation_error(self, "请输入正确的网段格式，如: 192.168.1")
-            return False
-            
+    def resolve_targets(self, text):
+        """解析扫描目标，无效时提示并返回None"""
+        if not text:
+            ScanResultDialog.show_validation_error(self, "请输入扫描目标")
+            return None
         try:
-            for part in parts:
-                if not (0 <= int(part) <= 255):
-                    raise ValueError()
-        except ValueError:
-            ScanResultDialog.show_validation_error(self, "IP地址格式不正确")
-            return False
-        
-        return True
+            return parse_scan_targets(text)
+        except ValueError as e:
+            ScanResultDialog.show_validation_error(self, str(e))
+            return None
     
     def reset_grid_state(self):
         """重置方格状态"""
-        for cell in self.grid_cells.values():
-            cell.set_state(IPGridCell.STATE_INITIAL)
+        self.active_canvas.reset()
         
         # 重置统计显示
         self.online_label.config(text="0")
         self.offline_label.config(text="0")
     
     # 扫描控制器回调方法
-    def update_cell_scanning(self, ip_suffix):
+    def has_cell(self, index):
+        """方格是否存在"""
+        return self.active_canvas is not None and self.active_canvas.has_cell(index)
+    
+    def update_cell_scanning(self, index):
         """更新方格为扫描中状态"""
-        if ip_suffix in self.grid_cells:
-            self.grid_cells[ip_suffix].set_state(IPGridCell.STATE_SCANNING)
+        self.active_canvas.set_state(index, STATE_SCANNING)
     
-    def update_cell_online(self, ip_suffix, stats):
+    def update_cell_online(self, index, stats):
         """更新方格为在线状态"""
-        if ip_suffix in self.grid_cells:
-            self.grid_cells[ip_suffix].set_state(IPGridCell.STATE_ONLINE, stats)
+        self.active_canvas.set_state(index, STATE_ONLINE, stats)
     
-    def update_cell_offline(self, ip_suffix, stats):
+    def update_cell_offline(self, index, stats):
         """更新方格为离线状态"""
-        if ip_suffix in self.grid_cells:
-            self.grid_cells[ip_suffix].set_state(IPGridCell.STATE_OFFLINE, stats)
+        self.active_canvas.set_state(index, STATE_OFFLINE, stats)
     
     def update_stats(self, stats):
         """更新统计显示"""
@@ -410,20 +396,20 @@ class VisualPingView(tb.Frame):
     
     # 方格交互回调方法
     
-    def ping_single_ip(self, ip_suffix):
+    def ping_single_ip(self, index):
         """单独ping某个IP"""
-        ip_address = f"{self.network_prefix}.{ip_suffix}"
+        ip_address = self.describe_target(index)
         
         # 直接执行ping，不显示提示窗口
-        self.scan_controller.ping_single_ip(self.network_prefix, ip_suffix)
+        self.scan_controller.ping_single_ip(ip_address)
     
-    def show_context_menu(self, ip_suffix, event):
+    def show_context_menu(self, index, event):
         """显示右键菜单（只有单独ping功能）"""
-        ip_address = f"{self.network_prefix}.{ip_suffix}"
+        ip_address = self.describe_target(index)
         
         # 创建简化的右键菜单
         IPContextMenu(
-            self, ip_address, ip_suffix, event,
+            self, ip_address, index, event,
             self.ping_single_ip
         )
     
@@ -440,10 +426,10 @@ class VisualPingView(tb.Frame):
         """清理资源，停止正在进行的扫描"""
         if self.scan_controller:
             self.scan_controller.stop_scan()
+            self.scan_controller.updates.stop()
         
-        # 停止所有闪烁效果
-        for cell in self.grid_cells.values():
-            try:
-                cell.stop_blinking()
-            except:
-                pass  # 忽略已销毁的控件错误 
\ No newline at end of file
+        # 停止闪烁效果
+        try:
+            self.active_canvas.stop_blinking()
+        except tk.TclError:
+            pass  # 忽略已销毁的控件错误 
\ No newline at end of file
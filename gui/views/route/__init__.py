@@ -5,20 +5,27 @@
 提供路由表显示、路由添加/删除、结果展示等功能的完整UI界面
 """
 
-# 主视图
-from .route_view import RouteFrame
+from netkit.utils.lazy_import import lazy_module
 
-# UI组件
-from .route_table_widget import RouteTableWidget
-from .route_form_widget import RouteFormWidget
-from .action_buttons_widget import ActionButtonsWidget
-from .result_display_widget import ResultDisplayWidget
+_EXPORTS = {
+    # 主视图
+    'RouteFrame': '.route_view',
+    # UI组件
+    'RouteTableWidget': '.route_table_widget',
+    'RouteTableModel': '.route_table_model',
+    'RouteFormWidget': '.route_form_widget',
+    'ActionButtonsWidget': '.action_buttons_widget',
+    'ResultDisplayWidget': '.result_display_widget',
+}
 
 # 为了向后兼容，保持原有的导入方式
 __all__ = [
     'RouteFrame',  # 主视图
     'RouteTableWidget',  # 路由表组件
+    'RouteTableModel',   # 路由表显示模型
     'RouteFormWidget',   # 表单组件
     'ActionButtonsWidget',  # 按钮组件
     'ResultDisplayWidget'   # 结果显示组件
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
@@ -0,0 +1,120 @@
+"""
+路由表显示模型
+职责：为路由分配稳定的行ID、计算新旧路由表差异、客户端筛选与排序（不依赖Tk）
+"""
+
+import ipaddress
+from typing import Dict, List, Optional, Tuple
+
+# 显示列：(TreeView列名, 路由数据字段)
+COLUMNS = (
+    ("destination", "network_destination"),
+    ("netmask", "netmask"),
+    ("gateway", "gateway"),
+    ("interface", "interface"),
+    ("metric", "metric"),
+    ("type", "route_type"),
+)
+
+# 按IP地址数值排序的列
+_IP_COLUMNS = {"destination", "netmask", "gateway", "interface"}
+
+
+def route_key(route: Dict) -> str:
+    """路由的稳定键：目标、掩码、网关、接口确定一条路由，跃点数等属性变化视为更新"""
+    return "|".join(str(route.get(field, "")) for field in
+                    ("network_destination", "netmask", "gateway", "interface"))
+
+
+def route_values(route: Dict) -> Tuple[str, ...]:
+    """路由在表格中显示的各列值"""
+    return tuple(str(route.get(field, "")) for _, field in COLUMNS)
+
+
+def _sort_key(column: str, value: str):
+    """列值的排序键：IP按数值、跃点数按整数，无法解析的值排在后面按文本比较"""
+    if column in _IP_COLUMNS:
+        try:
+            return (0, int(ipaddress.IPv4Address(value)), "")
+        except ValueError:
+            return (1, 0, value)
+    if column == "metric":
+        try:
+            return (0, int(value), "")
+        except ValueError:
+            return (1, 0, value)
+    return (0, 0, value)
+
+
+class RouteTableModel:
+    """路由表显示模型"""
+
+    def __init__(self):
+        self.routes: Dict[str, Dict] = {}  # 行ID -> 路由数据（保持路由表原始顺序）
+        self.values: Dict[str, Tuple[str, ...]] = {}  # 行ID -> 显示值
+        self.filter_text = ""
+        self.sort_column: Optional[str] = None
+        self.sort_descending = False
+
+    def set_routes(self, routes: List[Dict]):
+        """设置新的路由数据，键重复的路由追加序号区分"""
+        self.routes = {}
+        self.values = {}
+        for route in routes:
+            key = base = route_key(route)
+            occurrence = 1
+            while key in self.routes:
+                occurrence += 1
+                key = f"{base}#{occurrence}"
+            self.routes[key] = route
+            self.values[key] = route_values(route)
+
+    def diff(self, displayed: Dict[str, Tuple[str, ...]]) -> Tuple[List[str], List[Tuple[str, Tuple]], List[Tuple[str, Tuple]]]:
+        """
+        与当前显示内容比较
+
+        Args:
+            displayed: 已显示的 行ID -> 显示值
+
+        Returns:
+            (需删除的行ID, 需插入的(行ID, 值), 需更新的(行ID, 值))
+        """
+        deletes = [key for key in displayed if key not in self.values]
+        inserts = []
+        updates = []
+        for key, values in self.values.items():
+            current = displayed.get(key)
+            if current is None:
+                inserts.append((key, values))
+            elif current != values:
+                updates.append((key, values))
+        return deletes, inserts, updates
+
+    # ------------------------------------------------------------ 筛选与排序
+
+    def set_filter(self, text: str):
+        self.filter_text = text.strip().lower()
+
+    def toggle_sort(self, column: str):
+        """点击列标题：同一列再次点击切换升降序"""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = False
+
+    def matches(self, key: str) -> bool:
+        """所有筛选关键字都出现在某一列中（不区分大小写）"""
+        if not self.filter_text:
+            return True
+        text = " ".join(self.values[key]).lower()
+        return all(token in text for token in self.filter_text.split())
+
+    def visible_keys(self) -> List[str]:
+        """筛选、排序后应显示的行ID"""
+        keys = [key for key in self.values if self.matches(key)]
+        if self.sort_column is not None:
+            index = [name for name, _ in COLUMNS].index(self.sort_column)
+            keys.sort(key=lambda key: _sort_key(self.sort_column, self.values[key][index]),
+                      reverse=self.sort_descending)
+        return keys
@@ -1,16 +1,25 @@
 """
 路由表显示组件
 职责：TreeView管理、数据显示、选择事件处理
+
+刷新时按稳定的行ID与已显示内容比较，只插入、更新、删除发生变化的行，
+变更分批在空闲回调中执行，避免数千条路由阻塞界面；筛选和排序在客户端完成，
+被筛掉的行只是脱离显示，不需要重新获取路由表
 """
 
+import collections
+import tkinter as tk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from netkit.utils.ui_helper import ui_helper
 from tkinter import ttk
+from .route_table_model import RouteTableModel, COLUMNS, route_key
 
 
 class RouteTableWidget(tb.LabelFrame):
     """路由表显示组件"""
+
+    BATCH_SIZE = 300  # 每个空闲回调处理的行变更数
     
     def __init__(self, master, on_route_selected=None, **kwargs):
         super().__init__(master, text="当前路由表", padding=ui_helper.get_padding(10), **kwargs)
@@ -19,13 +28,36 @@ class RouteTableWidget(tb.LabelFrame):
         self.routes_data = []
         self.selected_route = None
         
+        # 显示模型、已显示的 行ID -> 值，以及待执行的行变更
+        self.model = RouteTableModel()
+        self.displayed = {}
+        self.pending_ops = collections.deque()
+        self.sync_job = None
+        
+        self.setup_filter()
         self.setup_table()
+    
+    def setup_filter(self):
+        """设置筛选输入框"""
+        filter_frame = tb.Frame(self)
+        filter_frame.pack(fill=X, pady=(0, ui_helper.get_padding(5)))
+        
+        tb.Label(filter_frame, text="筛选:").pack(side=LEFT)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', lambda *args: self.set_filter(self.filter_var.get()))
+        tb.Entry(filter_frame, textvariable=self.filter_var, width=30).pack(
+            side=LEFT, padx=(ui_helper.get_padding(5), 0))
+        
+        self.count_label = tb.Label(filter_frame, text="", bootstyle=SECONDARY)
+        self.count_label.pack(side=RIGHT)
         
     def setup_table(self):
         """设置路由表TreeView"""
         # 创建TreeView
-        columns = ("destination", "netmask", "gateway", "interface", "metric", "type")
-        self.route_tree = ttk.Treeview(self, columns=columns, show="headings", height=ui_helper.scale_size(12))
+        columns = tuple(name for name, _ in COLUMNS)
+        table_frame = tb.Frame(self)
+        table_frame.pack(fill=BOTH, expand=True)
+        self.route_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=ui_helper.scale_size(12))
         
         # 设置列标题和宽度（统一左对齐）
         self.route_tree.heading("destination", text="目标网络", anchor=W)
@@ -42,11 +74,18 @@ class RouteTableWidget(tb.LabelFrame):
         self.route_tree.column("metric", width=ui_helper.scale_size(80), anchor=W)
         self.route_tree.column("type", width=ui_helper.scale_size(100), anchor=W)
         
+        # 点击列标题排序
+        for column in columns:
+            self.route_tree.heading(column, command=lambda column=column: self.sort_by(column))
+        
         # 绑定选择事件
         self.route_tree.bind('<<TreeviewSelect>>', self._on_route_select)
         
         # 布局
-        self.route_tree.pack(fill=BOTH, expand=True)
+        scrollbar = tb.Scrollbar(table_frame, orient=VERTICAL, command=self.route_tree.yview)
+        self.route_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=RIGHT, fill=Y)
+        self.route_tree.pack(side=LEFT, fill=BOTH, expand=True)
         
     def update_routes(self, routes_data):
         """更新路由数据显示"""
@@ -54,36 +93,88 @@ class RouteTableWidget(tb.LabelFrame):
         self.populate_route_tree()
         
     def populate_route_tree(self):
-        """填充路由表TreeView"""
-        # 清空现有数据
-        for item in self.route_tree.get_children():
-            self.route_tree.delete(item)
-        
-        # 添加路由数据
-        for route in self.routes_data:
-            self.route_tree.insert('', 'end', values=(
-                route['network_destination'],
-                route['netmask'],
-                route['gateway'],
-                route['interface'],
-                route['metric'],
-                route['route_type']
-            ))
+        """按差异更新路由表TreeView（变更分批在空闲时执行）"""
+        self.model.set_routes(self.routes_data)
+        deletes, inserts, updates = self.model.diff(self.displayed)
+        
+        # 重新计算差异前丢弃尚未执行的旧变更，差异总是相对于已显示的内容
+        self._cancel_sync()
+        if deletes:
+            self.pending_ops.append(('delete', deletes))
+        for key, values in inserts:
+            self.pending_ops.append(('insert', key, values))
+        for key, values in updates:
+            self.pending_ops.append(('update', key, values))
+        
+        # 选中的路由换成新数据中对应的路由，已不存在时清除
+        if self.selected_route is not None:
+            self.selected_route = self.model.routes.get(route_key(self.selected_route))
+        
+        self._run_batch()
+    
+    def _cancel_sync(self):
+        if self.sync_job is not None:
+            self.after_cancel(self.sync_job)
+            self.sync_job = None
+        self.pending_ops.clear()
+    
+    def _run_batch(self):
+        """执行一批行变更，剩余变更留到下一个空闲回调"""
+        self.sync_job = None
+        done = 0
+        while self.pending_ops and done < self.BATCH_SIZE:
+            op = self.pending_ops.popleft()
+            if op[0] == 'delete':
+                keys = op[1]
+                self.route_tree.delete(*keys)
+                for key in keys:
+                    self.displayed.pop(key, None)
+                done += len(keys)
+            elif op[0] == 'insert':
+                _, key, values = op
+                self.route_tree.insert('', 'end', iid=key, values=values)
+                self.displayed[key] = values
+                done += 1
+            else:
+                _, key, values = op
+                self.route_tree.item(key, values=values)
+                self.displayed[key] = values
+                done += 1
+        
+        if self.pending_ops:
+            self.sync_job = self.after_idle(self._run_batch)
+        else:
+            self.apply_view()
+    
+    def apply_view(self):
+        """按筛选和排序结果一次性重排可见行，被筛掉的行脱离显示但保留"""
+        visible = [key for key in self.model.visible_keys() if key in self.displayed]
+        self.route_tree.set_children('', *visible)
+        if self.model.filter_text:
+            self.count_label.config(text=f"显示 {len(visible)} / {len(self.displayed)}")
+        else:
+            self.count_label.config(text=f"共 {len(self.displayed)} 条")
+    
+    def set_filter(self, text):
+        """客户端筛选"""
+        self.model.set_filter(text)
+        if not self.pending_ops:
+            self.apply_view()
+    
+    def sort_by(self, column):
+        """按列排序，再次点击同一列切换升降序"""
+        self.model.toggle_sort(column)
+        if not self.pending_ops:
+            self.apply_view()
             
     def _on_route_select(self, event):
         """路由选择事件处理"""
         selection = self.route_tree.selection()
         if selection:
-            item = self.route_tree.item(selection[0])
-            values = item['values']
-            
-            # 找到对应的路由数据
-            for route in self.routes_data:
-                if (route['network_destination'] == values[0] and 
-                    route['netmask'] == values[1] and 
-                    route['gateway'] == values[2]):
-                    self.selected_route = route
-                    break
+            # 行ID即路由的稳定键
+            route = self.model.routes.get(selection[0])
+            if route is not None:
+                self.selected_route = route
             
             # 通知父组件
             if self.on_route_selected and self.selected_route:
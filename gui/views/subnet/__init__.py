@@ -2,6 +2,13 @@
 子网计算视图包
 """
 
-from .subnet_view import SubnetView
+from netkit.utils.lazy_import import lazy_module
 
-__all__ = ['SubnetView']
\ No newline at end of file
+_EXPORTS = {
+    'SubnetView': '.subnet_view',
+    'VirtualResultList': '.virtual_result_list',
+}
+
+__all__ = ['SubnetView', 'VirtualResultList']
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
@@ -0,0 +1,83 @@
+"""
+子网划分结果的格式化与流式导出
+按页从结果源取子网，逐页写出，不在内存中拼接全部结果（不依赖Tk）
+"""
+
+import csv
+from typing import Dict, Iterator, List, Sequence
+
+# 表格格式的表头和分隔线
+HEADER = f"{'序号':<4} {'子网地址':<18} {'可用主机范围':<32} {'主机数':>6}"
+SEPARATOR = "-" * len(HEADER)
+
+# CSV导出的列：(表头, 字段)
+CSV_COLUMNS = (
+    ('序号', None),
+    ('子网地址', 'cidr_notation'),
+    ('网络地址', 'network_address'),
+    ('广播地址', 'broadcast_address'),
+    ('子网掩码', 'subnet_mask'),
+    ('可用主机范围', 'host_range'),
+    ('主机数', 'host_count'),
+)
+
+# 每次从结果源取的子网数
+PAGE_SIZE = 1000
+
+
+class ListPages:
+    """把已展开的子网列表包装成按页访问的结果源"""
+
+    def __init__(self, items: Sequence[Dict[str, str]]):
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def page(self, start: int, size: int) -> List[Dict[str, str]]:
+        return list(self.items[start:start + size])
+
+
+def format_row(number: int, subnet: Dict[str, str]) -> str:
+    """格式化一行（序号从1开始）"""
+    return f"{number:<4} {subnet['network_address']:<18} {subnet['host_range']:<32} {subnet['host_count']:>6}"
+
+
+def iter_pages(source, page_size: int = PAGE_SIZE) -> Iterator[tuple]:
+    """按页遍历结果源，产生(起始序号, 子网列表)"""
+    for start in range(0, len(source), page_size):
+        yield start, source.page(start, page_size)
+
+
+def write_division(source, stream, fmt: str = 'text', page_size: int = PAGE_SIZE) -> int:
+    """
+    把全部划分结果逐页写入流
+
+    Args:
+        source: 结果源（支持len和page(start, size)，如 SubnetDivision）
+        stream: 具有write方法的对象（文件、剪贴板适配器等）
+        fmt: 'text' 为表格文本，'csv' 为CSV
+        page_size: 每页子网数
+
+    Returns:
+        int: 写出的子网数
+    """
+    written = 0
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow([title for title, _ in CSV_COLUMNS])
+        for start, subnets in iter_pages(source, page_size):
+            writer.writerows(
+                [start + offset + 1] + [subnet[field] for _, field in CSV_COLUMNS[1:]]
+                for offset, subnet in enumerate(subnets)
+            )
+            written += len(subnets)
+        return written
+
+    stream.write(f"{HEADER}\n{SEPARATOR}\n")
+    for start, subnets in iter_pages(source, page_size):
+        stream.write("".join(
+            format_row(start + offset + 1, subnet) + "\n" for offset, subnet in enumerate(subnets)
+        ))
+        written += len(subnets)
+    return written
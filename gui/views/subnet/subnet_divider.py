@@ -1,19 +1,38 @@
 """
 子网划分组件
 负责子网划分功能的UI实现
+
+划分结果不展开成文本：虚拟列表只向计算器请求可见页，
+复制和导出全部结果时逐页写入剪贴板或文件
 """
 
+import os
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from ttkbootstrap.tableview import Tableview
 from netkit.utils.ui_helper import ui_helper
 from netkit.services.subnet import SubnetCalculator
 import tkinter as tk
+from tkinter import filedialog
 import pyperclip
+from .division_format import ListPages, write_division
+from .virtual_result_list import VirtualResultList
+
+
+class ClipboardWriter:
+    """把逐页写出的内容追加到Tk剪贴板"""
+    
+    def __init__(self, widget):
+        self.widget = widget
+        self.widget.clipboard_clear()
+    
+    def write(self, text):
+        self.widget.clipboard_append(text)
 
 
 class SubnetDivider(tb.LabelFrame):
     """子网划分组件"""
+
+    CLIPBOARD_MAX_ROWS = 100000  # 复制到剪贴板的最大子网数，更多时请导出到文件
     
     def __init__(self, master, on_divide=None, **kwargs):
         super().__init__(master, text="子网划分", padding=ui_helper.get_padding(15), **kwargs)
@@ -25,6 +44,9 @@ class SubnetDivider(tb.LabelFrame):
         self.current_network = None
         self.current_hosts = None
         
+        # 当前划分结果（按页访问的结果源）
+        self.division = None
+        
         # 划分方式变量
         self.divide_mode = tk.StringVar(value="subnets")  # 默认按子网数量
         
@@ -135,40 +157,10 @@ class SubnetDivider(tb.LabelFrame):
         # 划分结果标签
         tb.Label(self, text="划分结果：", font=ui_helper.get_font(9, "bold")).pack(anchor=W)
         
-        # 结果显示容器
-        result_container = tb.Frame(self)
-        result_container.pack(fill=BOTH, expand=True, pady=(ui_helper.get_padding(5), 0))
-        
-        # 创建Text组件显示结果（表格格式）
-        self.result_text = tb.Text(
-            result_container,
-            height=8,  # 设置固定高度8行
-            wrap=NONE,  # 不自动换行，保持表格格式
-            state=DISABLED,
-            relief=FLAT,
-            borderwidth=ui_helper.scale_size(1),
-            background='#f8f9fa',
-            selectbackground='#0078d4',
-            selectforeground='white',
-            font=('Consolas', 9)  # 使用等宽字体确保对齐
-        )
-        
-        # 添加垂直滚动条
-        v_scrollbar = tb.Scrollbar(result_container, orient=VERTICAL, command=self.result_text.yview)
-        self.result_text.configure(yscrollcommand=v_scrollbar.set)
-        
-        # 添加水平滚动条（因为不自动换行）
-        h_scrollbar = tb.Scrollbar(result_container, orient=HORIZONTAL, command=self.result_text.xview)
-        self.result_text.configure(xscrollcommand=h_scrollbar.set)
-        
-        # 布局
-        self.result_text.grid(row=0, column=0, sticky='nsew')
-        v_scrollbar.grid(row=0, column=1, sticky='ns')
-        h_scrollbar.grid(row=1, column=0, sticky='ew')
-        
-        # 配置grid权重
-        result_container.grid_rowconfigure(0, weight=1)
-        result_container.grid_columnconfigure(0, weight=1)
+        # 结果显示：虚拟列表，只渲染可见行
+        self.result_list = VirtualResultList(self, height=8)
+        self.result_list.pack(fill=BOTH, expand=True, pady=(ui_helper.get_padding(5), 0))
+        self.result_text = self.result_list.text
         
         # 添加右键菜单
         self.context_menu = tb.Menu(self, tearoff=0)
@@ -176,6 +168,7 @@ class SubnetDivider(tb.LabelFrame):
         self.context_menu.add_command(label="全选", command=self.select_all_text)
         self.context_menu.add_separator()
         self.context_menu.add_command(label="复制所有结果", command=self.copy_all_results)
+        self.context_menu.add_command(label="导出到文件...", command=self.export_results)
         
         # 绑定右键菜单
         self.result_text.bind("<Button-3>", self.show_context_menu)
@@ -230,7 +223,7 @@ class SubnetDivider(tb.LabelFrame):
                     if subnet_count < 2:
                         self.show_error("子网数量至少为2")
                         return
-                    results = self.calculator.divide_subnet(ip_str, cidr_bits, 'subnets', subnet_count)
+                    results = self.calculator.plan_division(ip_str, cidr_bits, 'subnets', subnet_count)
                 except ValueError:
                     self.show_error("请输入有效的子网数量")
                     return
@@ -240,7 +233,7 @@ class SubnetDivider(tb.LabelFrame):
                     if hosts_count < 1:
                         self.show_error("主机数量至少为1")
                         return
-                    results = self.calculator.divide_subnet(ip_str, cidr_bits, 'hosts', hosts_count)
+                    results = self.calculator.plan_division(ip_str, cidr_bits, 'hosts', hosts_count)
                 except ValueError:
                     self.show_error("请输入有效的主机数量")
                     return
@@ -255,37 +248,26 @@ class SubnetDivider(tb.LabelFrame):
         except Exception as e:
             self.show_error(str(e))
     
-    def display_results(self, results: list):
-        """显示划分结果"""
+    def display_results(self, results):
+        """
+        显示划分结果
+        
+        Args:
+            results: SubnetDivision 或子网信息列表
+        """
         if not results:
-            self._update_text_display("暂无划分结果")
+            self.division = None
+            self.result_list.show_message("暂无划分结果")
             return
         
-        # 构建表格格式的文本
-        lines = []
-        
-        # 表头
-        header = f"{'序号':<4} {'子网地址':<18} {'可用主机范围':<32} {'主机数':>6}"
-        lines.append(header)
-        lines.append("-" * len(header))  # 分隔线
-        
-        # 数据行
-        for i, subnet in enumerate(results, 1):
-            # 使用正确的英文字段名
-            network_addr = subnet['network_address']
-            host_range = subnet['host_range']
-            host_count = subnet['host_count']
-            
-            line = f"{i:<4} {network_addr:<18} {host_range:<32} {host_count:>6}"
-            lines.append(line)
-        
-        content = '\n'.join(lines)
-        self._update_text_display(content)
+        self.division = results if hasattr(results, 'page') else ListPages(results)
+        self.result_list.set_source(self.division)
     
     def clear_results(self):
         """清空结果"""
-        # 清空文本显示
-        self._update_text_display("")
+        # 清空结果列表
+        self.division = None
+        self.result_list.show_message("")
         
         # 重置网络信息
         self.current_network = None
@@ -294,13 +276,6 @@ class SubnetDivider(tb.LabelFrame):
         self.divide_button.config(state=DISABLED)
         self.clear_error()
     
-    def _update_text_display(self, content):
-        """更新文本显示内容"""
-        self.result_text.config(state=NORMAL)
-        self.result_text.delete("1.0", END)
-        self.result_text.insert("1.0", content)
-        self.result_text.config(state=DISABLED)
-    
     def show_context_menu(self, event):
         """显示右键菜单"""
         try:
@@ -330,12 +305,35 @@ class SubnetDivider(tb.LabelFrame):
         self.result_text.see(INSERT)
     
     def copy_all_results(self):
-        """复制所有划分结果"""
+        """复制所有划分结果（逐页追加到剪贴板）"""
+        if not self.division:
+            return
+        if len(self.division) > self.CLIPBOARD_MAX_ROWS:
+            self.show_error(f"共 {len(self.division)} 个子网，结果过多，请导出到文件")
+            return
         try:
-            # 获取所有文本内容
-            all_text = self.result_text.get("1.0", END).strip()
-            if all_text:
-                pyperclip.copy(all_text)
-        except Exception as e:
-            pass
+            write_division(self.division, ClipboardWriter(self))
+        except tk.TclError as e:
+            self.show_error(f"复制失败: {e}")
     
+    def export_results(self):
+        """导出所有划分结果到文件（逐页写入，支持文本和CSV）"""
+        if not self.division:
+            return
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            title="导出划分结果",
+            defaultextension=".txt",
+            filetypes=[("文本文件", "*.txt"), ("CSV文件", "*.csv")]
+        )
+        if not path:
+            return
+        
+        fmt = 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'text'
+        try:
+            # CSV带BOM，便于Excel识别中文表头
+            encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+            with open(path, 'w', encoding=encoding, newline='') as f:
+                write_division(self.division, f, fmt)
+        except OSError as e:
+            self.show_error(f"导出失败: {e}")
@@ -6,6 +6,7 @@
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from netkit.utils.ui_helper import ui_helper
+from netkit.services.subnet import SubnetDivision
 from .input_form import SubnetInputForm
 from .result_display import SubnetResultDisplay
 from .subnet_divider import SubnetDivider
@@ -73,7 +74,7 @@ class SubnetView(tb.Frame):
         # 清空当前网络信息
         self.current_network_info = None
     
-    def on_divide_subnet(self, divide_results: list):
-        """处理子网划分结果"""
+    def on_divide_subnet(self, division: SubnetDivision):
+        """处理子网划分结果（按需生成子网信息的 SubnetDivision）"""
         # 子网划分组件会自己显示结果，这里可以做额外处理
         pass
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+子网划分结果虚拟列表
+Text组件只保存表头和当前可见的几行，滚动时向结果源请求对应页重新渲染，
+垂直滚动条按总行数换算位置，结果再多也只占用一屏的内存
+"""
+
+import tkinter.font as tkfont
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from netkit.utils.ui_helper import ui_helper
+from .division_format import HEADER, SEPARATOR, format_row
+
+
+class VirtualResultList(tb.Frame):
+    """子网划分结果虚拟列表"""
+
+    WHEEL_ROWS = 3  # 鼠标滚轮每格滚动的行数
+
+    def __init__(self, master, height: int = 8, **kwargs):
+        super().__init__(master, **kwargs)
+
+        self.source = None
+        self.message = ""
+        self.first = 0
+        self.visible_rows = max(1, height - 2)  # 去掉表头和分隔线
+
+        self.text = tb.Text(
+            self,
+            height=height,
+            wrap=NONE,  # 不自动换行，保持表格格式
+            state=DISABLED,
+            relief=FLAT,
+            borderwidth=ui_helper.scale_size(1),
+            background='#f8f9fa',
+            selectbackground='#0078d4',
+            selectforeground='white',
+            font=('Consolas', 9)  # 使用等宽字体确保对齐
+        )
+
+        # 垂直滚动条由本组件按总行数控制，水平滚动仍由Text处理
+        self.v_scrollbar = tb.Scrollbar(self, orient=VERTICAL, command=self.on_scroll)
+        h_scrollbar = tb.Scrollbar(self, orient=HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=h_scrollbar.set)
+
+        self.text.grid(row=0, column=0, sticky='nsew')
+        self.v_scrollbar.grid(row=0, column=1, sticky='ns')
+        h_scrollbar.grid(row=1, column=0, sticky='ew')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.text.bind("<MouseWheel>", self.on_mousewheel)
+        self.text.bind("<Configure>", self.on_resize)
+
+        self.render()
+
+    # ------------------------------------------------------------ 数据
+
+    def set_source(self, source):
+        """设置结果源（支持len和page(start, size)），None表示清空"""
+        self.source = source
+        self.message = ""
+        self.first = 0
+        self.render()
+
+    def show_message(self, message: str):
+        """显示提示信息代替结果"""
+        self.source = None
+        self.message = message
+        self.first = 0
+        self.render()
+
+    @property
+    def total(self) -> int:
+        return len(self.source) if self.source is not None else 0
+
+    # ------------------------------------------------------------ 滚动
+
+    def scroll_to(self, first: int):
+        """滚动到指定行（从0开始）"""
+        first = max(0, min(first, self.total - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def on_scroll(self, action, amount=None, unit=None):
+        """滚动条回调：moveto按比例定位，scroll按行或页滚动"""
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * self.total))
+        elif action == 'scroll':
+            step = self.visible_rows if unit == 'pages' else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_mousewheel(self, event):
+        rows = (int(-event.delta / 120) or (-1 if event.delta > 0 else 1)) * self.WHEEL_ROWS
+        self.scroll_to(self.first + rows)
+        return "break"  # 阻止Text自身滚动
+
+    def on_resize(self, event):
+        """按Text高度重新计算可见行数"""
+        line_height = tkfont.Font(font=self.text.cget('font')).metrics('linespace')
+        rows = max(1, event.height // max(1, line_height) - 2)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.first = max(0, min(self.first, self.total - rows))
+            self.render()
+
+    # ------------------------------------------------------------ 渲染
+
+    def render(self):
+        """只渲染可见页"""
+        if self.source is None:
+            content = self.message
+        else:
+            subnets = self.source.page(self.first, self.visible_rows)
+            lines = [HEADER, SEPARATOR]
+            lines.extend(format_row(self.first + offset + 1, subnet) for offset, subnet in enumerate(subnets))
+            content = '\n'.join(lines)
+
+        self.text.config(state=NORMAL)
+        self.text.delete("1.0", END)
+        self.text.insert("1.0", content)
+        self.text.config(state=DISABLED)
+
+        if self.total:
+            self.v_scrollbar.set(self.first / self.total,
+                                 min(1.0, (self.first + self.visible_rows) / self.total))
+        else:
+            self.v_scrollbar.set(0.0, 1.0)
@@ -8,13 +8,8 @@ __version__ = "2.1.0"
 __author__ = "NetKit Team"
 __description__ = "网络工具包 - 提供网络配置、Ping测试、路由管理等功能"
 
-# 导入主要服务模块
-try:
-    from . import services
-    from . import utils
-except ImportError:
-    # 在某些测试环境中可能无法导入所有模块
-    pass
+# 服务和工具模块在首次访问时才导入，避免导入时加载WMI等Windows专用模块
+from .utils.lazy_import import lazy_module
 
 __all__ = [
     "services",
@@ -23,3 +18,5 @@ __all__ = [
     "__author__",
     "__description__"
 ]
+
+__getattr__, __dir__ = lazy_module(__name__, submodules=("services", "utils"))
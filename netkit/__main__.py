@@ -0,0 +1,9 @@
+"""
+支持 python -m netkit 运行命令行接口
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,475 @@
+"""
+NetKit 命令行接口
+无界面运行Ping扫描、端口扫描、路由表管理和子网计算，结果以JSON Lines或CSV流式输出到标准输出，
+便于在计划任务、服务器核心版等无显示环境中调用。本模块不导入tkinter/GUI相关模块
+
+安装后的命令为 netkit-cli（netkit 启动图形界面），也可以用 python -m netkit 运行
+
+用法示例:
+    netkit-cli ping 192.168.1.0/24 --count 1 --format csv
+    netkit-cli ping 192.168.1.0/24 --daemon
+    netkit-cli scan-ports 192.168.1.0/24 -p 22,80,443 --open
+    netkit-cli route list
+    netkit-cli route list --daemon
+    netkit-cli subnet info 192.168.1.10 /24
+    netkit-cli subnet divide 10.0.0.0 /16 --subnets 4
+    netkit-cli trace 8.8.8.8
+    netkit-cli trace 8.8.8.8 --mtr 10
+    netkit-cli daemon
+
+退出码:
+    0  命令成功（ping: 全部主机可达；scan-ports: 全部目标完成扫描；trace: 到达目标）
+    1  命令执行失败（ping: 存在不可达主机；scan-ports: 存在无法解析的主机；trace: 未到达目标）
+    2  参数错误
+"""
+
+import csv
+import sys
+import json
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from . import __version__
+
+FORMATS = ('jsonl', 'csv')
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+
+PING_FIELDS = [
+    'host', 'success', 'packets_sent', 'packets_received', 'packet_loss',
+    'min_time', 'avg_time', 'max_time', 'error', 'completed', 'total'
+]
+
+PORT_FIELDS = ['host', 'port', 'state', 'latency', 'error', 'completed', 'total']
+
+DEFAULT_SCAN_PORTS = '21,22,23,25,53,80,110,135,139,143,443,445,3389,8080'
+
+ROUTE_FIELDS = [
+    'network_destination', 'netmask', 'gateway', 'interface', 'metric',
+    'cidr_network', 'route_type'
+]
+
+SUBNET_FIELDS = [
+    'cidr_notation', 'network_address', 'broadcast_address', 'subnet_mask',
+    'host_range', 'host_count', 'network_host_bits', 'ip_type', 'binary_mask'
+]
+
+# 划分结果中的子网不含二进制掩码
+SUBNET_DIVIDE_FIELDS = ['index'] + [f for f in SUBNET_FIELDS if f != 'binary_mask']
+
+TRACE_FIELDS = ['ttl', 'address', 'rtt', 'type']
+
+MTR_FIELDS = [
+    'round', 'ttl', 'address', 'sent', 'received', 'loss',
+    'last', 'best', 'worst', 'avg', 'stdev'
+]
+
+RESULT_FIELDS = ['success', 'message', 'error']
+
+
+class RecordWriter:
+    """逐条写出记录（JSON Lines或CSV），每条记录写完立即刷新"""
+
+    def __init__(self, stream: TextIO, fmt: str = 'jsonl', fields: Optional[List[str]] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的输出格式: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+        self.csv_writer = None
+        self.count = 0
+
+    def write(self, record: Dict):
+        """写出一条记录"""
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            if self.csv_writer is None:
+                self.csv_writer = csv.DictWriter(
+                    self.stream, fieldnames=self.fields or list(record),
+                    extrasaction='ignore', lineterminator='\n'
+                )
+                self.csv_writer.writeheader()
+            self.csv_writer.writerow(record)
+        self.stream.flush()
+        self.count += 1
+
+    def write_all(self, records: Iterable[Dict]):
+        """写出多条记录"""
+        for record in records:
+            self.write(record)
+
+
+def _error(message: str) -> int:
+    """输出错误信息到标准错误"""
+    print(f"netkit: 错误: {message}", file=sys.stderr)
+    return EXIT_FAILURE
+
+
+def _project(record: Dict, fields: List[str]) -> Dict:
+    """按字段列表提取记录，缺失字段为None"""
+    return {field: record.get(field) for field in fields}
+
+
+def _daemon_stream(method: str, **params) -> Iterator[Dict]:
+    """
+    通过本地守护进程调用方法，逐条产出中间结果
+
+    Raises:
+        ConnectionError: 守护进程未运行或连接中断
+        RuntimeError: 守护进程返回错误
+    """
+    from .daemon.client import DaemonClient
+    from .daemon.protocol import RPCError
+
+    with DaemonClient() as client:
+        try:
+            return (yield from client.stream(method, **params))
+        except RPCError as e:
+            raise RuntimeError(f"守护进程返回错误: {e.message}")
+
+
+def _daemon_call(method: str, **params):
+    """通过本地守护进程调用方法并返回最终结果"""
+    stream = _daemon_stream(method, **params)
+    while True:
+        try:
+            next(stream)
+        except StopIteration as stop:
+            return stop.value
+
+
+# ---------------------------------------------------------------- ping
+
+def _expand_targets(targets: List[str]) -> List[str]:
+    """展开目标列表（支持单个IP、IP范围、CIDR和主机名），保持顺序并去重"""
+    from .services.ping.ip_parser import parse_ip_range
+
+    hosts, seen = [], set()
+    for target in targets:
+        for host in parse_ip_range(target):
+            if host not in seen:
+                seen.add(host)
+                hosts.append(host)
+    return hosts
+
+
+def cmd_ping(args, out: TextIO) -> int:
+    """批量ping，每台主机完成即输出一条记录"""
+    try:
+        hosts = _expand_targets(args.targets)
+    except ValueError as e:
+        print(f"netkit: 错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    writer = RecordWriter(out, args.format, PING_FIELDS)
+    failures = 0
+
+    if args.daemon:
+        try:
+            for record in _daemon_stream('ping.batch', targets=hosts, count=args.count,
+                                         timeout=args.timeout, max_workers=args.workers):
+                failures += not record['success']
+                writer.write(record)
+        except (ConnectionError, RuntimeError) as e:
+            return _error(str(e))
+        return EXIT_OK if failures == 0 else EXIT_FAILURE
+
+    from .services.ping.ping_service import PingService
+    from .services.ping.records import ping_record
+
+    def on_progress(host, result, stats, completed, total):
+        nonlocal failures
+        record = ping_record(host, result, stats, completed, total)
+        if not record['success']:
+            failures += 1
+        writer.write(record)
+
+    service = PingService()
+    try:
+        service.batch_ping(hosts, count=args.count, timeout=args.timeout,
+                           max_workers=args.workers, progress_callback=on_progress)
+    except KeyboardInterrupt:
+        service.stop_ping()
+        return EXIT_FAILURE
+
+    return EXIT_OK if failures == 0 else EXIT_FAILURE
+
+
+def cmd_scan_ports(args, out: TextIO) -> int:
+    """TCP端口扫描，每个端口完成即输出一条记录"""
+    from .services.ping.port_scan_service import PortScanService, STATE_ERROR, STATE_OPEN, parse_ports
+
+    try:
+        hosts = _expand_targets(args.targets)
+        ports = parse_ports(args.ports)
+    except ValueError as e:
+        print(f"netkit: 错误: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    writer = RecordWriter(out, args.format, PORT_FIELDS)
+    errors = 0
+
+    def on_progress(host, result, stats, completed, total):
+        nonlocal errors
+        errors += result['state'] == STATE_ERROR
+        if args.open and result['state'] != STATE_OPEN:
+            return
+        writer.write(_project(dict(result, completed=completed, total=total), PORT_FIELDS))
+
+    service = PortScanService()
+    try:
+        service.scan(hosts, ports, timeout=args.timeout, max_in_flight=args.workers,
+                     progress_callback=on_progress)
+    except KeyboardInterrupt:
+        service.stop()
+        return EXIT_FAILURE
+
+    return EXIT_OK if errors == 0 else EXIT_FAILURE
+
+
+# ---------------------------------------------------------------- route
+
+def cmd_route_list(args, out: TextIO) -> int:
+    """输出当前IPv4路由表"""
+    if args.daemon:
+        try:
+            result = _daemon_call('route.table')
+        except (ConnectionError, RuntimeError) as e:
+            return _error(str(e))
+    else:
+        from .services.route.route import RouteService
+        result = RouteService().get_route_table()
+    if not result['success']:
+        return _error(result['error'])
+
+    writer = RecordWriter(out, args.format, ROUTE_FIELDS)
+    writer.write_all(_project(route, ROUTE_FIELDS) for route in result['routes'])
+    return EXIT_OK
+
+
+def _write_result(result: Dict, args, out: TextIO) -> int:
+    """输出增删路由等操作的结果"""
+    RecordWriter(out, args.format, RESULT_FIELDS).write(_project(result, RESULT_FIELDS))
+    return EXIT_OK if result.get('success') else EXIT_FAILURE
+
+
+def cmd_route_add(args, out: TextIO) -> int:
+    """添加静态路由"""
+    from .services.route.route import RouteService
+
+    result = RouteService().add_route(args.destination, args.netmask, args.gateway, args.metric)
+    return _write_result(result, args, out)
+
+
+def cmd_route_delete(args, out: TextIO) -> int:
+    """删除静态路由"""
+    from .services.route.route import RouteService
+
+    result = RouteService().delete_route(args.destination, args.netmask, args.gateway)
+    return _write_result(result, args, out)
+
+
+# ---------------------------------------------------------------- subnet
+
+def cmd_subnet_info(args, out: TextIO) -> int:
+    """计算子网信息"""
+    from .services.subnet.subnet_calculator import SubnetCalculator
+
+    try:
+        info = SubnetCalculator().calculate_subnet_info(args.ip, args.mask)
+    except ValueError as e:
+        return _error(str(e))
+
+    RecordWriter(out, args.format, SUBNET_FIELDS).write(_project(info, SUBNET_FIELDS))
+    return EXIT_OK
+
+
+def cmd_subnet_divide(args, out: TextIO) -> int:
+    """子网划分，每个子网输出一条记录"""
+    from .services.subnet.subnet_calculator import SubnetCalculator
+
+    divide_by, value = ('subnets', args.subnets) if args.subnets else ('hosts', args.hosts)
+    try:
+        division = SubnetCalculator().plan_division(args.ip, args.mask, divide_by, value)
+    except ValueError as e:
+        return _error(str(e))
+
+    # 逐个生成并写出，划分出大量子网时不在内存中展开
+    writer = RecordWriter(out, args.format, SUBNET_DIVIDE_FIELDS)
+    writer.write_all(_project(dict(subnet, index=i), SUBNET_DIVIDE_FIELDS) for i, subnet in enumerate(division, 1))
+    return EXIT_OK
+
+
+# ---------------------------------------------------------------- trace
+
+def cmd_trace(args, out: TextIO) -> int:
+    """路由跟踪：默认输出一轮并行探测的各跳，--mtr 时每轮输出各跳统计"""
+    from .services.traceroute.traceroute_service import TracerouteService
+
+    service = TracerouteService()
+    if not args.mtr:
+        result = service.trace(args.host, max_hops=args.max_hops, timeout=args.timeout)
+        if not result['success']:
+            return _error(result['error'])
+        RecordWriter(out, args.format, TRACE_FIELDS).write_all(
+            _project(hop, TRACE_FIELDS) for hop in result['hops']
+        )
+        return EXIT_OK if result['reached'] else EXIT_FAILURE
+
+    writer = RecordWriter(out, args.format, MTR_FIELDS)
+
+    def on_round(round_number, hops):
+        writer.write_all(_project(dict(hop, round=round_number), MTR_FIELDS) for hop in hops)
+
+    try:
+        result = service.mtr(args.host, rounds=args.mtr, interval=args.interval,
+                             max_hops=args.max_hops, timeout=args.timeout, progress_callback=on_round)
+    except KeyboardInterrupt:
+        service.stop()
+        return EXIT_FAILURE
+    if not result['success']:
+        return _error(result['error'])
+    return EXIT_OK if result['reached'] else EXIT_FAILURE
+
+
+# ---------------------------------------------------------------- daemon
+
+def cmd_daemon(args, out: TextIO) -> int:
+    """前台运行本地守护进程，直到Ctrl+C"""
+    import logging
+    from .daemon.server import DaemonServer, register_default_methods
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    server = register_default_methods(DaemonServer(args.address, refresh_interval=args.refresh))
+    try:
+        server.serve_forever()
+    except (RuntimeError, OSError) as e:
+        return _error(str(e))
+    return EXIT_OK
+
+
+# ---------------------------------------------------------------- parser
+
+def _positive_int(value: str) -> int:
+    """argparse类型：正整数"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"必须是正整数: {value}")
+    return number
+
+
+def _ttl(value: str) -> int:
+    """argparse类型：TTL（1-255）"""
+    number = int(value)
+    if not 1 <= number <= 255:
+        raise argparse.ArgumentTypeError(f"必须在1-255之间: {value}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-f', '--format', choices=FORMATS, default='jsonl',
+                        help='输出格式（默认: jsonl）')
+
+    parser = argparse.ArgumentParser(prog='netkit-cli', description='NetKit 网络工具包命令行接口')
+    parser.add_argument('--version', action='version', version=f'%(prog)s {__version__}')
+    commands = parser.add_subparsers(dest='command', metavar='<command>')
+    commands.required = True
+
+    # ping
+    ping = commands.add_parser('ping', parents=[common], help='批量ping测试')
+    ping.add_argument('targets', nargs='+',
+                      help='目标：IP、IP范围(a-b)、CIDR网段或主机名')
+    ping.add_argument('-c', '--count', type=_positive_int, default=1, help='每台主机的ping次数（默认: 1）')
+    ping.add_argument('-w', '--timeout', type=_positive_int, default=1000, help='超时时间，毫秒（默认: 1000）')
+    ping.add_argument('-j', '--workers', type=_positive_int, default=25, help='最大并发数（默认: 25）')
+    ping.add_argument('--daemon', action='store_true', help='通过已运行的本地守护进程执行')
+    ping.set_defaults(handler=cmd_ping)
+
+    # scan-ports
+    scan_ports = commands.add_parser('scan-ports', parents=[common], help='TCP端口扫描')
+    scan_ports.add_argument('targets', nargs='+',
+                            help='目标：IP、IP范围(a-b)、CIDR网段或主机名')
+    scan_ports.add_argument('-p', '--ports', default=DEFAULT_SCAN_PORTS,
+                            help='端口列表，如 22,80,8000-8100（默认: 常用端口）')
+    scan_ports.add_argument('-w', '--timeout', type=_positive_int, default=1000,
+                            help='连接超时，毫秒（默认: 1000）')
+    scan_ports.add_argument('-j', '--workers', type=_positive_int, default=256,
+                            help='同时进行的连接数（默认: 256）')
+    scan_ports.add_argument('--open', action='store_true', help='只输出开放的端口')
+    scan_ports.set_defaults(handler=cmd_scan_ports)
+
+    # route
+    route = commands.add_parser('route', help='路由表管理')
+    route_commands = route.add_subparsers(dest='route_command', metavar='<action>')
+    route_commands.required = True
+
+    route_list = route_commands.add_parser('list', parents=[common], help='显示IPv4路由表')
+    route_list.add_argument('--daemon', action='store_true', help='读取本地守护进程预热的路由表快照')
+    route_list.set_defaults(handler=cmd_route_list)
+
+    route_add = route_commands.add_parser('add', parents=[common], help='添加静态路由')
+    route_add.add_argument('destination', help='目标网络')
+    route_add.add_argument('netmask', help='子网掩码')
+    route_add.add_argument('gateway', help='网关')
+    route_add.add_argument('-m', '--metric', type=_positive_int, default=1, help='跃点数（默认: 1）')
+    route_add.set_defaults(handler=cmd_route_add)
+
+    route_delete = route_commands.add_parser('delete', parents=[common], help='删除静态路由')
+    route_delete.add_argument('destination', help='目标网络')
+    route_delete.add_argument('netmask', nargs='?', help='子网掩码')
+    route_delete.add_argument('gateway', nargs='?', help='网关')
+    route_delete.set_defaults(handler=cmd_route_delete)
+
+    # subnet
+    subnet = commands.add_parser('subnet', help='子网计算')
+    subnet_commands = subnet.add_subparsers(dest='subnet_command', metavar='<action>')
+    subnet_commands.required = True
+
+    subnet_info = subnet_commands.add_parser('info', parents=[common], help='计算子网信息')
+    subnet_info.add_argument('ip', help='IP地址')
+    subnet_info.add_argument('mask', help='子网掩码或CIDR（如 /24）')
+    subnet_info.set_defaults(handler=cmd_subnet_info)
+
+    subnet_divide = subnet_commands.add_parser('divide', parents=[common], help='子网划分')
+    subnet_divide.add_argument('ip', help='IP地址')
+    subnet_divide.add_argument('mask', help='子网掩码或CIDR（如 /24）')
+    group = subnet_divide.add_mutually_exclusive_group(required=True)
+    group.add_argument('--subnets', type=_positive_int, help='按子网数量划分')
+    group.add_argument('--hosts', type=_positive_int, help='按每个子网的主机数划分')
+    subnet_divide.set_defaults(handler=cmd_subnet_divide)
+
+    # trace
+    trace = commands.add_parser('trace', parents=[common], help='路由跟踪（并行探测各跳，需要管理员权限）')
+    trace.add_argument('host', help='目标主机')
+    trace.add_argument('--max-hops', type=_ttl, default=30, help='最大跳数，1-255（默认: 30）')
+    trace.add_argument('-w', '--timeout', type=_positive_int, default=1000, help='每轮超时，毫秒（默认: 1000）')
+    trace.add_argument('--mtr', type=_positive_int, metavar='ROUNDS', help='连续探测指定轮数并输出各跳统计')
+    trace.add_argument('--interval', type=_positive_int, default=1000, help='连续探测的间隔，毫秒（默认: 1000）')
+    trace.set_defaults(handler=cmd_trace)
+
+    # daemon
+    daemon = commands.add_parser('daemon', help='运行本地守护进程，供多个客户端共享服务和缓存')
+    daemon.add_argument('--address', help='监听地址（默认: 当前用户的Unix套接字/命名管道）')
+    daemon.add_argument('--refresh', type=_positive_int, default=30, help='快照刷新间隔，秒（默认: 30）')
+    daemon.set_defaults(handler=cmd_daemon)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out: Optional[TextIO] = None) -> int:
+    """命令行入口"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args, out or sys.stdout)
+    except BrokenPipeError:
+        # 下游管道提前关闭（如 | head），静默退出
+        return EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""
+NetKit 本地守护进程
+
+在一个长驻进程中托管Ping、路由、子网计算和网卡信息服务，
+客户端通过Unix域套接字（Windows下为命名管道）以JSON-RPC 2.0调用，
+多个GUI实例和脚本共享同一份路由表/网卡快照，相同的并发请求只执行一次
+"""
+
+from netkit.utils.lazy_import import lazy_module
+
+_EXPORTS = {
+    'DaemonServer': '.server',
+    'SingleFlight': '.server',
+    'SnapshotCache': '.server',
+    'register_default_methods': '.server',
+    'DaemonClient': '.client',
+    'is_daemon_running': '.client',
+    'RPCError': '.protocol',
+    'default_address': '.protocol',
+    'auth_key': '.protocol',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS, submodules=('server', 'client', 'protocol'))
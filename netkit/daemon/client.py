@@ -0,0 +1,93 @@
+"""
+守护进程客户端
+一个客户端对应一条连接，调用按顺序执行（多线程并发调用请各自创建客户端）
+"""
+
+import itertools
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from typing import Any, Iterator, Optional
+
+from . import protocol
+from .protocol import RPCError
+
+
+class DaemonClient:
+    """JSON-RPC守护进程客户端"""
+
+    def __init__(self, address: Optional[str] = None, authkey: Optional[bytes] = None):
+        self.address = address or protocol.default_address()
+        self.authkey = authkey or protocol.auth_key()
+        self.conn = None
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def connect(self):
+        """建立连接，守护进程未运行时抛出ConnectionError"""
+        if self.conn is None:
+            try:
+                self.conn = Client(self.address, authkey=self.authkey)
+            except (OSError, EOFError) as e:
+                raise ConnectionError(f"无法连接NetKit守护进程 {self.address}: {e}")
+            except AuthenticationError as e:
+                raise ConnectionError(f"{self.address} 上的进程未通过认证，不是当前用户的NetKit守护进程: {e}")
+        return self
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def call(self, method: str, **params) -> Any:
+        """调用方法并返回结果（忽略中间结果）"""
+        stream = self.stream(method, **params)
+        while True:
+            try:
+                next(stream)
+            except StopIteration as stop:
+                return stop.value
+
+    def stream(self, method: str, **params) -> Iterator[Any]:
+        """
+        调用方法并逐条产出中间结果，生成器的返回值为最终结果
+
+        Raises:
+            RPCError: 服务端返回错误
+            ConnectionError: 连接中断
+        """
+        with self.lock:
+            self.connect()
+            request_id = next(self.ids)
+            try:
+                self.conn.send_bytes(protocol.encode(protocol.make_request(request_id, method, params)))
+                while True:
+                    message = protocol.decode(self.conn.recv_bytes())
+                    if message.get('method') == protocol.PROGRESS_METHOD:
+                        if message['params'].get('id') == request_id:
+                            yield message['params']['event']
+                        continue
+                    if message.get('id') != request_id:
+                        continue
+                    if 'error' in message:
+                        error = message['error']
+                        raise RPCError(error.get('code', protocol.SERVER_ERROR), error.get('message', ''))
+                    return message.get('result')
+            except (OSError, EOFError) as e:
+                self.close()
+                raise ConnectionError(f"与NetKit守护进程的连接中断: {e}")
+
+
+def is_daemon_running(address: Optional[str] = None) -> bool:
+    """检查守护进程是否在运行"""
+    try:
+        with DaemonClient(address) as client:
+            return client.call('daemon.ping') == 'pong'
+    except (ConnectionError, RPCError):
+        return False
@@ -0,0 +1,166 @@
+"""
+守护进程通信协议
+基于 multiprocessing.connection 的消息分帧（Unix域套接字 / Windows命名管道），
+每条消息是一个UTF-8编码的JSON-RPC 2.0对象
+
+批量请求的中间结果以 "progress" 通知推送:
+    {"jsonrpc": "2.0", "method": "progress", "params": {"id": <请求ID>, "event": {...}}}
+
+套接字和认证密钥放在当前用户私有（0700）的运行时目录中；
+连接双方用该密钥做HMAC双向认证，其他用户抢占地址时客户端会拒绝连接
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import getpass
+import secrets
+import tempfile
+from typing import Any, Dict, Optional
+
+JSONRPC_VERSION = '2.0'
+PROGRESS_METHOD = 'progress'
+
+# JSON-RPC 2.0 标准错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+class RPCError(Exception):
+    """JSON-RPC错误"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> Dict:
+        return {'code': self.code, 'message': self.message}
+
+
+def _current_user() -> str:
+    try:
+        return getpass.getuser()
+    except Exception:
+        return 'default'
+
+
+def _ensure_private_dir(path: str) -> str:
+    """
+    创建（或校验已有的）私有目录：必须是属于当前用户的真实目录，且组和其他用户无任何权限
+
+    Raises:
+        PermissionError: 目录是符号链接、属于其他用户或权限过宽
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"运行时目录不是真实目录: {path}")
+    if hasattr(os, 'getuid'):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"运行时目录属于其他用户: {path}")
+        if info.st_mode & 0o077:
+            raise PermissionError(f"运行时目录权限过宽({oct(info.st_mode & 0o777)}): {path}")
+    return path
+
+
+def runtime_dir() -> str:
+    """
+    当前用户私有的运行时目录，存放套接字和认证密钥
+
+    Windows下位于用户配置目录（由用户配置文件的ACL保护），
+    其他系统为 $XDG_RUNTIME_DIR 或临时目录下的 netkit-<用户名>
+    """
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        path = os.path.join(base, 'NetKit')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return _ensure_private_dir(os.path.join(base, f'netkit-{_current_user()}'))
+
+
+def default_address() -> str:
+    """
+    守护进程监听地址
+
+    可通过环境变量 NETKIT_DAEMON_ADDRESS 覆盖；
+    Windows下为当前用户的命名管道，其他系统为私有运行时目录下的Unix域套接字
+    """
+    override = os.environ.get('NETKIT_DAEMON_ADDRESS')
+    if override:
+        return override
+
+    if sys.platform == 'win32':
+        return rf'\\.\pipe\netkit-{_current_user()}'
+
+    return os.path.join(runtime_dir(), 'daemon.sock')
+
+
+def auth_key() -> bytes:
+    """
+    读取当前用户的守护进程认证密钥，不存在时生成
+
+    密钥文件仅当前用户可读；命名管道的名称可被其他用户抢先创建，
+    双向认证保证客户端只和持有同一密钥的守护进程通信
+    """
+    path = os.path.join(runtime_dir(), 'daemon.key')
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # 另一个进程可能刚创建文件、尚未写完
+        for _ in range(50):
+            with open(path, 'rb') as f:
+                key = f.read()
+            if key:
+                return key
+            time.sleep(0.01)
+        raise PermissionError(f"认证密钥文件为空: {path}")
+
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def encode(message: Dict) -> bytes:
+    """编码消息"""
+    return json.dumps(message, ensure_ascii=False, default=str).encode('utf-8')
+
+
+def decode(data: bytes) -> Dict:
+    """解码消息，格式无效时抛出RPCError"""
+    try:
+        message = json.loads(data.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise RPCError(PARSE_ERROR, f"消息解析失败: {e}")
+    if not isinstance(message, dict):
+        raise RPCError(INVALID_REQUEST, "消息必须是JSON对象")
+    return message
+
+
+def make_request(request_id: int, method: str, params: Optional[Dict] = None) -> Dict:
+    return {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'method': method, 'params': params or {}}
+
+
+def make_result(request_id: Any, result: Any) -> Dict:
+    return {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'result': result}
+
+
+def make_error(request_id: Any, error: RPCError) -> Dict:
+    return {'jsonrpc': JSONRPC_VERSION, 'id': request_id, 'error': error.to_dict()}
+
+
+def make_progress(request_id: Any, event: Any) -> Dict:
+    return {'jsonrpc': JSONRPC_VERSION, 'method': PROGRESS_METHOD,
+            'params': {'id': request_id, 'event': event}}
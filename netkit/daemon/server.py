@@ -0,0 +1,484 @@
+"""
+守护进程服务端
+每个客户端连接一个读线程，每个请求一个处理线程；
+相同方法+参数的并发请求合并为一次执行（SingleFlight），中间结果广播给所有等待者，
+路由表等快照由SnapshotCache保持预热
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import dataclasses
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from . import protocol
+from .protocol import RPCError
+
+logger = logging.getLogger(__name__)
+
+# 处理函数签名: handler(params: dict, emit: Callable[[Any], None]) -> 结果
+Handler = Callable[[Dict, Callable[[Any], None]], Any]
+
+# subnet.divide 单次返回的最大子网数
+SUBNET_PAGE_SIZE = 1024
+
+
+class Flight:
+    """一次正在执行的调用，记录中间事件供多个等待者回放"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.events: List[Any] = []
+        self.done = False
+        self.result = None
+        self.error: Optional[RPCError] = None
+
+    def emit(self, event: Any):
+        """推送一条中间结果"""
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def finish(self, result: Any = None, error: Optional[RPCError] = None):
+        with self.condition:
+            self.result = result
+            self.error = error
+            self.done = True
+            self.condition.notify_all()
+
+    def follow(self) -> Iterator[Any]:
+        """从头回放并跟随中间结果，调用结束后返回"""
+        position = 0
+        while True:
+            with self.condition:
+                while position >= len(self.events) and not self.done:
+                    self.condition.wait()
+                pending = self.events[position:]
+                finished = self.done
+            position += len(pending)
+            yield from pending
+            if finished and position >= len(self.events):
+                return
+
+
+class SingleFlight:
+    """合并相同的并发调用"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights: Dict[str, Flight] = {}
+        self.stats = {'executed': 0, 'shared': 0}
+
+    def join(self, key: str, run: Callable[[Flight], None]) -> Flight:
+        """
+        加入key对应的调用，不存在时新建并在后台线程中执行run(flight)
+
+        Returns:
+            Flight: 共享的调用对象
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.stats['shared'] += 1
+                return flight
+            flight = Flight()
+            self.flights[key] = flight
+            self.stats['executed'] += 1
+
+        def worker():
+            try:
+                run(flight)
+            finally:
+                with self.lock:
+                    self.flights.pop(key, None)
+
+        threading.Thread(target=worker, daemon=True, name=f'NetKitFlight-{key[:32]}').start()
+        return flight
+
+
+class SnapshotCache:
+    """带有效期的快照，后台定期刷新以保持预热"""
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 30.0,
+                 is_valid: Callable[[Any], bool] = lambda value: True):
+        self.loader = loader
+        self.ttl = ttl
+        self.is_valid = is_valid
+        self.lock = threading.Lock()
+        self.value = None
+        self.loaded_at = 0.0
+        self.stats = {'hits': 0, 'loads': 0}
+
+    def get(self, max_age: Optional[float] = None) -> Any:
+        """获取快照，过期时同步重新加载"""
+        max_age = self.ttl if max_age is None else max_age
+        with self.lock:
+            if self.loaded_at and time.monotonic() - self.loaded_at <= max_age:
+                self.stats['hits'] += 1
+                return self.value
+        return self.refresh()
+
+    def refresh(self) -> Any:
+        """重新加载快照（加载失败的结果不缓存）"""
+        value = self.loader()
+        with self.lock:
+            self.stats['loads'] += 1
+            if self.is_valid(value):
+                self.value = value
+                self.loaded_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = 0.0
+
+    def age(self) -> Optional[float]:
+        with self.lock:
+            return time.monotonic() - self.loaded_at if self.loaded_at else None
+
+
+class DaemonServer:
+    """JSON-RPC守护进程服务端"""
+
+    def __init__(self, address: Optional[str] = None, refresh_interval: float = 30.0,
+                 authkey: Optional[bytes] = None):
+        self.address = address or protocol.default_address()
+        self.authkey = authkey or protocol.auth_key()
+        self.refresh_interval = refresh_interval
+        self.methods: Dict[str, Handler] = {}
+        self.dedupe: Dict[str, bool] = {}
+        self.snapshots: Dict[str, SnapshotCache] = {}
+        self.single_flight = SingleFlight()
+        self.listener = None
+        self.running = False
+        self.stop_event = threading.Event()
+        self.accept_thread = None
+        self.refresh_thread = None
+        self.connections = 0
+        self.requests = 0
+        self.stats_lock = threading.Lock()
+
+        self.register('daemon.ping', lambda params, emit: 'pong')
+        self.register('daemon.stats', lambda params, emit: self.get_stats(), dedupe=False)
+
+    def register(self, name: str, handler: Handler, dedupe: bool = True):
+        """注册方法；dedupe=False 的方法（如修改路由）每次请求都独立执行"""
+        self.methods[name] = handler
+        self.dedupe[name] = dedupe
+
+    def add_snapshot(self, name: str, snapshot: SnapshotCache) -> SnapshotCache:
+        """登记需要后台保持预热的快照"""
+        self.snapshots[name] = snapshot
+        return snapshot
+
+    # ------------------------------------------------------------ 生命周期
+
+    def start(self):
+        """开始监听（后台线程），地址已被占用时抛出RuntimeError"""
+        if self.running:
+            return
+        self._prepare_address()
+        if sys.platform == 'win32':
+            self.listener = Listener(self.address, authkey=self.authkey)
+        else:
+            # 在受限的umask下创建套接字文件，避免创建到chmod之间被其他用户连接
+            previous_umask = os.umask(0o077)
+            try:
+                self.listener = Listener(self.address, authkey=self.authkey)
+            finally:
+                os.umask(previous_umask)
+
+        self.running = True
+        self.stop_event.clear()
+        self.accept_thread = threading.Thread(target=self._accept_loop, daemon=True,
+                                              name='NetKitDaemonAccept')
+        self.accept_thread.start()
+        if self.snapshots:
+            self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True,
+                                                   name='NetKitDaemonRefresh')
+            self.refresh_thread.start()
+        logger.info(f"NetKit守护进程已启动: {self.address}")
+
+    def serve_forever(self):
+        """前台运行直到stop()或键盘中断"""
+        self.start()
+        try:
+            while not self.stop_event.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """停止监听"""
+        if not self.running:
+            return
+        self.running = False
+        self.stop_event.set()
+
+        # 连接一次以唤醒阻塞在accept上的线程
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError, AuthenticationError):
+            pass
+        if self.accept_thread:
+            self.accept_thread.join(timeout=2)
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        logger.info("NetKit守护进程已停止")
+
+    def _prepare_address(self):
+        """检查地址是否已有守护进程在运行，清理残留的套接字文件"""
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except (OSError, EOFError):
+            if sys.platform != 'win32' and os.path.exists(self.address):
+                os.unlink(self.address)
+            return
+        except AuthenticationError:
+            raise RuntimeError(f"地址已被未通过认证的进程占用: {self.address}")
+        raise RuntimeError(f"守护进程已在运行: {self.address}")
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except (EOFError, AuthenticationError) as e:
+                # 未持有密钥的客户端，或握手中途断开
+                logger.warning(f"拒绝未通过认证的连接: {e}")
+                continue
+            except OSError:
+                if not self.running:
+                    break
+                continue
+            if not self.running:
+                conn.close()
+                break
+            with self.stats_lock:
+                self.connections += 1
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True,
+                             name='NetKitDaemonConn').start()
+
+    def _refresh_loop(self):
+        """后台定期刷新快照"""
+        while not self.stop_event.is_set():
+            for name, snapshot in list(self.snapshots.items()):
+                try:
+                    snapshot.refresh()
+                except Exception as e:
+                    logger.warning(f"刷新快照 {name} 失败: {e}")
+            self.stop_event.wait(self.refresh_interval)
+
+    # ------------------------------------------------------------ 请求处理
+
+    def _serve_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def send(message):
+            data = protocol.encode(message)
+            with send_lock:
+                conn.send_bytes(data)
+
+        try:
+            while self.running:
+                try:
+                    data = conn.recv_bytes()
+                except (EOFError, OSError):
+                    break
+                try:
+                    request = protocol.decode(data)
+                except RPCError as e:
+                    send(protocol.make_error(None, e))
+                    continue
+                threading.Thread(target=self._serve_request, args=(request, send),
+                                 daemon=True, name='NetKitDaemonRequest').start()
+        finally:
+            conn.close()
+
+    def _serve_request(self, request: Dict, send: Callable[[Dict], None]):
+        request_id = request.get('id')
+        try:
+            flight = self.dispatch(request.get('method'), request.get('params'))
+            for event in flight.follow():
+                send(protocol.make_progress(request_id, event))
+            if flight.error is not None:
+                send(protocol.make_error(request_id, flight.error))
+            else:
+                send(protocol.make_result(request_id, flight.result))
+        except RPCError as e:
+            self._safe_send(send, protocol.make_error(request_id, e))
+        except (OSError, EOFError):
+            # 客户端已断开
+            pass
+
+    @staticmethod
+    def _safe_send(send, message):
+        try:
+            send(message)
+        except (OSError, EOFError):
+            pass
+
+    def dispatch(self, method: Any, params: Any) -> Flight:
+        """
+        分派一次调用
+
+        Returns:
+            Flight: 调用对象（相同的并发调用返回同一个对象）
+        """
+        if not isinstance(method, str):
+            raise RPCError(protocol.INVALID_REQUEST, "缺少方法名")
+        handler = self.methods.get(method)
+        if handler is None:
+            raise RPCError(protocol.METHOD_NOT_FOUND, f"未知方法: {method}")
+        if params is None:
+            params = {}
+        if not isinstance(params, dict):
+            raise RPCError(protocol.INVALID_PARAMS, "参数必须是JSON对象")
+
+        with self.stats_lock:
+            self.requests += 1
+
+        def run(flight):
+            try:
+                flight.finish(result=handler(params, flight.emit))
+            except RPCError as e:
+                flight.finish(error=e)
+            except (TypeError, ValueError, KeyError) as e:
+                flight.finish(error=RPCError(protocol.INVALID_PARAMS, str(e)))
+            except Exception as e:
+                logger.exception(f"执行 {method} 出错")
+                flight.finish(error=RPCError(protocol.SERVER_ERROR, str(e)))
+
+        if self.dedupe.get(method, True):
+            key = method + ':' + json.dumps(params, sort_keys=True, default=str)
+            return self.single_flight.join(key, run)
+
+        flight = Flight()
+        threading.Thread(target=run, args=(flight,), daemon=True).start()
+        return flight
+
+    def get_stats(self) -> Dict:
+        """守护进程统计信息"""
+        with self.stats_lock:
+            stats = {'connections': self.connections, 'requests': self.requests}
+        stats.update(self.single_flight.stats)
+        stats['snapshots'] = {
+            name: dict(snapshot.stats, age=snapshot.age())
+            for name, snapshot in self.snapshots.items()
+        }
+        return stats
+
+
+def _require(params: Dict, name: str):
+    if name not in params:
+        raise RPCError(protocol.INVALID_PARAMS, f"缺少参数: {name}")
+    return params[name]
+
+
+def register_default_methods(server: DaemonServer, preload_adapters: bool = True) -> DaemonServer:
+    """
+    注册NetKit服务方法，各服务在守护进程内只创建一次
+
+    方法:
+        ping.single / ping.batch（逐主机推送progress）
+        route.table（预热快照）/ route.add / route.delete
+        subnet.info / subnet.divide（按start/limit分页，每页最多SUBNET_PAGE_SIZE个子网）
+        netconfig.adapters（共享异步数据管理器的网卡缓存，需要WMI）
+    """
+    from netkit.services.ping.ping_service import PingService
+    from netkit.services.ping.ip_parser import parse_ip_range
+    from netkit.services.route.route import RouteService
+    from netkit.services.subnet.subnet_calculator import SubnetCalculator
+    from netkit.services.ping.records import ping_record
+
+    ping_service = PingService()
+    route_service = RouteService()
+    calculator = SubnetCalculator()
+
+    routes = server.add_snapshot('route.table', SnapshotCache(
+        route_service.get_route_table, ttl=server.refresh_interval,
+        is_valid=lambda result: result.get('success', False)
+    ))
+
+    def ping_single(params, emit):
+        return ping_service.ping_with_stats(_require(params, 'host'),
+                                            params.get('count', 4), params.get('timeout', 3000))
+
+    def ping_batch(params, emit):
+        hosts = []
+        for target in _require(params, 'targets'):
+            hosts.extend(parse_ip_range(target))
+
+        reachable = 0
+
+        def on_progress(host, result, stats, completed, total):
+            nonlocal reachable
+            record = ping_record(host, result, stats, completed, total)
+            reachable += record['success']
+            emit(record)
+
+        ping_service.batch_ping(hosts, params.get('count', 1), params.get('timeout', 1000),
+                                params.get('max_workers', 25), on_progress)
+        return {'total': len(hosts), 'reachable': reachable, 'unreachable': len(hosts) - reachable}
+
+    def route_table(params, emit):
+        result = routes.get(params.get('max_age'))
+        return {key: value for key, value in result.items() if key != 'raw_output'}
+
+    def route_add(params, emit):
+        result = route_service.add_route(_require(params, 'destination'), _require(params, 'netmask'),
+                                         _require(params, 'gateway'), params.get('metric', 1))
+        routes.invalidate()
+        return result
+
+    def route_delete(params, emit):
+        result = route_service.delete_route(_require(params, 'destination'),
+                                            params.get('netmask'), params.get('gateway'))
+        routes.invalidate()
+        return result
+
+    def subnet_info(params, emit):
+        return calculator.calculate_subnet_info(_require(params, 'ip'), _require(params, 'mask'))
+
+    def subnet_divide(params, emit):
+        division = calculator.plan_division(_require(params, 'ip'), _require(params, 'mask'),
+                                            _require(params, 'divide_by'), _require(params, 'value'))
+        start = params.get('start', 0)
+        limit = min(params.get('limit', SUBNET_PAGE_SIZE), SUBNET_PAGE_SIZE)
+        if not isinstance(start, int) or not isinstance(limit, int) or start < 0 or limit <= 0:
+            raise RPCError(protocol.INVALID_PARAMS, "start必须是非负整数，limit必须是正整数")
+        return {'total': len(division), 'start': start, 'subnets': division.page(start, limit)}
+
+    def netconfig_adapters(params, emit):
+        try:
+            from netkit.services.netconfig.async_manager import get_async_manager
+        except ImportError as e:
+            raise RPCError(protocol.SERVER_ERROR, f"网卡信息不可用: {e}")
+        adapters = get_async_manager().get_all_adapters_fast(params.get('show_all', False))
+        return [dataclasses.asdict(adapter) for adapter in adapters]
+
+    # 提前预热网卡缓存（非Windows环境没有WMI时跳过）
+    if preload_adapters:
+        try:
+            from netkit.services.netconfig.async_manager import get_async_manager
+            get_async_manager().start_preload()
+        except ImportError:
+            pass
+
+    server.register('ping.single', ping_single)
+    server.register('ping.batch', ping_batch)
+    server.register('route.table', route_table)
+    server.register('route.add', route_add, dedupe=False)
+    server.register('route.delete', route_delete, dedupe=False)
+    server.register('subnet.info', subnet_info)
+    server.register('subnet.divide', subnet_divide)
+    server.register('netconfig.adapters', netconfig_adapters)
+    return server
@@ -1,20 +1,18 @@
 """
 NetKit Services - 网络服务模块
 
-提供网络配置、Ping测试、路由管理等服务
+提供网络配置、Ping测试、路由管理、路由跟踪等服务
+各服务子包在首次访问时才导入
 """
 
-# 导入主要服务模块
-try:
-    from . import netconfig
-    from . import ping
-    from .route import route
-except ImportError:
-    # 在某些测试环境中可能无法导入所有模块
-    pass
+from netkit.utils.lazy_import import lazy_module
 
 __all__ = [
     "netconfig",
     "ping", 
-    "route"
+    "route",
+    "subnet",
+    "traceroute"
 ]
+
+__getattr__, __dir__ = lazy_module(__name__, submodules=__all__)
@@ -2,35 +2,34 @@
 网络配置相关服务模块
 
 提供网卡管理、信息获取、IP配置等功能的统一接口
+各接口在首次访问时才导入对应模块（WMI/COM只在真正使用时加载）
 """
 
-# 网卡选择管理相关
-from .interface_manager import (
-    get_network_interfaces,
-    get_network_interfaces_with_details,
-    extract_interface_name_from_display,
-    format_interface_display_name,
-    get_network_connection_status,
-    get_interface_ip_address
-)
+from netkit.utils.lazy_import import lazy_module
 
-# 网卡信息获取相关
-from .interface_info import (
-    get_network_card_info,
-    get_network_adapter_hardware_info,
-    get_interface_config,
-    get_interface_mac_address,
-    get_interface_basic_info,
-    get_interface_ip_config
-)
-
-# IP配置相关
-from .ip_configurator import (
-    apply_profile,
-    validate_ip_config,
-    check_network_conflict,
-    suggest_ip_config
-)
+_EXPORTS = {
+    # 网卡选择管理相关
+    'get_network_interfaces': '.interface_manager',
+    'get_network_interfaces_with_details': '.interface_manager',
+    'extract_interface_name_from_display': '.interface_manager',
+    'format_interface_display_name': '.interface_manager',
+    'get_network_connection_status': '.interface_manager',
+    'get_interface_ip_address': '.interface_manager',
+    
+    # 网卡信息获取相关
+    'get_network_card_info': '.interface_info',
+    'get_network_adapter_hardware_info': '.interface_info',
+    'get_interface_config': '.interface_info',
+    'get_interface_mac_address': '.interface_info',
+    'get_interface_basic_info': '.interface_info',
+    'get_interface_ip_config': '.interface_info',
+    
+    # IP配置相关
+    'apply_profile': '.ip_configurator',
+    'validate_ip_config': '.ip_configurator',
+    'check_network_conflict': '.ip_configurator',
+    'suggest_ip_config': '.ip_configurator',
+}
 
 # 为了向后兼容，保持原有的导入方式
 __all__ = [
@@ -55,4 +54,6 @@ __all__ = [
     'validate_ip_config',
     'check_network_conflict',
     'suggest_ip_config'
-] 
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
@@ -0,0 +1,108 @@
+"""
+网卡定位模块
+通过线程本地WMI连接和带条件的WQL查询定位网卡及其配置，
+优先使用异步数据管理器中的缓存，避免全量遍历 Win32_NetworkAdapter*
+"""
+
+import logging
+from typing import Optional, Tuple
+from .interface_info import ThreadLocalWMI
+from .async_manager import peek_async_manager
+
+logger = logging.getLogger(__name__)
+
+
+def _cached_adapter(connection_id: str = None, adapter_index: int = None):
+    """从异步数据管理器缓存中获取网卡信息（管理器未创建时返回None）"""
+    manager = peek_async_manager()
+    if manager is None:
+        return None
+
+    if connection_id is not None:
+        return manager.get_cached_adapter(connection_id)
+    return manager.get_cached_adapter_by_index(adapter_index)
+
+
+def get_cached_adapter_info(connection_id: str):
+    """获取缓存中的网卡信息（不触发查询，无缓存时返回None）"""
+    return _cached_adapter(connection_id=connection_id)
+
+
+def invalidate_cached_adapter(connection_id: str):
+    """配置修改后失效缓存中的网卡信息"""
+    manager = peek_async_manager()
+    if manager is not None:
+        manager.invalidate_adapter_cache(connection_id)
+
+
+def _first(items, attr: str, value):
+    """返回第一个属性匹配的对象（防御WMI过滤未生效的情况）"""
+    for item in items or []:
+        if getattr(item, attr, None) == value:
+            return item
+    return None
+
+
+def find_adapter(connection_id: str, connection=None):
+    """
+    按NetConnectionID查询 Win32_NetworkAdapter
+
+    Returns:
+        WMI适配器对象，不存在时返回None
+    """
+    c = connection or ThreadLocalWMI.get_connection()
+    return _first(c.Win32_NetworkAdapter(NetConnectionID=connection_id),
+                  'NetConnectionID', connection_id)
+
+
+def find_adapter_config_by_index(adapter_index: int, connection=None):
+    """
+    按Index查询 Win32_NetworkAdapterConfiguration
+
+    Returns:
+        WMI配置对象，不存在时返回None
+    """
+    c = connection or ThreadLocalWMI.get_connection()
+    return _first(c.Win32_NetworkAdapterConfiguration(Index=adapter_index),
+                  'Index', adapter_index)
+
+
+def find_adapter_config(connection_id: str) -> Tuple[Optional[object], Optional[str]]:
+    """
+    定位网卡配置对象
+
+    先用缓存中的Index直接查询配置（1次查询），
+    缓存未命中或已失效时再按NetConnectionID查询适配器（2次查询）
+
+    Returns:
+        tuple: (配置对象, 错误信息)，成功时错误信息为None
+    """
+    c = ThreadLocalWMI.get_connection()
+
+    cached = _cached_adapter(connection_id=connection_id)
+    if cached is not None:
+        config = find_adapter_config_by_index(cached.adapter_index, c)
+        if config is not None:
+            return config, None
+        logger.info(f"网卡 {connection_id} 的缓存Index已失效，重新查询")
+
+    adapter = find_adapter(connection_id, c)
+    if adapter is None:
+        return None, f"找不到网络适配器连接: {connection_id}"
+
+    config = find_adapter_config_by_index(adapter.Index, c)
+    if config is None:
+        return None, f"找不到网络适配器配置: {connection_id} (Index: {adapter.Index})"
+
+    return config, None
+
+
+def get_connection_id_by_index(adapter_index: int) -> Optional[str]:
+    """按Index获取网卡连接名（缓存优先）"""
+    cached = _cached_adapter(adapter_index=adapter_index)
+    if cached is not None:
+        return cached.connection_id
+
+    c = ThreadLocalWMI.get_connection()
+    adapter = _first(c.Win32_NetworkAdapter(Index=adapter_index), 'Index', adapter_index)
+    return adapter.NetConnectionID if adapter is not None else None
@@ -0,0 +1,156 @@
+"""
+地址占用探测模块
+应用静态IP前并行向候选IP和网关发送ARP/ICMP探测，在很短的截止时间内给出结论，
+发现局域网中已有其他主机使用该IP时提前告警
+"""
+
+import time
+import platform
+import threading
+import concurrent.futures
+from typing import Dict, List, Optional, Tuple
+from netkit.services.ping.probes import ProbeFunc, icmp_probe, arp_probe
+from .adapter_lookup import get_cached_adapter_info
+
+# 默认探测截止时间(秒)
+DEFAULT_DEADLINE = 0.4
+
+
+def get_default_probes() -> List[Tuple[str, ProbeFunc]]:
+    """获取当前平台可用的探测方式"""
+    probes = [('icmp', icmp_probe)]
+    if platform.system() == 'Windows':
+        probes.insert(0, ('arp', arp_probe))
+    return probes
+
+
+class AddressProbe:
+    """候选地址占用探测器"""
+    
+    def __init__(self, probes: List[Tuple[str, ProbeFunc]] = None, deadline: float = DEFAULT_DEADLINE):
+        self.probes = probes if probes is not None else get_default_probes()
+        self.deadline = deadline
+    
+    def check(self, ip: str, gateway: str = None, exclude_interface: str = None) -> Dict:
+        """
+        探测候选IP是否已被占用、网关是否可达
+        
+        所有(目标, 探测方式)组合并行执行，候选IP一旦收到应答立即返回，
+        截止时间到达后未完成的探测直接放弃
+        
+        Args:
+            ip: 候选IP地址
+            gateway: 网关地址（可为空）
+            exclude_interface: 正在配置的网卡，候选IP已在该网卡上时跳过IP探测
+        
+        Returns:
+            dict: {
+                'ip_in_use': bool,
+                'gateway_reachable': bool | None（未指定网关或未得出结论时为None）,
+                'responders': {目标: [应答的探测方式]},
+                'skipped': [str],
+                'elapsed': float
+            }
+        """
+        start = time.monotonic()
+        result = {
+            'ip_in_use': False,
+            'gateway_reachable': None,
+            'responders': {},
+            'skipped': [],
+            'elapsed': 0.0
+        }
+        
+        targets = []
+        if self._is_local_address(ip, exclude_interface):
+            result['skipped'].append(ip)
+        else:
+            targets.append(('ip', ip))
+        if gateway:
+            targets.append(('gateway', gateway))
+        
+        if not targets or not self.probes:
+            result['elapsed'] = time.monotonic() - start
+            return result
+        
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(targets) * len(self.probes),
+            thread_name_prefix="address-probe"
+        )
+        try:
+            futures = {
+                executor.submit(self._run_probe, probe, address, self.deadline): (role, address, name)
+                for role, address in targets
+                for name, probe in self.probes
+            }
+            pending = set(futures)
+            gateway_done = 0
+            gateway_total = len(self.probes) if gateway else 0
+            
+            while pending:
+                remaining = self.deadline - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    role, address, name = futures[future]
+                    answered = future.result()
+                    if answered:
+                        result['responders'].setdefault(address, []).append(name)
+                    if role == 'ip' and answered:
+                        result['ip_in_use'] = True
+                    elif role == 'gateway':
+                        gateway_done += 1
+                        if answered:
+                            result['gateway_reachable'] = True
+                        elif gateway_done == gateway_total and result['gateway_reachable'] is None:
+                            result['gateway_reachable'] = False
+                
+                # 已确认IP被占用即可结束
+                if result['ip_in_use']:
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        result['elapsed'] = time.monotonic() - start
+        return result
+    
+    @staticmethod
+    def _run_probe(probe: ProbeFunc, address: str, timeout: float) -> bool:
+        """执行单个探测，出错视为无应答"""
+        try:
+            return bool(probe(address, timeout))
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _is_local_address(ip: str, exclude_interface: Optional[str]) -> bool:
+        """候选IP是否就是正在配置的网卡当前的地址（本机会应答自己）"""
+        if not exclude_interface:
+            return False
+        try:
+            adapter = get_cached_adapter_info(exclude_interface)
+        except Exception:
+            return False
+        return adapter is not None and ip in (adapter.ip_addresses or [])
+
+
+# 全局探测器
+_address_probe = None
+_address_probe_lock = threading.Lock()
+
+
+def get_address_probe() -> AddressProbe:
+    """获取地址占用探测器实例"""
+    global _address_probe
+    with _address_probe_lock:
+        if _address_probe is None:
+            _address_probe = AddressProbe()
+        return _address_probe
+
+
+def probe_address_in_use(ip: str, gateway: str = None, exclude_interface: str = None) -> Dict:
+    """探测候选IP是否已被局域网中其他主机使用"""
+    return get_address_probe().check(ip, gateway, exclude_interface)
@@ -9,6 +9,7 @@ import os
 from typing import Dict, List, Optional, Callable, Any
 from dataclasses import dataclass
 from .wmi_engine import get_wmi_engine, NetworkAdapterInfo
+from .conflict_index import ConflictIndex
 import logging
 
 @dataclass
@@ -36,6 +37,9 @@ class AsyncNetworkDataManager:
         self.adapters_cache = {}
         self.last_full_refresh = 0
         
+        # 冲突索引（与adapters_cache同步更新）
+        self.conflict_index = ConflictIndex()
+        
         # 加载锁
         self.loading_lock = threading.Lock()
         
@@ -68,7 +72,7 @@ class AsyncNetworkDataManager:
                 # 在CI环境下直接设置模拟数据到缓存
                 mock_adapters = self.wmi_engine._create_mock_adapter_for_ci()
                 for adapter in mock_adapters:
-                    self.adapters_cache[adapter.connection_id] = adapter
+                    self._store_adapter(adapter)
                 self.preload_completed = True
                 return
             
@@ -104,7 +108,7 @@ class AsyncNetworkDataManager:
                 self._notify_callbacks("loading_progress")
                 
                 # 缓存适配器信息
-                self.adapters_cache[adapter.connection_id] = adapter
+                self._store_adapter(adapter)
                 
                 # 小延迟避免CPU占用过高
                 time.sleep(0.005)
@@ -145,7 +149,7 @@ class AsyncNetworkDataManager:
                 # 从WMI获取最新信息
                 adapter = self.wmi_engine.get_adapter_info(connection_id, force_refresh=True)
                 if adapter:
-                    self.adapters_cache[connection_id] = adapter
+                    self._store_adapter(adapter)
                     callback(adapter, None)
                 else:
                     callback(None, "网卡不存在")
@@ -236,12 +240,11 @@ class AsyncNetworkDataManager:
             try:
                 adapter = self.wmi_engine.get_adapter_info(connection_id, force_refresh=True)
                 if adapter:
-                    self.adapters_cache[connection_id] = adapter
+                    self._store_adapter(adapter)
                     self._notify_callbacks("adapter_updated", connection_id)
                 else:
                     # 网卡可能已被移除
-                    if connection_id in self.adapters_cache:
-                        del self.adapters_cache[connection_id]
+                    self._drop_adapter(connection_id)
                     self._notify_callbacks("adapter_removed", connection_id)
             except Exception as e:
                 self.logger.error(f"刷新网卡{connection_id}失败: {e}")
@@ -266,6 +269,7 @@ class AsyncNetworkDataManager:
                     new_cache[adapter.connection_id] = adapter
                 
                 self.adapters_cache = new_cache
+                self.conflict_index.rebuild(adapters)
                 self.last_full_refresh = time.time()
                 
                 # 先设置加载状态为False，再发送完成事件
@@ -309,9 +313,31 @@ class AsyncNetworkDataManager:
             'is_loading': self.loading_state.is_loading
         }
     
+    def get_cached_adapter(self, connection_id: str) -> Optional[NetworkAdapterInfo]:
+        """按连接名从缓存获取网卡信息（不触发查询）"""
+        return self.adapters_cache.get(connection_id)
+
+    def get_cached_adapter_by_index(self, adapter_index: int) -> Optional[NetworkAdapterInfo]:
+        """按WMI Index从缓存获取网卡信息（不触发查询）"""
+        for adapter in list(self.adapters_cache.values()):
+            if adapter.adapter_index == adapter_index:
+                return adapter
+        return None
+
+    def _store_adapter(self, adapter: NetworkAdapterInfo):
+        """写入缓存并同步冲突索引"""
+        self.adapters_cache[adapter.connection_id] = adapter
+        self.conflict_index.update_adapter(adapter)
+
+    def _drop_adapter(self, connection_id: str):
+        """移除缓存并同步冲突索引"""
+        self.adapters_cache.pop(connection_id, None)
+        self.conflict_index.remove_adapter(connection_id)
+
     def clear_cache(self):
         """清空缓存"""
         self.adapters_cache.clear()
+        self.conflict_index.rebuild([])
         self.preload_completed = False
         self.last_full_refresh = 0
         self.loading_state = LoadingState()
@@ -319,10 +345,10 @@ class AsyncNetworkDataManager:
     
     def invalidate_adapter_cache(self, connection_id: str):
         """立即失效指定网卡的缓存"""
-        if connection_id in self.adapters_cache:
-            # 将缓存时间设置为很久以前，强制下次获取时刷新
-            adapter = self.adapters_cache[connection_id]
-            adapter.last_updated = 0
+        adapter = self.adapters_cache.get(connection_id)
+        if adapter is not None:
+            # 网卡信息不可变，替换为缓存时间很久以前的副本，强制下次获取时刷新
+            self.adapters_cache[connection_id] = adapter.with_changes(last_updated=0)
             self.logger.info(f"已失效网卡 {connection_id} 的缓存")
     
     def force_refresh_adapter(self, connection_id: str):
@@ -332,7 +358,7 @@ class AsyncNetworkDataManager:
                 # 强制从WMI获取最新信息
                 adapter = self.wmi_engine.get_adapter_info(connection_id, force_refresh=True)
                 if adapter:
-                    self.adapters_cache[connection_id] = adapter
+                    self._store_adapter(adapter)
                     self._notify_callbacks("adapter_force_updated", connection_id)
                     self.logger.info(f"强制刷新网卡 {connection_id} 成功")
                 else:
@@ -358,4 +384,8 @@ def get_async_manager() -> AsyncNetworkDataManager:
     global _async_manager
     if _async_manager is None:
         _async_manager = AsyncNetworkDataManager()
-    return _async_manager 
\ No newline at end of file
+    return _async_manager 
+
+def peek_async_manager() -> Optional[AsyncNetworkDataManager]:
+    """获取已创建的异步数据管理器（未创建时返回None，不触发初始化）"""
+    return _async_manager
@@ -0,0 +1,225 @@
+"""
+网络冲突索引模块
+按IP、网段、网关建立网卡索引，随网卡缓存增量更新，
+冲突检查直接查询索引，不再格式化/解析配置文本
+"""
+
+import bisect
+import ipaddress
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+# 网段键: (网络地址整数, 前缀长度)
+NetworkKey = Tuple[int, int]
+
+
+def _to_int(address: str) -> Optional[int]:
+    """IPv4地址转整数，非IPv4返回None"""
+    try:
+        return int(ipaddress.IPv4Address(address))
+    except (ipaddress.AddressValueError, ValueError):
+        return None
+
+
+def _network_key(ip: str, mask: str) -> Optional[NetworkKey]:
+    """由IP和掩码计算网段键，无效时返回None"""
+    try:
+        network = ipaddress.IPv4Network(f"{ip}/{mask}", strict=False)
+    except (ipaddress.AddressValueError, ipaddress.NetmaskValueError, ValueError):
+        return None
+    return int(network.network_address), network.prefixlen
+
+
+def _network_end(key: NetworkKey) -> int:
+    """网段的最后一个地址"""
+    start, prefixlen = key
+    return start + (1 << (32 - prefixlen)) - 1
+
+
+def _format_network(key: NetworkKey) -> str:
+    """网段键转为CIDR文本"""
+    return f"{ipaddress.IPv4Address(key[0])}/{key[1]}"
+
+
+class ConflictIndex:
+    """网卡冲突索引：IP → 网卡，网段 → 网卡，网关 → 网卡"""
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.by_ip: Dict[int, Set[str]] = {}
+        self.by_network: Dict[NetworkKey, Set[str]] = {}
+        self.by_gateway: Dict[int, Set[str]] = {}
+        # 按起始地址排序的网段键，用于查找被目标网段包含的网段
+        self.sorted_networks: List[NetworkKey] = []
+        # 每个网卡登记的条目，用于增量更新
+        self.entries: Dict[str, Tuple[List[int], List[NetworkKey], List[int]]] = {}
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def rebuild(self, adapters):
+        """用一组NetworkAdapterInfo重建索引"""
+        with self.lock:
+            self.by_ip.clear()
+            self.by_network.clear()
+            self.by_gateway.clear()
+            self.sorted_networks = []
+            self.entries.clear()
+            for adapter in adapters:
+                self.update_adapter(adapter)
+    
+    def update_adapter(self, adapter):
+        """登记或更新单个网卡"""
+        self.update(adapter.connection_id, adapter.ip_addresses, adapter.subnet_masks, adapter.gateways)
+    
+    def update(self, name: str, ip_addresses, subnet_masks, gateways):
+        """
+        按地址列表登记或更新网卡
+        
+        Args:
+            name: 网卡连接名
+            ip_addresses: IP地址列表
+            subnet_masks: 与IP地址按位置对应的子网掩码列表
+            gateways: 网关列表
+        """
+        ips, networks, gateway_ints = [], [], []
+        masks = list(subnet_masks or [])
+        for i, ip in enumerate(ip_addresses or []):
+            ip_int = _to_int(ip)
+            if ip_int is None:
+                continue
+            ips.append(ip_int)
+            key = _network_key(ip, masks[i]) if i < len(masks) else None
+            if key is not None:
+                networks.append(key)
+        for gateway in gateways or []:
+            gateway_int = _to_int(gateway)
+            if gateway_int is not None:
+                gateway_ints.append(gateway_int)
+        
+        with self.lock:
+            self.remove_adapter(name)
+            for ip_int in ips:
+                self.by_ip.setdefault(ip_int, set()).add(name)
+            for key in networks:
+                owners = self.by_network.setdefault(key, set())
+                if not owners:
+                    bisect.insort(self.sorted_networks, key)
+                owners.add(name)
+            for gateway_int in gateway_ints:
+                self.by_gateway.setdefault(gateway_int, set()).add(name)
+            self.entries[name] = (ips, networks, gateway_ints)
+    
+    def remove_adapter(self, connection_id: str):
+        """移除网卡的所有条目"""
+        with self.lock:
+            entry = self.entries.pop(connection_id, None)
+            if entry is None:
+                return
+            ips, networks, gateways = entry
+            for ip_int in ips:
+                self._discard(self.by_ip, ip_int, connection_id)
+            for key in networks:
+                if self._discard(self.by_network, key, connection_id):
+                    pos = bisect.bisect_left(self.sorted_networks, key)
+                    if pos < len(self.sorted_networks) and self.sorted_networks[pos] == key:
+                        del self.sorted_networks[pos]
+            for gateway_int in gateways:
+                self._discard(self.by_gateway, gateway_int, connection_id)
+    
+    @staticmethod
+    def _discard(mapping, key, connection_id) -> bool:
+        """从映射中移除网卡，键已无网卡时删除并返回True"""
+        owners = mapping.get(key)
+        if owners is None:
+            return False
+        owners.discard(connection_id)
+        if not owners:
+            del mapping[key]
+            return True
+        return False
+    
+    def find_ip(self, ip: str) -> Set[str]:
+        """查找使用该IP的网卡"""
+        ip_int = _to_int(ip)
+        with self.lock:
+            return set(self.by_ip.get(ip_int, ()))
+    
+    def find_gateway(self, gateway: str) -> Set[str]:
+        """查找使用该网关的网卡"""
+        gateway_int = _to_int(gateway)
+        with self.lock:
+            return set(self.by_gateway.get(gateway_int, ()))
+    
+    def find_overlapping_networks(self, ip: str, mask: str) -> Dict[NetworkKey, Set[str]]:
+        """
+        查找与目标网段重叠的网段
+        
+        CIDR网段要么互相包含要么不相交：包含目标的网段最多33个前缀逐一查表，
+        被目标包含的网段在排序列表中二分定位
+        """
+        target = _network_key(ip, mask)
+        if target is None:
+            return {}
+        start, prefixlen = target
+        end = _network_end(target)
+        
+        result = {}
+        with self.lock:
+            # 包含目标网段（含相同网段）的网段
+            for length in range(prefixlen, -1, -1):
+                key = (start & ~((1 << (32 - length)) - 1) & 0xFFFFFFFF, length)
+                if key in self.by_network:
+                    result[key] = set(self.by_network[key])
+            
+            # 被目标网段包含的更小网段
+            pos = bisect.bisect_left(self.sorted_networks, (start, prefixlen + 1))
+            while pos < len(self.sorted_networks) and self.sorted_networks[pos][0] <= end:
+                key = self.sorted_networks[pos]
+                if key[1] > prefixlen:
+                    result[key] = set(self.by_network[key])
+                pos += 1
+        return result
+    
+    def check(self, ip: str, mask: str, gateway: str, exclude_interface: str = None) -> Dict:
+        """
+        检查目标配置与现有网卡的冲突
+        
+        Args:
+            ip: 目标IP地址
+            mask: 目标子网掩码
+            gateway: 目标网关（可为空）
+            exclude_interface: 排除的网卡（通常是正在配置的网卡）
+        
+        Returns:
+            dict: {'conflicts': [str], 'has_conflict': bool, 'details': [dict]}
+        """
+        def others(names):
+            return sorted(name for name in names if name != exclude_interface)
+        
+        details = []
+        for name in others(self.find_ip(ip)):
+            details.append({'type': 'ip', 'value': ip, 'interface': name,
+                            'message': f"IP地址 {ip} 已在接口 {name} 上使用"})
+        
+        if gateway:
+            for name in others(self.find_gateway(gateway)):
+                details.append({'type': 'gateway', 'value': gateway, 'interface': name,
+                                'message': f"网关地址 {gateway} 已在接口 {name} 上使用"})
+        
+        target = _network_key(ip, mask)
+        if target is not None:
+            for key, names in sorted(self.find_overlapping_networks(ip, mask).items()):
+                for name in others(names):
+                    details.append({
+                        'type': 'subnet',
+                        'value': _format_network(key),
+                        'interface': name,
+                        'message': f"网段 {_format_network(target)} 与接口 {name} 的网段 {_format_network(key)} 重叠"
+                    })
+        
+        return {
+            'conflicts': [d['message'] for d in details],
+            'has_conflict': len(details) > 0,
+            'details': details
+        }
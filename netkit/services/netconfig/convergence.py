@@ -0,0 +1,109 @@
+"""
+配置收敛等待模块
+在应用IP配置后等待目标状态出现，取代固定时长的sleep：
+网络监听器的原始事件会立即唤醒检查，未运行监听时按短间隔复查
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Tuple
+from netkit.utils.network_monitor import get_network_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class ConvergenceWaiter:
+    """配置收敛等待器"""
+    
+    def __init__(self, poll_interval: float = 0.25, history_size: int = 50):
+        self.poll_interval = poll_interval
+        self.history_size = history_size
+        self.history: List[Dict] = []
+        self.lock = threading.Lock()
+    
+    def wait_until(self, check: Callable[[], bool], timeout: float,
+                   description: str = "") -> Tuple[bool, float]:
+        """
+        等待 check() 返回True或超时
+        
+        Args:
+            check: 收敛条件（会被反复调用，异常视为未收敛）
+            timeout: 最长等待时间(秒)
+            description: 用于日志和统计的描述
+            
+        Returns:
+            tuple: (是否收敛, 耗时秒数)
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        wake = threading.Event()
+        
+        def on_network_event(event_type, adapters):
+            wake.set()
+        
+        monitor = get_network_monitor()
+        monitor.add_event_listener(on_network_event)
+        try:
+            while True:
+                try:
+                    if check():
+                        return self._record(description, True, time.monotonic() - start)
+                except Exception as e:
+                    logger.debug(f"收敛检查出错({description}): {e}")
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self._record(description, False, time.monotonic() - start)
+                
+                wake.wait(min(self.poll_interval, remaining))
+                wake.clear()
+        finally:
+            monitor.remove_event_listener(on_network_event)
+    
+    def _record(self, description: str, converged: bool, elapsed: float) -> Tuple[bool, float]:
+        """记录一次收敛耗时"""
+        with self.lock:
+            self.history.append({
+                'description': description,
+                'converged': converged,
+                'elapsed': elapsed
+            })
+            if len(self.history) > self.history_size:
+                self.history = self.history[-self.history_size:]
+        
+        if converged:
+            logger.info(f"配置已收敛({description})，耗时 {elapsed * 1000:.0f}ms")
+        else:
+            logger.warning(f"配置在 {elapsed:.1f}s 内未收敛({description})")
+        return converged, elapsed
+    
+    def get_stats(self) -> Dict:
+        """获取收敛耗时统计"""
+        with self.lock:
+            times = [h['elapsed'] for h in self.history if h['converged']]
+            return {
+                'total': len(self.history),
+                'converged': len(times),
+                'timeouts': len(self.history) - len(times),
+                'avg_seconds': sum(times) / len(times) if times else 0.0,
+                'max_seconds': max(times) if times else 0.0,
+                'last': dict(self.history[-1]) if self.history else None
+            }
+
+
+# 全局收敛等待器
+_convergence_waiter = None
+
+
+def get_convergence_waiter() -> ConvergenceWaiter:
+    """获取收敛等待器实例"""
+    global _convergence_waiter
+    if _convergence_waiter is None:
+        _convergence_waiter = ConvergenceWaiter()
+    return _convergence_waiter
+
+
+def get_convergence_stats() -> Dict:
+    """获取配置收敛耗时统计"""
+    return get_convergence_waiter().get_stats()
@@ -6,7 +6,9 @@
 from typing import Dict, List, Optional
 from .wmi_engine import get_wmi_engine, NetworkAdapterInfo
 import logging
+import threading
 import time
+from netkit.utils.oui_lookup import lookup_vendor
 
 class NetworkInfoService:
     """网卡信息服务"""
@@ -262,18 +264,54 @@ def get_interface_config(interface_name: str) -> Optional[str]:
 
 # 为了兼容性，保留一些原有的类和函数
 class ThreadLocalWMI:
-    """线程本地的WMI连接管理器（兼容性保留）"""
+    """
+    线程本地的WMI连接池
+    
+    每个线程只初始化一次COM并复用同一个WMI连接，
+    避免每次操作都执行 CoInitialize + wmi.WMI() 的开销
+    """
+    
+    _local = threading.local()
     
     @classmethod
     def get_connection(cls):
-        """获取当前线程的WMI连接"""
-        # 使用新的WMI引擎
-        return get_wmi_engine()
+        """获取当前线程的WMI连接（不存在时创建）"""
+        import wmi
+        import pythoncom
+        
+        local = cls._local
+        factory = wmi.WMI
+        
+        # 连接与创建它的工厂绑定，工厂被替换时重新建立连接
+        if getattr(local, 'connection', None) is None or getattr(local, 'factory', None) is not factory:
+            pythoncom.CoInitialize()
+            local.com_refs = getattr(local, 'com_refs', 0) + 1
+            local.connection = factory()
+            local.factory = factory
+        
+        return local.connection
+    
+    @classmethod
+    def invalidate(cls):
+        """丢弃当前线程的连接（连接出错后调用，下次获取时重建）"""
+        cls._local.connection = None
+        cls._local.factory = None
     
     @classmethod
     def cleanup(cls):
-        """清理当前线程的WMI连接"""
-        pass
+        """清理当前线程的WMI连接并释放COM"""
+        local = cls._local
+        cls.invalidate()
+        
+        refs = getattr(local, 'com_refs', 0)
+        if refs:
+            import pythoncom
+            for _ in range(refs):
+                try:
+                    pythoncom.CoUninitialize()
+                except Exception:
+                    pass
+            local.com_refs = 0
 
 class NetworkAdapterWMI:
     """网络适配器WMI管理类（兼容性保留）"""
@@ -393,7 +431,10 @@ def get_connection_status_text(status_code) -> str:
     }
     return status_map.get(status_code, "未知")
 
-def extract_manufacturer_info(description: str) -> Dict[str, str]:
-    """从描述中提取制造商和型号信息（兼容函数）"""
+def extract_manufacturer_info(description: str, mac_address: str = None) -> Dict[str, str]:
+    """从描述中提取制造商和型号信息（兼容函数），描述无法识别时按MAC的OUI查询制造商"""
     service = get_network_info_service()
-    return service.wmi_engine._extract_manufacturer_info(description) 
\ No newline at end of file
+    info = service.wmi_engine._extract_manufacturer_info(description)
+    if info["manufacturer"] == "未知" and mac_address:
+        info["manufacturer"] = lookup_vendor(mac_address) or "未知"
+    return info 
\ No newline at end of file
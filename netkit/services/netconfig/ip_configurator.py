@@ -3,62 +3,96 @@ IP配置模块
 负责IP地址配置的应用、验证、冲突检查等功能
 """
 
-import subprocess
 import re
 import ipaddress
-import wmi
-import pythoncom
 import threading
+from netkit.utils.command_runner import run_command
 from .interface_manager import get_network_interfaces
-from .interface_info import get_interface_config
+from .interface_info import get_interface_config, ThreadLocalWMI
+from .adapter_lookup import (
+    find_adapter_config,
+    find_adapter_config_by_index,
+    get_connection_id_by_index,
+    get_cached_adapter_info,
+    invalidate_cached_adapter
+)
+from .async_manager import peek_async_manager
+from .conflict_index import ConflictIndex
+from .convergence import get_convergence_waiter
+from .profile_planner import (
+    plan_profile,
+    ACTION_SET_IP,
+    ACTION_SET_GATEWAY,
+    ACTION_SET_DNS,
+    ACTION_RESET_DNS
+)
 
+# 等待配置收敛的最长时间(秒)
+DHCP_CONVERGE_TIMEOUT = 5.0
+STATIC_CONVERGE_TIMEOUT = 3.0
 
-def apply_profile(interface_name, ip_mode, dns_mode, ip_config, dns_config):
+
+VALID_MODES = ('auto', 'manual')
+
+
+def apply_profile(interface_name, ip_mode, dns_mode, ip_config, dns_config,
+                  dry_run=False, force=False):
     """
     应用IP配置文件 - 支持四种配置组合模式
     
+    先与缓存中的网卡信息比较，只执行有差异的操作，配置一致时直接跳过
+    
     Args:
         interface_name: 网卡接口名称（NetConnectionID，如"以太网"）
         ip_mode: IP配置模式 ('auto' | 'manual')
         dns_mode: DNS配置模式 ('auto' | 'manual')
         ip_config: IP配置参数 {'ip': '', 'mask': '', 'gateway': ''}
         dns_config: DNS配置参数 {'dns1': '', 'dns2': ''}
+        dry_run: 仅返回配置计划，不做任何修改
+        force: 忽略缓存，按组合模式完整应用
     
     Returns:
-        dict: {'success': bool, 'message': str, 'error': str}
+        dict: {'success': bool, 'message': str, 'error': str}，
+              dry_run时额外包含 'plan'，跳过时包含 'skipped': True
     """
+    if ip_mode not in VALID_MODES or dns_mode not in VALID_MODES:
+        return {
+            'success': False,
+            'error': f"无效的配置模式: ip_mode={ip_mode}, dns_mode={dns_mode}"
+        }
+    
+    current = None if force else get_cached_adapter_info(interface_name)
+    plan = plan_profile(interface_name, current, ip_mode, dns_mode, ip_config, dns_config)
+    
+    if dry_run:
+        return {
+            'success': True,
+            'dry_run': True,
+            'message': plan.describe(),
+            'plan': plan.to_dict()
+        }
+    
+    if plan.is_noop:
+        return {
+            'success': True,
+            'skipped': True,
+            'message': plan.describe()
+        }
+    
     try:
-        # 初始化COM
-        pythoncom.CoInitialize()
-        
-        # 连接到WMI
-        c = wmi.WMI()
-        
-        # 通过NetConnectionID查找网络适配器
-        target_adapter = None
-        for adapter in c.Win32_NetworkAdapter():
-            if adapter.NetConnectionID == interface_name:
-                target_adapter = adapter
-                break
-        
-        if not target_adapter:
+        # 使用线程本地连接和带条件查询定位网卡配置（缓存优先）
+        adapter_config, error = find_adapter_config(interface_name)
+        if error:
             return {
                 'success': False,
-                'error': f"找不到网络适配器连接: {interface_name}"
+                'error': error
             }
         
-        # 通过适配器Index查找对应的配置
-        adapter_config = None
-        for config in c.Win32_NetworkAdapterConfiguration():
-            if config.Index == target_adapter.Index:
-                adapter_config = config
-                break
+        # 缓存信息即将过时，下次规划前需刷新
+        invalidate_cached_adapter(interface_name)
         
-        if not adapter_config:
-            return {
-                'success': False,
-                'error': f"找不到网络适配器配置: {interface_name} (Index: {target_adapter.Index})"
-            }
+        if not plan.requires_full_apply:
+            return _execute_plan(adapter_config, plan)
         
         # 根据四种组合模式应用配置
         if ip_mode == "auto" and dns_mode == "auto":
@@ -84,47 +118,73 @@ def apply_profile(interface_name, ip_mode, dns_mode, ip_config, dns_config):
             }
             
     except Exception as e:
+        # 连接可能已失效，下次调用时重建
+        ThreadLocalWMI.invalidate()
         return {
             'success': False,
             'error': f"WMI配置失败: {str(e)}"
         }
-    finally:
-        # 清理COM
-        try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+
+
+def _execute_plan(adapter_config, plan):
+    """按计划逐项执行差异操作"""
+    method_names = {
+        ACTION_SET_IP: 'EnableStatic',
+        ACTION_SET_GATEWAY: 'SetGateways',
+        ACTION_SET_DNS: 'SetDNSServerSearchOrder',
+        ACTION_RESET_DNS: 'SetDNSServerSearchOrder'
+    }
+    
+    done = []
+    for op in plan.operations:
+        if op.action == ACTION_SET_IP:
+            result = adapter_config.EnableStatic([op.args[0]], [op.args[1]])
+        elif op.action == ACTION_SET_GATEWAY:
+            result = adapter_config.SetGateways([op.args[0]])
+        elif op.action == ACTION_SET_DNS:
+            result = adapter_config.SetDNSServerSearchOrder(list(op.args))
+        elif op.action == ACTION_RESET_DNS:
+            result = adapter_config.SetDNSServerSearchOrder()
+        else:
+            return {
+                'success': False,
+                'error': f"未知的配置操作: {op.action}"
+            }
+        
+        if result[0] != 0:
+            return {
+                'success': False,
+                'error': f"{op.description}失败({method_names[op.action]})，错误代码: {result[0]}"
+            }
+        done.append(op.description)
+    
+    return {
+        'success': True,
+        'message': f"已按差异更新配置: {'；'.join(done)}"
+    }
+
+
+def _get_interface_name(adapter_config):
+    """获取配置对象对应的接口名称（失败时返回None）"""
+    try:
+        return get_connection_id_by_index(adapter_config.Index)
+    except Exception:
+        return None
 
 
 def _apply_full_dhcp_with_netsh_fallback(adapter_config, interface_name):
     """使用netsh作为备选方案的DHCP配置方法"""
     try:
         # 方案1：尝试使用netsh命令直接设置DHCP（最可靠的方法）
-        import subprocess
-        
         # 使用netsh设置为DHCP，这会自动清除所有静态设置包括网关
         cmd = f'netsh interface ipv4 set address name="{interface_name}" source=dhcp'
         
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
-            capture_output=True, 
-            text=True, 
-            encoding='utf-8',
-            timeout=30
-        )
+        result = run_command(cmd, timeout=30)
         
         if result.returncode == 0:
             # netsh成功，继续设置DNS
             dns_cmd = f'netsh interface ipv4 set dns name="{interface_name}" source=dhcp'
-            dns_result = subprocess.run(
-                dns_cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                timeout=30
-            )
+            dns_result = run_command(dns_cmd, timeout=30)
             
             if dns_result.returncode == 0:
                 return {
@@ -145,27 +205,64 @@ def _apply_full_dhcp_with_netsh_fallback(adapter_config, interface_name):
         return None
 
 
+def _wait_for_adapter_state(adapter_config, condition, timeout, description):
+    """
+    等待网卡配置达到目标状态
+    
+    每次检查都按Index重新查询配置（WMI对象是快照），网络变化事件会立即唤醒检查
+    
+    Returns:
+        tuple: (最近一次查询到的配置对象, 耗时秒数)
+    """
+    latest = [adapter_config]
+    
+    def check():
+        config = find_adapter_config_by_index(adapter_config.Index)
+        if config is None:
+            return False
+        latest[0] = config
+        return condition(config)
+    
+    _, elapsed = get_convergence_waiter().wait_until(check, timeout, description)
+    return latest[0], elapsed
+
+
+def _ipv4_addresses(config):
+    """配置对象中的IPv4地址列表"""
+    return [ip for ip in (config.IPAddress or ()) if ':' not in ip]
+
+
+def _dhcp_lease_obtained(previous_ips):
+    """
+    生成"已取得DHCP租约"的收敛条件
+
+    EnableDHCP之后配置里可能仍是原来的静态地址或APIPA(169.254.x.x)地址，
+    只有出现DHCP服务器/租约时间，或出现一个新的非APIPA地址，才算取得租约
+    """
+    previous = set(previous_ips)
+    link_local = ipaddress.ip_network('169.254.0.0/16')
+
+    def condition(cfg):
+        if not cfg.DHCPEnabled:
+            return False
+        addresses = [
+            ip for ip in _ipv4_addresses(cfg)
+            if ip != '0.0.0.0' and ipaddress.ip_address(ip) not in link_local
+        ]
+        if not addresses:
+            return False
+        has_lease = (cfg.DHCPServer not in (None, '', '255.255.255.255')
+                     or bool(cfg.DHCPLeaseObtained))
+        return has_lease or any(ip not in previous for ip in addresses)
+
+    return condition
+
+
 def _apply_full_dhcp(adapter_config):
     """组合1: 纯DHCP模式 (自动IP + 自动DNS) - 多重方案确保成功"""
     try:
-        # 获取接口名称用于netsh命令
-        interface_name = None
-        try:
-            # 尝试获取接口名称
-            pythoncom.CoInitialize()
-            c = wmi.WMI()
-            
-            for adapter in c.Win32_NetworkAdapter():
-                if adapter.Index == adapter_config.Index:
-                    interface_name = adapter.NetConnectionID
-                    break
-        except Exception:
-            pass
-        finally:
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
+        # 获取接口名称用于netsh命令（缓存优先，按Index查询）
+        interface_name = _get_interface_name(adapter_config)
         
         # 方案1：如果有接口名称，尝试使用netsh命令（最可靠）
         if interface_name:
@@ -181,33 +278,39 @@ def _apply_full_dhcp(adapter_config):
             pass
         
         # 步骤2：临时启用DHCP来清除静态设置
+        try:
+            previous_ips = _ipv4_addresses(adapter_config)
+        except Exception:
+            previous_ips = []
         adapter_config.EnableDHCP()
         
-        # 步骤3：获取当前的IP信息（用于临时静态设置）
-        import time
-        time.sleep(2)
-        
-        # 重新获取adapter配置以获取DHCP分配的IP
+        # 步骤3：等待取得DHCP租约（用于临时静态设置），取到即返回
+        converge_time = 0.0
+        lease_obtained = _dhcp_lease_obtained(previous_ips)
+        lease_pending = False
         try:
-            pythoncom.CoInitialize()
-            c = wmi.WMI()
-            
-            # 重新获取配置
-            for config in c.Win32_NetworkAdapterConfiguration():
-                if config.Index == adapter_config.Index:
-                    current_adapter_config = config
-                    break
-            else:
-                current_adapter_config = adapter_config
+            current_adapter_config, elapsed = _wait_for_adapter_state(
+                adapter_config,
+                lease_obtained,
+                DHCP_CONVERGE_TIMEOUT,
+                "DHCP分配IP"
+            )
+            converge_time += elapsed
             
-            # 获取当前IP信息
-            if current_adapter_config.IPAddress and len(current_adapter_config.IPAddress) > 0:
-                current_ip = current_adapter_config.IPAddress[0]
+            # 取得租约后用租约地址做临时静态设置（超时时不能把旧地址固定下来）
+            if lease_obtained(current_adapter_config):
+                current_ip = _ipv4_addresses(current_adapter_config)[0]
                 current_mask = current_adapter_config.IPSubnet[0] if current_adapter_config.IPSubnet else "255.255.255.0"
                 
                 # 步骤4：临时设置为静态IP（不设置网关）
                 current_adapter_config.EnableStatic([current_ip], [current_mask])
-                time.sleep(1)
+                _, elapsed = _wait_for_adapter_state(
+                    current_adapter_config,
+                    lambda cfg: not cfg.DHCPEnabled,
+                    STATIC_CONVERGE_TIMEOUT,
+                    "临时静态IP"
+                )
+                converge_time += elapsed
                 
                 # 步骤5：最后设置为DHCP（这样可以确保网关被清除）
                 result_ip = current_adapter_config.EnableDHCP()
@@ -217,7 +320,8 @@ def _apply_full_dhcp(adapter_config):
                         'error': f"最终启用DHCP失败，错误代码: {result_ip[0]}"
                     }
             else:
-                # 如果没有IP信息，直接使用原始方法
+                # 超时仍未取得租约，直接使用原始方法
+                lease_pending = True
                 result_ip = adapter_config.EnableDHCP()
                 if result_ip[0] != 0:
                     return {
@@ -233,11 +337,6 @@ def _apply_full_dhcp(adapter_config):
                     'success': False,
                     'error': f"启用DHCP失败，错误代码: {result_ip[0]}"
                 }
-        finally:
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
         
         # 步骤6：设置DNS为自动获取
         result_dns = adapter_config.SetDNSServerSearchOrder()
@@ -247,9 +346,14 @@ def _apply_full_dhcp(adapter_config):
                 'error': f"设置DNS为自动获取失败，错误代码: {result_dns[0]}"
             }
         
+        message = "使用WMI强力方法启用完全DHCP模式，已尽力清除静态网关设置"
+        if lease_pending:
+            message += f"（{DHCP_CONVERGE_TIMEOUT:.0f}秒内尚未取得DHCP租约）"
         return {
             'success': True,
-            'message': "使用WMI强力方法启用完全DHCP模式，已尽力清除静态网关设置"
+            'message': message,
+            'converge_time': converge_time,
+            'lease_pending': lease_pending
         }
         
     except Exception as e:
@@ -262,40 +366,16 @@ def _apply_full_dhcp(adapter_config):
 def _apply_dhcp_with_static_dns(adapter_config, dns_config):
     """组合2: DHCP IP + 静态DNS - 多重方案确保成功"""
     try:
-        # 获取接口名称用于netsh命令
-        interface_name = None
-        try:
-            pythoncom.CoInitialize()
-            c = wmi.WMI()
-            
-            for adapter in c.Win32_NetworkAdapter():
-                if adapter.Index == adapter_config.Index:
-                    interface_name = adapter.NetConnectionID
-                    break
-        except Exception:
-            pass
-        finally:
-            try:
-                pythoncom.CoUninitialize()
-            except:
-                pass
+        # 获取接口名称用于netsh命令（缓存优先，按Index查询）
+        interface_name = _get_interface_name(adapter_config)
         
         # 方案1：如果有接口名称，尝试使用netsh命令设置DHCP IP
         if interface_name:
             try:
-                import subprocess
-                
                 # 使用netsh设置为DHCP IP，这会清除静态网关
                 cmd = f'netsh interface ipv4 set address name="{interface_name}" source=dhcp'
                 
-                result = subprocess.run(
-                    cmd, 
-                    shell=True, 
-                    capture_output=True, 
-                    text=True, 
-                    encoding='utf-8',
-                    timeout=30
-                )
+                result = run_command(cmd, timeout=30)
                 
                 if result.returncode == 0:
                     # netsh IP设置成功，继续设置静态DNS
@@ -385,9 +465,13 @@ def _apply_static_ip_with_dhcp_dns(adapter_config, ip_config):
                 'error': f"清除网关设置失败，错误代码: {result_dhcp[0]}"
             }
         
-        # 等待一小段时间让DHCP设置生效
-        import time
-        time.sleep(1)
+        # 等待DHCP设置生效（观察到DHCP已启用即继续）
+        _, converge_time = _wait_for_adapter_state(
+            adapter_config,
+            lambda cfg: bool(cfg.DHCPEnabled),
+            STATIC_CONVERGE_TIMEOUT,
+            "清除静态网关"
+        )
         
         # 步骤2：立即设置为静态IP（只设置IP、掩码和网关，不影响DNS）
         if current_gateway:
@@ -426,7 +510,8 @@ def _apply_static_ip_with_dhcp_dns(adapter_config, ip_config):
         gateway_msg = f"，网关: {current_gateway}" if current_gateway else "，无网关"
         return {
             'success': True,
-            'message': f"已成功启用静态IP + DHCP DNS模式，IP: {current_ip}，掩码: {current_mask}{gateway_msg}"
+            'message': f"已成功启用静态IP + DHCP DNS模式，IP: {current_ip}，掩码: {current_mask}{gateway_msg}",
+            'converge_time': converge_time
         }
         
     except Exception as e:
@@ -625,56 +710,67 @@ def validate_ip_config(ip, mask, gateway, dns=""):
         }
 
 
-def check_network_conflict(ip, mask, gateway):
-    """检查网络配置冲突"""
+def _parse_config_text(config):
+    """从网卡配置文本中解析IP、子网掩码和默认网关（未找到时为None）"""
+    current_ip = None
+    current_mask = None
+    current_gateway = None
+    
+    for line in config.split('\n'):
+        address_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
+        if not address_match:
+            continue
+        if 'IP Address' in line or 'IP 地址' in line:
+            current_ip = address_match.group(1)
+        elif 'Subnet Mask' in line or '子网掩码' in line:
+            current_mask = address_match.group(1)
+        elif 'Default Gateway' in line or '默认网关' in line:
+            current_gateway = address_match.group(1)
+    
+    return current_ip, current_mask, current_gateway
+
+
+def check_network_conflict(ip, mask, gateway, exclude_interface=None):
+    """
+    检查网络配置冲突（IP相同、网关相同、网段重叠）
+    
+    网卡缓存预加载完成后直接查询冲突索引，否则逐个解析网卡配置文本
+    并建立临时索引，两条路径使用同一套判定规则
+    
+    Args:
+        exclude_interface: 排除的网卡（通常是正在配置的网卡）
+    
+    Returns:
+        dict: {'conflicts': [str], 'has_conflict': bool, 'details': [dict]}
+    """
+    manager = peek_async_manager()
     try:
-        # 获取当前网络接口配置（包括虚拟网卡，用于冲突检查）
-        interfaces = get_network_interfaces(show_all=True)
-        conflicts = []
-        
-        for interface in interfaces:
-            config = get_interface_config(interface)
-            if config:
-                # 解析当前配置（简单实现）
-                lines = config.split('\n')
-                current_ip = None
-                current_mask = None
-                current_gateway = None
-                
-                for line in lines:
-                    if 'IP Address' in line or 'IP 地址' in line:
-                        # 提取IP地址
-                        ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                        if ip_match:
-                            current_ip = ip_match.group(1)
-                    elif 'Subnet Mask' in line or '子网掩码' in line:
-                        # 提取子网掩码
-                        mask_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                        if mask_match:
-                            current_mask = mask_match.group(1)
-                    elif 'Default Gateway' in line or '默认网关' in line:
-                        # 提取默认网关
-                        gateway_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                        if gateway_match:
-                            current_gateway = gateway_match.group(1)
-                
-                # 检查IP冲突
-                if current_ip and current_ip == ip:
-                    conflicts.append(f"IP地址 {ip} 已在接口 {interface} 上使用")
-                
-                # 检查网关冲突
-                if current_gateway and current_gateway == gateway:
-                    conflicts.append(f"网关地址 {gateway} 已在接口 {interface} 上使用")
+        if manager is not None and manager.preload_completed:
+            index = manager.conflict_index
+        else:
+            # 获取当前网络接口配置（包括虚拟网卡，用于冲突检查）
+            index = ConflictIndex()
+            for interface in get_network_interfaces(show_all=True):
+                if interface == exclude_interface:
+                    continue
+                config = get_interface_config(interface)
+                if not config:
+                    continue
+                current_ip, current_mask, current_gateway = _parse_config_text(config)
+                index.update(
+                    interface,
+                    [current_ip] if current_ip else [],
+                    [current_mask] if current_mask else [],
+                    [current_gateway] if current_gateway else []
+                )
         
-        return {
-            'conflicts': conflicts,
-            'has_conflict': len(conflicts) > 0
-        }
+        return index.check(ip, mask, gateway, exclude_interface)
         
     except Exception as e:
         return {
             'conflicts': [f"检查网络冲突时出错: {str(e)}"],
-            'has_conflict': True
+            'has_conflict': True,
+            'details': []
         }
 
 
@@ -0,0 +1,187 @@
+"""
+配置差异规划模块
+将目标配置与缓存中的网卡信息(NetworkAdapterInfo)比较，生成最少的修改操作，
+配置已一致时跳过所有WMI调用，并支持仅预览计划(dry-run)
+"""
+
+import time
+import ipaddress
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict, Any
+
+# 缓存信息超过该时长(秒)不再用于规划
+PLAN_CACHE_MAX_AGE = 60
+
+# 操作类型
+ACTION_APPLY_MODE = 'apply_mode'      # 按组合模式完整应用（涉及DHCP切换或清除网关）
+ACTION_SET_IP = 'set_ip'              # EnableStatic 设置IP和掩码
+ACTION_SET_GATEWAY = 'set_gateway'    # SetGateways 设置网关
+ACTION_SET_DNS = 'set_dns'            # SetDNSServerSearchOrder 设置静态DNS
+ACTION_RESET_DNS = 'reset_dns'        # SetDNSServerSearchOrder() 恢复自动/清空DNS
+
+
+@dataclass
+class PlannedOperation:
+    """单个配置操作"""
+    action: str
+    description: str
+    args: Tuple = ()
+
+
+@dataclass
+class ProfilePlan:
+    """配置应用计划"""
+    interface_name: str
+    ip_mode: str
+    dns_mode: str
+    operations: List[PlannedOperation] = field(default_factory=list)
+    based_on_cache: bool = False
+    reason: str = ""
+    
+    @property
+    def is_noop(self) -> bool:
+        """配置已一致，无需任何操作"""
+        return self.based_on_cache and not self.operations
+    
+    @property
+    def requires_full_apply(self) -> bool:
+        """是否需要按组合模式完整应用"""
+        return any(op.action == ACTION_APPLY_MODE for op in self.operations)
+    
+    def describe(self) -> str:
+        """生成可读的计划说明"""
+        if self.is_noop:
+            return f"网卡 {self.interface_name} 的配置与目标一致，无需修改"
+        
+        lines = [f"网卡 {self.interface_name} 的配置计划:"]
+        for i, op in enumerate(self.operations, 1):
+            lines.append(f"  {i}. {op.description}")
+        if self.reason:
+            lines.append(f"  (说明: {self.reason})")
+        return "\n".join(lines)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            'interface_name': self.interface_name,
+            'ip_mode': self.ip_mode,
+            'dns_mode': self.dns_mode,
+            'based_on_cache': self.based_on_cache,
+            'reason': self.reason,
+            'operations': [
+                {'action': op.action, 'description': op.description, 'args': list(op.args)}
+                for op in self.operations
+            ]
+        }
+
+
+def _is_ipv4(value: str) -> bool:
+    """判断是否为IPv4地址"""
+    try:
+        ipaddress.IPv4Address(value)
+        return True
+    except (ipaddress.AddressValueError, ValueError):
+        return False
+
+
+def _ipv4_pairs(adapter) -> List[Tuple[str, str]]:
+    """提取网卡的IPv4地址及对应掩码（IPAddress与IPSubnet按位置对应）"""
+    pairs = []
+    masks = list(adapter.subnet_masks or [])
+    for i, ip in enumerate(adapter.ip_addresses or []):
+        if _is_ipv4(ip):
+            pairs.append((ip, masks[i] if i < len(masks) else ''))
+    return pairs
+
+
+def _ipv4_list(values) -> List[str]:
+    """过滤出IPv4地址"""
+    return [v for v in (values or []) if _is_ipv4(v)]
+
+
+def _requested_dns(dns_config) -> List[str]:
+    """提取目标DNS服务器列表"""
+    dns_config = dns_config or {}
+    return [dns for dns in (dns_config.get('dns1'), dns_config.get('dns2')) if dns]
+
+
+def _is_cache_usable(adapter, max_age: float) -> bool:
+    """缓存信息是否可用于规划（被失效或过旧时不可用）"""
+    if adapter is None or not adapter.last_updated:
+        return False
+    return time.time() - adapter.last_updated <= max_age
+
+
+def plan_profile(interface_name: str, current, ip_mode: str, dns_mode: str,
+                 ip_config: dict, dns_config: dict,
+                 max_age: float = PLAN_CACHE_MAX_AGE) -> ProfilePlan:
+    """
+    生成配置应用计划
+    
+    Args:
+        interface_name: 网卡连接名
+        current: 缓存中的NetworkAdapterInfo，None表示无可用缓存
+        ip_mode: IP配置模式 ('auto' | 'manual')
+        dns_mode: DNS配置模式 ('auto' | 'manual')
+        ip_config: IP配置参数 {'ip': '', 'mask': '', 'gateway': ''}
+        dns_config: DNS配置参数 {'dns1': '', 'dns2': ''}
+        max_age: 缓存最大可用时长(秒)
+    
+    Returns:
+        ProfilePlan: 配置计划
+    """
+    plan = ProfilePlan(interface_name, ip_mode, dns_mode)
+    full_apply = PlannedOperation(ACTION_APPLY_MODE, f"完整应用配置模式 (IP: {ip_mode}, DNS: {dns_mode})")
+    
+    if not _is_cache_usable(current, max_age):
+        plan.operations.append(full_apply)
+        plan.reason = "没有可用的网卡缓存信息，无法比较差异"
+        return plan
+    
+    plan.based_on_cache = True
+    ip_config = ip_config or {}
+    
+    # IP部分
+    if ip_mode == 'auto':
+        if not current.dhcp_enabled:
+            plan.operations.append(full_apply)
+            plan.reason = "需要从静态IP切换为DHCP"
+            return plan
+    else:
+        target_ip = ip_config.get('ip', '')
+        target_mask = ip_config.get('mask', '')
+        target_gateway = ip_config.get('gateway', '')
+        current_gateways = _ipv4_list(current.gateways)
+        
+        if current.dhcp_enabled:
+            plan.operations.append(full_apply)
+            plan.reason = "需要从DHCP切换为静态IP"
+            return plan
+        if not target_gateway and current_gateways:
+            plan.operations.append(full_apply)
+            plan.reason = "需要清除现有网关"
+            return plan
+        
+        if _ipv4_pairs(current) != [(target_ip, target_mask)]:
+            plan.operations.append(PlannedOperation(
+                ACTION_SET_IP, f"设置IP地址 {target_ip}/{target_mask}", (target_ip, target_mask)))
+        if target_gateway and current_gateways != [target_gateway]:
+            plan.operations.append(PlannedOperation(
+                ACTION_SET_GATEWAY, f"设置网关 {target_gateway}", (target_gateway,)))
+    
+    # DNS部分
+    if dns_mode == 'auto':
+        # 已经是自动获取时跳过；DNS来源未知时恢复为自动获取，该操作不会中断IP连接
+        if current.dns_auto is not True:
+            plan.operations.append(PlannedOperation(ACTION_RESET_DNS, "设置DNS为自动获取"))
+    else:
+        target_dns = _requested_dns(dns_config)
+        current_dns = _ipv4_list(current.dns_servers)
+        # DHCP下发的DNS即使与目标相同也要改为静态配置
+        if target_dns and (current_dns != target_dns or current.dns_auto):
+            plan.operations.append(PlannedOperation(
+                ACTION_SET_DNS, f"设置DNS服务器 {', '.join(target_dns)}", tuple(target_dns)))
+        elif not target_dns and current_dns and ip_mode == 'manual':
+            plan.operations.append(PlannedOperation(ACTION_RESET_DNS, "清空DNS设置"))
+    
+    return plan
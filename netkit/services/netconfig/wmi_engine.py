@@ -6,16 +6,60 @@ WMI查询引擎 - 统一的WMI查询管理
 import wmi
 import threading
 import pythoncom
+import sys
 import time
 import re
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+from netkit.utils.oui_lookup import lookup_vendor
 
-@dataclass
+# 需要驻留的重复度高的字符串字段
+_INTERNED_FIELDS = ('status', 'connection_status', 'manufacturer', 'model', 'speed', 'adapter_type')
+_INTERNED_SEQUENCES = ('ip_addresses', 'subnet_masks', 'gateways', 'dns_servers')
+
+
+def _intern(value):
+    """驻留字符串，非字符串原样返回"""
+    return sys.intern(value) if type(value) is str else value
+
+
+_TCPIP_INTERFACES_KEY = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters\Interfaces"
+
+
+def _read_dns_auto(setting_id) -> Optional[bool]:
+    """
+    读取网卡DNS来源
+    
+    WMI不区分DHCP下发和手动配置的DNS，注册表接口项中NameServer为空表示自动获取
+    
+    Returns:
+        bool: 自动获取为True，静态配置为False，无法读取时为None
+    """
+    if not setting_id:
+        return None
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                            f"{_TCPIP_INTERFACES_KEY}\\{setting_id}") as key:
+            try:
+                name_server, _ = winreg.QueryValueEx(key, "NameServer")
+            except FileNotFoundError:
+                return True
+    except (ImportError, OSError):
+        return None
+    return not str(name_server).strip()
+
+
+@dataclass(frozen=True, slots=True)
 class NetworkAdapterInfo:
-    """网卡完整信息结构"""
+    """
+    网卡完整信息结构
+    
+    不可变且使用__slots__，地址列表保存为元组，制造商、状态等重复字符串统一驻留，
+    同一对象可在WMI引擎缓存、异步管理器缓存之间按引用共享
+    """
     # 基本信息
     name: str
     connection_id: str
@@ -35,15 +79,28 @@ class NetworkAdapterInfo:
     physical_adapter: bool
     
     # 网络配置
-    ip_addresses: List[str]
-    subnet_masks: List[str]
-    gateways: List[str]
-    dns_servers: List[str]
+    ip_addresses: Tuple[str, ...]
+    subnet_masks: Tuple[str, ...]
+    gateways: Tuple[str, ...]
+    dns_servers: Tuple[str, ...]
     dhcp_enabled: bool
     
     # 元数据
     last_updated: float
     adapter_index: int
+    
+    # DNS是否自动获取（DHCP下发），None表示无法确定
+    dns_auto: Optional[bool] = None
+    
+    def __post_init__(self):
+        for name in _INTERNED_FIELDS:
+            object.__setattr__(self, name, _intern(getattr(self, name)))
+        for name in _INTERNED_SEQUENCES:
+            object.__setattr__(self, name, tuple(_intern(v) for v in getattr(self, name) or ()))
+    
+    def with_changes(self, **changes) -> 'NetworkAdapterInfo':
+        """返回修改了部分字段的新对象"""
+        return replace(self, **changes)
 
 class WMIQueryEngine:
     """高性能WMI查询引擎"""
@@ -98,8 +155,12 @@ class WMIQueryEngine:
             future = self.executor.submit(self._query_all_adapters, show_all)
             result = future.result(timeout=10)  # 10秒超时
         
-        # 缓存结果
+        # 缓存结果（各缓存键共享同一批对象）
         self._set_cache(cache_key, result)
+        if show_all:
+            self._set_cache("all_adapters_False", [a for a in result if a.physical_adapter])
+        for adapter in result:
+            self._set_cache(f"adapter_{adapter.connection_id}", adapter)
         return result
     
     def get_adapter_info(self, connection_id: str, force_refresh=False) -> Optional[NetworkAdapterInfo]:
@@ -207,9 +268,12 @@ class WMIQueryEngine:
             gateways = []
             dns_servers = []
             dhcp_enabled = False
+            dns_auto = None
             
             if config:
                 dhcp_enabled = bool(config.DHCPEnabled)
+                # 静态IP下DNS只能是静态配置
+                dns_auto = _read_dns_auto(getattr(config, 'SettingID', None)) if dhcp_enabled else False
                 
                 # IP地址
                 if config.IPAddress:
@@ -254,7 +318,8 @@ class WMIQueryEngine:
                 dns_servers=dns_servers,
                 dhcp_enabled=dhcp_enabled,
                 last_updated=time.time(),
-                adapter_index=adapter.Index
+                adapter_index=adapter.Index,
+                dns_auto=dns_auto
             )
             
         except Exception as e:
@@ -347,11 +412,13 @@ class WMIQueryEngine:
         # 从描述中提取更详细的制造商和型号信息
         extracted_info = self._extract_manufacturer_info(description)
         
-        # 如果WMI直接提供了制造商信息，优先使用
+        # 如果WMI直接提供了制造商信息，优先使用；描述中也识别不出时按MAC的OUI查询
         if manufacturer != "未知" and manufacturer != "":
             final_manufacturer = manufacturer
-        else:
+        elif extracted_info["manufacturer"] != "未知":
             final_manufacturer = extracted_info["manufacturer"]
+        else:
+            final_manufacturer = lookup_vendor(adapter.MACAddress or "") or "未知"
         
         return final_manufacturer, extracted_info["model"]
     
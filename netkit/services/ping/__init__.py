@@ -5,18 +5,47 @@ NetKit Ping服务模块
 - 单次ping测试
 - 批量ping测试  
 - 连续ping测试
+- 多方式主机发现
+- TCP端口扫描
+- 邻居表(ARP缓存)读取
+- 批量反向DNS解析
 - IP范围解析
 - 结果统计分析
+- 批量结果输出记录
 """
 
-from .ip_parser import parse_ip_range
-from .ping_executor import PingExecutor
-from .result_parser import PingResultParser
-from .ping_service import PingService
+from netkit.utils.lazy_import import lazy_module
+
+_EXPORTS = {
+    'parse_ip_range': '.ip_parser',
+    'count_ip_range': '.ip_parser',
+    'PingExecutor': '.ping_executor',
+    'PingResultParser': '.result_parser',
+    'PingService': '.ping_service',
+    'HostDiscovery': '.host_discovery',
+    'PortScanService': '.port_scan_service',
+    'parse_ports': '.port_scan_service',
+    'read_neighbor_table': '.neighbor_table',
+    'split_by_neighbors': '.neighbor_table',
+    'ReverseDNSResolver': '.reverse_dns',
+    'get_reverse_dns_resolver': '.reverse_dns',
+    'ping_record': '.records',
+}
 
 __all__ = [
     'PingService',
     'PingExecutor', 
     'PingResultParser',
-    'parse_ip_range'
-] 
\ No newline at end of file
+    'HostDiscovery',
+    'PortScanService',
+    'parse_ports',
+    'read_neighbor_table',
+    'split_by_neighbors',
+    'ReverseDNSResolver',
+    'get_reverse_dns_resolver',
+    'parse_ip_range',
+    'count_ip_range',
+    'ping_record'
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
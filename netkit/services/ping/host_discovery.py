@@ -0,0 +1,219 @@
+"""
+主机发现模块
+
+对每个主机并行发起ICMP回显、邻居表(ARP)检查和常用端口的TCP连接，
+任一方式得到肯定应答即判定在线并提前返回，禁ping的主机也能被发现，
+全部方式都在超时内失败才判定离线
+"""
+
+import time
+import errno
+import socket
+import platform
+import selectors
+import threading
+import concurrent.futures
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .probes import ProbeFunc, icmp_probe, arp_probe
+
+# TCP探测的常用端口（Web、SSH、SMB/NetBIOS、远程桌面）
+DEFAULT_TCP_PORTS = (80, 443, 22, 445, 139, 3389)
+
+# 对方主机发送RST拒绝连接同样说明主机在线
+_REFUSED_ERRORS = {errno.ECONNREFUSED, getattr(errno, 'WSAECONNREFUSED', 10061)}
+
+
+def make_tcp_probe(ports: Iterable[int] = DEFAULT_TCP_PORTS) -> ProbeFunc:
+    """
+    创建TCP探测函数：同时向多个端口发起非阻塞连接，
+    任一端口连接成功或被拒绝（收到RST）即判定主机在线
+    """
+    ports = tuple(ports)
+
+    def tcp_probe(ip: str, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        selector = selectors.DefaultSelector()
+        sockets = []
+        try:
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                sockets.append(sock)
+                code = sock.connect_ex((ip, port))
+                if code == 0 or code in _REFUSED_ERRORS:
+                    return True
+                selector.register(sock, selectors.EVENT_WRITE)
+
+            while selector.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                for key, _ in selector.select(remaining):
+                    code = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code == 0 or code in _REFUSED_ERRORS:
+                        return True
+                    selector.unregister(key.fileobj)
+            return False
+        finally:
+            selector.close()
+            for sock in sockets:
+                sock.close()
+
+    return tcp_probe
+
+
+def get_default_probes(neighbor_probe: Optional[ProbeFunc] = None) -> List[Tuple[str, ProbeFunc]]:
+    """获取当前平台可用的探测方式"""
+    probes = [('icmp', icmp_probe), ('tcp', make_tcp_probe())]
+    if neighbor_probe is not None:
+        probes.insert(0, ('neighbor', neighbor_probe))
+    elif platform.system() == 'Windows':
+        probes.insert(0, ('arp', arp_probe))
+    return probes
+
+
+class HostDiscovery:
+    """多方式并行的主机发现"""
+
+    def __init__(self, probes: List[Tuple[str, ProbeFunc]] = None, timeout: float = 1.0):
+        """
+        Args:
+            probes: [(名称, 探测函数)]，默认使用当前平台可用的全部方式
+            timeout: 单个主机的探测超时(秒)
+        """
+        self.probes = probes if probes is not None else get_default_probes()
+        self.timeout = timeout
+        self.stop_event = threading.Event()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self, workers: int) -> concurrent.futures.ThreadPoolExecutor:
+        """探测共用的线程池（按需扩容）"""
+        with self._executor_lock:
+            if self._executor is None or self._executor._max_workers < workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="host-discovery"
+                )
+            return self._executor
+
+    def discover(self, host: str, executor: concurrent.futures.Executor = None) -> Dict:
+        """
+        探测单个主机
+
+        Returns:
+            dict: {
+                'host': str,
+                'alive': bool,
+                'method': 首个肯定应答的探测方式（离线时为None）,
+                'elapsed': float（秒）
+            }
+        """
+        start = time.monotonic()
+        result = {'host': host, 'alive': False, 'method': None, 'elapsed': 0.0}
+        if not self.probes:
+            return result
+
+        # 每个探测从真正开始执行时计时：共用线程池繁忙时排队的探测不会因等待而被判为无应答
+        started = {}
+
+        def run(name, probe):
+            started[name] = time.monotonic()
+            return self._run_probe(probe, host, self.timeout)
+
+        executor = executor or self._get_executor(len(self.probes))
+        futures = {executor.submit(run, name, probe): name for name, probe in self.probes}
+        pending = set(futures)
+        try:
+            while pending and not self.stop_event.is_set():
+                running = [started.get(futures[future]) for future in pending]
+                if None in running:
+                    # 仍有探测在排队，任一探测完成或经过一个超时后重新检查
+                    remaining = self.timeout
+                else:
+                    remaining = max(running) + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        break
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=remaining, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.result():
+                        result['alive'] = True
+                        result['method'] = futures[future]
+                        break
+                if result['alive']:
+                    break
+        finally:
+            # 已得出结论或被停止时尚未开始的探测不再执行，已在进行的探测受自身超时约束
+            for future in pending:
+                future.cancel()
+
+        result['elapsed'] = time.monotonic() - start
+        return result
+
+    def discover_many(self, hosts: List[str], max_workers: int = 25,
+                      progress_callback: Callable = None) -> Dict[str, Dict]:
+        """
+        批量探测主机
+
+        Args:
+            hosts: 主机地址列表
+            max_workers: 同时探测的主机数
+            progress_callback: 进度回调 callback(host, result, completed, total)
+
+        Returns:
+            dict: 主机地址到探测结果的映射
+        """
+        self.stop_event.clear()
+        probe_executor = self._get_executor(max(1, max_workers * len(self.probes)))
+        results = {}
+        completed = 0
+        total = len(hosts)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="host-discovery-host") as host_executor:
+                future_to_host = {
+                    host_executor.submit(self._discover_unless_stopped, host, probe_executor): host
+                    for host in hosts
+                }
+                for future in concurrent.futures.as_completed(future_to_host):
+                    host = future_to_host[future]
+                    result = future.result()
+                    if result is None:
+                        continue
+                    completed += 1
+                    results[host] = result
+                    if progress_callback:
+                        progress_callback(host, result, completed, total)
+        finally:
+            self.close()
+
+        return results
+
+    def _discover_unless_stopped(self, host: str, executor) -> Optional[Dict]:
+        if self.stop_event.is_set():
+            return None
+        return self.discover(host, executor)
+
+    def stop(self):
+        """停止批量探测"""
+        self.stop_event.set()
+
+    def close(self):
+        """释放探测线程池（仍在进行的探测受自身超时约束，结束后线程退出）"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    @staticmethod
+    def _run_probe(probe: ProbeFunc, host: str, timeout: float) -> bool:
+        """执行单个探测，出错视为无应答"""
+        try:
+            return bool(probe(host, timeout))
+        except Exception:
+            return False
@@ -78,6 +78,43 @@ def parse_ip_range(ip_range_str):
     return ips
 
 
+def count_ip_range(ip_range_str):
+    """
+    计算IP范围内的主机数，不展开地址列表
+    
+    Args:
+        ip_range_str (str): IP范围字符串
+        
+    Returns:
+        int: 主机数（与parse_ip_range返回的列表长度一致）
+        
+    Raises:
+        ValueError: 当IP范围格式无效时
+    """
+    ip_range_str = ip_range_str.strip()
+    
+    try:
+        if '/' in ip_range_str:
+            network = ipaddress.IPv4Network(ip_range_str, strict=False)
+            # /31、/32 没有网络地址和广播地址之分
+            if network.prefixlen >= 31:
+                return network.num_addresses
+            return network.num_addresses - 2
+        
+        if '-' in ip_range_str:
+            start_ip, end_ip = ip_range_str.split('-', 1)
+            start_addr = ipaddress.IPv4Address(start_ip.strip())
+            end_addr = ipaddress.IPv4Address(end_ip.strip())
+            if start_addr > end_addr:
+                raise ValueError("起始IP地址不能大于结束IP地址")
+            return int(end_addr) - int(start_addr) + 1
+        
+        return 1
+    
+    except Exception as e:
+        raise ValueError(f"无效的IP范围格式: {str(e)}")
+
+
 def validate_ip_address(ip_str):
     """
     验证IP地址格式是否正确
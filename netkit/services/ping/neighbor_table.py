@@ -0,0 +1,148 @@
+"""
+邻居表(ARP缓存)读取模块
+
+系统ARP/邻居缓存中已有本网段内近期通信过的主机，扫描前读取一次，
+这些主机可以立即显示为在线，探测时把未知地址排在前面
+- Linux: 解析 /proc/net/arp
+- Windows: 调用 iphlpapi.GetIpNetTable
+读取失败时返回空表，不影响扫描
+"""
+
+import socket
+import struct
+import logging
+import platform
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROC_NET_ARP = '/proc/net/arp'
+
+# /proc/net/arp 的标志位：ATF_COM 已解析，ATF_PERM 静态
+_ATF_COM = 0x2
+_ATF_PERM = 0x4
+
+# GetIpNetTable 的表项类型
+_MIB_IPNET_TYPE_INVALID = 2
+_MIB_IPNET_TYPE_STATIC = 4
+_ERROR_INSUFFICIENT_BUFFER = 122
+
+
+def _is_unicast_mac(mac: str) -> bool:
+    """排除全零、广播和组播MAC（广播/组播地址在Windows表中以静态项出现）"""
+    try:
+        octets = [int(part, 16) for part in mac.replace('-', ':').split(':')]
+    except ValueError:
+        return False
+    return len(octets) == 6 and any(octets) and not octets[0] & 0x01
+
+
+def parse_proc_net_arp(text: str) -> Dict[str, Dict[str, str]]:
+    """
+    解析 /proc/net/arp 内容
+
+    Returns:
+        dict: {IP: {'ip', 'mac', 'interface', 'state'}}，只包含已解析的表项，
+              state 为 'static' 或 'dynamic'
+    """
+    neighbors = {}
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 6:
+            continue
+        ip, _, flags, mac, _, device = fields[:6]
+        try:
+            flags = int(flags, 16)
+        except ValueError:
+            continue
+        if not flags & (_ATF_COM | _ATF_PERM) or not _is_unicast_mac(mac):
+            continue
+        neighbors[ip] = {
+            'ip': ip,
+            'mac': mac.lower(),
+            'interface': device,
+            'state': 'static' if flags & _ATF_PERM else 'dynamic',
+        }
+    return neighbors
+
+
+def read_proc_net_arp(path: str = None) -> Dict[str, Dict[str, str]]:
+    """读取Linux邻居表"""
+    with open(path or PROC_NET_ARP, 'r', encoding='ascii', errors='replace') as f:
+        return parse_proc_net_arp(f.read())
+
+
+def read_ip_net_table() -> Dict[str, Dict[str, str]]:
+    """读取Windows IPv4邻居表（GetIpNetTable）"""
+    import ctypes
+    from ctypes import wintypes
+
+    class MIB_IPNETROW(ctypes.Structure):
+        _fields_ = [
+            ('dwIndex', wintypes.DWORD),
+            ('dwPhysAddrLen', wintypes.DWORD),
+            ('bPhysAddr', ctypes.c_ubyte * 8),
+            ('dwAddr', wintypes.DWORD),
+            ('dwType', wintypes.DWORD),
+        ]
+
+    get_table = ctypes.windll.iphlpapi.GetIpNetTable
+    size = wintypes.ULONG(0)
+    ret = get_table(None, ctypes.byref(size), False)
+    if ret not in (0, _ERROR_INSUFFICIENT_BUFFER) or size.value == 0:
+        return {}
+
+    buffer = ctypes.create_string_buffer(size.value)
+    ret = get_table(buffer, ctypes.byref(size), False)
+    if ret != 0:
+        raise OSError(f"GetIpNetTable 调用失败: {ret}")
+
+    count = wintypes.DWORD.from_buffer(buffer).value
+    rows = (MIB_IPNETROW * count).from_buffer(buffer, ctypes.sizeof(wintypes.DWORD))
+
+    neighbors = {}
+    for row in rows:
+        if row.dwType == _MIB_IPNET_TYPE_INVALID or row.dwPhysAddrLen != 6:
+            continue
+        mac = ':'.join(f'{octet:02x}' for octet in row.bPhysAddr[:6])
+        if not _is_unicast_mac(mac):
+            continue
+        ip = socket.inet_ntoa(struct.pack('<I', row.dwAddr))
+        neighbors[ip] = {
+            'ip': ip,
+            'mac': mac,
+            'interface': str(row.dwIndex),
+            'state': 'static' if row.dwType == _MIB_IPNET_TYPE_STATIC else 'dynamic',
+        }
+    return neighbors
+
+
+def read_neighbor_table() -> Dict[str, Dict[str, str]]:
+    """
+    读取当前系统的邻居表
+
+    Returns:
+        dict: {IP: 表项}，不支持的平台或读取失败时为空
+    """
+    system = platform.system()
+    try:
+        if system == 'Windows':
+            return read_ip_net_table()
+        if system == 'Linux':
+            return read_proc_net_arp()
+    except (OSError, AttributeError, ValueError) as e:
+        logger.warning(f"读取邻居表失败: {e}")
+    return {}
+
+
+def split_by_neighbors(hosts: Iterable[str], neighbors: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+    """
+    按是否在邻居表中拆分主机（保持原顺序）
+
+    Returns:
+        tuple: (未知主机, 邻居表中已有的主机)
+    """
+    unknown, known = [], []
+    for host in hosts:
+        (known if host in neighbors else unknown).append(host)
+    return unknown, known
@@ -12,6 +12,8 @@ import time
 import platform
 import os
 
+from netkit.utils.console_encoding import decode_output
+
 
 class PingExecutor:
     """Ping命令执行器"""
@@ -77,6 +79,22 @@ class PingExecutor:
                 'return_code': -1
             }
     
+    def probe(self, host, timeout=300):
+        """
+        发送单个ICMP回显请求，判断主机是否应答
+        
+        Windows下"目标主机无法访问"的应答也会返回0，因此以输出中的TTL判断
+        
+        Args:
+            host (str): 目标主机地址
+            timeout (int): 超时时间(毫秒)
+            
+        Returns:
+            bool: 主机是否应答
+        """
+        result = self.ping_single(host, count=1, timeout=timeout)
+        return result['success'] and 'TTL=' in result['output'].upper()
+    
     def _run_ping_command(self, cmd):
         """
         运行ping命令，处理编码问题
@@ -135,24 +153,8 @@ class PingExecutor:
         Returns:
             str: 解码后的文本
         """
-        if not byte_output:
-            return ''
-        
-        # Windows系统中ping命令存在编码问题，特别是中文网卡名称会出现乱码
-        # 解决方案是使用多种编码尝试机制：先尝试UTF-8，失败后尝试GBK，最后使用系统默认编码
-        encodings = ['utf-8', 'gbk', 'cp936', 'latin1']
-        
-        for encoding in encodings:
-            try:
-                return byte_output.decode(encoding)
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-        
-        # 如果所有编码都失败，使用errors='replace'强制解码
-        try:
-            return byte_output.decode('utf-8', errors='replace')
-        except Exception:
-            return str(byte_output)
+        # 使用进程级检测到的控制台代码页解码，失败时才尝试备选编码
+        return decode_output(byte_output)
     
     def batch_ping(self, hosts, count=5, timeout=3000, max_workers=25, progress_callback=None):
         """
@@ -10,12 +10,14 @@ import concurrent.futures
 from .ip_parser import parse_ip_range
 from .ping_executor import PingExecutor
 from .result_parser import PingResultParser
+from .host_discovery import HostDiscovery
 class PingService:
     """Ping测试服务类"""
     
     def __init__(self):
         self.executor = PingExecutor()
         self.parser = PingResultParser()
+        self.discovery = None
         
     def ping_single(self, host, count=4, timeout=3000):
         """
@@ -98,9 +100,48 @@ class PingService:
         
         return results
     
+    def batch_discover(self, hosts, timeout=1000, max_workers=25, probes=None, progress_callback=None):
+        """
+        批量主机发现（ICMP、邻居表、TCP连接并行探测，任一应答即判定在线）
+        
+        Args:
+            hosts (list): 主机地址列表
+            timeout (int): 每个主机的探测超时(毫秒)
+            max_workers (int): 最大并发主机数
+            probes (list): [(名称, 探测函数)]，默认使用当前平台可用的全部方式
+            progress_callback (callable): 进度回调函数，参数与batch_ping相同
+            
+        Returns:
+            dict: 主机地址到结果的映射
+        """
+        self.discovery = HostDiscovery(probes, timeout=timeout / 1000)
+        results = {}
+        
+        def on_progress(host, result, completed, total):
+            # 与ping统计保持同样的success字段，附带判定在线的探测方式
+            elapsed_ms = round(result['elapsed'] * 1000)
+            stats = {
+                'host': host,
+                'success': result['alive'],
+                'method': result['method'],
+                'times': [elapsed_ms] if result['alive'] else [],
+            }
+            results[host] = {
+                'result': result,
+                'stats': stats
+            }
+            
+            if progress_callback:
+                progress_callback(host, result, stats, completed, total)
+        
+        self.discovery.discover_many(hosts, max_workers, on_progress)
+        return results
+    
     def stop_ping(self):
         """停止ping测试"""
         self.executor.stop_ping()
+        if self.discovery is not None:
+            self.discovery.stop()
     
     def is_running(self):
         """检查是否有ping测试正在运行"""
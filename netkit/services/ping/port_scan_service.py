@@ -0,0 +1,302 @@
+"""
+端口扫描服务
+
+在asyncio事件循环中用非阻塞connect扫描 主机×端口 矩阵：
+- 固定数量的协程从 (主机, 端口) 序列中取任务，协程数即全局同时连接数上限
+- 每个主机另有信号量，避免对单个主机并发过多连接
+- 连接超时统一挂在时间轮上，由一个定时协程推进，不为每个连接单独创建计时器
+结果分为 open（连接成功）、closed（被拒绝）、filtered（超时或不可达），
+进度回调与 batch_ping 的参数形式一致
+"""
+
+import math
+import socket
+import asyncio
+import threading
+import ipaddress
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+STATE_OPEN = 'open'
+STATE_CLOSED = 'closed'
+STATE_FILTERED = 'filtered'
+STATE_ERROR = 'error'
+
+
+def parse_ports(ports_str: str) -> List[int]:
+    """
+    解析端口字符串，返回端口列表（保持输入顺序并去重）
+
+    Examples:
+        >>> parse_ports("22,80,8000-8002")
+        [22, 80, 8000, 8001, 8002]
+
+    Raises:
+        ValueError: 格式无效或端口超出1-65535
+    """
+    ports = []
+    seen = set()
+    for part in ports_str.replace('，', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = (int(value) for value in part.split('-', 1))
+            else:
+                start = end = int(part)
+        except ValueError:
+            raise ValueError(f"无效的端口格式: {part}")
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"端口范围无效: {part}（端口应在1-65535之间，且起始不大于结束）")
+        for port in range(start, end + 1):
+            if port not in seen:
+                seen.add(port)
+                ports.append(port)
+    if not ports:
+        raise ValueError("请输入要扫描的端口")
+    return ports
+
+
+class WheelTimer:
+    """时间轮上的一个计时器"""
+
+    __slots__ = ('tick', 'callback', 'cancelled', 'fired')
+
+    def __init__(self, tick: int, callback: Callable):
+        self.tick = tick
+        self.callback = callback
+        self.cancelled = False
+        self.fired = False
+
+
+class TimerWheel:
+    """
+    单层哈希时间轮
+
+    计时器按到期刻度放入 刻度 % 槽数 的槽中，添加和取消都是O(1)；
+    取消只做标记，推进到该槽时再清理。超过一圈的计时器留在槽中等待后续轮次
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 256, now: float = 0.0):
+        """
+        Args:
+            tick: 每个刻度的秒数（超时精度）
+            slots: 槽数
+            now: 当前时间，与之后advance传入的时间同一时钟
+        """
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.current = int(now / tick)
+        self.pending = 0
+
+    def schedule(self, deadline: float, callback: Callable) -> WheelTimer:
+        """在deadline（或其后的第一个刻度）调用callback"""
+        tick = max(math.ceil(deadline / self.tick), self.current + 1)
+        timer = WheelTimer(tick, callback)
+        self.slots[tick % len(self.slots)].append(timer)
+        self.pending += 1
+        return timer
+
+    def cancel(self, timer: WheelTimer):
+        """取消计时器（已触发或已取消时忽略）"""
+        if not timer.cancelled and not timer.fired:
+            timer.cancelled = True
+            self.pending -= 1
+
+    def advance(self, now: float) -> int:
+        """
+        推进到now，触发所有已到期的计时器
+
+        Returns:
+            int: 本次触发的计时器数
+        """
+        target = int(now / self.tick)
+        if target <= self.current:
+            return 0
+
+        slot_count = len(self.slots)
+        fired = 0
+        # 落后超过一圈时每个槽只需检查一次
+        for step in range(1, min(target - self.current, slot_count) + 1):
+            slot = self.slots[(self.current + step) % slot_count]
+            if not slot:
+                continue
+            due = []
+            remaining = []
+            for timer in slot:
+                if timer.cancelled:
+                    continue
+                (due if timer.tick <= target else remaining).append(timer)
+            slot[:] = remaining
+            for timer in due:
+                timer.fired = True
+                self.pending -= 1
+                timer.callback()
+                fired += 1
+
+        self.current = target
+        return fired
+
+
+class PortScanService:
+    """TCP端口扫描服务"""
+
+    TICK = 0.01  # 时间轮刻度(秒)
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.is_running = False
+
+    def scan(self, hosts: Iterable[str], ports: Iterable[int], timeout: int = 1000,
+             max_in_flight: int = 256, per_host: int = 64,
+             progress_callback: Callable = None) -> Dict[str, Dict[int, Dict]]:
+        """
+        扫描 主机×端口 矩阵（阻塞到扫描结束，应在后台线程中调用）
+
+        Args:
+            hosts: 主机地址列表
+            ports: 端口列表
+            timeout: 连接超时(毫秒)
+            max_in_flight: 全局同时进行的连接数上限
+            per_host: 单个主机同时进行的连接数上限
+            progress_callback: 进度回调 callback(host, result, stats, completed, total)
+
+        Returns:
+            dict: {主机: {端口: 结果}}，结果为 {
+                'host', 'port',
+                'state': 'open' | 'closed' | 'filtered' | 'error',
+                'latency': 连接耗时(毫秒，仅open/closed),
+                'error': 错误信息或None
+            }
+        """
+        hosts = list(hosts)
+        ports = list(ports)
+        self.stop_event.clear()
+        self.is_running = True
+        try:
+            return asyncio.run(self._scan(
+                hosts, ports, timeout / 1000, max(1, max_in_flight), max(1, per_host), progress_callback
+            ))
+        finally:
+            self.is_running = False
+
+    def stop(self):
+        """停止扫描（已发起的连接在超时内结束）"""
+        self.stop_event.set()
+
+    async def _scan(self, hosts, ports, timeout, max_in_flight, per_host, progress_callback):
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(self.TICK, now=loop.time())
+        addresses = await self._resolve_all(loop, hosts)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+        results = {host: {} for host in hosts}
+        total = len(hosts) * len(ports)
+        completed = 0
+        pairs = self._iter_pairs(hosts, ports)
+
+        async def worker():
+            nonlocal completed
+            # 所有协程共用同一个迭代器，取任务本身是同步的
+            for host, port in pairs:
+                if self.stop_event.is_set():
+                    return
+                async with host_limits[host]:
+                    result = await self._probe(loop, wheel, host, port, addresses[host], timeout)
+                results[host][port] = result
+                completed += 1
+                if progress_callback:
+                    progress_callback(host, result, self._make_stats(result), completed, total)
+
+        ticker = asyncio.ensure_future(self._drive_wheel(loop, wheel))
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(max_in_flight, total))))
+        finally:
+            ticker.cancel()
+        return results
+
+    @staticmethod
+    def _iter_pairs(hosts: List[str], ports: List[int]) -> Iterator[Tuple[str, int]]:
+        """按端口优先的顺序交错各主机，使并发连接分散到不同主机"""
+        for port in ports:
+            for host in hosts:
+                yield host, port
+
+    async def _drive_wheel(self, loop, wheel: TimerWheel):
+        """定时推进时间轮"""
+        while True:
+            await asyncio.sleep(self.TICK)
+            wheel.advance(loop.time())
+
+    async def _resolve_all(self, loop, hosts: List[str]) -> Dict[str, Optional[Tuple[int, str]]]:
+        """解析主机地址，IP地址直接使用，主机名只解析一次"""
+        addresses = {}
+        names = []
+        for host in hosts:
+            try:
+                address = ipaddress.ip_address(host)
+                family = socket.AF_INET6 if address.version == 6 else socket.AF_INET
+                addresses[host] = (family, host)
+            except ValueError:
+                names.append(host)
+
+        async def resolve(name):
+            try:
+                infos = await loop.getaddrinfo(name, None, type=socket.SOCK_STREAM)
+                family, _, _, _, sockaddr = infos[0]
+                return family, sockaddr[0]
+            except (OSError, IndexError):
+                return None
+
+        for name, address in zip(names, await asyncio.gather(*(resolve(name) for name in names))):
+            addresses[name] = address
+        return addresses
+
+    async def _probe(self, loop, wheel: TimerWheel, host: str, port: int,
+                     address: Optional[Tuple[int, str]], timeout: float) -> Dict:
+        """探测单个端口"""
+        result = {'host': host, 'port': port, 'state': STATE_FILTERED, 'latency': None, 'error': None}
+        if address is None:
+            result['state'] = STATE_ERROR
+            result['error'] = f"无法解析主机: {host}"
+            return result
+
+        family, ip = address
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = loop.time()
+        connect = asyncio.ensure_future(self._connect(loop, sock, (ip, port)))
+        timer = wheel.schedule(start + timeout, connect.cancel)
+        try:
+            await connect
+            result['state'] = STATE_OPEN
+        except asyncio.CancelledError:
+            # 只有时间轮触发的取消视为超时，外部取消继续向上传递
+            if not timer.fired:
+                raise
+        except ConnectionRefusedError:
+            result['state'] = STATE_CLOSED
+        except OSError as e:
+            result['error'] = str(e)
+        finally:
+            wheel.cancel(timer)
+            sock.close()
+
+        if result['state'] in (STATE_OPEN, STATE_CLOSED):
+            result['latency'] = round((loop.time() - start) * 1000, 2)
+        return result
+
+    async def _connect(self, loop, sock: socket.socket, address: Tuple[str, int]):
+        """发起非阻塞连接"""
+        await loop.sock_connect(sock, address)
+
+    @staticmethod
+    def _make_stats(result: Dict) -> Dict:
+        """生成与ping统计相同形式的结果，端口开放即视为成功"""
+        return {
+            'host': result['host'],
+            'port': result['port'],
+            'state': result['state'],
+            'success': result['state'] == STATE_OPEN,
+            'times': [result['latency']] if result['latency'] is not None else [],
+        }
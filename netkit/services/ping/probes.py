@@ -0,0 +1,53 @@
+"""
+在线探测函数
+主机发现和地址占用检测共用的ICMP、ARP探测，
+每个探测在给定超时内给出结论: probe(ip, timeout_seconds) -> bool
+"""
+
+import socket
+import struct
+import threading
+from typing import Callable
+
+from .ping_executor import PingExecutor
+
+# 探测函数: probe(ip, timeout_seconds) -> bool（是否得到肯定应答）
+ProbeFunc = Callable[[str, float], bool]
+
+_icmp_executor = PingExecutor()
+
+
+def icmp_probe(ip: str, timeout: float) -> bool:
+    """ICMP回显探测（复用Ping服务的执行器）"""
+    return _icmp_executor.probe(ip, timeout=max(1, int(timeout * 1000)))
+
+
+def _send_arp(ip: str) -> bool:
+    """调用Windows SendARP，先查邻居缓存，未命中时发送ARP请求（无应答时约3秒才返回）"""
+    import ctypes
+
+    dest = struct.unpack('<I', socket.inet_aton(ip))[0]
+    mac = (ctypes.c_ulong * 2)()
+    size = ctypes.c_ulong(6)
+    ret = ctypes.windll.iphlpapi.SendARP(dest, 0, ctypes.byref(mac), ctypes.byref(size))
+    return ret == 0 and size.value > 0
+
+
+def arp_probe(ip: str, timeout: float) -> bool:
+    """
+    ARP探测（能发现禁ping的主机；只对同一链路上的地址有效）
+
+    SendARP本身不能指定超时，在后台线程中调用，超时未返回即判定无应答
+    """
+    answered = []
+
+    def worker():
+        try:
+            answered.append(_send_arp(ip))
+        except (OSError, AttributeError):
+            answered.append(False)
+
+    thread = threading.Thread(target=worker, daemon=True, name='NetKitSendARP')
+    thread.start()
+    thread.join(timeout)
+    return bool(answered and answered[0])
@@ -0,0 +1,23 @@
+"""
+Ping结果记录
+将批量ping的单个结果整理为扁平的输出记录，命令行和守护进程共用同一格式
+"""
+
+from typing import Dict
+
+
+def ping_record(host: str, result: Dict, stats: Dict, completed: int, total: int) -> Dict:
+    """将批量ping的单个结果转换为输出记录"""
+    return {
+        'host': host,
+        'success': bool(stats.get('success') or result.get('success')),
+        'packets_sent': stats.get('packets_sent', 0),
+        'packets_received': stats.get('packets_received', 0),
+        'packet_loss': stats.get('packet_loss', 0),
+        'min_time': stats.get('min_time', 0),
+        'avg_time': stats.get('avg_time', 0),
+        'max_time': stats.get('max_time', 0),
+        'error': result.get('error') or None,
+        'completed': completed,
+        'total': total,
+    }
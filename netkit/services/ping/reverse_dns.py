@@ -0,0 +1,446 @@
+"""
+反向DNS(PTR)解析模块
+
+直接通过UDP向系统配置的DNS服务器发送PTR查询，按查询ID匹配应答，
+同时进行的查询数受并发上限约束，不为每个地址单独阻塞一个线程。
+解析结果放入LRU+TTL缓存，"无此记录"的否定应答按SOA中的否定缓存时间缓存，
+超时和服务器错误不缓存。找不到DNS服务器配置时退回系统的getnameinfo。
+使用系统DNS配置时每批查询前重新读取，切换网络后DNS服务器变化即清空缓存
+"""
+
+import time
+import random
+import socket
+import struct
+import asyncio
+import logging
+import platform
+import threading
+import ipaddress
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+RESOLV_CONF = '/etc/resolv.conf'
+
+# 缓存时间(秒)：应答TTL限制在[MIN_TTL, MAX_TTL]，没有SOA的否定应答使用NEGATIVE_TTL
+MIN_TTL = 30
+MAX_TTL = 86400
+NEGATIVE_TTL = 300
+
+_TYPE_SOA = 6
+_TYPE_PTR = 12
+_CLASS_IN = 1
+_RCODE_NOERROR = 0
+_RCODE_NXDOMAIN = 3
+
+
+class DNSCache:
+    """线程安全的LRU+TTL缓存，值为None表示否定应答"""
+
+    def __init__(self, maxsize: int = 4096, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Tuple[bool, Optional[str]]:
+        """
+        Returns:
+            tuple: (是否命中, 值)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            value, expires = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key, value: Optional[str], ttl: float):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ------------------------------------------------------------ 报文编解码
+
+def build_ptr_query(query_id: int, ip: str) -> bytes:
+    """构造PTR查询报文（期望递归）"""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    qname = b''.join(
+        bytes([len(label)]) + label.encode('ascii')
+        for label in ipaddress.ip_address(ip).reverse_pointer.split('.')
+    ) + b'\x00'
+    return header + qname + struct.pack('!HH', _TYPE_PTR, _CLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """读取域名（支持压缩指针），返回(域名, 名字之后的偏移)"""
+    labels = []
+    end = None
+    for _ in range(128):  # 防止指针成环
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return '.'.join(labels), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode('ascii', errors='replace'))
+        offset += length
+    raise ValueError("域名压缩指针过多")
+
+
+def parse_ptr_response(data: bytes) -> Dict:
+    """
+    解析PTR应答报文
+
+    Returns:
+        dict: {
+            'id': 查询ID,
+            'rcode': 响应码,
+            'question': 问题中的域名,
+            'names': PTR记录中的主机名列表,
+            'ttl': PTR记录的最小TTL（没有PTR记录时为None）,
+            'negative_ttl': 授权段SOA给出的否定缓存时间（没有时为None）
+        }
+
+    Raises:
+        ValueError: 报文格式错误
+    """
+    try:
+        query_id, flags, qdcount, ancount, nscount, _ = struct.unpack_from('!HHHHHH', data)
+        offset = 12
+        question = ''
+        for _ in range(qdcount):
+            question, offset = _read_name(data, offset)
+            offset += 4
+
+        names = []
+        ttl = None
+        negative_ttl = None
+        for section, count in (('answer', ancount), ('authority', nscount)):
+            for _ in range(count):
+                _, offset = _read_name(data, offset)
+                rtype, _, rttl, rdlength = struct.unpack_from('!HHIH', data, offset)
+                offset += 10
+                if section == 'answer' and rtype == _TYPE_PTR:
+                    name, _ = _read_name(data, offset)
+                    names.append(name)
+                    ttl = rttl if ttl is None else min(ttl, rttl)
+                elif section == 'authority' and rtype == _TYPE_SOA:
+                    # SOA: mname, rname, serial, refresh, retry, expire, minimum
+                    _, pos = _read_name(data, offset)
+                    _, pos = _read_name(data, pos)
+                    minimum = struct.unpack_from('!I', data, pos + 16)[0]
+                    negative_ttl = min(rttl, minimum)
+                offset += rdlength
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"DNS应答格式错误: {e}")
+
+    return {
+        'id': query_id,
+        'rcode': flags & 0x000F,
+        'question': question,
+        'names': names,
+        'ttl': ttl,
+        'negative_ttl': negative_ttl,
+    }
+
+
+# ------------------------------------------------------------ DNS服务器配置
+
+def parse_resolv_conf(text: str) -> List[str]:
+    """解析resolv.conf中的nameserver"""
+    servers = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0] == 'nameserver':
+            server = fields[1].split('%', 1)[0]  # 去掉IPv6链路本地地址的接口后缀
+            try:
+                ipaddress.ip_address(server)
+            except ValueError:
+                continue
+            servers.append(server)
+    return servers
+
+
+def _read_windows_nameservers() -> List[str]:
+    """读取Windows的DNS服务器（GetNetworkParams）"""
+    import ctypes
+    from ctypes import wintypes
+
+    class IP_ADDR_STRING(ctypes.Structure):
+        pass
+
+    IP_ADDR_STRING._fields_ = [
+        ('Next', ctypes.POINTER(IP_ADDR_STRING)),
+        ('IpAddress', ctypes.c_char * 16),
+        ('IpMask', ctypes.c_char * 16),
+        ('Context', wintypes.DWORD),
+    ]
+
+    class FIXED_INFO(ctypes.Structure):
+        _fields_ = [
+            ('HostName', ctypes.c_char * 132),
+            ('DomainName', ctypes.c_char * 132),
+            ('CurrentDnsServer', ctypes.POINTER(IP_ADDR_STRING)),
+            ('DnsServerList', IP_ADDR_STRING),
+            ('NodeType', wintypes.UINT),
+            ('ScopeId', ctypes.c_char * 260),
+            ('EnableRouting', wintypes.UINT),
+            ('EnableProxy', wintypes.UINT),
+            ('EnableDns', wintypes.UINT),
+        ]
+
+    get_params = ctypes.windll.iphlpapi.GetNetworkParams
+    size = wintypes.ULONG(0)
+    get_params(None, ctypes.byref(size))
+    buffer = ctypes.create_string_buffer(size.value)
+    if get_params(buffer, ctypes.byref(size)) != 0:
+        return []
+
+    info = FIXED_INFO.from_buffer(buffer)
+    servers = []
+    entry = info.DnsServerList
+    while True:
+        server = entry.IpAddress.decode('ascii', errors='ignore')
+        if server and server != '0.0.0.0':
+            servers.append(server)
+        if not entry.Next:
+            break
+        entry = entry.Next.contents
+    return servers
+
+
+def get_system_nameservers() -> List[str]:
+    """获取系统配置的DNS服务器，读取失败时为空"""
+    try:
+        if platform.system() == 'Windows':
+            return _read_windows_nameservers()
+        with open(RESOLV_CONF, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_resolv_conf(f.read())
+    except (OSError, AttributeError, ValueError) as e:
+        logger.warning(f"读取DNS服务器配置失败: {e}")
+        return []
+
+
+# ------------------------------------------------------------ 解析器
+
+class _DNSProtocol(asyncio.DatagramProtocol):
+    """按查询ID把应答分发给等待中的查询"""
+
+    def __init__(self):
+        self.waiting: Dict[int, Tuple[asyncio.Future, tuple]] = {}
+
+    def datagram_received(self, data, addr):
+        if len(data) < 2:
+            return
+        query_id = struct.unpack_from('!H', data)[0]
+        entry = self.waiting.get(query_id)
+        if entry is None:
+            return
+        future, server = entry
+        # 只接受来自所查询服务器的应答
+        if addr[:2] != server or future.done():
+            return
+        future.set_result(data)
+
+    def error_received(self, exc):
+        logger.debug(f"DNS查询套接字错误: {exc}")
+
+
+class ReverseDNSResolver:
+    """批量反向DNS解析器"""
+
+    def __init__(self, nameservers: Iterable = None, timeout: float = 1.0, retries: int = 1,
+                 max_concurrency: int = 64, cache: DNSCache = None):
+        """
+        Args:
+            nameservers: DNS服务器列表，元素为地址或(地址, 端口)，默认跟随系统配置
+            timeout: 单次查询超时(秒)
+            retries: 超时后的重试次数（依次换用下一个服务器）
+            max_concurrency: 同时进行的查询数上限
+            cache: 解析结果缓存
+        """
+        self.follow_system = nameservers is None
+        self.nameservers = self._normalize(get_system_nameservers() if nameservers is None else nameservers)
+        self.timeout = timeout
+        self.retries = retries
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache if cache is not None else DNSCache()
+
+    @staticmethod
+    def _normalize(nameservers: Iterable) -> List[tuple]:
+        return [
+            (server, DNS_PORT) if isinstance(server, str) else tuple(server)
+            for server in nameservers
+        ]
+
+    def refresh_nameservers(self):
+        """重新读取系统DNS服务器，变化时（如切换网络）清空缓存，旧网络的解析结果不再使用"""
+        if not self.follow_system:
+            return
+        nameservers = self._normalize(get_system_nameservers())
+        if nameservers != self.nameservers:
+            logger.info(f"DNS服务器已变化: {[server[0] for server in nameservers]}")
+            self.nameservers = nameservers
+            self.cache.clear()
+
+    def lookup_cached(self, ip: str) -> Optional[str]:
+        """只查缓存，不发起查询"""
+        return self.cache.get(ip)[1]
+
+    def resolve(self, ip: str) -> Optional[str]:
+        """解析单个地址（阻塞）"""
+        return self.resolve_many([ip]).get(ip)
+
+    def resolve_many(self, ips: Iterable[str], progress_callback: Callable = None) -> Dict[str, Optional[str]]:
+        """
+        批量解析地址（阻塞到全部完成，应在后台线程中调用）
+
+        Args:
+            ips: IP地址列表
+            progress_callback: 每个地址解析完成时调用 callback(ip, name)
+
+        Returns:
+            dict: {IP: 主机名或None}
+        """
+        return asyncio.run(self.resolve_many_async(ips, progress_callback))
+
+    async def resolve_many_async(self, ips: Iterable[str], progress_callback: Callable = None) -> Dict[str, Optional[str]]:
+        """批量解析地址（协程版本）"""
+        self.refresh_nameservers()
+        results = {}
+        pending = []
+        for ip in dict.fromkeys(ips):
+            hit, name = self.cache.get(ip)
+            if hit:
+                results[ip] = name
+                if progress_callback:
+                    progress_callback(ip, name)
+            else:
+                pending.append(ip)
+        if not pending:
+            return results
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(lookup, ip):
+            async with semaphore:
+                name = await lookup(ip)
+            results[ip] = name
+            if progress_callback:
+                progress_callback(ip, name)
+
+        if self.nameservers:
+            try:
+                async with _UDPClient(self.nameservers) as client:
+                    await asyncio.gather(*(run(lambda ip: self._query(client, ip), ip) for ip in pending))
+            except OSError as e:
+                logger.warning(f"反向DNS查询失败: {e}")
+        else:
+            await asyncio.gather(*(run(self._getnameinfo, ip) for ip in pending))
+        return results
+
+    async def _query(self, client: '_UDPClient', ip: str) -> Optional[str]:
+        """向DNS服务器查询PTR，超时依次换下一个服务器重试"""
+        for attempt in range(self.retries + 1):
+            server = self.nameservers[attempt % len(self.nameservers)]
+            try:
+                response = await client.query(ip, server, self.timeout)
+            except (asyncio.TimeoutError, OSError, ValueError):
+                continue
+
+            if response['rcode'] == _RCODE_NOERROR and response['names']:
+                name = response['names'][0]
+                self.cache.set(ip, name, min(max(response['ttl'], MIN_TTL), MAX_TTL))
+                return name
+            if response['rcode'] in (_RCODE_NOERROR, _RCODE_NXDOMAIN):
+                # 否定应答（NXDOMAIN或没有PTR记录）同样缓存
+                ttl = response['negative_ttl'] if response['negative_ttl'] is not None else NEGATIVE_TTL
+                self.cache.set(ip, None, min(max(ttl, MIN_TTL), MAX_TTL))
+                return None
+            # 服务器错误，换下一个服务器
+        return None
+
+    async def _getnameinfo(self, ip: str) -> Optional[str]:
+        """没有DNS服务器配置时使用系统解析"""
+        loop = asyncio.get_running_loop()
+        try:
+            name, _ = await asyncio.wait_for(
+                loop.getnameinfo((ip, 0), socket.NI_NAMEREQD), self.timeout * (self.retries + 1)
+            )
+        except (asyncio.TimeoutError, OSError):
+            return None
+        self.cache.set(ip, name, NEGATIVE_TTL)
+        return name
+
+
+class _UDPClient:
+    """共用一个UDP套接字的DNS查询客户端"""
+
+    def __init__(self, nameservers: List[tuple]):
+        self.nameservers = nameservers
+        self.transports = {}
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        # 每个地址族一个套接字
+        for family in {socket.AF_INET6 if ':' in server[0] else socket.AF_INET for server in self.nameservers}:
+            transport, protocol = await loop.create_datagram_endpoint(_DNSProtocol, family=family)
+            self.transports[family] = (transport, protocol)
+        return self
+
+    async def __aexit__(self, *exc):
+        for transport, _ in self.transports.values():
+            transport.close()
+
+    async def query(self, ip: str, server: tuple, timeout: float) -> Dict:
+        family = socket.AF_INET6 if ':' in server[0] else socket.AF_INET
+        transport, protocol = self.transports[family]
+        query_id = random.getrandbits(16)
+        while query_id in protocol.waiting:
+            query_id = random.getrandbits(16)
+
+        future = asyncio.get_running_loop().create_future()
+        protocol.waiting[query_id] = (future, server)
+        try:
+            transport.sendto(build_ptr_query(query_id, ip), server)
+            response = parse_ptr_response(await asyncio.wait_for(future, timeout))
+        finally:
+            del protocol.waiting[query_id]
+
+        if response['question'].lower() != ipaddress.ip_address(ip).reverse_pointer:
+            raise ValueError("应答与查询不匹配")
+        return response
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_reverse_dns_resolver() -> ReverseDNSResolver:
+    """获取共享的反向DNS解析器（缓存在各界面间共用）"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = ReverseDNSResolver()
+        return _resolver
@@ -5,17 +5,23 @@
 提供路由表获取、路由添加/删除、参数验证、异步处理等服务
 """
 
-# 主服务接口
-from .route import RouteService
+from netkit.utils.lazy_import import lazy_module
 
-# 服务组件
-from .route_manager import RouteManager
-from .route_parser import RouteParser
-from .route_validator import RouteValidator
-from .async_route_handler import AsyncRouteHandler
-
-# 向后兼容的函数接口
-from .route import add_route, delete_route, get_routes
+_EXPORTS = {
+    # 主服务接口
+    'RouteService': '.route',
+    
+    # 服务组件
+    'RouteManager': '.route_manager',
+    'RouteParser': '.route_parser',
+    'RouteValidator': '.route_validator',
+    'AsyncRouteHandler': '.async_route_handler',
+    
+    # 向后兼容的函数接口
+    'add_route': '.route',
+    'delete_route': '.route',
+    'get_routes': '.route',
+}
 
 # 导出主要服务类
 __all__ = [
@@ -28,4 +34,8 @@ __all__ = [
     'add_route',
     'delete_route', 
     'get_routes'
-]
\ No newline at end of file
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS, submodules=(
+    'route', 'route_manager', 'route_parser', 'route_validator', 'async_route_handler'
+))
@@ -3,9 +3,9 @@
 职责：系统路由操作、命令执行、路由管理
 """
 
-import subprocess
 import platform
 from typing import Dict
+from netkit.utils.command_runner import run_command
 
 
 class RouteManager:
@@ -20,13 +20,7 @@ class RouteManager:
             # 使用route print命令获取路由表
             cmd = ['route', 'print']
             
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                encoding='gbk',
-                creationflags=self._get_creation_flags()
-            )
+            result = run_command(cmd)
             
             if result.returncode != 0:
                 return {
@@ -57,13 +51,7 @@ class RouteManager:
                 'metric', str(metric)
             ]
             
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                encoding='gbk',
-                creationflags=self._get_creation_flags()
-            )
+            result = run_command(cmd)
             
             if result.returncode == 0:
                 return {
@@ -96,13 +84,7 @@ class RouteManager:
             if gateway:
                 cmd.append(gateway)
             
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                encoding='gbk',
-                creationflags=self._get_creation_flags()
-            )
+            result = run_command(cmd)
             
             if result.returncode == 0:
                 return {
@@ -124,13 +106,7 @@ class RouteManager:
     def execute_route_command(self, cmd_args: list) -> Dict:
         """执行路由命令"""
         try:
-            result = subprocess.run(
-                cmd_args,
-                capture_output=True,
-                text=True,
-                encoding='gbk',
-                creationflags=self._get_creation_flags()
-            )
+            result = run_command(cmd_args)
             
             return {
                 'success': result.returncode == 0,
@@ -145,13 +121,6 @@ class RouteManager:
                 'error': f"执行命令出错: {str(e)}"
             }
     
-    def _get_creation_flags(self):
-        """获取创建标志（Windows下隐藏控制台窗口）"""
-        if self.platform == 'Windows':
-            return subprocess.CREATE_NO_WINDOW
-        else:
-            return 0
-    
     def backup_routes(self) -> Dict:
         """备份当前路由表"""
         try:
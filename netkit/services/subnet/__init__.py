@@ -2,8 +2,15 @@
 子网计算服务包
 """
 
-from .subnet_calculator import SubnetCalculator
-from .ip_validator import IPValidator
-from .cidr_converter import CIDRConverter
+from netkit.utils.lazy_import import lazy_module
 
-__all__ = ['SubnetCalculator', 'IPValidator', 'CIDRConverter']
\ No newline at end of file
+_EXPORTS = {
+    'SubnetCalculator': '.subnet_calculator',
+    'SubnetDivision': '.subnet_calculator',
+    'IPValidator': '.ip_validator',
+    'CIDRConverter': '.cidr_converter',
+}
+
+__all__ = ['SubnetCalculator', 'SubnetDivision', 'IPValidator', 'CIDRConverter']
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
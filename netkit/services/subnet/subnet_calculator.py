@@ -4,11 +4,48 @@
 """
 
 import ipaddress
-from typing import Dict, List, Optional, Tuple
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
 from .ip_validator import IPValidator
 from .cidr_converter import CIDRConverter
 
 
+class SubnetDivision:
+    """
+    子网划分结果
+    
+    各子网等长且连续，第i个子网的地址由网络地址直接算出，
+    按需生成指定范围的子网信息，不展开全部子网
+    """
+    
+    def __init__(self, calculator: 'SubnetCalculator', network: ipaddress.IPv4Network,
+                 new_prefix: int, count: int):
+        self.calculator = calculator
+        self.network = network
+        self.new_prefix = new_prefix
+        self.count = count
+        self._base = int(network.network_address)
+        self._block = 1 << (32 - new_prefix)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def subnet(self, index: int) -> ipaddress.IPv4Network:
+        """第index个子网（从0开始）"""
+        if not 0 <= index < self.count:
+            raise IndexError(f"子网序号超出范围: {index}")
+        return ipaddress.IPv4Network((self._base + index * self._block, self.new_prefix))
+    
+    def page(self, start: int, size: int) -> List[Dict[str, str]]:
+        """从start开始的最多size个子网信息"""
+        stop = min(self.count, max(0, start) + size)
+        return [self.calculator._format_subnet(self.subnet(i)) for i in range(max(0, start), stop)]
+    
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for i in range(self.count):
+            yield self.calculator._format_subnet(self.subnet(i))
+
+
 class SubnetCalculator:
     """子网计算器"""
     
@@ -82,6 +119,19 @@ class SubnetCalculator:
         Returns:
             子网列表
         """
+        return list(self.plan_division(ip_str, mask_or_cidr, divide_by, value))
+    
+    def plan_division(self, ip_str: str, mask_or_cidr: str,
+                      divide_by: str, value: int) -> SubnetDivision:
+        """
+        子网划分（按需生成结果）
+        
+        参数与 divide_subnet 相同，返回的 SubnetDivision 只记录划分方式，
+        子网信息在访问时才计算，适合划分出大量子网的情况
+        
+        Returns:
+            SubnetDivision 对象
+        """
         # 输入验证
         if not ip_str or not ip_str.strip():
             raise ValueError("IP地址不能为空")
@@ -109,35 +159,33 @@ class SubnetCalculator:
             
             if divide_by == 'subnets':
                 # 按子网数量划分
-                subnets = self._divide_by_subnet_count(network, value)
+                new_prefix, count = self._divide_by_subnet_count(network, value)
             else:  # divide_by == 'hosts'
                 # 按主机数量划分
-                subnets = self._divide_by_host_count(network, value)
-            
-            # 格式化结果
-            result = []
-            for i, subnet in enumerate(subnets, 1):
-                result.append({
-                    'network_address': str(subnet.network_address),
-                    'broadcast_address': str(subnet.broadcast_address),
-                    'subnet_mask': self.converter.cidr_to_mask(subnet.prefixlen),
-                    'cidr_notation': str(subnet),
-                    'host_range': self._get_host_range(subnet),
-                    'host_count': str(self._get_usable_hosts_count(subnet)),
-                    'network_host_bits': f"{subnet.prefixlen}/{32-subnet.prefixlen}",
-                    'ip_type': self._get_ip_type(subnet)
-                })
+                new_prefix, count = self._divide_by_host_count(network, value)
             
-            return result
+            return SubnetDivision(self, network, new_prefix, count)
             
         except Exception as e:
             raise ValueError(f"子网划分失败: {str(e)}")
     
+    def _format_subnet(self, subnet: ipaddress.IPv4Network) -> Dict[str, str]:
+        """格式化单个子网的信息"""
+        return {
+            'network_address': str(subnet.network_address),
+            'broadcast_address': str(subnet.broadcast_address),
+            'subnet_mask': self.converter.cidr_to_mask(subnet.prefixlen),
+            'cidr_notation': str(subnet),
+            'host_range': self._get_host_range(subnet),
+            'host_count': str(self._get_usable_hosts_count(subnet)),
+            'network_host_bits': f"{subnet.prefixlen}/{32-subnet.prefixlen}",
+            'ip_type': self._get_ip_type(subnet)
+        }
+    
     def _divide_by_subnet_count(self, network: ipaddress.IPv4Network, 
-                               subnet_count: int) -> List[ipaddress.IPv4Network]:
-        """按子网数量划分"""
+                               subnet_count: int) -> Tuple[int, int]:
+        """按子网数量划分，返回(新前缀长度, 子网数)"""
         # 计算需要的额外位数
-        import math
         extra_bits = math.ceil(math.log2(subnet_count))
         
         # 检查是否可以划分
@@ -145,15 +193,12 @@ class SubnetCalculator:
         if new_prefix > 30:  # 至少保留2位主机位
             raise ValueError(f"无法将 /{network.prefixlen} 网络划分为 {subnet_count} 个子网")
         
-        # 执行划分
-        subnets = list(network.subnets(new_prefix=new_prefix))
-        return subnets[:subnet_count]
+        return new_prefix, subnet_count
     
     def _divide_by_host_count(self, network: ipaddress.IPv4Network, 
-                             hosts_per_subnet: int) -> List[ipaddress.IPv4Network]:
-        """按主机数量划分"""
+                             hosts_per_subnet: int) -> Tuple[int, int]:
+        """按主机数量划分，返回(新前缀长度, 子网数)"""
         # 计算需要的主机位数
-        import math
         # 需要额外2个地址（网络地址和广播地址）
         required_addresses = hosts_per_subnet + 2
         host_bits = math.ceil(math.log2(required_addresses))
@@ -165,9 +210,7 @@ class SubnetCalculator:
         if new_prefix <= network.prefixlen:
             raise ValueError(f"每个子网需要 {hosts_per_subnet} 个主机，超出了原网络容量")
         
-        # 执行划分
-        subnets = list(network.subnets(new_prefix=new_prefix))
-        return subnets
+        return new_prefix, 1 << (new_prefix - network.prefixlen)
     
     def _get_host_range(self, network: ipaddress.IPv4Network) -> str:
         """获取可用主机范围"""
@@ -180,26 +223,12 @@ class SubnetCalculator:
             # /32 网络只有一个地址
             return str(network.network_address)
         
-        # 对于大网络（前缀长度小于等于16），避免生成完整的主机列表
-        if network.prefixlen <= 16:
-            # 直接计算第一个和最后一个主机地址
-            if network.num_addresses <= 2:
-                return "无可用主机"
-            first_host = network.network_address + 1
-            last_host = network.broadcast_address - 1
-            if first_host == last_host:
-                return str(first_host)
-            return f"{first_host} - {last_host}"
-        
-        # 对于小网络，使用原来的方法
-        hosts = list(network.hosts())
-        if not hosts:
-            return "无可用主机"
-        
-        if len(hosts) == 1:
-            return str(hosts[0])
-        
-        return f"{hosts[0]} - {hosts[-1]}"
+        # 直接计算第一个和最后一个主机地址，避免生成完整的主机列表
+        first_host = network.network_address + 1
+        last_host = network.broadcast_address - 1
+        if first_host == last_host:
+            return str(first_host)
+        return f"{first_host} - {last_host}"
     
     def _get_usable_hosts_count(self, network: ipaddress.IPv4Network) -> int:
         """获取可用主机数"""
@@ -0,0 +1,23 @@
+"""
+NetKit 路由跟踪服务模块
+
+提供并行TTL探测的路由跟踪和连续(MTR)模式
+"""
+
+from netkit.utils.lazy_import import lazy_module
+
+_EXPORTS = {
+    'TracerouteService': '.traceroute_service',
+    'TracerouteEngine': '.traceroute_service',
+    'HopStats': '.traceroute_service',
+    'IcmpTransport': '.icmp_transport',
+}
+
+__all__ = [
+    'TracerouteService',
+    'TracerouteEngine',
+    'HopStats',
+    'IcmpTransport',
+]
+
+__getattr__, __dir__ = lazy_module(__name__, _EXPORTS)
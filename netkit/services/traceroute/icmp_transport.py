@@ -0,0 +1,136 @@
+"""
+ICMP探测传输
+
+用原始套接字发送指定TTL的ICMP回显请求，并接收回显应答、超时(time exceeded)
+和目的不可达报文。超时和不可达报文的数据部分带有原始IP首部和ICMP首部的前8字节，
+从中取出原始请求的标识符和序号，与发出的探测对应。
+原始套接字需要管理员(root)权限
+"""
+
+import os
+import socket
+import struct
+import select
+import time
+import platform
+from typing import Dict, Optional
+
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACHABLE = 3
+ICMP_ECHO_REQUEST = 8
+ICMP_TIME_EXCEEDED = 11
+
+# 应答类型
+REPLY_ECHO = 'echo_reply'
+REPLY_TIME_EXCEEDED = 'time_exceeded'
+REPLY_UNREACHABLE = 'unreachable'
+
+_REPLY_TYPES = {
+    ICMP_ECHO_REPLY: REPLY_ECHO,
+    ICMP_TIME_EXCEEDED: REPLY_TIME_EXCEEDED,
+    ICMP_DEST_UNREACHABLE: REPLY_UNREACHABLE,
+}
+
+PAYLOAD = b'NetKit-traceroute'
+
+
+def checksum(data: bytes) -> int:
+    """ICMP校验和（16位反码和）"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int, payload: bytes = PAYLOAD) -> bytes:
+    """构造ICMP回显请求"""
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum(header + payload), ident, seq) + payload
+
+
+def parse_icmp_packet(packet: bytes) -> Optional[Dict]:
+    """
+    解析原始套接字收到的IPv4+ICMP报文
+
+    Returns:
+        dict: {'type', 'source', 'ident', 'seq'}，不是探测相关的报文时返回None
+    """
+    try:
+        ihl = (packet[0] & 0x0F) * 4
+        source = socket.inet_ntoa(packet[12:16])
+        icmp_type = packet[ihl]
+        reply_type = _REPLY_TYPES.get(icmp_type)
+        if reply_type is None:
+            return None
+
+        if icmp_type == ICMP_ECHO_REPLY:
+            ident, seq = struct.unpack_from('!HH', packet, ihl + 4)
+        else:
+            # 数据部分：原始IP首部 + 原始ICMP首部前8字节
+            inner = ihl + 8
+            inner_ihl = (packet[inner] & 0x0F) * 4
+            if packet[inner + 9] != socket.IPPROTO_ICMP or packet[inner + inner_ihl] != ICMP_ECHO_REQUEST:
+                return None
+            ident, seq = struct.unpack_from('!HH', packet, inner + inner_ihl + 4)
+    except (IndexError, struct.error, OSError):
+        return None
+
+    return {'type': reply_type, 'source': source, 'ident': ident, 'seq': seq}
+
+
+def _local_address(destination: str) -> str:
+    """到达目标所用的本机地址（Windows原始套接字需绑定具体地址才能收到ICMP）"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((destination, 33434))
+        return sock.getsockname()[0]
+
+
+class IcmpTransport:
+    """原始套接字ICMP传输"""
+
+    def __init__(self, destination: str):
+        """
+        Raises:
+            PermissionError: 没有创建原始套接字的权限
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        if platform.system() == 'Windows':
+            self.sock.bind((_local_address(destination), 0))
+        self.sock.setblocking(False)
+
+    def send(self, destination: str, ttl: int, ident: int, seq: int) -> float:
+        """发送指定TTL的回显请求，返回发送时间(time.monotonic)"""
+        self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        sent = time.monotonic()
+        self.sock.sendto(build_echo_request(ident, seq), (destination, 0))
+        return sent
+
+    def receive(self, timeout: float) -> Optional[Dict]:
+        """
+        等待一个ICMP报文
+
+        Returns:
+            dict: parse_icmp_packet的结果加上接收时间'received'，超时或无关报文返回None
+        """
+        readable, _, _ = select.select([self.sock], [], [], max(0.0, timeout))
+        if not readable:
+            return None
+        try:
+            packet = self.sock.recv(65535)
+        except (BlockingIOError, InterruptedError):
+            return None
+        received = time.monotonic()
+        reply = parse_icmp_packet(packet)
+        if reply is not None:
+            reply['received'] = received
+        return reply
+
+    def close(self):
+        self.sock.close()
+
+
+def default_ident() -> int:
+    """本进程的ICMP标识符"""
+    return os.getpid() & 0xFFFF
@@ -0,0 +1,264 @@
+"""
+路由跟踪服务
+
+一轮探测同时发出TTL为1..最大跳数的全部回显请求，按应答中带回的标识符和序号
+对应到TTL，整轮耗时约等于最慢一跳的往返时间，而不是逐跳等待超时。
+收到目标的回显应答后，只要更小TTL的各跳都已应答就提前结束。
+
+连续(MTR)模式按间隔重复探测，每跳用环形缓冲保存最近若干次的往返时间，
+统计丢包率和延迟
+"""
+
+import math
+import time
+import socket
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from .icmp_transport import IcmpTransport, REPLY_ECHO, REPLY_UNREACHABLE, default_ident
+
+# IP报文的TTL字段为8位
+MAX_TTL = 255
+
+
+class HopStats:
+    """单跳的连续探测统计（只保留最近history次）"""
+
+    def __init__(self, ttl: int, history: int = 100):
+        self.ttl = ttl
+        self.samples = deque(maxlen=history)  # 往返时间(毫秒)，无应答为None
+        self.address = None
+
+    def add(self, address: Optional[str], rtt: Optional[float]):
+        self.samples.append(rtt)
+        if address is not None:
+            self.address = address
+
+    def summary(self) -> Dict:
+        """
+        Returns:
+            dict: {'ttl', 'address', 'sent', 'received', 'loss'(%),
+                   'last', 'best', 'worst', 'avg', 'stdev'}（毫秒，无应答时为None）
+        """
+        times = [rtt for rtt in self.samples if rtt is not None]
+        sent = len(self.samples)
+        avg = sum(times) / len(times) if times else None
+        return {
+            'ttl': self.ttl,
+            'address': self.address,
+            'sent': sent,
+            'received': len(times),
+            'loss': round((sent - len(times)) * 100.0 / sent, 1) if sent else 0.0,
+            'last': self.samples[-1] if sent else None,
+            'best': min(times) if times else None,
+            'worst': max(times) if times else None,
+            'avg': round(avg, 2) if avg is not None else None,
+            'stdev': round(math.sqrt(sum((rtt - avg) ** 2 for rtt in times) / len(times)), 2) if times else None,
+        }
+
+
+class TracerouteEngine:
+    """并行TTL探测引擎（与具体传输无关）"""
+
+    def __init__(self, transport, destination: str, max_hops: int = 30,
+                 timeout: float = 1.0, ident: int = None):
+        """
+        Args:
+            transport: 提供 send(destination, ttl, ident, seq) 和 receive(timeout) 的传输
+            destination: 目标IPv4地址
+            max_hops: 最大跳数（限制在1..MAX_TTL之间）
+            timeout: 一轮探测的超时(秒)
+            ident: ICMP标识符，用于区分本进程的探测
+        """
+        self.transport = transport
+        self.destination = destination
+        self.max_hops = min(max(1, int(max_hops)), MAX_TTL)
+        self.timeout = timeout
+        self.ident = default_ident() if ident is None else ident
+        self.seq = 0
+
+    def _next_seq(self) -> int:
+        self.seq = (self.seq + 1) & 0xFFFF
+        return self.seq
+
+    def probe_round(self) -> Dict:
+        """
+        发出一轮探测
+
+        Returns:
+            dict: {
+                'hops': [{'ttl', 'address', 'rtt'(毫秒), 'type'}]，无应答的跳address和rtt为None,
+                'reached': 是否到达目标
+            }
+        """
+        probes = {}
+        for ttl in range(1, self.max_hops + 1):
+            seq = self._next_seq()
+            probes[seq] = (ttl, self.transport.send(self.destination, ttl, self.ident, seq))
+
+        answers = {}
+        end_ttl = None
+        reached = False
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # 路径终点之前的各跳都已应答即可结束
+            if end_ttl is not None and all(ttl in answers for ttl in range(1, end_ttl)):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            reply = self.transport.receive(remaining)
+            if reply is None or reply['ident'] != self.ident or reply['seq'] not in probes:
+                continue
+
+            ttl, sent = probes[reply['seq']]
+            if ttl in answers:
+                continue
+            answers[ttl] = {
+                'ttl': ttl,
+                'address': reply['source'],
+                'rtt': round((reply['received'] - sent) * 1000, 2),
+                'type': reply['type'],
+            }
+            # 目标的回显应答或任何不可达报文都是路径终点
+            if reply['type'] in (REPLY_ECHO, REPLY_UNREACHABLE):
+                if end_ttl is None or ttl < end_ttl:
+                    end_ttl = ttl
+                    reached = reply['source'] == self.destination
+
+        last = end_ttl if end_ttl is not None else max(answers, default=0)
+        hops = [
+            answers.get(ttl, {'ttl': ttl, 'address': None, 'rtt': None, 'type': None})
+            for ttl in range(1, last + 1)
+        ]
+        return {'hops': hops, 'reached': reached}
+
+
+class TracerouteService:
+    """路由跟踪服务"""
+
+    def __init__(self, transport_factory: Callable = None):
+        """
+        Args:
+            transport_factory: 按目标地址创建传输的工厂，默认使用原始套接字ICMP
+        """
+        self.transport_factory = transport_factory or IcmpTransport
+        self.stop_event = threading.Event()
+
+    def trace(self, host: str, max_hops: int = 30, timeout: int = 1000) -> Dict:
+        """
+        跟踪到目标的路由（一轮并行探测）
+
+        Args:
+            host: 目标主机
+            max_hops: 最大跳数
+            timeout: 超时(毫秒)
+
+        Returns:
+            dict: {'success', 'target', 'address', 'hops', 'reached', 'elapsed'(秒), 'error'}
+        """
+        result = {'success': False, 'target': host, 'address': None, 'hops': [],
+                  'reached': False, 'elapsed': 0.0, 'error': None}
+        start = time.monotonic()
+        engine = self._open(host, max_hops, timeout, result)
+        if engine is None:
+            return result
+        try:
+            round_result = engine.probe_round()
+        except OSError as e:
+            result['error'] = f"路由跟踪失败: {e}"
+            return result
+        finally:
+            engine.transport.close()
+
+        result.update(round_result)
+        result['success'] = True
+        result['elapsed'] = round(time.monotonic() - start, 3)
+        return result
+
+    def mtr(self, host: str, rounds: int = None, interval: int = 1000, max_hops: int = 30,
+            timeout: int = 1000, history: int = 100, progress_callback: Callable = None) -> Dict:
+        """
+        连续跟踪（MTR），直到完成指定轮数或调用stop()
+
+        Args:
+            host: 目标主机
+            rounds: 轮数，None表示一直运行到停止
+            interval: 两轮开始之间的间隔(毫秒)
+            max_hops: 最大跳数
+            timeout: 每轮超时(毫秒)
+            history: 每跳保留的最近探测次数
+            progress_callback: 每轮结束后调用 callback(round, hops)，hops为各跳统计
+
+        Returns:
+            dict: {'success', 'target', 'address', 'hops'(各跳统计), 'rounds', 'reached', 'error'}
+        """
+        result = {'success': False, 'target': host, 'address': None, 'hops': [],
+                  'rounds': 0, 'reached': False, 'error': None}
+        self.stop_event.clear()
+        engine = self._open(host, max_hops, timeout, result)
+        if engine is None:
+            return result
+
+        stats: List[HopStats] = []
+        path_length = 0
+        reached_length = None
+        try:
+            while rounds is None or result['rounds'] < rounds:
+                started = time.monotonic()
+                round_result = engine.probe_round()
+                hops = round_result['hops']
+                # 到达过目标时路径长度取到达目标的最小TTL（目标对该TTL的应答丢失时，
+                # 更大TTL的应答也来自目标，不能算作新的一跳）；否则取观察到的最长值
+                if round_result['reached']:
+                    reached_length = min(reached_length or len(hops), len(hops))
+                path_length = reached_length or max(path_length, len(hops))
+                del stats[path_length:]
+                while len(stats) < path_length:
+                    stats.append(HopStats(len(stats) + 1, history))
+                for hop_stats in stats:
+                    hop = hops[hop_stats.ttl - 1] if hop_stats.ttl <= len(hops) else None
+                    hop_stats.add(hop and hop['address'], hop and hop['rtt'])
+
+                result['rounds'] += 1
+                result['reached'] = result['reached'] or round_result['reached']
+                result['hops'] = [hop_stats.summary() for hop_stats in stats]
+                if progress_callback:
+                    progress_callback(result['rounds'], result['hops'])
+
+                if rounds is not None and result['rounds'] >= rounds:
+                    break
+                if self.stop_event.wait(max(0.0, interval / 1000 - (time.monotonic() - started))):
+                    break
+        except OSError as e:
+            result['error'] = f"路由跟踪失败: {e}"
+            return result
+        finally:
+            engine.transport.close()
+
+        result['success'] = True
+        return result
+
+    def stop(self):
+        """停止连续跟踪"""
+        self.stop_event.set()
+
+    def _open(self, host: str, max_hops: int, timeout: int, result: Dict) -> Optional[TracerouteEngine]:
+        """解析目标并创建探测引擎，失败时在result中记录错误"""
+        try:
+            address = socket.gethostbyname(host)
+        except (socket.gaierror, UnicodeError):
+            result['error'] = f"无法解析主机: {host}"
+            return None
+        result['address'] = address
+
+        try:
+            transport = self.transport_factory(address)
+        except PermissionError:
+            result['error'] = "发送ICMP探测需要管理员权限"
+            return None
+        except OSError as e:
+            result['error'] = f"创建ICMP套接字失败: {e}"
+            return None
+        return TracerouteEngine(transport, address, max_hops, timeout / 1000)
@@ -1 +1,20 @@
-# Auto-generated skeleton
+"""
+NetKit Utils - 通用工具模块
+
+各子模块在首次访问时才导入
+"""
+
+from .lazy_import import lazy_module
+
+__all__ = [
+    "admin_check",
+    "command_runner",
+    "console_encoding",
+    "monitor_backends",
+    "network_monitor",
+    "oui_lookup",
+    "ui_helper",
+    "lazy_import"
+]
+
+__getattr__, __dir__ = lazy_module(__name__, submodules=__all__)
@@ -0,0 +1,371 @@
+"""
+命令执行服务
+保持一个长驻的shell会话（Windows为PowerShell，其他系统为sh），
+通过标准输入逐条送入命令，以带随机标记的哨兵行切分每条命令的输出和退出码，
+省去每条命令单独创建进程的开销（Windows上每次数十毫秒）；
+会话无法启动或在写入命令前断开时回退为一次性 subprocess.run
+"""
+
+import os
+import time
+import base64
+import uuid
+import queue
+import atexit
+import shlex
+import logging
+import platform
+import threading
+import subprocess
+from typing import Dict, List, Optional, Sequence, Union
+from .console_encoding import decode_output
+
+logger = logging.getLogger(__name__)
+
+Command = Union[str, Sequence[str]]
+
+
+class SessionError(Exception):
+    """shell会话异常（未启动、已退出或管道断开）"""
+
+
+class CommandInterrupted(SessionError):
+    """命令送入后shell会话意外退出（命令可能已部分执行，不能重试）"""
+
+
+class ShellDialect:
+    """shell方言：启动参数、参数转义和带哨兵的命令包装"""
+
+    name = 'base'
+    argv: List[str] = []
+
+    def quote(self, arg: str) -> str:
+        raise NotImplementedError
+
+    def join(self, command: Command) -> str:
+        """将参数列表拼接为shell命令行"""
+        if isinstance(command, str):
+            return command
+        return ' '.join(self.quote(str(arg)) for arg in command)
+
+    def wrap(self, command: str, sentinel: str) -> str:
+        """
+        包装命令：执行后向stdout写入 "\\n<哨兵> <退出码>\\n"，向stderr写入 "\\n<哨兵>\\n"
+        """
+        raise NotImplementedError
+
+
+class PosixShellDialect(ShellDialect):
+    """POSIX sh"""
+
+    name = 'sh'
+
+    def __init__(self, argv: Optional[List[str]] = None):
+        self.argv = argv or ['/bin/sh']
+
+    def quote(self, arg: str) -> str:
+        return shlex.quote(arg)
+
+    def wrap(self, command: str, sentinel: str) -> str:
+        # 标准输入重定向到/dev/null，防止命令读走后续送入的命令
+        return (f"{{ {command}\n}} </dev/null\n"
+                f"printf '\\n%s %d\\n' '{sentinel}' $?\n"
+                f"printf '\\n%s\\n' '{sentinel}' >&2\n")
+
+
+class PowerShellDialect(ShellDialect):
+    """Windows PowerShell（-Command - 从标准输入逐行读取命令）"""
+
+    name = 'powershell'
+
+    def __init__(self, argv: Optional[List[str]] = None):
+        self.argv = argv or ['powershell.exe', '-NoLogo', '-NoProfile', '-NonInteractive',
+                             '-ExecutionPolicy', 'Bypass', '-Command', '-']
+
+    def quote(self, arg: str) -> str:
+        return "'" + arg.replace("'", "''") + "'"
+
+    def join(self, command: Command) -> str:
+        if isinstance(command, str):
+            return command
+        return '& ' + super().join(command)
+
+    @staticmethod
+    def encode(command: str) -> str:
+        """
+        把命令编码为只含ASCII的表达式
+
+        -Command - 按控制台输入代码页(OEM)解码标准输入，直接送入UTF-8时
+        "以太网"等非ASCII连接名会乱码；改为送入UTF-16LE的Base64，由会话内解码后执行
+        """
+        encoded = base64.b64encode(command.encode('utf-16-le')).decode('ascii')
+        return ("Invoke-Expression ([Text.Encoding]::Unicode.GetString("
+                f"[Convert]::FromBase64String('{encoded}')))")
+
+    def wrap(self, command: str, sentinel: str) -> str:
+        return (f"$global:LASTEXITCODE = 0; {self.encode(command)}; "
+                f"$__rc = if ($?) {{ $LASTEXITCODE }} elseif ($LASTEXITCODE) {{ $LASTEXITCODE }} else {{ 1 }}; "
+                f"[Console]::Out.Write(\"`n{sentinel} $__rc`n\"); [Console]::Out.Flush(); "
+                f"[Console]::Error.Write(\"`n{sentinel}`n\"); [Console]::Error.Flush()\n")
+
+
+def default_dialect() -> ShellDialect:
+    """当前平台的shell方言"""
+    if platform.system() == 'Windows':
+        return PowerShellDialect()
+    return PosixShellDialect()
+
+
+def _creation_flags() -> int:
+    """Windows下隐藏控制台窗口"""
+    return subprocess.CREATE_NO_WINDOW if platform.system() == 'Windows' else 0
+
+
+class ShellSession:
+    """长驻shell会话，同一时间只执行一条命令"""
+
+    def __init__(self, dialect: ShellDialect):
+        self.dialect = dialect
+        self.process = None
+        self.stdout_queue: queue.Queue = queue.Queue()
+        self.stderr_queue: queue.Queue = queue.Queue()
+        self.token = uuid.uuid4().hex
+        self.counter = 0
+
+    def start(self):
+        """启动shell进程，失败时抛出SessionError"""
+        try:
+            self.process = subprocess.Popen(
+                self.dialect.argv,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                creationflags=_creation_flags()
+            )
+        except (OSError, ValueError) as e:
+            raise SessionError(f"无法启动shell会话 {self.dialect.argv[0]}: {e}")
+
+        for stream, target in ((self.process.stdout, self.stdout_queue),
+                               (self.process.stderr, self.stderr_queue)):
+            threading.Thread(target=self._pump, args=(stream, target), daemon=True,
+                             name=f'NetKitShellPump-{self.dialect.name}').start()
+
+    @staticmethod
+    def _pump(stream, target: queue.Queue):
+        """把管道中的行转存到队列，EOF时放入None"""
+        try:
+            for line in iter(stream.readline, b''):
+                target.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            target.put(None)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def send(self, command: str) -> str:
+        """
+        送入命令，返回本次命令的哨兵
+
+        Raises:
+            SessionError: 会话不可用（此时命令尚未执行，可以安全地回退）
+        """
+        if not self.is_alive():
+            raise SessionError("shell会话未运行")
+        self.counter += 1
+        sentinel = f"__NETKIT_{self.token}_{self.counter}__"
+        try:
+            self.process.stdin.write(self.dialect.wrap(command, sentinel).encode('utf-8'))
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise SessionError(f"写入shell会话失败: {e}")
+        return sentinel
+
+    def _collect(self, target: queue.Queue, sentinel: bytes, deadline: Optional[float]):
+        """
+        读取到哨兵行为止
+
+        Returns:
+            tuple: (输出字节, 哨兵行剩余部分)
+        """
+        chunks = []
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(self.dialect.argv, 0)
+            try:
+                line = target.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.dialect.argv, 0)
+            if line is None:
+                raise SessionError("shell会话意外退出")
+            if line.startswith(sentinel):
+                # 去掉哨兵前补的换行
+                output = b''.join(chunks)
+                return output[:-1] if output.endswith(b'\n') else output, line[len(sentinel):]
+            chunks.append(line)
+
+    def execute(self, command: str, timeout: Optional[float] = None):
+        """
+        执行一条命令
+
+        Returns:
+            tuple: (退出码, stdout字节, stderr字节)
+
+        Raises:
+            SessionError: 送入命令前会话已不可用
+            CommandInterrupted: 命令执行过程中会话退出
+            subprocess.TimeoutExpired: 超时（会话随后被结束）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sentinel = self.send(command).encode('ascii')
+        try:
+            stdout, rest = self._collect(self.stdout_queue, sentinel, deadline)
+            stderr, _ = self._collect(self.stderr_queue, sentinel, deadline)
+        except SessionError as e:
+            self.close()
+            raise CommandInterrupted(str(e))
+        except subprocess.TimeoutExpired:
+            # 命令可能仍在运行，直接结束会话
+            self.process.kill()
+            self.close()
+            raise
+        try:
+            returncode = int(rest.strip() or 0)
+        except ValueError:
+            returncode = -1
+        return returncode, stdout, stderr
+
+    def close(self):
+        """结束shell进程"""
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                try:
+                    self.process.stdin.close()
+                except OSError:
+                    pass
+                try:
+                    self.process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait(timeout=1)
+        finally:
+            self.process = None
+
+
+def _decode(data: Optional[bytes], encoding: Optional[str]) -> str:
+    """按指定编码解码，未指定时使用共享的控制台输出解码器"""
+    if not data:
+        return ''
+    if isinstance(data, str):
+        return data
+    if encoding is None:
+        return decode_output(data)
+    return data.decode(encoding, errors='replace')
+
+
+class CommandRunner:
+    """
+    共享的命令执行器
+
+    run() 返回 subprocess.CompletedProcess（stdout/stderr已解码），调用方式与subprocess.run一致
+    """
+
+    def __init__(self, dialect: Optional[ShellDialect] = None, persistent: Optional[bool] = None):
+        self.dialect = dialect or default_dialect()
+        if persistent is None:
+            persistent = os.environ.get('NETKIT_PERSISTENT_SHELL', '1') != '0'
+        self.persistent = persistent
+        self.session: Optional[ShellSession] = None
+        self.lock = threading.Lock()
+        self.stats = {'session_runs': 0, 'oneshot_runs': 0, 'fallbacks': 0, 'restarts': 0}
+
+    def run(self, command: Command, encoding: Optional[str] = None, timeout: Optional[float] = None,
+            persistent: Optional[bool] = None) -> subprocess.CompletedProcess:
+        """
+        执行命令
+
+        Args:
+            command: 参数列表或命令行字符串
+            encoding: 输出编码（None表示使用进程检测到的控制台代码页）
+            timeout: 超时时间(秒)，超时抛出 subprocess.TimeoutExpired
+            persistent: 是否通过长驻会话执行（None表示使用执行器的默认设置）
+        """
+        use_session = self.persistent if persistent is None else persistent
+        if use_session:
+            with self.lock:
+                try:
+                    session = self._get_session()
+                    returncode, stdout, stderr = session.execute(self.dialect.join(command), timeout)
+                    self.stats['session_runs'] += 1
+                    return subprocess.CompletedProcess(
+                        command, returncode, _decode(stdout, encoding), _decode(stderr, encoding)
+                    )
+                except CommandInterrupted as e:
+                    self._close_session()
+                    return subprocess.CompletedProcess(command, -1, '', str(e))
+                except SessionError as e:
+                    logger.info(f"shell会话不可用，改用单次执行: {e}")
+                    self.stats['fallbacks'] += 1
+                    self._close_session()
+
+        return self.run_oneshot(command, encoding, timeout)
+
+    def run_oneshot(self, command: Command, encoding: Optional[str] = None,
+                    timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """为单条命令创建进程执行"""
+        self.stats['oneshot_runs'] += 1
+        result = subprocess.run(
+            command,
+            shell=isinstance(command, str),
+            capture_output=True,
+            timeout=timeout,
+            creationflags=_creation_flags()
+        )
+        return subprocess.CompletedProcess(
+            command, result.returncode,
+            _decode(result.stdout, encoding), _decode(result.stderr, encoding)
+        )
+
+    def _get_session(self) -> ShellSession:
+        if self.session is None or not self.session.is_alive():
+            if self.session is not None:
+                self.stats['restarts'] += 1
+            self.session = ShellSession(self.dialect)
+            self.session.start()
+        return self.session
+
+    def _close_session(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def close(self):
+        """关闭长驻会话"""
+        with self.lock:
+            self._close_session()
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+
+# 全局命令执行器
+_command_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_command_runner() -> CommandRunner:
+    """获取全局命令执行器（进程退出时关闭shell会话）"""
+    global _command_runner
+    with _runner_lock:
+        if _command_runner is None:
+            _command_runner = CommandRunner()
+            atexit.register(_command_runner.close)
+    return _command_runner
+
+
+def run_command(command: Command, encoding: Optional[str] = None,
+                timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """通过全局命令执行器执行命令"""
+    return get_command_runner().run(command, encoding=encoding, timeout=timeout)
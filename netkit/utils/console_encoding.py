@@ -0,0 +1,132 @@
+"""
+控制台输出解码
+每个进程只检测一次控制台代码页（可覆盖），热路径上只用一种编码解码，
+解码失败时才依次尝试备选编码，并统计回退次数
+
+Windows下子进程以 CREATE_NO_WINDOW 启动时会获得新的隐藏控制台，
+其输出使用系统OEM代码页（简体中文为cp936/GBK，英文为cp437）
+"""
+
+import os
+import codecs
+import locale
+import platform
+import threading
+from typing import Dict, Iterable, Optional
+
+# 环境变量覆盖，如 NETKIT_CONSOLE_ENCODING=utf-8
+ENCODING_ENV = 'NETKIT_CONSOLE_ENCODING'
+
+DEFAULT_FALLBACKS = ('utf-8', 'gbk', 'latin-1')
+
+
+def normalize_encoding(name: str) -> str:
+    """规范化编码名（如 cp65001 → utf-8），未知编码抛出LookupError"""
+    if name.lower() in ('cp65001', '65001'):
+        return 'utf-8'
+    return codecs.lookup(name).name
+
+
+def detect_console_encoding() -> str:
+    """检测子进程控制台输出使用的编码"""
+    override = os.environ.get(ENCODING_ENV)
+    if override:
+        try:
+            return normalize_encoding(override)
+        except LookupError:
+            pass
+
+    if platform.system() == 'Windows':
+        try:
+            import ctypes
+            codepage = ctypes.windll.kernel32.GetOEMCP()
+            if codepage:
+                return normalize_encoding(f'cp{codepage}')
+        except (AttributeError, OSError, LookupError):
+            pass
+
+    try:
+        return normalize_encoding(locale.getpreferredencoding(False) or 'utf-8')
+    except LookupError:
+        return 'utf-8'
+
+
+class OutputDecoder:
+    """使用主编码解码，失败时回退到备选编码"""
+
+    def __init__(self, encoding: Optional[str] = None, fallbacks: Iterable[str] = DEFAULT_FALLBACKS):
+        self.encoding = normalize_encoding(encoding) if encoding else detect_console_encoding()
+        self.fallbacks = [name for name in (normalize_encoding(f) for f in fallbacks)
+                          if name != self.encoding]
+        self.lock = threading.Lock()
+        self.stats = {'decodes': 0, 'fallbacks': 0, 'replacements': 0}
+        self.fallback_encodings: Dict[str, int] = {}
+
+    def decode(self, data: bytes) -> str:
+        """解码字节输出"""
+        if not data:
+            return ''
+        try:
+            text = data.decode(self.encoding)
+            with self.lock:
+                self.stats['decodes'] += 1
+            return text
+        except UnicodeDecodeError:
+            pass
+
+        for encoding in self.fallbacks:
+            try:
+                text = data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            with self.lock:
+                self.stats['decodes'] += 1
+                self.stats['fallbacks'] += 1
+                self.fallback_encodings[encoding] = self.fallback_encodings.get(encoding, 0) + 1
+            return text
+
+        with self.lock:
+            self.stats['decodes'] += 1
+            self.stats['replacements'] += 1
+        return data.decode(self.encoding, errors='replace')
+
+    def get_stats(self) -> Dict:
+        """解码统计（主编码、回退次数及各备选编码的使用次数）"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['encoding'] = self.encoding
+            stats['fallback_encodings'] = dict(self.fallback_encodings)
+        return stats
+
+
+# 全局解码器
+_output_decoder = None
+_decoder_lock = threading.Lock()
+
+
+def get_output_decoder() -> OutputDecoder:
+    """获取全局解码器（首次调用时检测代码页）"""
+    global _output_decoder
+    with _decoder_lock:
+        if _output_decoder is None:
+            _output_decoder = OutputDecoder()
+    return _output_decoder
+
+
+def set_console_encoding(encoding: Optional[str]) -> OutputDecoder:
+    """
+    覆盖全局解码器的主编码
+
+    Args:
+        encoding: 编码名，None表示重新检测
+    """
+    global _output_decoder
+    decoder = OutputDecoder(encoding)
+    with _decoder_lock:
+        _output_decoder = decoder
+    return decoder
+
+
+def decode_output(data: bytes) -> str:
+    """用全局解码器解码命令输出"""
+    return get_output_decoder().decode(data)
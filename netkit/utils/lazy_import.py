@@ -0,0 +1,43 @@
+"""
+延迟导入工具
+基于PEP 562模块级__getattr__，包内符号和子模块在首次访问时才导入，
+避免导入轻量子系统（如子网计算）时连带加载WMI/COM等Windows专用模块
+"""
+
+import sys
+import importlib
+from typing import Callable, Dict, Iterable, Tuple
+
+
+def lazy_module(module_name: str, exports: Dict[str, str] = None,
+                submodules: Iterable[str] = ()) -> Tuple[Callable, Callable]:
+    """
+    为包生成延迟导入的 __getattr__ 和 __dir__
+    
+    Args:
+        module_name: 包名（传入 __name__）
+        exports: 符号名 → 定义该符号的相对模块名，如 {'PingService': '.ping_service'}
+        submodules: 可按属性访问的子模块名
+    
+    Returns:
+        tuple: (__getattr__, __dir__)
+    """
+    exports = dict(exports or {})
+    submodules = set(submodules)
+    
+    def __getattr__(name):
+        if name in exports:
+            value = getattr(importlib.import_module(exports[name], module_name), name)
+        elif name in submodules:
+            value = importlib.import_module(f'.{name}', module_name)
+        else:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        
+        # 缓存到包命名空间，之后的访问不再经过__getattr__
+        setattr(sys.modules[module_name], name, value)
+        return value
+    
+    def __dir__():
+        return sorted(set(vars(sys.modules[module_name])) | set(exports) | submodules)
+    
+    return __getattr__, __dir__
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络监听后端
+按平台提供事件驱动的网络变化监听实现：
+- Linux: rtnetlink 组播（链路/地址/路由）
+- Windows: WMI 实例修改事件
+- 其他/失败时: 结构化指纹轮询 + 空闲指数退避
+所有后端在稳态下都不启动子进程
+"""
+
+import os
+import errno
+import socket
+import struct
+import select
+import platform
+import logging
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+
+# 后端事件回调: emit(event_type, adapters)
+EmitCallback = Callable[[str, Set[str]], None]
+StopCheck = Callable[[], bool]
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# rtnetlink 常量（linux/rtnetlink.h）
+# ---------------------------------------------------------------------------
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+
+RTA_OIF = 4
+
+_NLMSGHDR = struct.Struct('=IHHII')      # len, type, flags, seq, pid
+_IFINFOMSG = struct.Struct('=BxHiII')    # family, type, index, flags, change
+_IFADDRMSG = struct.Struct('=BBBBI')     # family, prefixlen, flags, scope, index
+_RTMSG_SIZE = 12
+_RTATTR = struct.Struct('=HH')           # len, type
+
+# 消息类型 -> 事件类型
+NETLINK_EVENT_TYPES = {
+    RTM_NEWLINK: "网络适配器状态变化",
+    RTM_DELLINK: "网络适配器移除",
+    RTM_NEWADDR: "网络地址变化",
+    RTM_DELADDR: "网络地址移除",
+    RTM_NEWROUTE: "路由变化",
+    RTM_DELROUTE: "路由移除",
+}
+
+# 轮询后端按网卡读取地址（Linux）
+_SIOCGIFADDR = 0x8915
+PROC_IF_INET6 = '/proc/net/if_inet6'
+
+
+def _nl_align(length: int) -> int:
+    """netlink 4字节对齐"""
+    return (length + 3) & ~3
+
+
+def _route_oif(payload: bytes) -> Optional[int]:
+    """从rtmsg属性中提取出接口索引（RTA_OIF）"""
+    offset = _RTMSG_SIZE
+    while offset + _RTATTR.size <= len(payload):
+        rta_len, rta_type = _RTATTR.unpack_from(payload, offset)
+        if rta_len < _RTATTR.size:
+            break
+        if rta_type == RTA_OIF and rta_len >= _RTATTR.size + 4:
+            return struct.unpack_from('=i', payload, offset + _RTATTR.size)[0]
+        offset += _nl_align(rta_len)
+    return None
+
+
+def parse_netlink_messages(data: bytes) -> List[Tuple[str, Optional[int]]]:
+    """
+    解析一个rtnetlink数据报中的所有消息
+
+    Args:
+        data: recv() 得到的原始字节
+
+    Returns:
+        list: [(事件类型, 接口索引或None), ...]，忽略不关心的消息
+    """
+    events = []
+    offset = 0
+
+    while offset + _NLMSGHDR.size <= len(data):
+        msg_len, msg_type, _flags, _seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if msg_len < _NLMSGHDR.size or offset + msg_len > len(data):
+            break
+
+        payload = data[offset + _NLMSGHDR.size:offset + msg_len]
+
+        if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+            pass
+        elif msg_type in (RTM_NEWLINK, RTM_DELLINK) and len(payload) >= _IFINFOMSG.size:
+            index = _IFINFOMSG.unpack_from(payload)[2]
+            events.append((NETLINK_EVENT_TYPES[msg_type], index))
+        elif msg_type in (RTM_NEWADDR, RTM_DELADDR) and len(payload) >= _IFADDRMSG.size:
+            index = _IFADDRMSG.unpack_from(payload)[4]
+            events.append((NETLINK_EVENT_TYPES[msg_type], index))
+        elif msg_type in (RTM_NEWROUTE, RTM_DELROUTE) and len(payload) >= _RTMSG_SIZE:
+            events.append((NETLINK_EVENT_TYPES[msg_type], _route_oif(payload)))
+
+        offset += _nl_align(msg_len)
+
+    return events
+
+
+def _index_to_name(index: Optional[int]) -> Optional[str]:
+    """接口索引转名称（接口已删除时返回索引字符串）"""
+    if index is None or index <= 0:
+        return None
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return str(index)
+
+
+class MonitorBackend:
+    """网络监听后端基类"""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        """当前平台是否可用"""
+        return False
+
+    def run(self, emit: EmitCallback, should_stop: StopCheck):
+        """
+        阻塞运行直到 should_stop() 返回True
+
+        Raises:
+            Exception: 后端无法继续工作时抛出，由监听器切换到下一个后端
+        """
+        raise NotImplementedError
+
+
+class NetlinkMonitorBackend(MonitorBackend):
+    """Linux rtnetlink 组播监听后端"""
+
+    name = "netlink"
+
+    GROUPS = (RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE |
+              RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE)
+
+    def __init__(self, stop_check_interval: float = 0.5):
+        # 仅用于检查停止标志，事件到达时select立即返回
+        self.stop_check_interval = stop_check_interval
+
+    def is_available(self) -> bool:
+        return platform.system() == 'Linux' and hasattr(socket, 'AF_NETLINK')
+
+    def open_socket(self) -> socket.socket:
+        """创建并绑定rtnetlink组播socket"""
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        sock.bind((0, self.GROUPS))
+        return sock
+
+    def run(self, emit: EmitCallback, should_stop: StopCheck):
+        sock = self.open_socket()
+        logger.info("rtnetlink网络监听已启动")
+        try:
+            while not should_stop():
+                readable, _, _ = select.select([sock], [], [], self.stop_check_interval)
+                if not readable:
+                    continue
+
+                try:
+                    data = sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    # ENOBUFS: 内核缓冲溢出，丢失了部分事件，按全量变化处理
+                    if e.errno == errno.ENOBUFS:
+                        emit("网络状态变化（事件溢出）", set())
+                        continue
+                    raise
+
+                # 同一数据报内的事件按类型合并
+                grouped: Dict[str, Set[str]] = {}
+                for event_type, index in parse_netlink_messages(data):
+                    adapters = grouped.setdefault(event_type, set())
+                    name = _index_to_name(index)
+                    if name:
+                        adapters.add(name)
+
+                for event_type, adapters in grouped.items():
+                    emit(event_type, adapters)
+        finally:
+            sock.close()
+
+
+class WMIMonitorBackend(MonitorBackend):
+    """Windows WMI 事件监听后端"""
+
+    name = "wmi"
+
+    # WMI内部事件由提供程序按WITHIN间隔轮询，不启动任何外部进程
+    WQL = (
+        "SELECT * FROM __InstanceModificationEvent WITHIN {within} WHERE "
+        "TargetInstance ISA 'Win32_NetworkAdapter' OR "
+        "TargetInstance ISA 'Win32_NetworkAdapterConfiguration'"
+    )
+
+    def __init__(self, within: float = 0.5, timeout_ms: int = 500):
+        self.within = within
+        self.timeout_ms = timeout_ms
+
+    def is_available(self) -> bool:
+        if platform.system() != 'Windows':
+            return False
+        try:
+            import wmi  # noqa: F401
+            import pythoncom  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def run(self, emit: EmitCallback, should_stop: StopCheck):
+        import wmi
+        import pythoncom
+
+        pythoncom.CoInitialize()
+        try:
+            c = wmi.WMI()
+            # 单个watcher同时覆盖状态和配置变化，避免两个watcher串行等待
+            watcher = c.watch_for(raw_wql=self.WQL.format(within=self.within))
+            logger.info("WMI网络监听已启动")
+
+            while not should_stop():
+                try:
+                    event = watcher(timeout_ms=self.timeout_ms)
+                except wmi.x_wmi_timed_out:
+                    continue
+
+                emit(self._event_type(event), self._event_adapters(event))
+        finally:
+            pythoncom.CoUninitialize()
+
+    @staticmethod
+    def _event_type(event) -> str:
+        """根据事件实例类型生成事件描述"""
+        if getattr(event, 'NetConnectionID', None) is not None:
+            return "网络适配器状态变化"
+        return "网络适配器配置变化"
+
+    @staticmethod
+    def _event_adapters(event) -> Set[str]:
+        """提取受影响的网卡（连接名优先，其次为Index）"""
+        connection_id = getattr(event, 'NetConnectionID', None)
+        if connection_id:
+            return {connection_id}
+        index = getattr(event, 'Index', None)
+        return {str(index)} if index is not None else set()
+
+
+class PollingMonitorBackend(MonitorBackend):
+    """
+    结构化指纹轮询后端（兜底方案）
+
+    指纹只读取接口表、系统文件和各网卡的地址，不启动子进程也不做主机名解析；
+    连续无变化时轮询间隔指数退避，检测到变化后恢复最小间隔
+    """
+
+    name = "polling"
+
+    ADDRESSES_KEY = "*addresses"
+
+    def __init__(self, min_interval: float = 2.0, max_interval: float = 30.0,
+                 backoff_factor: float = 2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+        self._hostname = None
+
+    def is_available(self) -> bool:
+        return True
+
+    def next_interval(self, changed: bool) -> float:
+        """计算下一次轮询间隔"""
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff_factor)
+        return self.interval
+
+    def get_fingerprint(self) -> Dict[str, tuple]:
+        """获取当前网络状态的结构化指纹: {接口名: 状态元组}"""
+        fingerprint = {}
+
+        try:
+            interfaces = socket.if_nameindex()
+        except OSError:
+            interfaces = []
+
+        ipv6 = self._read_proc_ipv6()
+        readable = ipv6 is not None
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for index, name in interfaces:
+                state = (index,) + self._read_sysfs_state(name)
+                if readable:
+                    ipv4 = self._read_ipv4_address(sock, name)
+                    state += (ipv4,) + tuple(sorted(ipv6.get(name, ())))
+                fingerprint[name] = state
+
+        if not readable:
+            # 无法按网卡读取地址时以本机地址集合作为特殊键（主机名只查询一次）
+            fingerprint[self.ADDRESSES_KEY] = self._resolve_host_addresses()
+
+        return fingerprint
+
+    @staticmethod
+    def _read_ipv4_address(sock: socket.socket, name: str) -> str:
+        """通过SIOCGIFADDR读取网卡的主IPv4地址，未配置地址时为空"""
+        import fcntl
+
+        try:
+            request = struct.pack('256s', name.encode('utf-8')[:15])
+            return socket.inet_ntoa(fcntl.ioctl(sock.fileno(), _SIOCGIFADDR, request)[20:24])
+        except OSError:
+            return ''
+
+    @staticmethod
+    def _read_proc_ipv6() -> Optional[Dict[str, List[str]]]:
+        """
+        读取 /proc/net/if_inet6 中各网卡的IPv6地址
+
+        Returns:
+            dict: {接口名: [地址(十六进制)]}，不是Linux或无法读取时为None
+        """
+        if platform.system() != 'Linux':
+            return None
+        addresses = {}
+        try:
+            with open(PROC_IF_INET6, 'r', encoding='ascii') as fh:
+                for line in fh:
+                    fields = line.split()
+                    if len(fields) >= 6:
+                        addresses.setdefault(fields[5], []).append(fields[0])
+        except OSError:
+            # 系统未启用IPv6时文件不存在，仍可按网卡读取IPv4地址
+            pass
+        return addresses
+
+    def _resolve_host_addresses(self) -> tuple:
+        """本机主机名解析出的地址集合"""
+        if self._hostname is None:
+            self._hostname = socket.gethostname()
+        try:
+            infos = socket.getaddrinfo(self._hostname, None)
+        except OSError:
+            return ()
+        return tuple(sorted({info[4][0] for info in infos}))
+
+    @staticmethod
+    def _read_sysfs_state(name: str) -> tuple:
+        """读取Linux sysfs中的链路状态（其他平台返回空元组）"""
+        base = f"/sys/class/net/{name}"
+        if not os.path.isdir(base):
+            return ()
+
+        state = []
+        for attr in ('operstate', 'carrier', 'address'):
+            try:
+                with open(os.path.join(base, attr), 'r', encoding='utf-8') as fh:
+                    state.append(fh.read().strip())
+            except OSError:
+                state.append('')
+        return tuple(state)
+
+    @classmethod
+    def diff_fingerprints(cls, old: Dict[str, tuple], new: Dict[str, tuple]) -> Set[str]:
+        """比较两个指纹，返回发生变化的接口集合"""
+        changed = set()
+        for name in set(old) | set(new):
+            if old.get(name) != new.get(name):
+                changed.add(name)
+        return changed
+
+    def run(self, emit: EmitCallback, should_stop: StopCheck, sleep=None):
+        import time
+        sleep = sleep or time.sleep
+
+        logger.info("使用指纹轮询模式监听网络变化")
+        previous = self.get_fingerprint()
+        self.interval = self.min_interval
+
+        while not should_stop():
+            # 分段睡眠，保证停止请求能及时响应
+            remaining = self.interval
+            while remaining > 0 and not should_stop():
+                step = min(0.5, remaining)
+                sleep(step)
+                remaining -= step
+            if should_stop():
+                break
+
+            current = self.get_fingerprint()
+            changed = self.diff_fingerprints(previous, current)
+            if changed:
+                adapters = {name for name in changed if name != self.ADDRESSES_KEY}
+                emit("网络状态变化（轮询检测）", adapters)
+                previous = current
+
+            self.next_interval(bool(changed))
+
+
+def get_default_backends() -> List[MonitorBackend]:
+    """按优先级返回当前平台的候选后端"""
+    return [NetlinkMonitorBackend(), WMIMonitorBackend(), PollingMonitorBackend()]
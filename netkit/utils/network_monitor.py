@@ -2,25 +2,150 @@
 # -*- coding: utf-8 -*-
 """
 网络监听服务
-使用WMI事件监听网络适配器变化
+按平台选择事件驱动后端（rtnetlink / WMI事件），失败时退回指纹轮询
 """
 
 import threading
 import time
-import subprocess
-import logging
-from typing import Callable, Optional
+from typing import Callable, List, Optional, Set
+
+from .monitor_backends import MonitorBackend, get_default_backends
+
+
+class NetworkChangeEvent(str):
+    """
+    合并后的网络变化事件
+
+    继承自str以兼容只接收事件类型字符串的旧回调，
+    同时携带本次突发中涉及的全部事件类型和网卡
+    """
+    
+    def __new__(cls, event_types: List[str], adapters: Set[str]):
+        obj = super().__new__(cls, "、".join(event_types))
+        obj.event_types = list(event_types)
+        obj.adapters = frozenset(adapters)
+        return obj
+
+
+class EventCoalescer:
+    """
+    后沿触发的事件合并器
+
+    突发事件在静默 settle_interval 后合并为一次分发；
+    持续不断的突发最迟在 max_wait 后强制分发一次。
+    分发在独立工作线程中执行，慢回调不会阻塞事件来源线程
+    """
+    
+    def __init__(self, dispatch: Callable[[NetworkChangeEvent], None],
+                 settle_interval: float = 0.5, max_wait: float = 3.0):
+        self.dispatch = dispatch
+        self.settle_interval = settle_interval
+        self.max_wait = max_wait
+        
+        self._cond = threading.Condition()
+        self._running = False
+        self._worker = None
+        
+        # 当前突发的累积状态
+        self._event_types: List[str] = []
+        self._adapters: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        
+        self.dispatched_count = 0
+    
+    def start(self):
+        """启动分发线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+    
+    def stop(self, timeout: float = 2.0):
+        """停止分发线程（丢弃未分发的事件）"""
+        with self._cond:
+            self._running = False
+            self._reset()
+            self._cond.notify_all()
+        if self._worker and self._worker is not threading.current_thread():
+            self._worker.join(timeout=timeout)
+    
+    def submit(self, event_type: str, adapters: Optional[Set[str]] = None):
+        """提交一个事件（线程安全，立即返回）"""
+        with self._cond:
+            now = time.monotonic()
+            if not self._event_types:
+                self._first_event = now
+            if event_type not in self._event_types:
+                self._event_types.append(event_type)
+            self._adapters.update(adapters or ())
+            self._last_event = now
+            self._cond.notify_all()
+    
+    def has_pending(self) -> bool:
+        """是否有尚未分发的事件"""
+        with self._cond:
+            return bool(self._event_types)
+    
+    def _reset(self):
+        self._event_types = []
+        self._adapters = set()
+    
+    def _run(self):
+        """工作线程：等待突发结束后分发"""
+        while True:
+            with self._cond:
+                while self._running:
+                    if not self._event_types:
+                        self._cond.wait()
+                        continue
+                    
+                    deadline = min(self._last_event + self.settle_interval,
+                                   self._first_event + self.max_wait)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                
+                if not self._running:
+                    return
+                
+                event = NetworkChangeEvent(self._event_types, self._adapters)
+                self._reset()
+            
+            # 在锁外执行回调，期间到达的新事件进入下一批
+            try:
+                self.dispatch(event)
+            finally:
+                self.dispatched_count += 1
 
 
 class NetworkMonitor:
     """网络适配器监听器"""
     
-    def __init__(self):
+    def __init__(self, backends: Optional[List[MonitorBackend]] = None):
         self.is_monitoring = False
         self.monitor_thread = None
         self.callbacks = []
         self.last_event_time = 0
-        self.event_debounce_interval = 1.0  # 事件防抖间隔1秒
+        self.event_debounce_interval = 0.5  # 突发静默0.5秒后分发
+        self.event_max_wait = 3.0  # 持续突发最多等待3秒
+        
+        # 事件合并器（回调在其工作线程中执行）
+        self.coalescer = None
+        
+        # 候选后端（按优先级），当前生效的后端
+        self.backends = backends if backends is not None else get_default_backends()
+        self.active_backend = None
+        
+        # 原始事件监听器（不经合并，在后端线程中同步调用，必须轻量）
+        self.event_listeners = []
+        
+        # 最近一次事件涉及的网卡
+        self.last_event_adapters: Set[str] = set()
+        self.event_count = 0
         
     def add_callback(self, callback: Callable):
         """添加网络变化回调函数"""
@@ -32,12 +157,23 @@ class NetworkMonitor:
         if callback in self.callbacks:
             self.callbacks.remove(callback)
     
+    def add_event_listener(self, listener: Callable):
+        """添加原始事件监听器 listener(event_type, adapters)"""
+        if listener not in self.event_listeners:
+            self.event_listeners.append(listener)
+    
+    def remove_event_listener(self, listener: Callable):
+        """移除原始事件监听器"""
+        if listener in self.event_listeners:
+            self.event_listeners.remove(listener)
+    
     def start_monitoring(self):
         """开始监听网络适配器变化"""
         if self.is_monitoring:
             return
             
         self.is_monitoring = True
+        self._ensure_coalescer()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         
@@ -46,125 +182,76 @@ class NetworkMonitor:
         self.is_monitoring = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+        if self.coalescer:
+            self.coalescer.stop()
+            self.coalescer = None
+    
+    def _ensure_coalescer(self):
+        """按当前参数创建并启动事件合并器"""
+        if self.coalescer is None:
+            self.coalescer = EventCoalescer(
+                self._dispatch_callbacks,
+                settle_interval=self.event_debounce_interval,
+                max_wait=self.event_max_wait
+            )
+            self.coalescer.start()
     
     def _monitor_loop(self):
-        """监听循环"""
-        try:
-            # 尝试使用WMI事件监听
-            if self._try_wmi_monitoring():
+        """监听循环：依次尝试可用后端，异常时切换到下一个"""
+        for backend in self.backends:
+            if not self.is_monitoring:
                 return
-        except Exception as e:
-            print(f"WMI监听失败，切换到轮询模式: {e}")
-        
-        # 如果WMI失败，使用轮询模式
-        self._polling_monitoring()
-    
-    def _try_wmi_monitoring(self):
-        """尝试使用WMI事件监听"""
-        try:
-            import wmi
-            import pythoncom
-            
-            # 初始化COM环境
-            pythoncom.CoInitialize()
+            if not backend.is_available():
+                continue
             
+            self.active_backend = backend
             try:
-                # 创建WMI连接
-                c = wmi.WMI()
-                
-                # 监听网络适配器配置变化事件
-                adapter_watcher = c.Win32_NetworkAdapterConfiguration.watch_for(
-                    notification_type="modification"
-                )
-                
-                # 监听网络适配器状态变化事件
-                status_watcher = c.Win32_NetworkAdapter.watch_for(
-                    notification_type="modification"
-                )
-                
-                print("WMI网络监听已启动")
-                
-                while self.is_monitoring:
-                    try:
-                        # 检查配置变化事件（超时1秒）
-                        if adapter_watcher(timeout_ms=1000):
-                            self._trigger_callbacks("网络适配器配置变化")
-                        
-                        # 检查状态变化事件（超时1秒）
-                        if status_watcher(timeout_ms=1000):
-                            self._trigger_callbacks("网络适配器状态变化")
-                            
-                    except Exception as e:
-                        if self.is_monitoring:
-                            print(f"WMI事件监听错误: {e}")
-                            time.sleep(1)
-                
-                return True
-                
-            finally:
-                # 清理COM环境
-                pythoncom.CoUninitialize()
-            
-        except ImportError:
-            print("WMI模块未安装，使用轮询模式")
-            return False
-        except Exception as e:
-            print(f"WMI监听初始化失败: {e}")
-            return False
-    
-    def _polling_monitoring(self):
-        """轮询模式监听"""
-        print("使用轮询模式监听网络变化")
-        
-        # 获取初始网络状态
-        previous_state = self._get_network_state()
+                backend.run(self._on_backend_event, self._should_stop)
+                return
+            except Exception as e:
+                if self.is_monitoring:
+                    print(f"{backend.name}监听失败，尝试下一种方式: {e}")
         
-        while self.is_monitoring:
+        self.active_backend = None
+    
+    def _should_stop(self) -> bool:
+        """后端检查是否应停止"""
+        return not self.is_monitoring
+    
+    def _on_backend_event(self, event_type: str, adapters: Set[str]):
+        """后端事件入口"""
+        self.event_count += 1
+        for listener in list(self.event_listeners):
             try:
-                time.sleep(2)  # 每2秒检查一次
-                
-                current_state = self._get_network_state()
-                
-                # 比较状态变化
-                if current_state != previous_state:
-                    self._trigger_callbacks("网络状态变化（轮询检测）")
-                    previous_state = current_state
-                    
+                listener(event_type, adapters)
             except Exception as e:
-                if self.is_monitoring:
-                    print(f"轮询监听错误: {e}")
-                    time.sleep(5)
-    
-    def _get_network_state(self):
-        """获取当前网络状态（用于轮询比较）"""
-        try:
-            # 获取网络接口状态
-            cmd = ['netsh', 'interface', 'show', 'interface']
-            result = subprocess.run(cmd, capture_output=True, text=True, 
-                                  encoding='utf-8', timeout=10)
-            
-            if result.returncode == 0:
-                return result.stdout
-            else:
-                return ""
-                
-        except Exception:
-            return ""
+                print(f"事件监听器执行错误: {e}")
+        self._trigger_callbacks(event_type, adapters)
     
-    def _trigger_callbacks(self, event_type: str):
-        """触发回调函数（带防抖）"""
-        current_time = time.time()
-        
-        # 事件防抖
-        if (current_time - self.last_event_time) < self.event_debounce_interval:
+    def get_monitor_info(self) -> dict:
+        """获取监听器运行信息"""
+        return {
+            'is_monitoring': self.is_monitoring,
+            'backend': self.active_backend.name if self.active_backend else None,
+            'event_count': self.event_count,
+            'last_event_adapters': sorted(self.last_event_adapters)
+        }
+    
+    def _trigger_callbacks(self, event_type: str, adapters: Optional[Set[str]] = None):
+        """提交事件到合并器（突发结束后统一触发回调），停止监听后到达的事件直接丢弃"""
+        coalescer = self.coalescer
+        if not self.is_monitoring or coalescer is None:
             return
-            
-        self.last_event_time = current_time
+        self.last_event_time = time.time()
+        coalescer.submit(event_type, adapters)
+    
+    def _dispatch_callbacks(self, event: NetworkChangeEvent):
+        """调用所有回调函数（在合并器工作线程中执行）"""
+        self.last_event_adapters = set(event.adapters)
         
-        # 调用所有回调函数
-        for callback in self.callbacks:
+        for callback in list(self.callbacks):
             try:
-                callback(event_type)
+                callback(event)
             except Exception as e:
                 print(f"回调函数执行错误: {e}")
 
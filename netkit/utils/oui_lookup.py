@@ -0,0 +1,209 @@
+"""
+OUI厂商数据库模块
+将IEEE OUI注册表编译为紧凑的二进制文件（排序的uint32前缀数组 + 字符串表），
+运行时通过mmap映射并用二分查找，MAC地址查厂商无需在导入时加载大字典
+
+文件格式（小端）:
+    头部   8字节魔数 | uint32 条目数 | uint32 字符串表字节数
+    前缀表 条目数 × uint32（24位OUI，升序）
+    偏移表 条目数 × uint32（厂商名在字符串表中的起始偏移）
+    字符串表 以NUL结尾的UTF-8厂商名（去重）
+"""
+
+import os
+import re
+import csv
+import sys
+import mmap
+import struct
+import bisect
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+MAGIC = b'NKOUI\x00\x01\x00'
+HEADER = struct.Struct('<8sII')
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+DEFAULT_DB_PATH = os.path.join(DATA_DIR, 'oui.bin')
+
+_HEX_DIGITS = re.compile(r'[^0-9A-Fa-f]')
+
+
+def mac_to_oui(mac: str) -> Optional[int]:
+    """提取MAC地址的24位OUI，格式无效时返回None"""
+    if not mac:
+        return None
+    digits = _HEX_DIGITS.sub('', mac)
+    if len(digits) < 6:
+        return None
+    return int(digits[:6], 16)
+
+
+def parse_ieee_registry(lines: Iterable[str]) -> Iterable[Tuple[int, str]]:
+    """
+    解析IEEE OUI注册表
+
+    支持 oui.csv（Registry,Assignment,Organization Name,...）
+    和 oui.txt（"00-00-0C   (hex)		Cisco Systems, Inc"）两种格式，只取MA-L条目
+    """
+    lines = list(lines)
+    if lines and lines[0].startswith('Registry,'):
+        for row in csv.DictReader(lines):
+            if row.get('Registry', 'MA-L') != 'MA-L':
+                continue
+            assignment = (row.get('Assignment') or '').strip()
+            vendor = (row.get('Organization Name') or '').strip()
+            if len(assignment) == 6 and vendor:
+                yield int(assignment, 16), vendor
+        return
+
+    for line in lines:
+        if '(hex)' not in line:
+            continue
+        prefix, _, vendor = line.partition('(hex)')
+        digits = _HEX_DIGITS.sub('', prefix)
+        vendor = vendor.strip()
+        if len(digits) == 6 and vendor:
+            yield int(digits, 16), vendor
+
+
+def compile_oui_database(entries: Iterable[Tuple[int, str]], path: str) -> int:
+    """
+    将(OUI, 厂商名)条目编译为二进制数据库
+
+    Returns:
+        int: 写入的条目数
+    """
+    by_prefix: Dict[int, str] = {}
+    for prefix, vendor in entries:
+        by_prefix[prefix] = vendor
+
+    strings = bytearray()
+    string_offsets: Dict[str, int] = {}
+    prefixes, offsets = [], []
+    for prefix in sorted(by_prefix):
+        vendor = by_prefix[prefix]
+        if vendor not in string_offsets:
+            string_offsets[vendor] = len(strings)
+            strings += vendor.encode('utf-8') + b'\x00'
+        prefixes.append(prefix)
+        offsets.append(string_offsets[vendor])
+
+    count = len(prefixes)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, len(strings)))
+        f.write(struct.pack(f'<{count}I', *prefixes))
+        f.write(struct.pack(f'<{count}I', *offsets))
+        f.write(bytes(strings))
+    return count
+
+
+class OUIDatabase:
+    """内存映射的OUI厂商数据库"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.mmap = None
+        self.prefixes = None
+        self.offsets = None
+        self.strings_start = 0
+        self.count = 0
+        self.loaded = False
+        self.vendor_cache: Dict[int, str] = {}
+
+    def _load(self):
+        """首次查询时映射文件"""
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            try:
+                self.file = open(self.path, 'rb')
+                self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                self.close()
+                return
+
+            magic, count, _ = HEADER.unpack_from(self.mmap, 0)
+            if magic != MAGIC:
+                self.close()
+                return
+
+            view = memoryview(self.mmap)
+            table_start = HEADER.size
+            table_end = table_start + count * 4
+            prefixes = view[table_start:table_end]
+            offsets = view[table_end:table_end + count * 4]
+            if sys.byteorder == 'little':
+                self.prefixes = prefixes.cast('I')
+                self.offsets = offsets.cast('I')
+            else:
+                self.prefixes = struct.unpack(f'<{count}I', prefixes)
+                self.offsets = struct.unpack(f'<{count}I', offsets)
+            self.strings_start = table_end + count * 4
+            self.count = count
+
+    def __len__(self):
+        self._load()
+        return self.count
+
+    def lookup_oui(self, oui: int) -> Optional[str]:
+        """按24位OUI查询厂商名"""
+        self._load()
+        if not self.count:
+            return None
+
+        pos = bisect.bisect_left(self.prefixes, oui)
+        if pos >= self.count or self.prefixes[pos] != oui:
+            return None
+
+        offset = self.offsets[pos]
+        vendor = self.vendor_cache.get(offset)
+        if vendor is None:
+            start = self.strings_start + offset
+            end = self.mmap.find(b'\x00', start)
+            vendor = self.mmap[start:end].decode('utf-8')
+            self.vendor_cache[offset] = vendor
+        return vendor
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """按MAC地址查询厂商名，未知或本地管理地址返回None"""
+        oui = mac_to_oui(mac)
+        if oui is None or oui & 0x020000:
+            return None
+        return self.lookup_oui(oui)
+
+    def close(self):
+        """释放内存映射"""
+        self.prefixes = None
+        self.offsets = None
+        self.count = 0
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                pass
+            self.mmap = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# 全局OUI数据库
+_oui_database = None
+
+
+def get_oui_database() -> OUIDatabase:
+    """获取OUI数据库实例（文件在首次查询时才映射）"""
+    global _oui_database
+    if _oui_database is None:
+        _oui_database = OUIDatabase()
+    return _oui_database
+
+
+def lookup_vendor(mac: str) -> Optional[str]:
+    """按MAC地址查询厂商名"""
+    return get_oui_database().lookup(mac)
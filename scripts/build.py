@@ -97,6 +97,14 @@ def install_dependencies():
     
     return True
 
+def build_oui_database():
+    """从IEEE下载完整注册表编译OUI厂商数据库（下载失败时保留种子数据并继续构建）"""
+    print("Building OUI vendor database...")
+    
+    if not run_command([sys.executable, str(Path('scripts') / 'build_oui_db.py'), '--download'], shell=False):
+        print("Warning: full OUI registry unavailable, bundling the seed database")
+    return True
+
 def build_executable():
     """构建可执行文件"""
     print("Building executable...")
@@ -170,6 +178,7 @@ def main():
     steps = [
         ("Clean build directories", clean_build_dirs),
         ("Install dependencies", install_dependencies),
+        ("Build OUI database", build_oui_database),
         ("Build executable", build_executable),
         ("Copy to releases", copy_to_releases),
     ]
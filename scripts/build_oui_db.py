@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OUI厂商数据库编译脚本
+将IEEE OUI注册表（oui.csv 或 oui.txt）编译为 netkit/data/oui.bin
+
+用法:
+    python scripts/build_oui_db.py [注册表文件] [输出文件]
+    python scripts/build_oui_db.py --download [输出文件]
+
+不指定注册表文件时使用随包附带的 netkit/data/oui_seed.csv（只含常见厂商）；
+--download 从IEEE下载完整注册表后编译，下载失败时退回种子文件并返回非0。
+发布构建(scripts/build.py)使用 --download 生成完整数据库
+"""
+
+import sys
+import os
+import time
+import urllib.request
+
+# 添加项目根目录到路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netkit.utils.oui_lookup import (
+    DATA_DIR,
+    DEFAULT_DB_PATH,
+    parse_ieee_registry,
+    compile_oui_database
+)
+
+IEEE_REGISTRY_URL = 'https://standards-oui.ieee.org/oui/oui.csv'
+SEED_PATH = os.path.join(DATA_DIR, 'oui_seed.csv')
+
+
+def download_registry(url=IEEE_REGISTRY_URL, timeout=60):
+    """下载IEEE注册表，返回文本行"""
+    request = urllib.request.Request(url, headers={'User-Agent': 'NetKit-build'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read().decode('utf-8', errors='replace').splitlines(keepends=True)
+
+
+def read_registry(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.readlines()
+
+
+def main(argv=None):
+    args = list(sys.argv[1:] if argv is None else argv)
+    download = '--download' in args
+    if download:
+        args.remove('--download')
+
+    exit_code = 0
+    if download:
+        output = args[0] if args else DEFAULT_DB_PATH
+        try:
+            lines = download_registry()
+            source = IEEE_REGISTRY_URL
+        except OSError as e:
+            print(f"下载OUI注册表失败，使用种子文件: {e}")
+            lines = read_registry(SEED_PATH)
+            source = SEED_PATH
+            exit_code = 1
+    else:
+        source = args[0] if args else SEED_PATH
+        output = args[1] if len(args) > 1 else DEFAULT_DB_PATH
+        lines = read_registry(source)
+
+    start_time = time.time()
+    count = compile_oui_database(parse_ieee_registry(lines), output)
+
+    print(f"已从 {source} 编译 {count} 条OUI记录: {output}")
+    print(f"文件大小: {os.path.getsize(output) / 1024:.1f}KB，耗时 {time.time() - start_time:.2f}秒")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -78,7 +78,13 @@ a = Analysis(
         'gui.views.ping_view',
         'gui.views.subnet_view',
         'gui.views.traceroute_view',
+        # 视图模块由 gui.main.VIEW_SPECS 在首次导航时按需导入，无法被静态追踪
+        'gui.views.netconfig.netconfig_view',
         'gui.views.route.route_view',
+        'gui.views.ping.visual_ping_view',
+        'gui.views.subnet.subnet_view',
+        # 只被按需导入的视图使用的第三方库
+        'pyperclip',
         'netkit',
         'netkit.services',
         'netkit.services.ip_switcher',
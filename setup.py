@@ -30,6 +30,9 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/iam189cm/NetKit",
     packages=find_packages(),
+    package_data={
+        "netkit": ["data/oui.bin", "data/oui_seed.csv"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: System Administrators",
@@ -62,7 +65,8 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "netkit=scripts.start:main",
+            "netkit=gui.main:main",
+            "netkit-cli=netkit.cli:main",
         ],
     },
     include_package_data=True,
@@ -16,6 +16,8 @@ from tests.fixtures import *
 # 设置测试模式
 os.environ['NETKIT_TEST_MODE'] = '1'
 os.environ['NETKIT_LOCAL_TEST'] = '1'
+# 系统命令在单元测试中由mock接管，不启动长驻shell会话
+os.environ.setdefault('NETKIT_PERSISTENT_SHELL', '0')
 
 
 @pytest.fixture(scope="session")
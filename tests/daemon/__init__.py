@@ -0,0 +1 @@
+# NetKit 守护进程测试模块
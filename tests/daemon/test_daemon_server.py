@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地守护进程测试
+验证JSON-RPC往返、相同并发请求合并、中间结果推送和快照缓存
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import pytest
+from unittest.mock import patch
+
+from netkit.daemon import protocol
+from netkit.daemon.server import DaemonServer, SingleFlight, SnapshotCache, register_default_methods
+from netkit.daemon.client import DaemonClient, is_daemon_running
+from netkit.daemon.protocol import RPCError
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="测试使用Unix域套接字")
+
+
+@pytest.fixture(autouse=True)
+def runtime_base(tmp_path, monkeypatch):
+    """运行时目录（认证密钥所在处）放在测试临时目录下"""
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.delenv('NETKIT_DAEMON_ADDRESS', raising=False)
+    return tmp_path
+
+
+@pytest.fixture
+def address():
+    """短路径的临时套接字地址（Unix套接字路径长度有限制）"""
+    directory = tempfile.mkdtemp(prefix='nkd')
+    yield os.path.join(directory, 'd.sock')
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def server(address):
+    server = DaemonServer(address)
+    yield server
+    server.stop()
+
+
+class TestRoundTrip:
+    """请求往返测试"""
+
+    def test_ping_and_custom_method(self, server):
+        """内置方法和注册的方法都可以调用"""
+        server.register('math.add', lambda params, emit: params['a'] + params['b'])
+        server.start()
+
+        with DaemonClient(server.address) as client:
+            assert client.call('daemon.ping') == 'pong'
+            assert client.call('math.add', a=2, b=3) == 5
+            assert client.call('math.add', a=1, b=1) == 2
+
+    def test_unknown_method(self, server):
+        """未知方法返回METHOD_NOT_FOUND"""
+        server.start()
+
+        with DaemonClient(server.address) as client:
+            with pytest.raises(RPCError) as exc:
+                client.call('no.such.method')
+        assert exc.value.code == protocol.METHOD_NOT_FOUND
+
+    def test_handler_errors(self, server):
+        """参数错误和内部错误映射为对应的错误码"""
+        server.register('bad.params', lambda params, emit: params['missing'])
+        server.register('boom', lambda params, emit: 1 / 0)
+        server.start()
+
+        with DaemonClient(server.address) as client:
+            with pytest.raises(RPCError) as exc:
+                client.call('bad.params')
+            assert exc.value.code == protocol.INVALID_PARAMS
+
+            with pytest.raises(RPCError) as exc:
+                client.call('boom')
+            assert exc.value.code == protocol.SERVER_ERROR
+
+            # 出错后连接仍可继续使用
+            assert client.call('daemon.ping') == 'pong'
+
+    def test_daemon_not_running(self, address):
+        """守护进程未运行时连接失败"""
+        assert is_daemon_running(address) is False
+        with pytest.raises(ConnectionError):
+            DaemonClient(address).connect()
+
+
+class TestDedupe:
+    """相同并发请求合并测试"""
+
+    def test_identical_concurrent_requests_execute_once(self, server):
+        """多个客户端同时发出相同请求，处理函数只执行一次"""
+        calls = []
+        release = threading.Event()
+
+        def slow(params, emit):
+            calls.append(params)
+            release.wait(5)
+            return {'routes': params['n']}
+
+        server.register('slow', slow)
+        server.start()
+
+        results = []
+
+        def worker():
+            with DaemonClient(server.address) as client:
+                results.append(client.call('slow', n=7))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + 5
+        while server.single_flight.stats['shared'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [{'routes': 7}] * 4
+        assert len(calls) == 1
+        assert server.single_flight.stats == {'executed': 1, 'shared': 3}
+
+    def test_different_params_not_merged(self):
+        """参数不同的请求分别执行"""
+        flights = SingleFlight()
+        done = []
+        first = flights.join('a', lambda flight: flight.finish(result=1))
+        second = flights.join('b', lambda flight: flight.finish(result=2))
+        for flight in (first, second):
+            list(flight.follow())
+            done.append(flight.result)
+
+        assert done == [1, 2]
+        assert flights.stats['executed'] == 2
+
+    def test_non_dedupe_methods_run_every_time(self, server):
+        """dedupe=False 的方法每次请求都执行"""
+        calls = []
+        server.register('mutate', lambda params, emit: calls.append(1) or len(calls), dedupe=False)
+
+        flights = [server.dispatch('mutate', {}) for _ in range(3)]
+        for flight in flights:
+            list(flight.follow())
+
+        assert len(calls) == 3
+
+
+class TestStreaming:
+    """中间结果推送测试"""
+
+    def test_progress_events_streamed(self, server):
+        """批量方法逐条推送中间结果，最后返回汇总"""
+        def batch(params, emit):
+            for i in range(params['n']):
+                emit({'index': i})
+            return {'total': params['n']}
+
+        server.register('batch', batch)
+        server.start()
+
+        with DaemonClient(server.address) as client:
+            stream = client.stream('batch', n=3)
+            events = []
+            try:
+                while True:
+                    events.append(next(stream))
+            except StopIteration as stop:
+                summary = stop.value
+
+        assert events == [{'index': 0}, {'index': 1}, {'index': 2}]
+        assert summary == {'total': 3}
+
+    def test_late_joiner_replays_events(self):
+        """中途加入的等待者从头回放已产生的中间结果"""
+        flights = SingleFlight()
+        step = threading.Event()
+
+        def run(flight):
+            flight.emit(1)
+            step.wait(5)
+            flight.emit(2)
+            flight.finish(result='done')
+
+        leader = flights.join('k', run)
+        time.sleep(0.05)
+        follower = flights.join('k', run)
+        step.set()
+
+        assert follower is leader
+        assert list(follower.follow()) == [1, 2]
+        assert list(leader.follow()) == [1, 2]
+        assert leader.result == 'done'
+
+
+class TestSnapshots:
+    """快照缓存测试"""
+
+    def test_snapshot_ttl_and_invalidate(self):
+        """有效期内命中缓存，失效后重新加载，失败结果不缓存"""
+        results = iter([{'success': False}, {'success': True, 'n': 1}, {'success': True, 'n': 2}])
+        snapshot = SnapshotCache(lambda: next(results), ttl=60,
+                                 is_valid=lambda value: value['success'])
+
+        assert snapshot.get() == {'success': False}
+        assert snapshot.get() == {'success': True, 'n': 1}
+        assert snapshot.get() == {'success': True, 'n': 1}
+        snapshot.invalidate()
+        assert snapshot.get() == {'success': True, 'n': 2}
+        assert snapshot.stats == {'hits': 1, 'loads': 3}
+
+    def test_route_table_shared_and_invalidated_by_changes(self, server):
+        """路由表在请求间共享，增删路由后失效"""
+        raw = "IPv4 Route Table\n 0.0.0.0  0.0.0.0  192.168.1.1  192.168.1.100  25\nIPv6 Route Table\n"
+        with patch('netkit.services.route.route_manager.RouteManager.get_system_routes',
+                   return_value={'success': True, 'raw_output': raw}) as get_routes, \
+             patch('netkit.services.route.route_manager.RouteManager.add_system_route',
+                   return_value={'success': True, 'message': 'ok'}):
+            register_default_methods(server, preload_adapters=False)
+
+            def call(method, **params):
+                flight = server.dispatch(method, params)
+                list(flight.follow())
+                return flight.result
+
+            first = call('route.table')
+            call('route.table')
+            assert get_routes.call_count == 1
+            assert first['routes'][0]['gateway'] == '192.168.1.1'
+            assert 'raw_output' not in first
+
+            assert call('route.add', destination='10.0.0.0', netmask='255.0.0.0',
+                        gateway='192.168.1.1')['success'] is True
+            call('route.table')
+            assert get_routes.call_count == 2
+
+    def test_subnet_divide_paged(self, server):
+        """子网划分按页返回，单页大小有上限"""
+        from netkit.daemon.server import SUBNET_PAGE_SIZE
+
+        register_default_methods(server, preload_adapters=False)
+
+        def call(method, **params):
+            flight = server.dispatch(method, params)
+            list(flight.follow())
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        params = dict(ip='10.0.0.0', mask='/8', divide_by='hosts', value=2)
+        first = call('subnet.divide', **params)
+        later = call('subnet.divide', start=1000, limit=2, **params)
+
+        assert first['total'] == 1 << 22
+        assert len(first['subnets']) == SUBNET_PAGE_SIZE
+        assert first['subnets'][1]['cidr_notation'] == '10.0.0.4/30'
+        assert [s['cidr_notation'] for s in later['subnets']] == ['10.0.15.160/30', '10.0.15.164/30']
+        assert len(call('subnet.divide', limit=10 ** 9, **params)['subnets']) == SUBNET_PAGE_SIZE
+        with pytest.raises(RPCError) as exc:
+            call('subnet.divide', start=-1, **params)
+        assert exc.value.code == protocol.INVALID_PARAMS
+
+
+class TestLifecycle:
+    """启动/停止测试"""
+
+    def test_refuses_second_daemon(self, server):
+        """同一地址上不能启动第二个守护进程"""
+        server.start()
+        assert is_daemon_running(server.address) is True
+
+        with pytest.raises(RuntimeError):
+            DaemonServer(server.address).start()
+
+    def test_stale_socket_removed(self, address):
+        """残留的套接字文件在启动时被清理"""
+        with open(address, 'w'):
+            pass
+
+        server = DaemonServer(address)
+        try:
+            server.start()
+            assert is_daemon_running(address) is True
+        finally:
+            server.stop()
+        assert is_daemon_running(address) is False
+
+    def test_socket_private_to_user(self, server):
+        """套接字文件创建时即只允许当前用户访问"""
+        from multiprocessing.connection import Listener
+
+        created_modes = []
+
+        def listener(address, **kwargs):
+            result = Listener(address, **kwargs)
+            created_modes.append(os.stat(address).st_mode & 0o777)
+            return result
+
+        with patch('netkit.daemon.server.Listener', side_effect=listener):
+            server.start()
+
+        assert len(created_modes) == 1
+        assert created_modes[0] & 0o077 == 0
+
+
+class TestAccessControl:
+    """运行时目录和认证测试"""
+
+    def test_default_address_in_private_dir(self, runtime_base):
+        """默认套接字位于新建的0700目录中"""
+        address = protocol.default_address()
+        directory = os.path.dirname(address)
+
+        assert os.path.dirname(directory) == str(runtime_base)
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+        assert protocol.runtime_dir() == directory
+
+    def test_rejects_unsafe_runtime_dir(self, runtime_base):
+        """符号链接或权限过宽的运行时目录被拒绝"""
+        directory = os.path.join(str(runtime_base), f'netkit-{protocol._current_user()}')
+
+        os.mkdir(directory, 0o755)
+        os.chmod(directory, 0o755)
+        with pytest.raises(PermissionError):
+            protocol.default_address()
+
+        os.rmdir(directory)
+        target = runtime_base / 'elsewhere'
+        target.mkdir(mode=0o700)
+        os.symlink(str(target), directory)
+        with pytest.raises(PermissionError):
+            protocol.default_address()
+
+    def test_auth_key_stable_and_private(self):
+        """认证密钥生成一次后复用，文件仅当前用户可读"""
+        key = protocol.auth_key()
+
+        assert len(key) == 32
+        assert protocol.auth_key() == key
+        assert os.stat(os.path.join(protocol.runtime_dir(), 'daemon.key')).st_mode & 0o077 == 0
+
+    def test_impostor_rejected(self, address):
+        """客户端拒绝不持有当前用户密钥的监听者，守护进程拒绝不持有密钥的客户端"""
+        impostor = DaemonServer(address, authkey=b'impostor')
+        impostor.start()
+        try:
+            assert is_daemon_running(address) is False
+            with pytest.raises(ConnectionError):
+                DaemonClient(address).connect()
+            with pytest.raises(RuntimeError):
+                DaemonServer(address).start()
+        finally:
+            impostor.stop()
+
+        server = DaemonServer(address)
+        server.start()
+        try:
+            assert is_daemon_running(address) is True
+            with pytest.raises(ConnectionError):
+                DaemonClient(address, authkey=b'impostor').connect()
+            # 拒绝后仍继续接受合法连接
+            assert is_daemon_running(address) is True
+        finally:
+            server.stop()
+
+
+class TestCliClient:
+    """命令行通过守护进程执行测试"""
+
+    def test_route_list_and_ping_via_daemon(self, server):
+        """--daemon 时ping和路由表都由守护进程执行"""
+        import io
+        import json
+        from netkit import cli
+
+        raw = "IPv4 Route Table\n 0.0.0.0  0.0.0.0  192.168.1.1  192.168.1.100  25\nIPv6 Route Table\n"
+        ping_results = {'10.0.0.1': {'success': True, 'packets_sent': 1, 'packets_received': 1},
+                        '10.0.0.2': {'success': False, 'packets_sent': 1, 'packets_received': 0}}
+        with patch('netkit.services.route.route_manager.RouteManager.get_system_routes',
+                   return_value={'success': True, 'raw_output': raw}) as get_routes, \
+             patch('netkit.services.ping.ping_service.PingService.batch_ping',
+                   side_effect=lambda hosts, count, timeout, max_workers, callback: [
+                       callback(host, {'success': ping_results[host]['success']}, ping_results[host],
+                                index, len(hosts))
+                       for index, host in enumerate(hosts, 1)]), \
+             patch.dict(os.environ, {'NETKIT_DAEMON_ADDRESS': server.address}):
+            register_default_methods(server, preload_adapters=False)
+            server.start()
+
+            out = io.StringIO()
+            assert cli.main(['route', 'list', '--daemon'], out=out) == cli.EXIT_OK
+            assert json.loads(out.getvalue())['gateway'] == '192.168.1.1'
+
+            out = io.StringIO()
+            code = cli.main(['ping', '10.0.0.1-10.0.0.2', '--daemon'], out=out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert code == cli.EXIT_FAILURE
+        assert [(r['host'], r['success']) for r in records] == [('10.0.0.1', True), ('10.0.0.2', False)]
+        assert get_routes.call_count == 1
+        assert server.get_stats()['requests'] == 2
+
+    def test_daemon_not_running(self, address, capsys):
+        """守护进程未运行时返回失败退出码"""
+        from netkit import cli
+
+        with patch.dict(os.environ, {'NETKIT_DAEMON_ADDRESS': address}):
+            assert cli.main(['route', 'list', '--daemon']) == cli.EXIT_FAILURE
+        assert '无法连接NetKit守护进程' in capsys.readouterr().err
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大范围扫描热力图测试
+模型和目标解析不依赖Tk；画布相关测试需要可用的显示环境
+"""
+
+import time
+import pytest
+import tkinter as tk
+
+from gui.views.ping.grid_layout import (
+    STATE_INITIAL,
+    STATE_SCANNING,
+    STATE_ONLINE,
+    STATE_OFFLINE,
+    COLORS,
+)
+from gui.views.ping.heatmap_model import HeatmapModel, BACKGROUND_COLOR, blend_color
+from gui.views.ping.scan_controller import ScanController, parse_scan_targets
+
+
+def make_root():
+    """创建隐藏的Tk根窗口，无显示环境时跳过"""
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"无可用显示环境: {e}")
+    root.withdraw()
+    return root
+
+
+class TestScanTargets:
+    """扫描目标解析测试"""
+
+    def test_legacy_prefix(self):
+        """三段网段前缀按/24处理"""
+        targets = parse_scan_targets("192.168.1")
+
+        assert len(targets) == 254
+        assert targets[0] == "192.168.1.1"
+        assert targets[-1] == "192.168.1.254"
+
+    def test_cidr_and_range(self):
+        """支持CIDR和起止范围"""
+        assert len(parse_scan_targets("10.0.0.0/16")) == 65534
+        assert parse_scan_targets("10.0.0.254-10.0.1.1") == [
+            "10.0.0.254", "10.0.0.255", "10.0.1.0", "10.0.1.1"
+        ]
+
+    def test_rejects_oversized_range_without_expanding(self):
+        """超出上限的范围在展开前拒绝"""
+        start = time.perf_counter()
+        with pytest.raises(ValueError, match="扫描范围过大"):
+            parse_scan_targets("10.0.0.0/8")
+        assert time.perf_counter() - start < 0.1
+
+    @pytest.mark.parametrize("text", ["", "   ", "not-an-ip", "example.com", "192.168.1.300/24"])
+    def test_invalid_input(self, text):
+        """无效输入抛出ValueError"""
+        with pytest.raises(ValueError):
+            parse_scan_targets(text)
+
+    def test_controller_indexes_targets(self):
+        """控制器按目标序号回报结果，统计总数随目标数量变化"""
+        class View:
+            def after(self, delay, callback):
+                return 1
+
+        controller = ScanController(View())
+        controller.ping_service.batch_discover = lambda hosts, progress_callback, **kwargs: [
+            progress_callback(host, {}, {'success': True}, i + 1, len(hosts))
+            for i, host in enumerate(hosts)
+        ]
+        targets = parse_scan_targets("10.1.0.0/22")
+
+        assert controller.start_scan(targets)
+        controller.scan_thread.join(timeout=5)
+
+        assert controller.stats['total_count'] == 1022
+        indexes = [item[0] for item in controller.updates.drain()]
+        assert indexes == list(range(1022))
+
+
+class TestHeatmapModel:
+    """热力图模型测试"""
+
+    def test_geometry(self):
+        """/16网段一行即一个/24"""
+        model = HeatmapModel(65534, cols=256)
+
+        assert (model.cols, model.rows) == (256, 256)
+        assert model.canvas_size(1) == (256, 256)
+        assert model.canvas_size(4) == (1024, 1024)
+        assert model.canvas_size(1 / 4) == (64, 64)
+        assert model.fit_scale(800) == 2
+        assert model.fit_scale(100) == 1 / 4
+
+    def test_lod_counts_follow_state_changes(self):
+        """各级聚合方块的计数随单点状态增量更新"""
+        model = HeatmapModel(65534)
+        for index in (0, 1, 256, 257):
+            model.set_state(index, STATE_SCANNING)
+        model.set_state(0, STATE_ONLINE)
+        model.set_state(1, STATE_OFFLINE)
+
+        assert model.block_summary(0, 0, 2) == {STATE_SCANNING: 2, STATE_ONLINE: 1, STATE_OFFLINE: 1}
+        assert model.block_summary(0, 0, 16)[STATE_SCANNING] == 2
+        assert model.set_state(0, STATE_ONLINE) is False
+
+        model.reset()
+        assert model.block_summary(0, 0, 16) == {STATE_SCANNING: 0, STATE_ONLINE: 0, STATE_OFFLINE: 0}
+        assert model.get_state(0) == STATE_INITIAL
+
+    def test_block_colors(self):
+        """聚合方块按在线比例插值，尚无结果时显示扫描中或初始色"""
+        model = HeatmapModel(1024, cols=32)
+
+        assert model.block_color(0, 0, 4) == COLORS[STATE_INITIAL]
+        model.set_state(0, STATE_SCANNING)
+        assert model.block_color(0, 0, 4) == COLORS[STATE_SCANNING]
+
+        model.set_state(0, STATE_ONLINE)
+        model.set_state(1, STATE_OFFLINE)
+        assert model.block_color(0, 0, 4) == blend_color(COLORS[STATE_OFFLINE], COLORS[STATE_ONLINE], 0.5)
+        assert model.block_color(0, 0, 1) == COLORS[STATE_ONLINE]
+
+    def test_partial_last_row(self):
+        """最后一行不满时，网格外的点为背景色"""
+        model = HeatmapModel(300, cols=256)
+        rows = model.render(0, 0, 256, 2, 1)
+
+        assert rows[1][43] == COLORS[STATE_INITIAL]
+        assert rows[1][44] == BACKGROUND_COLOR
+        assert model.block_color(2, 0, 16) == COLORS[STATE_INITIAL]
+        assert model.block_color(0, 1, 16) == BACKGROUND_COLOR
+        assert model.index_at(44, 1, 1) is None
+
+    def test_visible_blocks_clamped(self):
+        """可见范围只包含视口内的方块"""
+        model = HeatmapModel(65534)
+
+        assert model.visible_blocks(0, 0, 800, 600, 8) == (0, 0, 100, 75)
+        assert model.visible_blocks(1000, 2000, 800, 600, 8) == (125, 250, 225, 256)
+        assert model.visible_blocks(0, 0, 800, 600, 1 / 2) == (0, 0, 128, 128)
+
+    def test_hit_testing_at_zoom(self):
+        """命中测试在各缩放级别下定位到主机"""
+        model = HeatmapModel(65534)
+
+        assert model.index_at(8 * 10 + 3, 8 * 2 + 7, 8) == 2 * 256 + 10
+        assert model.index_at(5, 1, 1 / 4) == 4 * 256 + 20
+
+    @pytest.mark.benchmark
+    def test_viewport_render_cost(self):
+        """/16扫描全部更新后，单个视口的渲染量与视口大小相关而与主机总数无关"""
+        model = HeatmapModel(65534)
+        for index in range(0, 65534, 3):
+            model.set_state(index, STATE_ONLINE)
+
+        start = time.perf_counter()
+        rows = model.render(*model.visible_blocks(0, 0, 800, 600, 8), 1)
+        elapsed = time.perf_counter() - start
+
+        assert sum(len(row) for row in rows) == 100 * 75
+        assert elapsed < 0.05
+
+
+class TestHeatmapCanvas:
+    """热力图画布测试（需要显示环境）"""
+
+    @pytest.fixture
+    def canvas(self):
+        from gui.views.ping.heatmap_canvas import HeatmapCanvas
+
+        root = make_root()
+        canvas = HeatmapCanvas(root, width=400, height=300)
+        canvas.pack()
+        root.update_idletasks()
+        canvas.build(65534, scale=4)
+        root.update_idletasks()
+        canvas.flush()
+        yield canvas
+        root.destroy()
+
+    def test_single_image_item_viewport_sized(self, canvas):
+        """只有一个图片项，且只覆盖视口"""
+        assert len(canvas.find_all()) == 1
+        bx0, by0, bx1, by1, size, pixels = canvas.viewport
+        assert (bx1 - bx0) * pixels <= 400 + pixels
+        assert (by1 - by0) * pixels <= 300 + pixels
+
+    def test_patch_small_changes(self, canvas):
+        """少量状态变化只修补像素，不重绘视口"""
+        redraws = canvas.stats['redraws']
+        canvas.set_state(0, STATE_ONLINE)
+        canvas.set_state(70000, STATE_ONLINE)
+        canvas.flush()
+
+        assert canvas.stats['redraws'] == redraws
+        assert canvas.stats['patches'] == 1
+        assert canvas.image.get(0, 0) == (0, 0xAA, 0)
+
+    def test_zoom_keeps_state(self, canvas):
+        """缩放切换细节级别，状态保留"""
+        canvas.set_state(5, STATE_OFFLINE)
+        canvas.zoom(-4)
+        canvas.flush()
+
+        assert canvas.scale == 1 / 4
+        assert canvas.get_state(5) == STATE_OFFLINE
+        assert canvas.viewport[4] == 4
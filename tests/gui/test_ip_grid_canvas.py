@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单画布IP方格测试
+布局与命中测试不依赖Tk；画布相关测试需要可用的显示环境
+"""
+
+import pytest
+import tkinter as tk
+
+from gui.views.ping.grid_layout import (
+    GridLayout,
+    STATE_INITIAL,
+    STATE_SCANNING,
+    STATE_ONLINE,
+    COLORS,
+    BLINK_COLOR,
+)
+
+
+def make_root():
+    """创建隐藏的Tk根窗口，无显示环境时跳过"""
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"无可用显示环境: {e}")
+    root.withdraw()
+    return root
+
+
+class TestGridLayout:
+    """方格布局测试"""
+
+    def test_rows_and_size(self):
+        """行数和像素尺寸"""
+        layout = GridLayout(254, cols=20, cell_size=44, spacing=2, margin=1)
+
+        assert layout.rows == 13
+        assert layout.size == (1 + 20 * 46 - 2 + 1, 1 + 13 * 46 - 2 + 1)
+
+    def test_cell_rect_row_major(self):
+        """方格按行优先排列"""
+        layout = GridLayout(254, cols=10, cell_size=30, spacing=2, margin=0)
+
+        assert layout.cell_rect(0) == (0, 0, 30, 30)
+        assert layout.cell_rect(9) == (288, 0, 318, 30)
+        assert layout.cell_rect(10) == (0, 32, 30, 62)
+
+    def test_hit_testing(self):
+        """命中测试返回方格序号，间隙和越界返回None"""
+        layout = GridLayout(25, cols=10, cell_size=30, spacing=2, margin=0)
+
+        assert layout.index_at(15, 15) == 0
+        assert layout.index_at(32 * 3 + 5, 32 * 1 + 5) == 13
+        assert layout.index_at(30.5, 10) is None        # 列间隙
+        assert layout.index_at(10, 31) is None          # 行间隙
+        assert layout.index_at(32 * 6, 32 * 2 + 1) is None  # 最后一行之后的空位
+        assert layout.index_at(-1, 5) is None
+        assert layout.index_at(32 * 10 + 1, 5) is None  # 超出列数
+
+    def test_hit_test_roundtrip(self):
+        """每个方格中心的命中测试都回到自身"""
+        layout = GridLayout(254, cols=17, cell_size=44)
+
+        for index in range(254):
+            assert layout.index_at(*layout.cell_center(index)) == index
+
+
+class TestIPGridCanvas:
+    """单画布渲染器测试（需要显示环境）"""
+
+    @pytest.fixture
+    def canvas(self):
+        from gui.views.ping.ip_grid_canvas import IPGridCanvas
+
+        root = make_root()
+        clicks = []
+        canvas = IPGridCanvas(root, on_double_click=clicks.append)
+        canvas.clicks = clicks
+        canvas.build(range(1, 255), cols=20, cell_size=40)
+        yield canvas
+        root.destroy()
+
+    def test_single_widget_two_items_per_cell(self, canvas):
+        """254个方格只占一个控件，每格一个矩形和一个数字"""
+        assert len(canvas.winfo_children()) == 0
+        assert len(canvas.find_withtag("cell")) == 254
+        assert len(canvas.find_withtag("label")) == 254
+
+    def test_relayout_preserves_state(self, canvas):
+        """调整列数只移动画布项，状态保留"""
+        canvas.set_state(5, STATE_ONLINE, {'times': [3]})
+        items_before = canvas.find_all()
+
+        canvas.relayout(cols=10)
+
+        assert canvas.find_all() == items_before
+        assert canvas.get_state(5) == STATE_ONLINE
+        assert canvas.itemcget(canvas.rect_ids[4], "fill") == COLORS[STATE_ONLINE]
+        assert canvas.key_at(*canvas.layout.cell_center(14)) == 15
+
+    def test_confirmed_result_stored(self, canvas):
+        """邻居表判定在线后被探测确认，状态不变但结果更新为探测结果"""
+        canvas.set_state(9, STATE_ONLINE, {'success': True, 'method': 'neighbor', 'times': []})
+
+        confirmed = {'success': True, 'method': 'icmp', 'times': [2, 3]}
+        canvas.set_state(9, STATE_ONLINE, confirmed)
+
+        assert canvas.get_state(9) == STATE_ONLINE
+        assert canvas.get_result(9) == confirmed
+
+    def test_shared_blink_tick(self, canvas):
+        """所有扫描中的方格共用一个定时器"""
+        for key in (1, 2, 3):
+            canvas.set_state(key, STATE_SCANNING)
+        job = canvas.blink_job
+
+        assert job is not None
+        canvas.after_cancel(job)
+        canvas._blink_tick()
+        assert {canvas.itemcget(canvas.rect_ids[i], "fill") for i in (0, 1, 2)} == {BLINK_COLOR}
+
+        canvas.set_state(2, STATE_ONLINE)
+        assert canvas.blinking == {0, 2}
+
+        canvas.reset()
+        assert canvas.blink_job is None
+        assert canvas.get_state(1) == STATE_INITIAL
+
+    def test_double_click_hit(self, canvas):
+        """双击通过命中测试定位方格"""
+        x, y = canvas.layout.cell_center(41)
+
+        canvas._on_double_click(type('Event', (), {'x': int(x), 'y': int(y)})())
+
+        assert canvas.clicks == [42]
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描结果按帧更新测试
+使用假视图和手动驱动的定时器，不依赖显示环境
+"""
+
+import threading
+
+import pytest
+
+from gui.ui_queue import UIUpdateQueue
+from gui.views.ping.scan_controller import ScanController
+
+
+class FakeView:
+    """记录调用的假视图，after只登记回调，由测试手动执行"""
+
+    def __init__(self):
+        self.calls = []
+        self.stats_updates = 0
+        self.completed = None
+        self.jobs = {}
+        self.next_job = 0
+
+    def after(self, delay, callback):
+        self.next_job += 1
+        self.jobs[self.next_job] = callback
+        return self.next_job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for callback in jobs.values():
+            callback()
+
+    def winfo_exists(self):
+        return True
+
+    def has_cell(self, ip_suffix):
+        return 1 <= ip_suffix <= 254
+
+    def update_cell_scanning(self, ip_suffix):
+        self.calls.append(('scanning', ip_suffix))
+
+    def update_cell_online(self, ip_suffix, stats):
+        self.calls.append(('online', ip_suffix))
+
+    def update_cell_offline(self, ip_suffix, stats):
+        self.calls.append(('offline', ip_suffix))
+
+    def update_stats(self, stats):
+        self.stats_updates += 1
+
+    def show_error(self, message):
+        self.calls.append(('error', message))
+
+    def on_scan_completed(self, stats):
+        self.completed = dict(stats)
+
+
+class TestUIUpdateQueue:
+    """更新队列测试"""
+
+    def test_batches_items_per_frame(self):
+        """一帧取出全部待处理数据"""
+        view = FakeView()
+        frames = []
+        queue = UIUpdateQueue(view, lambda items: frames.append(items) or False)
+
+        queue.start()
+        for i in range(100):
+            queue.put(i)
+        view.run_pending()
+
+        assert frames == [list(range(100))]
+        assert not queue.is_running()
+        assert queue.stats['max_batch'] == 100
+
+    def test_keeps_ticking_while_requested(self):
+        """回调返回True时继续计时，数据未取完时也继续"""
+        view = FakeView()
+        keep = [True]
+        queue = UIUpdateQueue(view, lambda items: keep[0])
+
+        queue.start()
+        view.run_pending()
+        assert queue.is_running()
+
+        keep[0] = False
+        view.run_pending()
+        assert not queue.is_running()
+
+    def test_stop_discards_items(self):
+        """停止后取消定时器并丢弃数据"""
+        view = FakeView()
+        queue = UIUpdateQueue(view, lambda items: True)
+
+        queue.start()
+        queue.put(1)
+        queue.stop()
+
+        assert view.jobs == {}
+        assert queue.drain() == []
+
+
+class TestScanControllerFrames:
+    """扫描控制器按帧应用结果"""
+
+    @pytest.fixture
+    def controller(self):
+        view = FakeView()
+        controller = ScanController(view)
+        controller.targets = [f"192.168.1.{i}" for i in range(1, 255)]
+        controller.reset_stats()
+        controller.is_scanning = True
+        return controller
+
+    @staticmethod
+    def feed(controller, count, received=0.0):
+        for i in range(1, count + 1):
+            controller.updates.put((i, {'success': i % 2 == 0}, received))
+
+    def test_no_per_host_timers(self, controller):
+        """254个结果只用一个帧定时器"""
+        view = controller.view
+        controller.updates.start()
+        self.feed(controller, 254)
+
+        assert len(view.jobs) == 1
+
+    def test_scanning_then_result_after_delay(self, controller):
+        """先显示扫描中，到期后在同一帧显示结果并只刷新一次统计"""
+        view = controller.view
+        self.feed(controller, 254, received=10.0)
+
+        assert controller.apply_frame(controller.updates.drain(), now=10.0)
+        assert view.calls == [('scanning', i) for i in range(1, 255)]
+        assert view.stats_updates == 0
+
+        view.calls.clear()
+        controller.apply_frame([], now=10.0 + controller.RESULT_DELAY - 0.01)
+        assert view.calls == []
+
+        controller.apply_frame([], now=10.0 + controller.RESULT_DELAY)
+        assert len(view.calls) == 254
+        assert view.stats_updates == 1
+        assert controller.stats['online_count'] == 127
+        assert controller.stats['offline_count'] == 127
+
+    def test_per_cell_timestamps(self, controller):
+        """每个方格按自己的到达时间到期"""
+        view = controller.view
+        controller.apply_frame([(1, {'success': True}, 0.0), (2, {'success': False}, 0.3)], now=0.3)
+        view.calls.clear()
+
+        controller.apply_frame([], now=0.6)
+        assert view.calls == [('online', 1)]
+
+        controller.apply_frame([], now=0.8)
+        assert view.calls == [('online', 1), ('offline', 2)]
+
+    def test_completion_after_last_result(self, controller):
+        """批量扫描结束且所有结果显示后才通知完成"""
+        view = controller.view
+        controller.apply_frame([(5, {'success': True}, 0.0)], now=0.0)
+        controller.batch_finished = True
+
+        assert controller.apply_frame([], now=0.1)
+        assert view.completed is None
+
+        assert controller.apply_frame([], now=0.5) is False
+        assert view.completed == {'online_count': 1, 'offline_count': 0, 'total_count': 254}
+        assert controller.is_scanning is False
+
+    def test_stopped_scan_not_completed(self, controller):
+        """停止扫描后不再通知完成，已到达的结果照常显示"""
+        view = controller.view
+        controller.apply_frame([(5, {'success': True}, 0.0)], now=0.0)
+        controller.stop_scan()
+        controller.batch_finished = True
+
+        assert controller.apply_frame([], now=1.0) is False
+        assert ('online', 5) in view.calls
+        assert view.completed is None
+
+    def test_error_reported_once(self, controller):
+        """扫描线程的错误在UI帧中显示"""
+        controller.scan_error = "扫描过程中出现错误: boom"
+
+        controller.apply_frame([], now=0.0)
+        controller.apply_frame([], now=0.1)
+
+        assert controller.view.calls == [('error', "扫描过程中出现错误: boom")]
+
+
+class NullResolver:
+    """不发起查询的解析器"""
+
+    def resolve_many(self, hosts):
+        return {}
+
+    def lookup_cached(self, ip_address):
+        return None
+
+
+class TestNeighborPrefill:
+    """邻居表预先标记测试"""
+
+    @pytest.fixture
+    def controller(self):
+        view = FakeView()
+        controller = ScanController(view)
+        controller.resolver = NullResolver()
+        controller.targets = [f"192.168.1.{i}" for i in range(1, 255)]
+        controller.index_of = {ip: index for index, ip in enumerate(controller.targets)}
+        controller.reset_stats()
+        controller.is_scanning = True
+        return controller
+
+    def test_known_hosts_first_and_probed_last(self, controller):
+        """邻居表中的主机下一帧即在线，探测顺序中排在未知地址之后"""
+        neighbors = {
+            '192.168.1.11': {'ip': '192.168.1.11', 'mac': '00:11:22:33:44:55'},
+            '192.168.1.2': {'ip': '192.168.1.2', 'mac': '00:11:22:33:44:66'},
+        }
+        probed = []
+        controller.load_neighbors = lambda: neighbors
+        controller.ping_service.batch_discover = lambda hosts, **kwargs: probed.extend(hosts)
+
+        controller.scan_network()
+        controller.apply_frame(controller.updates.drain())
+
+        assert controller.view.calls == [('online', 1), ('online', 10)]
+        assert controller.stats['online_count'] == 2
+        assert probed[-2:] == ['192.168.1.2', '192.168.1.11']
+        assert len(probed) == 254
+
+    def test_confirmation_not_counted_twice(self, controller):
+        """探测再次确认在线时只更新方格，不重复计数，也不再显示扫描中"""
+        controller.apply_frame([(9, {'success': True, 'method': 'neighbor'}, 0.0)], now=1.0)
+        controller.view.calls.clear()
+
+        controller.apply_frame([(9, {'success': True, 'method': 'icmp'}, 2.0)], now=2.0)
+
+        assert controller.view.calls == [('online', 9)]
+        assert controller.stats['online_count'] == 1
+        assert controller.stats['offline_count'] == 0
+
+    def test_stale_neighbor_downgraded(self, controller):
+        """邻居表中的主机探测全部无应答时是过期表项，改为离线且不计入在线数"""
+        controller.apply_frame([(9, {'success': True, 'method': 'neighbor'}, 0.0)], now=1.0)
+        controller.view.calls.clear()
+
+        controller.apply_frame([(9, {'success': False, 'method': None}, 2.0)], now=3.0)
+
+        assert controller.view.calls == [('offline', 9)]
+        assert controller.stats == {'online_count': 0, 'offline_count': 1, 'total_count': 254}
+
+    def test_confirmed_online_not_overridden(self, controller):
+        """已被探测确认在线的方格不被之后的无应答覆盖"""
+        controller.apply_frame([(9, {'success': True, 'method': 'neighbor'}, 0.0)], now=1.0)
+        controller.apply_frame([(9, {'success': True, 'method': 'icmp'}, 2.0)], now=2.0)
+        controller.view.calls.clear()
+
+        controller.apply_frame([(9, {'success': False, 'method': None}, 3.0)], now=4.0)
+
+        assert controller.view.calls == []
+        assert controller.stats['online_count'] == 1
+
+    def test_stale_neighbor_not_resolved(self, controller):
+        """过期的邻居表项不做反向解析，未来得及探测的邻居主机仍按在线处理"""
+        resolved = []
+
+        class Resolver:
+            def resolve_many(self, hosts):
+                resolved.extend(hosts)
+
+        controller.resolver = Resolver()
+        controller.load_neighbors = lambda: {
+            '192.168.1.2': {'ip': '192.168.1.2', 'mac': '00:11:22:33:44:66'},
+            '192.168.1.3': {'ip': '192.168.1.3', 'mac': '00:11:22:33:44:77'},
+        }
+        controller.ping_service.batch_discover = lambda hosts, **kwargs: {
+            '192.168.1.2': {'stats': {'success': False}},
+            '192.168.1.5': {'stats': {'success': True}},
+        }
+
+        controller.scan_network()
+
+        assert sorted(resolved) == ['192.168.1.3', '192.168.1.5']
+
+    def test_names_resolved_after_sweep(self, controller):
+        """探测结束后才解析在线主机的名称"""
+        events = []
+
+        class Resolver:
+            def resolve_many(self, hosts):
+                events.append(('resolve', sorted(hosts), controller.batch_finished))
+
+        controller.resolver = Resolver()
+        controller.load_neighbors = lambda: {'192.168.1.2': {'ip': '192.168.1.2', 'mac': '00:11:22:33:44:66'}}
+        controller.ping_service.batch_discover = lambda hosts, **kwargs: {
+            '192.168.1.5': {'stats': {'success': True}},
+            '192.168.1.6': {'stats': {'success': False}},
+            '192.168.1.2': {'stats': {'success': True}},
+        }
+
+        controller.scan_network()
+
+        assert events == [('resolve', ['192.168.1.2', '192.168.1.5'], True)]
+
+    def test_vendor_from_neighbor_macs(self, controller, monkeypatch):
+        """在线主机的MAC在扫描后从邻居表补全，按OUI查出厂商"""
+        from gui.views.ping import scan_controller as module
+
+        tables = [
+            {'192.168.1.2': {'ip': '192.168.1.2', 'mac': '00:15:5d:01:02:03'}},
+            {'192.168.1.2': {'ip': '192.168.1.2', 'mac': '00:15:5d:01:02:03'},
+             '192.168.1.5': {'ip': '192.168.1.5', 'mac': 'b8:27:eb:00:00:01'}},
+        ]
+        controller.load_neighbors = lambda: tables.pop(0)
+        controller.ping_service.batch_discover = lambda hosts, **kwargs: {
+            '192.168.1.5': {'stats': {'success': True}},
+            '192.168.1.6': {'stats': {'success': False}},
+        }
+        vendors = {'00:15:5d:01:02:03': 'Microsoft Corporation', 'b8:27:eb:00:00:01': 'Raspberry Pi Foundation'}
+        monkeypatch.setattr(module, 'lookup_vendor', vendors.get)
+
+        controller.scan_network()
+
+        assert controller.lookup_vendor('192.168.1.2') == 'Microsoft Corporation'
+        assert controller.lookup_vendor('192.168.1.5') == 'Raspberry Pi Foundation'
+        assert controller.lookup_vendor('192.168.1.6') is None
+
+
+class TestRestart:
+    """停止后立即重新扫描测试"""
+
+    def test_stale_thread_dropped(self):
+        """旧扫描线程在新扫描开始后到达的结果、完成标记和MAC都被丢弃"""
+        controller = ScanController(FakeView())
+        controller.resolver = NullResolver()
+        controller.load_neighbors = lambda: {}
+        entered = [threading.Event(), threading.Event()]
+        release = [threading.Event(), threading.Event()]
+        calls = []
+
+        def batch_discover(hosts, progress_callback=None, **kwargs):
+            scan = len(calls)
+            calls.append(list(hosts))
+            entered[scan].set()
+            release[scan].wait(5)
+            host = hosts[0]
+            progress_callback(host, None, {'host': host, 'success': True, 'method': 'icmp'}, 1, len(hosts))
+            return {host: {'stats': {'success': True}}}
+
+        controller.ping_service.batch_discover = batch_discover
+        controller.record_macs = lambda hosts: controller.macs.update((host, 'mac') for host in hosts)
+
+        assert controller.start_scan(['10.0.0.1', '10.0.0.2'])
+        first = controller.scan_thread
+        assert entered[0].wait(5)
+        controller.stop_scan()
+        assert controller.start_scan(['10.0.1.1'])
+        second = controller.scan_thread
+
+        release[0].set()
+        first.join(5)
+
+        assert not controller.updates.items
+        assert controller.batch_finished is False
+        assert controller.macs == {}
+
+        release[1].set()
+        second.join(5)
+
+        assert [item[:2] for item in controller.updates.items] == [
+            (0, {'host': '10.0.1.1', 'success': True, 'method': 'icmp'})
+        ]
+        assert controller.batch_finished is True
+        assert controller.macs == {'10.0.1.1': 'mac'}
+
+
+class TestSinglePing:
+    """单独ping测试"""
+
+    def test_result_not_blocked_by_name_resolution(self):
+        """解析未完成时立即显示结果，解析完成后主机名进入缓存供悬停提示使用"""
+        view = FakeView()
+        shown = threading.Event()
+
+        def show_single_ping_result(ip_address, result):
+            view.calls.append(('result', ip_address, result))
+            shown.set()
+
+        view.show_single_ping_result = show_single_ping_result
+        controller = ScanController(view)
+        controller.safe_ui_update = lambda callback, delay=0: callback()
+        controller.load_neighbors = lambda: {}
+        controller.ping_service.ping_with_stats = lambda ip, **kwargs: {'stats': {'success': True}}
+        release = threading.Event()
+        resolved = threading.Event()
+        names = {}
+
+        class Resolver:
+            def resolve_many(self, hosts):
+                release.wait(5)
+                names.update((host, 'printer.lan') for host in hosts)
+                resolved.set()
+
+            def lookup_cached(self, ip_address):
+                return names.get(ip_address)
+
+        controller.resolver = Resolver()
+
+        controller.ping_single_ip('192.168.1.9')
+
+        assert shown.wait(5)
+        assert view.calls[0][2]['hostname'] is None
+        release.set()
+        assert resolved.wait(5)
+        assert controller.lookup_name('192.168.1.9') == 'printer.lan'
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动时间线测试
+"""
+
+import time
+
+from gui.startup_timeline import StartupTimeline, get_log_dir
+
+
+class TestStartupTimeline:
+    """启动时间线测试"""
+    
+    def test_marks_are_relative_to_origin(self):
+        """阶段耗时相对起点递增"""
+        timeline = StartupTimeline(origin=time.perf_counter())
+        first = timeline.mark("窗口框架创建完成")
+        time.sleep(0.01)
+        second = timeline.mark("默认视图显示完成")
+        
+        assert 0 <= first < second
+        assert [label for label, _ in timeline.marks] == ["窗口框架创建完成", "默认视图显示完成"]
+    
+    def test_write_appends_to_log(self, tmp_path):
+        """时间线追加写入日志文件"""
+        path = tmp_path / "logs" / "startup.log"
+        timeline = StartupTimeline()
+        timeline.mark("进入主循环")
+        
+        assert timeline.write(str(path)) == str(path)
+        assert timeline.write(str(path)) == str(path)
+        
+        content = path.read_text(encoding='utf-8')
+        assert content.count("NetKit 启动时间线") == 2
+        assert "进入主循环" in content
+        assert timeline.written is True
+    
+    def test_log_dir_uses_local_app_data(self, monkeypatch, tmp_path):
+        """Windows下日志写入LOCALAPPDATA"""
+        monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+        
+        assert get_log_dir() == str(tmp_path / 'NetKit' / 'logs')
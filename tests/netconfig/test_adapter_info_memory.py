@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NetworkAdapterInfo紧凑表示测试
+包含500个模拟网卡的内存基准测试
+"""
+
+import time
+import threading
+import tracemalloc
+import dataclasses
+from dataclasses import dataclass
+from typing import List
+from unittest.mock import patch
+import pytest
+
+pytest.importorskip("wmi")
+
+from netkit.services.netconfig.wmi_engine import NetworkAdapterInfo, WMIQueryEngine
+from netkit.services.netconfig.async_manager import AsyncNetworkDataManager
+
+
+@dataclass
+class LegacyAdapterInfo:
+    """旧版网卡信息结构（普通dataclass + 列表），用于对比"""
+    name: str
+    connection_id: str
+    description: str
+    mac_address: str
+    status: str
+    connection_status: str
+    enabled: bool
+    manufacturer: str
+    model: str
+    speed: str
+    adapter_type: str
+    physical_adapter: bool
+    ip_addresses: List[str]
+    subnet_masks: List[str]
+    gateways: List[str]
+    dns_servers: List[str]
+    dhcp_enabled: bool
+    last_updated: float
+    adapter_index: int
+
+
+def fresh(text):
+    """模拟WMI每次返回的新字符串对象"""
+    return "".join(list(text))
+
+
+def adapter_fields(i):
+    """第i个模拟网卡的字段"""
+    return dict(
+        name=fresh(f"Intel(R) Ethernet Connection #{i}"),
+        connection_id=fresh(f"以太网 {i}"),
+        description=fresh(f"Intel(R) Ethernet Connection #{i}"),
+        mac_address=fresh(f"00:15:5D:00:{i // 256:02X}:{i % 256:02X}"),
+        status=fresh("已启用"),
+        connection_status=fresh("已连接"),
+        enabled=True,
+        manufacturer=fresh("Intel"),
+        model=fresh("Ethernet Connection"),
+        speed=fresh("1 Gbps"),
+        adapter_type=fresh("以太网 802.3"),
+        physical_adapter=True,
+        ip_addresses=[fresh(f"10.{i // 256}.{i % 256}.10")],
+        subnet_masks=[fresh("255.255.255.0")],
+        gateways=[fresh(f"10.{i // 256}.{i % 256}.1")],
+        dns_servers=[fresh("8.8.8.8"), fresh("114.114.114.114")],
+        dhcp_enabled=False,
+        last_updated=time.time(),
+        adapter_index=i
+    )
+
+
+def measure(factory, count):
+    """测量创建count个对象占用的内存"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(**adapter_fields(i)) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, after - before
+
+
+def make_adapter(**overrides):
+    fields = adapter_fields(1)
+    fields.update(overrides)
+    return NetworkAdapterInfo(**fields)
+
+
+class TestNetworkAdapterInfo:
+    """紧凑网卡信息结构测试"""
+    
+    def test_immutable_and_slotted(self):
+        """对象不可变且没有实例字典"""
+        adapter = make_adapter()
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            adapter.last_updated = 0
+        assert not hasattr(adapter, '__dict__')
+    
+    def test_sequences_become_tuples(self):
+        """地址列表转为元组"""
+        adapter = make_adapter(ip_addresses=["192.168.1.10"], dns_servers=None)
+        
+        assert adapter.ip_addresses == ("192.168.1.10",)
+        assert adapter.dns_servers == ()
+    
+    def test_repeated_strings_interned(self):
+        """重复字符串共享同一对象"""
+        a = make_adapter(manufacturer=fresh("Realtek"))
+        b = make_adapter(manufacturer=fresh("Realtek"))
+        
+        assert a.manufacturer is b.manufacturer
+        assert a.status is b.status
+        assert a.dns_servers[0] is b.dns_servers[0]
+    
+    def test_with_changes(self):
+        """修改字段返回新对象"""
+        adapter = make_adapter()
+        stale = adapter.with_changes(last_updated=0)
+        
+        assert stale.last_updated == 0
+        assert adapter.last_updated != 0
+        assert stale.manufacturer is adapter.manufacturer
+
+
+class TestSharedCaches:
+    """缓存间按引用共享测试"""
+    
+    def test_engine_caches_share_objects(self):
+        """批量查询结果同时填充单网卡缓存和物理网卡列表"""
+        engine = WMIQueryEngine.__new__(WMIQueryEngine)
+        engine.cache = {}
+        engine.cache_timeout = 30
+        engine.cache_lock = threading.RLock()
+        engine.is_ci = True
+        physical = make_adapter(connection_id="以太网")
+        virtual = make_adapter(connection_id="vEthernet", physical_adapter=False)
+        
+        with patch.object(engine, '_query_all_adapters', return_value=[physical, virtual]):
+            engine.get_all_adapters_info(show_all=True, force_refresh=True)
+        
+        assert engine.get_adapter_info("以太网") is physical
+        assert engine.get_adapter_info("vEthernet") is virtual
+        assert engine.get_all_adapters_info(show_all=False) == [physical]
+        assert engine.get_all_adapters_info(show_all=False)[0] is physical
+    
+    def test_invalidate_replaces_cached_object(self):
+        """失效缓存时替换对象而不修改共享对象"""
+        with patch('netkit.services.netconfig.async_manager.get_wmi_engine'):
+            manager = AsyncNetworkDataManager()
+        adapter = make_adapter(connection_id="以太网")
+        manager._store_adapter(adapter)
+        
+        manager.invalidate_adapter_cache("以太网")
+        
+        assert manager.get_cached_adapter("以太网").last_updated == 0
+        assert adapter.last_updated != 0
+
+
+class TestAdapterInfoMemoryBenchmark:
+    """500个模拟网卡的内存基准"""
+    
+    @pytest.mark.benchmark
+    def test_memory_500_adapters(self):
+        """紧凑表示的内存占用明显低于旧结构"""
+        legacy, legacy_bytes = measure(LegacyAdapterInfo, 500)
+        compact, compact_bytes = measure(NetworkAdapterInfo, 500)
+        
+        print(f"\n500个网卡: 旧结构 {legacy_bytes / 1024:.1f}KB, "
+              f"紧凑结构 {compact_bytes / 1024:.1f}KB")
+        
+        assert len(legacy) == len(compact) == 500
+        assert compact_bytes < legacy_bytes * 0.8
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网卡定位与WMI连接复用测试
+使用假WMI对象模型统计查询次数
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("wmi")
+pytest.importorskip("pythoncom")
+
+from netkit.services.netconfig import adapter_lookup
+from netkit.services.netconfig.interface_info import ThreadLocalWMI
+from netkit.services.netconfig.ip_configurator import apply_profile
+
+
+class FakeWMIClass:
+    """假WMI类：支持按属性过滤并记录查询"""
+    
+    def __init__(self, name, instances, log):
+        self.name = name
+        self.instances = instances
+        self.log = log
+    
+    def __call__(self, **filters):
+        self.log.append((self.name, filters))
+        return [inst for inst in self.instances
+                if all(getattr(inst, k, None) == v for k, v in filters.items())]
+
+
+class FakeWMI:
+    """假WMI连接：包含若干网卡及其配置"""
+    
+    def __init__(self, adapter_count=50):
+        self.queries = []
+        adapters, configs = [], []
+        for i in range(adapter_count):
+            adapters.append(Mock(NetConnectionID=f"以太网 {i}", Index=i))
+            config = Mock(Index=i)
+            config.EnableStatic.return_value = (0,)
+            config.SetGateways.return_value = (0,)
+            config.SetDNSServerSearchOrder.return_value = (0,)
+            configs.append(config)
+        self.Win32_NetworkAdapter = FakeWMIClass("Win32_NetworkAdapter", adapters, self.queries)
+        self.Win32_NetworkAdapterConfiguration = FakeWMIClass(
+            "Win32_NetworkAdapterConfiguration", configs, self.queries)
+
+
+@pytest.fixture
+def fake_wmi():
+    """注入假WMI并重置线程连接池"""
+    fake = FakeWMI()
+    factory = Mock(return_value=fake)
+    ThreadLocalWMI.invalidate()
+    with patch('wmi.WMI', factory), \
+         patch('pythoncom.CoInitialize'), \
+         patch('pythoncom.CoUninitialize'), \
+         patch.object(adapter_lookup, 'peek_async_manager', return_value=None):
+        yield fake, factory
+    ThreadLocalWMI.invalidate()
+
+
+class TestAdapterLookup:
+    """网卡定位测试"""
+    
+    @pytest.mark.unit
+    def test_filtered_lookup_without_cache(self, fake_wmi):
+        """缓存未命中时只执行两次带条件查询"""
+        fake, _ = fake_wmi
+        config, error = adapter_lookup.find_adapter_config("以太网 42")
+        
+        assert error is None
+        assert config.Index == 42
+        assert fake.queries == [
+            ("Win32_NetworkAdapter", {'NetConnectionID': "以太网 42"}),
+            ("Win32_NetworkAdapterConfiguration", {'Index': 42}),
+        ]
+    
+    @pytest.mark.unit
+    def test_cache_hit_skips_adapter_query(self, fake_wmi):
+        """缓存命中时直接按Index查询配置"""
+        fake, _ = fake_wmi
+        manager = Mock()
+        manager.get_cached_adapter.return_value = Mock(adapter_index=7, connection_id="以太网 7")
+        
+        with patch.object(adapter_lookup, 'peek_async_manager', return_value=manager):
+            config, error = adapter_lookup.find_adapter_config("以太网 7")
+        
+        assert error is None and config.Index == 7
+        assert fake.queries == [("Win32_NetworkAdapterConfiguration", {'Index': 7})]
+    
+    @pytest.mark.unit
+    def test_stale_cache_falls_back(self, fake_wmi):
+        """缓存中的Index失效时回退到按连接名查询"""
+        fake, _ = fake_wmi
+        manager = Mock()
+        manager.get_cached_adapter.return_value = Mock(adapter_index=999)
+        
+        with patch.object(adapter_lookup, 'peek_async_manager', return_value=manager):
+            config, error = adapter_lookup.find_adapter_config("以太网 3")
+        
+        assert error is None and config.Index == 3
+        assert len(fake.queries) == 3
+    
+    @pytest.mark.unit
+    def test_not_found(self, fake_wmi):
+        """网卡不存在时返回错误信息"""
+        config, error = adapter_lookup.find_adapter_config("不存在的网卡")
+        assert config is None
+        assert "找不到网络适配器连接" in error
+    
+    @pytest.mark.unit
+    def test_connection_reused_per_thread(self, fake_wmi):
+        """同一线程内多次apply_profile只创建一次WMI连接"""
+        fake, factory = fake_wmi
+        ip_config = {'ip': '192.168.1.100', 'mask': '255.255.255.0', 'gateway': '192.168.1.1'}
+        dns_config = {'dns1': '8.8.8.8', 'dns2': ''}
+        
+        for _ in range(3):
+            result = apply_profile("以太网 1", "manual", "manual", ip_config, dns_config)
+            assert result['success'] is True
+        
+        assert factory.call_count == 1
+        assert len(fake.queries) == 6  # 每次2次带条件查询，没有全量遍历
+        assert all(filters for _, filters in fake.queries)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+地址占用探测测试
+使用本地假应答器模拟局域网主机
+"""
+
+import time
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("wmi")
+
+from netkit.services.netconfig import address_probe
+from netkit.services.netconfig.address_probe import AddressProbe
+from netkit.services.ping.ping_executor import PingExecutor
+
+
+class FakeResponder:
+    """假应答器：对在线地址延迟应答，对离线地址等到超时后返回无应答"""
+    
+    def __init__(self, online, delay=0.02):
+        self.online = set(online)
+        self.delay = delay
+        self.probed = []
+        self.lock = threading.Lock()
+    
+    def __call__(self, ip, timeout):
+        with self.lock:
+            self.probed.append(ip)
+        if ip in self.online:
+            time.sleep(self.delay)
+            return True
+        time.sleep(timeout)
+        return False
+
+
+class TestAddressProbe:
+    """地址占用探测器测试"""
+    
+    def test_ip_in_use_returns_early(self):
+        """候选IP有应答时立即返回，不等截止时间"""
+        responder = FakeResponder(online={"192.168.1.50"})
+        probe = AddressProbe(probes=[('icmp', responder)], deadline=1.0)
+        
+        result = probe.check("192.168.1.50", "192.168.1.1")
+        
+        assert result['ip_in_use'] is True
+        assert result['responders'] == {"192.168.1.50": ['icmp']}
+        assert result['elapsed'] < 0.5
+    
+    def test_free_ip_bounded_by_deadline(self):
+        """无应答时在截止时间内返回"""
+        responder = FakeResponder(online={"192.168.1.1"})
+        probe = AddressProbe(probes=[('arp', responder), ('icmp', responder)], deadline=0.2)
+        
+        result = probe.check("192.168.1.77", "192.168.1.1")
+        
+        assert result['ip_in_use'] is False
+        assert result['gateway_reachable'] is True
+        assert result['elapsed'] < 0.35
+        assert sorted(set(responder.probed)) == ["192.168.1.1", "192.168.1.77"]
+    
+    def test_gateway_unreachable(self):
+        """所有探测都无应答时网关不可达"""
+        probe = AddressProbe(probes=[('icmp', lambda ip, timeout: False)], deadline=0.2)
+        
+        result = probe.check("10.0.0.5", "10.0.0.1")
+        
+        assert result['ip_in_use'] is False
+        assert result['gateway_reachable'] is False
+    
+    def test_probe_error_treated_as_no_reply(self):
+        """探测出错视为无应答"""
+        def broken(ip, timeout):
+            raise OSError("SendARP不可用")
+        
+        probe = AddressProbe(probes=[('arp', broken)], deadline=0.2)
+        assert probe.check("10.0.0.5")['ip_in_use'] is False
+    
+    def test_skip_address_already_on_interface(self):
+        """候选IP就是该网卡当前地址时不探测（本机会应答自己）"""
+        responder = FakeResponder(online={"192.168.1.50"})
+        probe = AddressProbe(probes=[('icmp', responder)], deadline=0.2)
+        cached = Mock(ip_addresses=["192.168.1.50"])
+        
+        with patch.object(address_probe, 'get_cached_adapter_info', return_value=cached):
+            result = probe.check("192.168.1.50", exclude_interface="以太网")
+        
+        assert result['ip_in_use'] is False
+        assert result['skipped'] == ["192.168.1.50"]
+        assert responder.probed == []
+    
+    def test_icmp_probe_uses_ping_executor(self):
+        """ICMP探测复用Ping执行器"""
+        with patch.object(PingExecutor, 'probe', return_value=True) as mock_probe:
+            assert address_probe.icmp_probe("192.168.1.5", 0.3) is True
+        
+        mock_probe.assert_called_once_with("192.168.1.5", timeout=300)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网络冲突索引测试
+包含200个模拟网卡的冲突检查基准测试
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("wmi")
+
+from netkit.services.netconfig.wmi_engine import NetworkAdapterInfo
+from netkit.services.netconfig.conflict_index import ConflictIndex
+from netkit.services.netconfig import ip_configurator
+
+
+def make_adapter(name, ips, masks, gateways=()):
+    """创建模拟网卡信息"""
+    return NetworkAdapterInfo(
+        name=name, connection_id=name, description=name, mac_address="",
+        status="已连接", connection_status="已连接", enabled=True,
+        manufacturer="Intel", model="", speed="", adapter_type="以太网",
+        physical_adapter=True, ip_addresses=list(ips), subnet_masks=list(masks),
+        gateways=list(gateways), dns_servers=[], dhcp_enabled=False,
+        last_updated=time.time(), adapter_index=0
+    )
+
+
+def simulated_adapters(count=200):
+    """生成模拟网卡：每个网卡位于独立的/24网段"""
+    return [
+        make_adapter(f"以太网 {i}", [f"10.{i // 256}.{i % 256}.10", "fe80::1"],
+                     ["255.255.255.0", "64"], [f"10.{i // 256}.{i % 256}.1"])
+        for i in range(count)
+    ]
+
+
+def legacy_config_text(adapter):
+    """旧实现使用的配置文本"""
+    return (f'接口"{adapter.connection_id}"的配置\n'
+            f'    IP 地址:                           {adapter.ip_addresses[0]}\n'
+            f'    子网掩码:                           {adapter.subnet_masks[0]}\n'
+            f'    默认网关:                           {adapter.gateways[0]}\n')
+
+
+class TestConflictIndex:
+    """冲突索引测试"""
+    
+    @pytest.fixture
+    def index(self):
+        index = ConflictIndex()
+        index.rebuild([
+            make_adapter("以太网", ["192.168.1.50"], ["255.255.255.0"], ["192.168.1.1"]),
+            make_adapter("Wi-Fi", ["10.0.5.20"], ["255.255.0.0"], ["10.0.0.1"]),
+            make_adapter("VPN", ["172.16.8.2"], ["255.255.255.252"]),
+        ])
+        return index
+    
+    def test_exact_ip_conflict(self, index):
+        """IP完全相同"""
+        result = index.check("192.168.1.50", "255.255.255.0", "")
+        
+        assert result['has_conflict'] is True
+        assert [d['type'] for d in result['details']] == ['ip', 'subnet']
+        assert "IP地址 192.168.1.50 已在接口 以太网 上使用" in result['conflicts']
+    
+    def test_gateway_conflict(self, index):
+        """网关相同"""
+        result = index.check("192.168.9.9", "255.255.255.0", "10.0.0.1")
+        
+        assert [(d['type'], d['interface']) for d in result['details']] == [('gateway', 'Wi-Fi')]
+    
+    def test_subnet_contained_in_existing(self, index):
+        """目标网段被现有网段包含"""
+        result = index.check("10.0.7.1", "255.255.255.0", "")
+        
+        assert [(d['type'], d['value']) for d in result['details']] == [('subnet', '10.0.0.0/16')]
+    
+    def test_subnet_containing_existing(self, index):
+        """目标网段包含现有的更小网段"""
+        result = index.check("172.16.0.1", "255.255.0.0", "")
+        
+        assert [(d['type'], d['value']) for d in result['details']] == [('subnet', '172.16.8.0/30')]
+    
+    def test_no_conflict(self, index):
+        """不重叠的网段"""
+        result = index.check("192.168.2.10", "255.255.255.0", "192.168.2.1")
+        
+        assert result['has_conflict'] is False
+        assert result['conflicts'] == []
+    
+    def test_exclude_interface(self, index):
+        """排除正在配置的网卡"""
+        result = index.check("192.168.1.50", "255.255.255.0", "192.168.1.1",
+                             exclude_interface="以太网")
+        
+        assert result['has_conflict'] is False
+    
+    def test_incremental_update_and_remove(self, index):
+        """增量更新和移除网卡"""
+        index.update_adapter(make_adapter("以太网", ["192.168.3.50"], ["255.255.255.0"]))
+        assert index.check("192.168.1.50", "255.255.255.0", "")['has_conflict'] is False
+        assert index.find_ip("192.168.3.50") == {"以太网"}
+        
+        index.remove_adapter("Wi-Fi")
+        assert index.find_gateway("10.0.0.1") == set()
+        assert index.find_overlapping_networks("10.0.7.1", "255.255.255.0") == {}
+        assert len(index) == 2
+
+
+class TestCheckNetworkConflictWithIndex:
+    """check_network_conflict使用索引测试"""
+    
+    def test_uses_index_when_cache_ready(self):
+        """缓存预加载完成后不再解析配置文本"""
+        manager = Mock(preload_completed=True)
+        manager.conflict_index = ConflictIndex()
+        manager.conflict_index.rebuild(simulated_adapters(3))
+        
+        with patch.object(ip_configurator, 'peek_async_manager', return_value=manager), \
+             patch.object(ip_configurator, 'get_interface_config') as mock_get_config:
+            result = ip_configurator.check_network_conflict("10.0.1.10", "255.255.255.0", "")
+        
+        assert result['has_conflict'] is True
+        assert result['details'][0]['interface'] == "以太网 1"
+        mock_get_config.assert_not_called()
+    
+    @pytest.mark.parametrize("target", [
+        ("10.0.1.10", "255.255.255.0", ""),        # 只有网段重叠
+        ("10.0.1.10", "255.255.0.0", "10.0.2.1"),  # 包含其他网段且网关相同
+        ("10.0.2.10", "255.255.255.0", ""),        # IP相同
+        ("172.31.0.5", "255.255.255.0", ""),       # 无冲突
+    ])
+    def test_same_verdict_before_and_after_preload(self, target):
+        """预加载完成前后同一输入的检查结果一致"""
+        adapters = simulated_adapters(3)
+        adapters[2] = make_adapter("以太网 2", ["10.0.2.10"], ["255.255.255.0"], ["10.0.2.1"])
+        by_name = {adapter.connection_id: adapter for adapter in adapters}
+        manager = Mock(preload_completed=True)
+        manager.conflict_index = ConflictIndex()
+        manager.conflict_index.rebuild(adapters)
+        
+        with patch.object(ip_configurator, 'peek_async_manager', return_value=manager):
+            indexed = ip_configurator.check_network_conflict(*target)
+        with patch.object(ip_configurator, 'peek_async_manager', return_value=None), \
+             patch.object(ip_configurator, 'get_network_interfaces', return_value=list(by_name)), \
+             patch.object(ip_configurator, 'get_interface_config',
+                          side_effect=lambda name: legacy_config_text(by_name[name])):
+            parsed = ip_configurator.check_network_conflict(*target)
+        
+        assert parsed == indexed
+    
+    def test_exclude_interface_in_text_fallback(self):
+        """正在配置的网卡不与自身当前地址冲突"""
+        adapters = simulated_adapters(2)
+        by_name = {adapter.connection_id: adapter for adapter in adapters}
+        
+        with patch.object(ip_configurator, 'peek_async_manager', return_value=None), \
+             patch.object(ip_configurator, 'get_network_interfaces', return_value=list(by_name)), \
+             patch.object(ip_configurator, 'get_interface_config',
+                          side_effect=lambda name: legacy_config_text(by_name[name])):
+            result = ip_configurator.check_network_conflict(
+                "10.0.1.10", "255.255.255.0", "10.0.1.1", exclude_interface="以太网 1")
+        
+        assert result['has_conflict'] is False
+
+
+class TestConflictIndexBenchmark:
+    """200个模拟网卡的冲突检查基准"""
+    
+    @pytest.mark.benchmark
+    def test_index_vs_text_parsing(self):
+        """索引查询与逐个解析配置文本对比"""
+        adapters = simulated_adapters(200)
+        by_name = {adapter.connection_id: adapter for adapter in adapters}
+        index = ConflictIndex()
+        index.rebuild(adapters)
+        targets = [(f"10.0.{i}.77", "255.255.255.0", f"10.0.{i}.1") for i in range(0, 200, 10)]
+        
+        start = time.perf_counter()
+        for ip, mask, gateway in targets:
+            indexed = index.check(ip, mask, gateway)
+        index_time = time.perf_counter() - start
+        
+        with patch.object(ip_configurator, 'peek_async_manager', return_value=None), \
+             patch.object(ip_configurator, 'get_network_interfaces', return_value=list(by_name)), \
+             patch.object(ip_configurator, 'get_interface_config',
+                          side_effect=lambda name: legacy_config_text(by_name[name])):
+            start = time.perf_counter()
+            for ip, mask, gateway in targets:
+                legacy = ip_configurator.check_network_conflict(ip, mask, gateway)
+            legacy_time = time.perf_counter() - start
+        
+        print(f"\n200个网卡 {len(targets)} 次检查: 索引 {index_time * 1000:.2f}ms, "
+              f"文本解析 {legacy_time * 1000:.2f}ms")
+        
+        # 文本解析回退与索引使用同一套规则
+        assert legacy == indexed
+        assert {d['type'] for d in indexed['details']} == {'gateway', 'subnet'}
+        assert index_time < legacy_time
+        assert index_time / len(targets) < 0.001
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置收敛等待测试
+验证应用配置后在目标状态出现时立即返回，而不是固定sleep
+"""
+
+import time
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("wmi")
+
+from netkit.services.netconfig.convergence import ConvergenceWaiter
+from netkit.services.netconfig import ip_configurator
+from netkit.utils.network_monitor import get_network_monitor
+
+
+class TestConvergenceWaiter:
+    """收敛等待器测试"""
+    
+    def test_returns_immediately_when_converged(self):
+        """条件已满足时立即返回"""
+        waiter = ConvergenceWaiter(poll_interval=1.0)
+        converged, elapsed = waiter.wait_until(lambda: True, 5.0, "立即")
+        
+        assert converged is True
+        assert elapsed < 0.1
+        assert waiter.get_stats()['converged'] == 1
+    
+    def test_timeout(self):
+        """条件始终不满足时在截止时间返回"""
+        waiter = ConvergenceWaiter(poll_interval=0.02)
+        converged, elapsed = waiter.wait_until(lambda: False, 0.1, "超时")
+        
+        assert converged is False
+        assert 0.1 <= elapsed < 0.5
+        assert waiter.get_stats()['timeouts'] == 1
+    
+    def test_check_exception_treated_as_not_converged(self):
+        """检查出错视为未收敛"""
+        waiter = ConvergenceWaiter(poll_interval=0.02)
+        
+        def check():
+            raise RuntimeError("WMI不可用")
+        
+        converged, _ = waiter.wait_until(check, 0.05, "异常")
+        assert converged is False
+    
+    def test_network_event_wakes_waiter(self):
+        """网络变化事件立即唤醒检查，不必等待轮询间隔"""
+        waiter = ConvergenceWaiter(poll_interval=5.0)
+        state = {'ready': False}
+        monitor = get_network_monitor()
+        
+        def fire_event():
+            time.sleep(0.1)
+            state['ready'] = True
+            for listener in list(monitor.event_listeners):
+                listener("IP地址变化", {"以太网"})
+        
+        threading.Thread(target=fire_event, daemon=True).start()
+        converged, elapsed = waiter.wait_until(lambda: state['ready'], 3.0, "事件")
+        
+        assert converged is True
+        assert elapsed < 1.0
+        # 等待结束后监听器被移除
+        assert len(monitor.event_listeners) == 0
+
+
+class TestApplyConvergence:
+    """配置应用中的收敛等待测试"""
+    
+    def test_static_ip_with_dhcp_dns_no_fixed_sleep(self):
+        """DHCP已生效时静态IP+DHCP DNS不再固定等待"""
+        adapter_config = Mock(Index=3)
+        adapter_config.EnableDHCP.return_value = (0,)
+        adapter_config.EnableStatic.return_value = (0,)
+        adapter_config.SetGateways.return_value = (0,)
+        adapter_config.SetDNSServerSearchOrder.return_value = (0,)
+        refreshed = Mock(Index=3, DHCPEnabled=True)
+        
+        with patch.object(ip_configurator, 'find_adapter_config_by_index',
+                          return_value=refreshed) as mock_find:
+            start = time.monotonic()
+            result = ip_configurator._apply_static_ip_with_dhcp_dns(
+                adapter_config,
+                {'ip': '192.168.1.100', 'mask': '255.255.255.0', 'gateway': '192.168.1.1'}
+            )
+            duration = time.monotonic() - start
+        
+        assert result['success'] is True
+        assert result['converge_time'] < 0.5
+        assert duration < 0.5
+        mock_find.assert_called_with(3)
+    
+    def test_full_dhcp_waits_for_assigned_ip(self):
+        """完全DHCP在分配到IP后立即继续"""
+        adapter_config = Mock(Index=5, IPAddress=('192.168.1.10',))
+        adapter_config.EnableDHCP.return_value = (0,)
+        adapter_config.SetDNSServerSearchOrder.return_value = (0,)
+        
+        pending = Mock(Index=5, DHCPEnabled=True, IPAddress=None)
+        assigned = Mock(Index=5, DHCPEnabled=True,
+                        IPAddress=('192.168.1.50',), IPSubnet=('255.255.255.0',))
+        assigned.EnableStatic.return_value = (0,)
+        assigned.EnableDHCP.return_value = (0,)
+        static = Mock(Index=5, DHCPEnabled=False)
+        
+        with patch.object(ip_configurator, '_get_interface_name', return_value=None), \
+             patch.object(ip_configurator, 'find_adapter_config_by_index',
+                          side_effect=[pending, assigned, static]), \
+             patch.object(ip_configurator, 'get_convergence_waiter',
+                          return_value=ConvergenceWaiter(poll_interval=0.01)):
+            result = ip_configurator._apply_full_dhcp(adapter_config)
+        
+        assert result['success'] is True
+        assert result['converge_time'] < 0.5
+        assigned.EnableStatic.assert_called_once_with(['192.168.1.50'], ['255.255.255.0'])
+        assigned.EnableDHCP.assert_called_once()
+    
+    def test_full_dhcp_ignores_old_static_and_apipa_address(self):
+        """EnableDHCP后仍是旧静态地址或APIPA地址时继续等待真正的租约"""
+        adapter_config = Mock(Index=5, IPAddress=('192.168.1.10',))
+        adapter_config.EnableDHCP.return_value = (0,)
+        adapter_config.SetDNSServerSearchOrder.return_value = (0,)
+        
+        no_lease = dict(DHCPEnabled=True, DHCPServer='255.255.255.255',
+                        DHCPLeaseObtained=None, IPSubnet=('255.255.255.0',))
+        old_static = Mock(Index=5, IPAddress=('192.168.1.10', 'fe80::1'), **no_lease)
+        apipa = Mock(Index=5, IPAddress=('169.254.20.7',), **no_lease)
+        leased = Mock(Index=5, DHCPEnabled=True, DHCPServer='192.168.1.1',
+                      DHCPLeaseObtained='20260101080000.000000+480',
+                      IPAddress=('192.168.1.10',), IPSubnet=('255.255.255.0',))
+        leased.EnableStatic.return_value = (0,)
+        leased.EnableDHCP.return_value = (0,)
+        static = Mock(Index=5, DHCPEnabled=False)
+        
+        with patch.object(ip_configurator, '_get_interface_name', return_value=None), \
+             patch.object(ip_configurator, 'find_adapter_config_by_index',
+                          side_effect=[old_static, old_static, apipa, leased, static]) as mock_find, \
+             patch.object(ip_configurator, 'get_convergence_waiter',
+                          return_value=ConvergenceWaiter(poll_interval=0.01)):
+            result = ip_configurator._apply_full_dhcp(adapter_config)
+        
+        assert result['success'] is True
+        assert result['lease_pending'] is False
+        assert mock_find.call_count == 5
+        old_static.EnableStatic.assert_not_called()
+        apipa.EnableStatic.assert_not_called()
+        leased.EnableStatic.assert_called_once_with(['192.168.1.10'], ['255.255.255.0'])
+    
+    def test_full_dhcp_reports_pending_lease_on_timeout(self):
+        """超时未取得租约时不把旧地址设为临时静态地址"""
+        adapter_config = Mock(Index=5, IPAddress=('192.168.1.10',))
+        adapter_config.EnableDHCP.return_value = (0,)
+        adapter_config.SetDNSServerSearchOrder.return_value = (0,)
+        old_static = Mock(Index=5, DHCPEnabled=True, DHCPServer=None, DHCPLeaseObtained=None,
+                          IPAddress=('192.168.1.10',), IPSubnet=('255.255.255.0',))
+        
+        with patch.object(ip_configurator, '_get_interface_name', return_value=None), \
+             patch.object(ip_configurator, 'find_adapter_config_by_index', return_value=old_static), \
+             patch.object(ip_configurator, 'DHCP_CONVERGE_TIMEOUT', 0.05), \
+             patch.object(ip_configurator, 'get_convergence_waiter',
+                          return_value=ConvergenceWaiter(poll_interval=0.01)):
+            result = ip_configurator._apply_full_dhcp(adapter_config)
+        
+        assert result['success'] is True
+        assert result['lease_pending'] is True
+        old_static.EnableStatic.assert_not_called()
+        assert adapter_config.EnableDHCP.call_count == 2
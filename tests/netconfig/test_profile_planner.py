@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置差异规划测试
+验证只生成有差异的操作，配置一致时跳过WMI调用
+"""
+
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+pytest.importorskip("wmi")
+
+from netkit.services.netconfig.wmi_engine import NetworkAdapterInfo
+from netkit.services.netconfig.profile_planner import (
+    plan_profile,
+    ACTION_APPLY_MODE,
+    ACTION_SET_IP,
+    ACTION_SET_GATEWAY,
+    ACTION_SET_DNS,
+    ACTION_RESET_DNS
+)
+from netkit.services.netconfig import ip_configurator
+
+
+def make_adapter(**overrides):
+    """创建缓存网卡信息"""
+    values = dict(
+        name="Intel Ethernet", connection_id="以太网", description="Intel Ethernet",
+        mac_address="00:11:22:33:44:55", status="已连接", connection_status="已连接",
+        enabled=True, manufacturer="Intel", model="I219", speed="1 Gbps",
+        adapter_type="以太网", physical_adapter=True,
+        ip_addresses=["192.168.1.100", "fe80::1"], subnet_masks=["255.255.255.0", "64"],
+        gateways=["192.168.1.1"], dns_servers=["8.8.8.8", "8.8.4.4"],
+        dhcp_enabled=False, last_updated=time.time(), adapter_index=7
+    )
+    values.update(overrides)
+    return NetworkAdapterInfo(**values)
+
+
+STATIC_IP = {'ip': '192.168.1.100', 'mask': '255.255.255.0', 'gateway': '192.168.1.1'}
+STATIC_DNS = {'dns1': '8.8.8.8', 'dns2': '8.8.4.4'}
+
+
+def actions(plan):
+    return [op.action for op in plan.operations]
+
+
+class TestPlanProfile:
+    """计划生成测试"""
+    
+    def test_identical_static_config_is_noop(self):
+        """静态配置完全一致时无操作"""
+        plan = plan_profile("以太网", make_adapter(), "manual", "manual", STATIC_IP, STATIC_DNS)
+        
+        assert plan.is_noop
+        assert "无需修改" in plan.describe()
+    
+    def test_only_dns_changed(self):
+        """只有DNS不同时只设置DNS"""
+        plan = plan_profile("以太网", make_adapter(), "manual", "manual", STATIC_IP,
+                            {'dns1': '114.114.114.114', 'dns2': ''})
+        
+        assert actions(plan) == [ACTION_SET_DNS]
+        assert plan.operations[0].args == ('114.114.114.114',)
+    
+    def test_ip_and_gateway_changed(self):
+        """IP和网关变化时分别生成操作"""
+        plan = plan_profile("以太网", make_adapter(), "manual", "manual",
+                            {'ip': '10.0.0.5', 'mask': '255.0.0.0', 'gateway': '10.0.0.1'},
+                            STATIC_DNS)
+        
+        assert actions(plan) == [ACTION_SET_IP, ACTION_SET_GATEWAY]
+    
+    def test_removing_gateway_requires_full_apply(self):
+        """清除网关需要完整应用"""
+        plan = plan_profile("以太网", make_adapter(), "manual", "manual",
+                            dict(STATIC_IP, gateway=''), STATIC_DNS)
+        
+        assert plan.requires_full_apply
+    
+    def test_dhcp_transition_requires_full_apply(self):
+        """DHCP与静态之间切换需要完整应用"""
+        to_static = plan_profile("以太网", make_adapter(dhcp_enabled=True),
+                                 "manual", "manual", STATIC_IP, STATIC_DNS)
+        to_dhcp = plan_profile("以太网", make_adapter(), "auto", "auto", {}, {})
+        
+        assert actions(to_static) == [ACTION_APPLY_MODE]
+        assert actions(to_dhcp) == [ACTION_APPLY_MODE]
+    
+    def test_auto_dns_reset_when_source_unknown_or_static(self):
+        """DNS来源未知或为静态配置时恢复为自动获取"""
+        for dns_auto in (None, False):
+            plan = plan_profile("以太网", make_adapter(dhcp_enabled=True, dns_auto=dns_auto),
+                                "auto", "auto", {}, {})
+            
+            assert actions(plan) == [ACTION_RESET_DNS]
+    
+    def test_dhcp_with_automatic_dns_is_noop(self):
+        """已是DHCP且DNS自动获取时，自动/自动配置无需任何操作"""
+        plan = plan_profile("以太网", make_adapter(dhcp_enabled=True, dns_auto=True),
+                            "auto", "auto", {}, {})
+        
+        assert plan.is_noop
+    
+    def test_dhcp_provided_dns_pinned_as_static(self):
+        """DHCP下发的DNS与目标相同时仍需设置为静态DNS"""
+        plan = plan_profile("以太网", make_adapter(dhcp_enabled=True, dns_auto=True),
+                            "auto", "manual", {}, STATIC_DNS)
+        
+        assert actions(plan) == [ACTION_SET_DNS]
+    
+    def test_stale_or_missing_cache_falls_back(self):
+        """无缓存或缓存已失效时完整应用"""
+        missing = plan_profile("以太网", None, "manual", "manual", STATIC_IP, STATIC_DNS)
+        invalidated = plan_profile("以太网", make_adapter(last_updated=0),
+                                   "manual", "manual", STATIC_IP, STATIC_DNS)
+        
+        for plan in (missing, invalidated):
+            assert not plan.based_on_cache
+            assert not plan.is_noop
+            assert plan.requires_full_apply
+
+
+class TestApplyProfileWithPlan:
+    """apply_profile差异应用测试"""
+    
+    def test_noop_skips_wmi(self):
+        """配置一致时不定位网卡也不调用WMI"""
+        with patch.object(ip_configurator, 'get_cached_adapter_info', return_value=make_adapter()), \
+             patch.object(ip_configurator, 'find_adapter_config') as mock_find:
+            result = ip_configurator.apply_profile("以太网", "manual", "manual", STATIC_IP, STATIC_DNS)
+        
+        assert result['success'] is True
+        assert result['skipped'] is True
+        mock_find.assert_not_called()
+    
+    def test_dry_run_returns_plan(self):
+        """dry-run只返回计划"""
+        with patch.object(ip_configurator, 'get_cached_adapter_info', return_value=make_adapter()), \
+             patch.object(ip_configurator, 'find_adapter_config') as mock_find:
+            result = ip_configurator.apply_profile("以太网", "manual", "manual", STATIC_IP,
+                                                   {'dns1': '1.1.1.1', 'dns2': ''}, dry_run=True)
+        
+        assert result['dry_run'] is True
+        assert [op['action'] for op in result['plan']['operations']] == [ACTION_SET_DNS]
+        assert "1.1.1.1" in result['message']
+        mock_find.assert_not_called()
+    
+    def test_only_changed_settings_applied(self):
+        """只调用有差异的WMI方法"""
+        adapter_config = Mock()
+        adapter_config.SetDNSServerSearchOrder.return_value = (0,)
+        
+        with patch.object(ip_configurator, 'get_cached_adapter_info', return_value=make_adapter()), \
+             patch.object(ip_configurator, 'find_adapter_config', return_value=(adapter_config, None)), \
+             patch.object(ip_configurator, 'invalidate_cached_adapter') as mock_invalidate:
+            result = ip_configurator.apply_profile("以太网", "manual", "manual", STATIC_IP,
+                                                   {'dns1': '1.1.1.1', 'dns2': ''})
+        
+        assert result['success'] is True
+        adapter_config.SetDNSServerSearchOrder.assert_called_once_with(['1.1.1.1'])
+        adapter_config.EnableStatic.assert_not_called()
+        adapter_config.SetGateways.assert_not_called()
+        mock_invalidate.assert_called_once_with("以太网")
+    
+    def test_force_ignores_cache(self):
+        """force时按组合模式完整应用"""
+        adapter_config = Mock()
+        
+        with patch.object(ip_configurator, 'get_cached_adapter_info', return_value=make_adapter()), \
+             patch.object(ip_configurator, 'find_adapter_config', return_value=(adapter_config, None)), \
+             patch.object(ip_configurator, 'invalidate_cached_adapter'), \
+             patch.object(ip_configurator, '_apply_full_static',
+                          return_value={'success': True, 'message': 'ok'}) as mock_full:
+            result = ip_configurator.apply_profile("以太网", "manual", "manual", STATIC_IP,
+                                                   STATIC_DNS, force=True)
+        
+        assert result['success'] is True
+        mock_full.assert_called_once()
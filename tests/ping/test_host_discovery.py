@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+主机发现测试
+TCP探测使用本机监听端口，其余探测方式用假探测函数模拟
+"""
+
+import socket
+import threading
+import time
+import concurrent.futures
+import pytest
+from unittest.mock import patch
+
+from netkit.services.ping import HostDiscovery, PingService
+from netkit.services.ping import probes
+from netkit.services.ping.host_discovery import make_tcp_probe
+
+
+def free_port():
+    """获取一个当前未监听的端口"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def delayed(answer, delay=0.0, calls=None):
+    """延迟一段时间后给出应答的假探测"""
+    def probe(ip, timeout):
+        if calls is not None:
+            calls.append(ip)
+        time.sleep(min(delay, timeout))
+        return answer
+    return probe
+
+
+@pytest.fixture
+def listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(8)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+class TestTcpProbe:
+    """TCP连接探测测试"""
+
+    def test_listening_port(self, listener):
+        """端口在监听时判定在线"""
+        probe = make_tcp_probe([listener])
+        assert probe('127.0.0.1', 1.0) is True
+
+    def test_refused_port_counts_as_alive(self):
+        """连接被拒绝(RST)同样说明主机在线"""
+        probe = make_tcp_probe([free_port()])
+        assert probe('127.0.0.1', 1.0) is True
+
+    def test_any_port_answers(self, listener):
+        """多个端口中任一端口应答即可"""
+        probe = make_tcp_probe([free_port(), listener])
+        assert probe('127.0.0.1', 1.0) is True
+
+    def test_no_ports_is_negative(self):
+        """没有可探测的端口时判定无应答"""
+        probe = make_tcp_probe([])
+        assert probe('127.0.0.1', 0.2) is False
+
+
+class TestHostDiscovery:
+    """多方式并行发现测试"""
+
+    def test_first_positive_wins(self):
+        """首个肯定应答即返回，不等待慢的探测方式"""
+        discovery = HostDiscovery([
+            ('icmp', delayed(False, delay=0.8)),
+            ('neighbor', delayed(True, delay=0.05)),
+        ], timeout=1.0)
+
+        result = discovery.discover('10.0.0.1')
+
+        assert result['alive'] is True
+        assert result['method'] == 'neighbor'
+        assert result['elapsed'] < 0.5
+
+    def test_icmp_blocked_host_found_by_tcp(self, listener):
+        """禁ping的主机通过TCP端口被发现"""
+        discovery = HostDiscovery([
+            ('icmp', delayed(False)),
+            ('tcp', make_tcp_probe([listener])),
+        ], timeout=1.0)
+
+        result = discovery.discover('127.0.0.1')
+
+        assert result['alive'] is True
+        assert result['method'] == 'tcp'
+
+    def test_all_negative_is_offline(self):
+        """全部探测无应答时判定离线"""
+        discovery = HostDiscovery([
+            ('icmp', delayed(False)),
+            ('tcp', delayed(False, delay=0.05)),
+        ], timeout=0.5)
+
+        result = discovery.discover('10.0.0.2')
+
+        assert result == {'host': '10.0.0.2', 'alive': False, 'method': None,
+                          'elapsed': result['elapsed']}
+
+    def test_timeout_bounds_slow_probe(self):
+        """超过超时仍未应答的探测不再等待"""
+        def overrunning(ip, timeout):
+            time.sleep(timeout * 3)
+            return True
+
+        discovery = HostDiscovery([('slow', overrunning)], timeout=0.2)
+
+        start = time.monotonic()
+        result = discovery.discover('10.0.0.3')
+
+        assert result['alive'] is False
+        assert time.monotonic() - start < 0.5
+
+    def test_queued_probe_gets_full_timeout(self):
+        """共用线程池繁忙时，排队的探测开始执行后才计时，不会未探测就判为离线"""
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        try:
+            executor.submit(time.sleep, 0.3)
+            discovery = HostDiscovery([('icmp', delayed(True, delay=0.05))], timeout=0.2)
+
+            result = discovery.discover('10.0.0.5', executor)
+        finally:
+            executor.shutdown()
+
+        assert result['alive'] is True
+        assert result['method'] == 'icmp'
+
+    def test_arp_probe_bounded_by_timeout(self):
+        """SendARP无应答时约3秒才返回，ARP探测在超时后即判定无应答"""
+        with patch.object(probes, '_send_arp', side_effect=lambda ip: time.sleep(3) or True):
+            start = time.monotonic()
+            assert probes.arp_probe('10.0.0.6', 0.1) is False
+            assert time.monotonic() - start < 0.5
+
+        with patch.object(probes, '_send_arp', return_value=True):
+            assert probes.arp_probe('10.0.0.6', 0.1) is True
+
+    def test_probe_error_is_negative(self):
+        """探测出错视为无应答"""
+        def broken(ip, timeout):
+            raise OSError("no route")
+
+        discovery = HostDiscovery([('broken', broken), ('icmp', delayed(True))], timeout=0.5)
+
+        assert discovery.discover('10.0.0.4')['method'] == 'icmp'
+
+    def test_discover_many_reports_progress(self):
+        """批量探测逐个回报进度"""
+        alive = {'10.0.0.1', '10.0.0.3'}
+        discovery = HostDiscovery([('fake', lambda ip, timeout: ip in alive)], timeout=0.5)
+        hosts = [f'10.0.0.{i}' for i in range(1, 6)]
+        progress = []
+
+        results = discovery.discover_many(
+            hosts, max_workers=3,
+            progress_callback=lambda host, result, completed, total: progress.append((completed, total))
+        )
+
+        assert {host for host, result in results.items() if result['alive']} == alive
+        assert sorted(progress) == [(i, 5) for i in range(1, 6)]
+
+    def test_stop_skips_remaining_hosts(self):
+        """停止后不再探测剩余主机"""
+        calls = []
+        discovery = HostDiscovery([('slow', delayed(False, delay=0.2, calls=calls))], timeout=0.5)
+        hosts = [f'10.0.1.{i}' for i in range(1, 51)]
+        threading.Timer(0.1, discovery.stop).start()
+
+        results = discovery.discover_many(hosts, max_workers=2)
+
+        assert len(results) < len(hosts)
+        assert len(calls) < len(hosts)
+
+
+class TestBatchDiscover:
+    """Ping服务批量发现接口测试"""
+
+    def test_stats_shape_matches_batch_ping(self):
+        """回调参数与batch_ping一致，统计中带success和探测方式"""
+        service = PingService()
+        received = []
+
+        results = service.batch_discover(
+            ['10.0.0.1', '10.0.0.2'],
+            timeout=500,
+            probes=[('tcp', lambda ip, timeout: ip.endswith('.1'))],
+            progress_callback=lambda host, result, stats, completed, total: received.append((host, stats))
+        )
+
+        stats = dict(received)
+        assert stats['10.0.0.1']['success'] is True
+        assert stats['10.0.0.1']['method'] == 'tcp'
+        assert stats['10.0.0.2']['success'] is False
+        assert stats['10.0.0.2']['times'] == []
+        assert results['10.0.0.1']['stats'] is stats['10.0.0.1']
+
+    def test_stop_ping_stops_discovery(self):
+        """stop_ping同时停止主机发现"""
+        service = PingService()
+        hosts = [f'10.0.2.{i}' for i in range(1, 41)]
+        threading.Timer(0.1, service.stop_ping).start()
+
+        results = service.batch_discover(
+            hosts, timeout=500, max_workers=2,
+            probes=[('slow', delayed(False, delay=0.2))]
+        )
+
+        assert len(results) < len(hosts)
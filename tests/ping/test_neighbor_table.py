@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+邻居表读取测试
+使用 /proc/net/arp 格式的样例文件，不依赖本机真实的ARP缓存
+"""
+
+import pytest
+
+from netkit.services.ping import read_neighbor_table, split_by_neighbors
+from netkit.services.ping import neighbor_table
+from netkit.services.ping.neighbor_table import parse_proc_net_arp, read_proc_net_arp
+
+PROC_NET_ARP_SAMPLE = """\
+IP address       HW type     Flags       HW address            Mask     Device
+192.168.1.1      0x1         0x2         a4:91:b1:0c:22:01     *        eth0
+192.168.1.20     0x1         0x2         3C:52:82:AA:BB:CC     *        eth0
+192.168.1.30     0x1         0x0         00:00:00:00:00:00     *        eth0
+192.168.1.40     0x1         0x6         00:11:22:33:44:55     *        eth0
+10.0.0.5         0x1         0x2         08:00:27:12:34:56     *        wlan0
+224.0.0.251      0x1         0x6         01:00:5e:00:00:fb     *        eth0
+192.168.1.255    0x1         0x6         ff:ff:ff:ff:ff:ff     *        eth0
+garbage line
+"""
+
+
+@pytest.fixture
+def arp_file(tmp_path):
+    path = tmp_path / "arp"
+    path.write_text(PROC_NET_ARP_SAMPLE)
+    return path
+
+
+class TestProcNetArp:
+    """/proc/net/arp 解析测试"""
+
+    def test_resolved_entries_only(self):
+        """只保留已解析的单播表项"""
+        neighbors = parse_proc_net_arp(PROC_NET_ARP_SAMPLE)
+
+        assert sorted(neighbors) == ['10.0.0.5', '192.168.1.1', '192.168.1.20', '192.168.1.40']
+
+    def test_entry_fields(self):
+        """表项包含MAC、接口和静态/动态状态，MAC统一小写"""
+        neighbors = parse_proc_net_arp(PROC_NET_ARP_SAMPLE)
+
+        assert neighbors['192.168.1.20'] == {
+            'ip': '192.168.1.20',
+            'mac': '3c:52:82:aa:bb:cc',
+            'interface': 'eth0',
+            'state': 'dynamic',
+        }
+        assert neighbors['192.168.1.40']['state'] == 'static'
+        assert neighbors['10.0.0.5']['interface'] == 'wlan0'
+
+    def test_header_only(self):
+        """空表只有表头"""
+        assert parse_proc_net_arp(PROC_NET_ARP_SAMPLE.splitlines()[0]) == {}
+
+    def test_read_file(self, arp_file):
+        """从文件读取"""
+        assert len(read_proc_net_arp(str(arp_file))) == 4
+
+    def test_platform_reader(self, arp_file, monkeypatch):
+        """Linux下读取默认路径，读取失败时返回空表"""
+        monkeypatch.setattr(neighbor_table.platform, 'system', lambda: 'Linux')
+        monkeypatch.setattr(neighbor_table, 'PROC_NET_ARP', str(arp_file))
+        assert '192.168.1.1' in read_neighbor_table()
+
+        monkeypatch.setattr(neighbor_table, 'PROC_NET_ARP', str(arp_file) + '.missing')
+        assert read_neighbor_table() == {}
+
+    def test_unsupported_platform(self, monkeypatch):
+        """不支持的平台返回空表"""
+        monkeypatch.setattr(neighbor_table.platform, 'system', lambda: 'Plan9')
+        assert read_neighbor_table() == {}
+
+
+class TestSplitByNeighbors:
+    """按邻居表拆分主机测试"""
+
+    def test_keeps_order(self):
+        neighbors = parse_proc_net_arp(PROC_NET_ARP_SAMPLE)
+        hosts = [f'192.168.1.{i}' for i in range(1, 41)]
+
+        unknown, known = split_by_neighbors(hosts, neighbors)
+
+        assert known == ['192.168.1.1', '192.168.1.20', '192.168.1.40']
+        assert len(unknown) == 37
+        assert unknown[:2] == ['192.168.1.2', '192.168.1.3']
@@ -15,7 +15,8 @@ from netkit.services.ping import (
     PingService,
     PingExecutor,
     PingResultParser,
-    parse_ip_range
+    parse_ip_range,
+    count_ip_range
 )
 
 
@@ -133,6 +134,16 @@ class TestPingService:
         expected_ips = ['192.168.1.1', '192.168.1.2', '192.168.1.3', '192.168.1.4', '192.168.1.5']
         assert ips == expected_ips
     
+    def test_ip_range_counting(self):
+        """测试不展开列表计算主机数"""
+        for ip_range in ("192.168.1.0/24", "10.0.0.0/31", "10.0.0.7/32",
+                         "192.168.1.250-192.168.2.5", "192.168.1.1"):
+            assert count_ip_range(ip_range) == len(parse_ip_range(ip_range))
+        
+        assert count_ip_range("10.0.0.0/8") == 2 ** 24 - 2
+        with pytest.raises(ValueError):
+            count_ip_range("192.168.1.9-192.168.1.1")
+    
     def test_ping_performance(self):
         """测试Ping性能"""
         # 性能测试：批量ping应该在合理时间内完成
@@ -191,6 +202,23 @@ class TestPingExecutor:
         
         # 验证subprocess调用
         mock_subprocess.assert_called_once()
+    
+    @patch('netkit.services.ping.ping_executor.subprocess.run')
+    def test_probe_requires_echo_reply(self, mock_subprocess):
+        """测试单包探测以TTL判断应答（无法访问的应答不算）"""
+        mock_result = Mock()
+        mock_result.returncode = 0
+        mock_result.stderr = b""
+        mock_subprocess.return_value = mock_result
+        
+        mock_result.stdout = "来自 192.168.1.5 的回复: 字节=32 时间<1ms TTL=64".encode('gbk')
+        assert self.executor.probe('192.168.1.5', timeout=200) is True
+        
+        mock_result.stdout = "来自 192.168.1.1 的回复: 无法访问目标主机。".encode('gbk')
+        assert self.executor.probe('192.168.1.5', timeout=200) is False
+        
+        args = mock_subprocess.call_args[0][0]
+        assert args[1:5] == ['-n', '1', '-w', '200']
 
 
 class TestPingResultParser:
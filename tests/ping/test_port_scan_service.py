@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+端口扫描服务测试
+开放/关闭端口使用本机监听端口，超时和并发限制用替换连接函数的方式模拟
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+import pytest
+
+from netkit.services.ping import PortScanService, parse_ports
+from netkit.services.ping.port_scan_service import TimerWheel
+
+
+@pytest.fixture
+def listeners():
+    """本机上的一组监听端口"""
+    socks = []
+    for _ in range(20):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(128)
+        socks.append(sock)
+    yield [sock.getsockname()[1] for sock in socks]
+    for sock in socks:
+        sock.close()
+
+
+def closed_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class SlowScanService(PortScanService):
+    """连接固定耗时并记录并发数的扫描服务"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.active = {}
+        self.max_active = {}
+        self.max_total = 0
+
+    async def _connect(self, loop, sock, address):
+        host = address[0]
+        self.active[host] = self.active.get(host, 0) + 1
+        self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        self.max_total = max(self.max_total, sum(self.active.values()))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active[host] -= 1
+
+
+class TestTimerWheel:
+    """时间轮测试"""
+
+    def test_fires_at_deadline(self):
+        """到期前不触发，到期后触发一次"""
+        wheel = TimerWheel(tick=0.01, slots=16)
+        fired = []
+        wheel.schedule(0.05, lambda: fired.append('a'))
+
+        assert wheel.advance(0.04) == 0
+        assert wheel.advance(0.05) == 1
+        assert wheel.advance(0.2) == 0
+        assert fired == ['a'] and wheel.pending == 0
+
+    def test_cancel(self):
+        """取消的计时器不触发"""
+        wheel = TimerWheel(tick=0.01, slots=16)
+        fired = []
+        timer = wheel.schedule(0.03, lambda: fired.append('a'))
+        wheel.cancel(timer)
+        wheel.cancel(timer)
+
+        assert wheel.advance(1.0) == 0
+        assert fired == [] and wheel.pending == 0
+
+    def test_timeout_longer_than_one_round(self):
+        """超过一圈的计时器等到对应轮次才触发"""
+        wheel = TimerWheel(tick=0.01, slots=8)
+        fired = []
+        wheel.schedule(0.25, lambda: fired.append('late'))
+        wheel.schedule(0.01, lambda: fired.append('early'))
+
+        for step in range(1, 25):
+            wheel.advance(step * 0.01)
+        assert fired == ['early']
+        wheel.advance(0.25)
+        assert fired == ['early', 'late']
+
+    def test_catch_up_after_stall(self):
+        """事件循环停顿后一次推进触发全部到期计时器"""
+        wheel = TimerWheel(tick=0.01, slots=8)
+        fired = []
+        for i in range(1, 40):
+            wheel.schedule(i * 0.01, lambda i=i: fired.append(i))
+
+        assert wheel.advance(0.3) == 30
+        assert sorted(fired) == list(range(1, 31))
+        assert wheel.pending == 9
+
+    def test_past_deadline_fires_next_tick(self):
+        """已过期的截止时间在下一个刻度触发"""
+        wheel = TimerWheel(tick=0.01, slots=8, now=1.0)
+        fired = []
+        wheel.schedule(0.5, lambda: fired.append('x'))
+
+        assert wheel.advance(1.011) == 1
+
+
+class TestParsePorts:
+    """端口字符串解析测试"""
+
+    def test_list_and_ranges(self):
+        assert parse_ports("22, 80，443,8000-8002,80") == [22, 80, 443, 8000, 8001, 8002]
+
+    @pytest.mark.parametrize("text", ["", "0", "65536", "90-80", "http", "1-2-3"])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_ports(text)
+
+
+class TestPortScanService:
+    """端口扫描测试"""
+
+    def test_open_and_closed(self, listeners):
+        """监听端口为open，未监听端口为closed，均带连接耗时"""
+        refused = closed_port()
+        service = PortScanService()
+
+        results = service.scan(['127.0.0.1'], listeners[:3] + [refused], timeout=1000)
+
+        states = {port: result['state'] for port, result in results['127.0.0.1'].items()}
+        assert states == {listeners[0]: 'open', listeners[1]: 'open', listeners[2]: 'open', refused: 'closed'}
+        assert all(result['latency'] is not None for result in results['127.0.0.1'].values())
+
+    def test_timeout_is_filtered(self):
+        """超时未连接的端口为filtered，超时由时间轮控制"""
+        service = SlowScanService(delay=10)
+
+        start = time.perf_counter()
+        results = service.scan(['10.0.0.1'], [80, 443], timeout=200)
+        elapsed = time.perf_counter() - start
+
+        assert {result['state'] for result in results['10.0.0.1'].values()} == {'filtered'}
+        assert results['10.0.0.1'][80]['latency'] is None
+        assert elapsed < 1.0
+
+    def test_unresolvable_host(self):
+        """无法解析的主机记为error"""
+        service = PortScanService()
+
+        results = service.scan(['no-such-host.invalid'], [80], timeout=200)
+
+        assert results['no-such-host.invalid'][80]['state'] == 'error'
+
+    def test_connection_budgets(self):
+        """全局和单主机的同时连接数不超过限制"""
+        service = SlowScanService(delay=0.02)
+        hosts = [f'10.0.0.{i}' for i in range(1, 5)]
+
+        service.scan(hosts, range(1, 51), timeout=1000, max_in_flight=12, per_host=5)
+
+        assert service.max_total <= 12
+        assert max(service.max_active.values()) <= 5
+        assert service.max_total >= 10
+
+    def test_progress_callback_shape(self, listeners):
+        """进度回调参数与batch_ping一致，开放端口为success"""
+        service = PortScanService()
+        calls = []
+
+        service.scan(['127.0.0.1'], [listeners[0], closed_port()],
+                     progress_callback=lambda *args: calls.append(args))
+
+        assert [call[3] for call in sorted(calls, key=lambda call: call[3])] == [1, 2]
+        assert all(call[4] == 2 and call[0] == '127.0.0.1' for call in calls)
+        by_port = {call[1]['port']: call[2] for call in calls}
+        assert by_port[listeners[0]]['success'] is True
+        assert by_port[listeners[0]]['state'] == 'open'
+        assert len(by_port[listeners[0]]['times']) == 1
+
+    def test_stop(self):
+        """停止后不再发起新连接"""
+        service = SlowScanService(delay=0.05)
+        threading.Timer(0.1, service.stop).start()
+
+        results = service.scan(['10.0.0.1'], range(1, 201), per_host=4, max_in_flight=4)
+
+        assert len(results['10.0.0.1']) < 200
+        assert service.is_running is False
+
+    @pytest.mark.benchmark
+    def test_localhost_throughput(self, listeners):
+        """本机2000个端口（20个监听）的扫描吞吐"""
+        ports = sorted(set(range(40000, 42000)) | set(listeners))
+        service = PortScanService()
+
+        start = time.perf_counter()
+        results = service.scan(['127.0.0.1'], ports, timeout=1000, max_in_flight=256, per_host=256)
+        elapsed = time.perf_counter() - start
+
+        open_ports = {port for port, result in results['127.0.0.1'].items() if result['state'] == 'open'}
+        assert set(listeners) <= open_ports
+        assert len(results['127.0.0.1']) == len(ports)
+        print(f"\n{len(ports)} 个端口耗时 {elapsed:.2f}s，{len(ports) / elapsed:.0f} 端口/秒")
+        assert elapsed < 5.0
+
+
+class TestScanPortsCommand:
+    """scan-ports子命令测试"""
+
+    @staticmethod
+    def run_cli(argv):
+        import io
+        from netkit import cli
+
+        out = io.StringIO()
+        code = cli.main(argv, out=out)
+        return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_streams_each_port(self, listeners):
+        """每个端口完成即输出一条记录"""
+        from netkit import cli
+
+        closed = closed_port()
+        code, records = self.run_cli(['scan-ports', '127.0.0.1', '-p', f'{listeners[0]},{closed}'])
+
+        assert code == cli.EXIT_OK
+        assert {(r['port'], r['state']) for r in records} == {(listeners[0], 'open'), (closed, 'closed')}
+        assert sorted(r['completed'] for r in records) == [1, 2]
+        assert all(r['total'] == 2 for r in records)
+
+    def test_open_only(self, listeners):
+        """--open 只输出开放的端口"""
+        ports = ','.join(str(port) for port in listeners[:3] + [closed_port()])
+        code, records = self.run_cli(['scan-ports', '127.0.0.1', '-p', ports, '--open'])
+
+        assert sorted(r['port'] for r in records) == sorted(listeners[:3])
+
+    def test_invalid_ports(self):
+        """无效的端口列表返回参数错误"""
+        from netkit import cli
+
+        code, records = self.run_cli(['scan-ports', '127.0.0.1', '-p', '0-10'])
+
+        assert code == cli.EXIT_USAGE
+        assert records == []
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+反向DNS解析测试
+使用本机UDP上的桩DNS服务器，按预设表应答PTR查询
+"""
+
+import socket
+import struct
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from netkit.services.ping import ReverseDNSResolver
+from netkit.services.ping import reverse_dns
+from netkit.services.ping.reverse_dns import (
+    DNSCache,
+    build_ptr_query,
+    parse_ptr_response,
+    parse_resolv_conf,
+)
+
+
+def encode_name(name):
+    return b''.join(bytes([len(label)]) + label.encode() for label in name.split('.') if label) + b'\x00'
+
+
+def build_response(query, names=(), rcode=0, ttl=3600, soa_minimum=None):
+    """按查询构造应答：names非空时给出PTR记录（使用压缩指针指向问题），否则可附带SOA"""
+    query_id = struct.unpack_from('!H', query)[0]
+    question = query[12:]
+    answers = b''
+    for name in names:
+        rdata = encode_name(name)
+        answers += b'\xc0\x0c' + struct.pack('!HHIH', 12, 1, ttl, len(rdata)) + rdata
+    authority = b''
+    if soa_minimum is not None:
+        rdata = encode_name('ns.example') + encode_name('admin.example') + struct.pack('!IIIII', 1, 2, 3, 4, soa_minimum)
+        authority = encode_name('in-addr.arpa') + struct.pack('!HHIH', 6, 1, 900, len(rdata)) + rdata
+    header = struct.pack('!HHHHHH', query_id, 0x8180 | rcode, 1, len(names), 1 if authority else 0, 0)
+    return header + question + answers + authority
+
+
+class StubDNSServer:
+    """本机桩DNS服务器：records为 {IP: 主机名 | None | 'drop' | 'servfail'}"""
+
+    def __init__(self, records, delay=0.0):
+        self.records = records
+        self.delay = delay
+        self.queries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.address = self.sock.getsockname()
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while self.running:
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except OSError:
+                return
+            threading.Thread(target=self.answer, args=(data, addr), daemon=True).start()
+
+    def answer(self, data, addr):
+        question = parse_ptr_response(data)['question']
+        ip = '.'.join(reversed(question.split('.')[:4]))
+        with self.lock:
+            self.queries.append(ip)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        record = self.records.get(ip)
+        try:
+            if record == 'drop':
+                return
+            if record == 'servfail':
+                response = build_response(data, rcode=2)
+            elif record is None:
+                response = build_response(data, rcode=3, soa_minimum=60)
+            else:
+                response = build_response(data, names=[record])
+            self.sock.sendto(response, addr)
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def close(self):
+        self.running = False
+        self.sock.close()
+
+
+@pytest.fixture
+def server():
+    records = {f'10.0.0.{i}': f'host{i}.lan' for i in range(1, 51)}
+    records['10.0.0.99'] = None
+    records['10.0.0.98'] = 'drop'
+    records['10.0.0.97'] = 'servfail'
+    stub = StubDNSServer(records, delay=0.02)
+    yield stub
+    stub.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWireFormat:
+    """报文编解码测试"""
+
+    def test_query_and_response_roundtrip(self):
+        """PTR查询的问题为in-addr.arpa名称，应答中的压缩名称正确解析"""
+        query = build_ptr_query(0x1234, '192.168.1.20')
+        response = parse_ptr_response(build_response(query, names=['printer.lan'], ttl=120))
+
+        assert response['id'] == 0x1234
+        assert response['question'] == '20.1.168.192.in-addr.arpa'
+        assert response['names'] == ['printer.lan']
+        assert response['ttl'] == 120
+
+    def test_negative_response_soa_ttl(self):
+        """NXDOMAIN应答的否定缓存时间取SOA的TTL与minimum中较小者"""
+        query = build_ptr_query(1, '10.0.0.1')
+        response = parse_ptr_response(build_response(query, rcode=3, soa_minimum=60))
+
+        assert response['rcode'] == 3
+        assert response['names'] == []
+        assert response['negative_ttl'] == 60
+
+    def test_ipv6_query(self):
+        """IPv6地址使用ip6.arpa"""
+        response = parse_ptr_response(build_ptr_query(1, '2001:db8::1'))
+        assert response['question'].endswith('.8.b.d.0.1.0.0.2.ip6.arpa')
+
+    def test_truncated_packet(self):
+        """截断的报文抛出ValueError"""
+        with pytest.raises(ValueError):
+            parse_ptr_response(build_ptr_query(1, '10.0.0.1')[:15])
+
+    def test_resolv_conf(self):
+        """只取nameserver行中的有效地址"""
+        text = "# comment\nsearch lan\nnameserver 192.168.1.1\nnameserver fe80::1%eth0\nnameserver bogus\n"
+        assert parse_resolv_conf(text) == ['192.168.1.1', 'fe80::1']
+
+
+class TestDNSCache:
+    """LRU+TTL缓存测试"""
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = DNSCache(clock=clock)
+        cache.set('a', 'host-a', 60)
+
+        assert cache.get('a') == (True, 'host-a')
+        clock.now += 60
+        assert cache.get('a') == (False, None)
+
+    def test_negative_entries(self):
+        """否定应答命中时值为None"""
+        cache = DNSCache()
+        cache.set('b', None, 60)
+        assert cache.get('b') == (True, None)
+
+    def test_lru_eviction(self):
+        cache = DNSCache(maxsize=2)
+        cache.set('a', '1', 60)
+        cache.set('b', '2', 60)
+        cache.get('a')
+        cache.set('c', '3', 60)
+
+        assert cache.get('b') == (False, None)
+        assert cache.get('a') == (True, '1')
+        assert len(cache) == 2
+
+
+class TestReverseDNSResolver:
+    """解析器测试"""
+
+    def make_resolver(self, server, **kwargs):
+        kwargs.setdefault('timeout', 0.5)
+        return ReverseDNSResolver(nameservers=[server.address], **kwargs)
+
+    def test_batch_resolution(self, server):
+        """批量解析并行进行，结果逐个回调"""
+        resolver = self.make_resolver(server, max_concurrency=16)
+        ips = [f'10.0.0.{i}' for i in range(1, 51)]
+        progress = []
+
+        start = time.perf_counter()
+        names = resolver.resolve_many(ips, progress_callback=lambda ip, name: progress.append(ip))
+        elapsed = time.perf_counter() - start
+
+        assert names == {ip: f'host{ip.rsplit(".", 1)[1]}.lan' for ip in ips}
+        assert sorted(progress) == sorted(ips)
+        # 50个查询每个20ms，串行需要1秒
+        assert elapsed < 0.5
+
+    def test_concurrency_limit(self, server):
+        """同时进行的查询数不超过上限"""
+        resolver = self.make_resolver(server, max_concurrency=4)
+
+        resolver.resolve_many([f'10.0.0.{i}' for i in range(1, 31)])
+
+        assert 1 < server.max_in_flight <= 4
+
+    def test_cache_hits_skip_network(self, server):
+        """已缓存的地址不再查询"""
+        resolver = self.make_resolver(server)
+        resolver.resolve_many(['10.0.0.1', '10.0.0.2'])
+        server.queries.clear()
+
+        names = resolver.resolve_many(['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+
+        assert server.queries == ['10.0.0.3']
+        assert names['10.0.0.1'] == 'host1.lan'
+        assert resolver.lookup_cached('10.0.0.3') == 'host3.lan'
+
+    def test_negative_answer_cached(self, server):
+        """NXDOMAIN按SOA时间缓存，再次解析不发查询"""
+        resolver = self.make_resolver(server)
+
+        assert resolver.resolve('10.0.0.99') is None
+        assert resolver.resolve('10.0.0.99') is None
+        assert server.queries == ['10.0.0.99']
+        assert resolver.cache.get('10.0.0.99') == (True, None)
+
+    def test_timeout_and_servfail_not_cached(self, server):
+        """超时和服务器错误不缓存，重试后放弃"""
+        resolver = self.make_resolver(server, timeout=0.1, retries=1)
+
+        names = resolver.resolve_many(['10.0.0.98', '10.0.0.97'])
+
+        assert names == {'10.0.0.98': None, '10.0.0.97': None}
+        assert server.queries.count('10.0.0.98') == 2
+        assert resolver.cache.get('10.0.0.98') == (False, None)
+        assert resolver.cache.get('10.0.0.97') == (False, None)
+
+    def test_lookup_cached_does_not_query(self, server):
+        """只查缓存时不发起查询"""
+        resolver = self.make_resolver(server)
+
+        assert resolver.lookup_cached('10.0.0.5') is None
+        assert server.queries == []
+
+    def test_follows_system_nameserver_changes(self, server):
+        """使用系统配置时每批查询前重新读取DNS服务器，变化后清空缓存"""
+        with patch.object(reverse_dns, 'get_system_nameservers', return_value=[]):
+            resolver = ReverseDNSResolver(timeout=0.5)
+        resolver.cache.set('10.0.0.1', 'stale.old-network', 3600)
+
+        with patch.object(reverse_dns, 'get_system_nameservers', return_value=[server.address]):
+            names = resolver.resolve_many(['10.0.0.1', '10.0.0.2'])
+
+        assert names == {'10.0.0.1': 'host1.lan', '10.0.0.2': 'host2.lan'}
+        assert sorted(server.queries) == ['10.0.0.1', '10.0.0.2']
+
+    def test_explicit_nameservers_not_refreshed(self, server):
+        """显式指定的DNS服务器不随系统配置变化"""
+        resolver = self.make_resolver(server)
+
+        with patch.object(reverse_dns, 'get_system_nameservers', return_value=['192.0.2.53']) as system:
+            assert resolver.resolve('10.0.0.3') == 'host3.lan'
+        system.assert_not_called()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+路由表显示模型测试
+差异计算、筛选和排序不依赖Tk
+"""
+
+import time
+import pytest
+
+from gui.views.route.route_table_model import RouteTableModel, route_key, route_values
+
+
+def make_route(destination, netmask="255.255.255.0", gateway="192.168.1.1",
+               interface="192.168.1.100", metric=25, route_type="静态路由"):
+    return {
+        'network_destination': destination,
+        'netmask': netmask,
+        'gateway': gateway,
+        'interface': interface,
+        'metric': metric,
+        'route_type': route_type,
+    }
+
+
+def make_routes(count):
+    return [make_route(f"10.{i // 256}.{i % 256}.0", metric=i % 50) for i in range(count)]
+
+
+class TestRouteDiff:
+    """差异计算测试"""
+
+    def test_initial_load_inserts_all(self):
+        """首次加载全部插入"""
+        model = RouteTableModel()
+        model.set_routes(make_routes(3))
+
+        deletes, inserts, updates = model.diff({})
+
+        assert deletes == [] and updates == []
+        assert [key for key, _ in inserts] == [route_key(route) for route in make_routes(3)]
+
+    def test_only_changes_reported(self):
+        """只报告新增、删除和属性变化的行"""
+        model = RouteTableModel()
+        old = make_routes(1000)
+        model.set_routes(old)
+        displayed = dict(model.values)
+
+        new = make_routes(1000)
+        new[20]['metric'] = 999
+        del new[10]
+        new.append(make_route("172.16.0.0", netmask="255.240.0.0"))
+        model.set_routes(new)
+        deletes, inserts, updates = model.diff(displayed)
+
+        assert deletes == [route_key(old[10])]
+        assert [key for key, _ in inserts] == [route_key(new[-1])]
+        assert updates == [(route_key(new[19]), route_values(new[19]))]
+        assert updates[0][1][4] == "999"
+
+    def test_duplicate_keys_disambiguated(self):
+        """键相同的路由（如持久路由与活动路由）各占一行"""
+        model = RouteTableModel()
+        route = make_route("0.0.0.0", netmask="0.0.0.0")
+        model.set_routes([route, dict(route, route_type="持久路由")])
+
+        assert len(model.routes) == 2
+        assert f"{route_key(route)}#2" in model.routes
+
+    @pytest.mark.benchmark
+    def test_diff_cost_for_large_table(self):
+        """5000条路由无变化时差异为空且计算迅速"""
+        model = RouteTableModel()
+        model.set_routes(make_routes(5000))
+        displayed = dict(model.values)
+
+        start = time.perf_counter()
+        model.set_routes(make_routes(5000))
+        result = model.diff(displayed)
+        elapsed = time.perf_counter() - start
+
+        assert result == ([], [], [])
+        assert elapsed < 0.5
+
+
+class TestFilterAndSort:
+    """筛选与排序测试"""
+
+    @pytest.fixture
+    def model(self):
+        model = RouteTableModel()
+        model.set_routes([
+            make_route("192.168.10.0", metric=5, route_type="静态路由"),
+            make_route("10.0.0.0", netmask="255.0.0.0", metric=30, route_type="网络路由"),
+            make_route("9.9.9.9", netmask="255.255.255.255", gateway="On-link", metric=100,
+                       route_type="主机路由"),
+        ])
+        return model
+
+    def test_filter_all_tokens(self, model):
+        """所有关键字都要匹配，不区分大小写"""
+        model.set_filter("on-LINK")
+        assert [model.values[key][0] for key in model.visible_keys()] == ["9.9.9.9"]
+
+        model.set_filter("255.255 路由")
+        assert len(model.visible_keys()) == 2
+
+        model.set_filter("")
+        assert len(model.visible_keys()) == 3
+
+    def test_sort_ip_numerically(self, model):
+        """IP列按数值排序，再次点击切换降序"""
+        model.toggle_sort("destination")
+        assert [model.values[key][0] for key in model.visible_keys()] == ["9.9.9.9", "10.0.0.0", "192.168.10.0"]
+
+        model.toggle_sort("destination")
+        assert [model.values[key][0] for key in model.visible_keys()] == ["192.168.10.0", "10.0.0.0", "9.9.9.9"]
+
+    def test_sort_metric_numerically(self, model):
+        """跃点数按整数排序，非IP文本排在IP之后"""
+        model.toggle_sort("metric")
+        assert [model.values[key][4] for key in model.visible_keys()] == ["5", "30", "100"]
+
+        model.toggle_sort("gateway")
+        assert model.values[model.visible_keys()[-1]][2] == "On-link"
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+打包配置测试
+视图模块按需导入，PyInstaller无法追踪，必须在两个spec的hiddenimports中列出
+"""
+
+import os
+import ast
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SPECS = ['netkit_onefile.spec', 'netkit_debug.spec']
+
+
+def view_modules():
+    """从gui/main.py中读出VIEW_SPECS登记的视图模块（不导入GUI框架）"""
+    with open(os.path.join(PROJECT_ROOT, 'gui', 'main.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'VIEW_SPECS' for t in node.targets):
+            return [spec[0] for spec in ast.literal_eval(node.value).values()]
+    raise AssertionError("gui/main.py 中没有 VIEW_SPECS")
+
+
+def hidden_imports(spec_name):
+    """spec文件中Analysis的hiddenimports列表"""
+    with open(os.path.join(PROJECT_ROOT, 'scripts', spec_name), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword) and node.arg == 'hiddenimports':
+            return ast.literal_eval(node.value)
+    raise AssertionError(f"{spec_name} 中没有 hiddenimports")
+
+
+class TestHiddenImports:
+    """按需导入模块的打包测试"""
+
+    @pytest.mark.parametrize('spec_name', SPECS)
+    def test_lazy_views_and_dependencies_listed(self, spec_name):
+        """VIEW_SPECS中的视图模块和只被它们使用的pyperclip都在hiddenimports中"""
+        imports = set(hidden_imports(spec_name))
+
+        assert set(view_modules()) <= imports
+        assert 'pyperclip' in imports
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行接口测试
+验证子命令的JSON Lines/CSV流式输出、退出码，以及CLI不依赖GUI模块
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import subprocess
+import pytest
+from unittest.mock import patch
+
+from netkit import cli
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_ROUTE_OUTPUT = """
+IPv4 Route Table
+===========================================================================
+Active Routes:
+Network Destination        Netmask          Gateway       Interface  Metric
+          0.0.0.0          0.0.0.0      192.168.1.1    192.168.1.100     25
+        127.0.0.0        255.0.0.0         On-link         127.0.0.1    331
+       10.10.0.0      255.255.0.0      192.168.1.254   192.168.1.100     10
+===========================================================================
+IPv6 Route Table
+"""
+
+
+def run_cli(argv):
+    """运行CLI并返回(退出码, 输出文本)"""
+    out = io.StringIO()
+    code = cli.main(argv, out=out)
+    return code, out.getvalue()
+
+
+def parse_jsonl(text):
+    """解析JSON Lines输出"""
+    return [json.loads(line) for line in text.splitlines() if line]
+
+
+def fake_ping_single(reachable):
+    """构造按主机返回成功/失败的ping_single替身"""
+    def ping_single(host, count=4, timeout=3000):
+        if host in reachable:
+            output = (f"Reply from {host}: bytes=32 time=1ms TTL=64\n"
+                      f"    Packets: Sent = 1, Received = 1, Lost = 0 (0% loss),\n"
+                      f"    Minimum = 1ms, Maximum = 1ms, Average = 1ms\n")
+            return {'success': True, 'output': output, 'error': '', 'host': host, 'return_code': 0}
+        return {'success': False, 'output': '', 'error': 'Request timed out.', 'host': host, 'return_code': 1}
+    return ping_single
+
+
+class TestSubnetCommands:
+    """子网计算子命令测试"""
+
+    def test_subnet_info_jsonl(self):
+        """subnet info 输出单条JSON记录"""
+        code, text = run_cli(['subnet', 'info', '192.168.1.10', '/24'])
+
+        assert code == cli.EXIT_OK
+        records = parse_jsonl(text)
+        assert len(records) == 1
+        assert records[0]['network_address'] == '192.168.1.0'
+        assert records[0]['host_count'] == '254'
+
+    def test_subnet_divide_csv(self):
+        """subnet divide 以CSV输出，每个子网一行"""
+        code, text = run_cli(['subnet', 'divide', '10.0.0.0', '/16', '--subnets', '4', '--format', 'csv'])
+
+        assert code == cli.EXIT_OK
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert [row['cidr_notation'] for row in rows] == [
+            '10.0.0.0/18', '10.0.64.0/18', '10.0.128.0/18', '10.0.192.0/18'
+        ]
+        assert rows[0]['index'] == '1'
+        assert 'binary_mask' not in rows[0]
+        assert all(value for value in rows[0].values())
+
+    def test_subnet_divide_streams(self):
+        """大量子网逐个写出，下游关闭时不必先展开全部子网"""
+        class ClosingStream(io.StringIO):
+            def write(self, text):
+                if self.getvalue().count('\n') >= 3:
+                    raise BrokenPipeError()
+                return super().write(text)
+
+        out = ClosingStream()
+        with patch('netkit.services.subnet.subnet_calculator.SubnetCalculator.divide_subnet',
+                   side_effect=AssertionError("不应展开全部子网")):
+            code = cli.main(['subnet', 'divide', '10.0.0.0', '/8', '--hosts', '2'], out=out)
+
+        assert code == cli.EXIT_OK
+        assert [r['cidr_notation'] for r in parse_jsonl(out.getvalue())] == [
+            '10.0.0.0/30', '10.0.0.4/30', '10.0.0.8/30'
+        ]
+
+    def test_subnet_invalid_input(self):
+        """无效输入返回失败退出码且不输出记录"""
+        code, text = run_cli(['subnet', 'info', '999.1.1.1', '/24'])
+
+        assert code == cli.EXIT_FAILURE
+        assert text == ''
+
+    def test_divide_requires_mode(self):
+        """subnet divide 必须指定划分方式"""
+        with pytest.raises(SystemExit) as exc:
+            run_cli(['subnet', 'divide', '10.0.0.0', '/16'])
+        assert exc.value.code == cli.EXIT_USAGE
+
+
+class TestPingCommand:
+    """ping子命令测试"""
+
+    def test_ping_streams_each_host(self):
+        """每台主机完成即输出一条记录"""
+        with patch('netkit.services.ping.ping_executor.PingExecutor.ping_single',
+                   side_effect=fake_ping_single({'10.0.0.1', '10.0.0.2'})):
+            code, text = run_cli(['ping', '10.0.0.1-10.0.0.3', '--workers', '1'])
+
+        records = parse_jsonl(text)
+        assert {r['host'] for r in records} == {'10.0.0.1', '10.0.0.2', '10.0.0.3'}
+        assert [r['completed'] for r in records] == [1, 2, 3]
+        assert all(r['total'] == 3 for r in records)
+        assert {r['host']: r['success'] for r in records}['10.0.0.3'] is False
+        # 存在不可达主机时返回失败退出码
+        assert code == cli.EXIT_FAILURE
+
+    def test_ping_all_reachable(self):
+        """全部可达时返回0，CSV表头只输出一次"""
+        with patch('netkit.services.ping.ping_executor.PingExecutor.ping_single',
+                   side_effect=fake_ping_single({'10.0.0.1', '10.0.0.2'})):
+            code, text = run_cli(['ping', '10.0.0.1', '10.0.0.2', '10.0.0.1', '-f', 'csv'])
+
+        rows = list(csv.DictReader(io.StringIO(text)))
+        assert code == cli.EXIT_OK
+        assert len(rows) == 2
+        assert text.count('host,success') == 1
+
+    def test_ping_invalid_range(self):
+        """无效的目标范围返回参数错误"""
+        code, text = run_cli(['ping', '10.0.0.9-10.0.0.1'])
+
+        assert code == cli.EXIT_USAGE
+        assert text == ''
+
+    def test_writer_flushes_per_record(self):
+        """每条记录写出后立即刷新，下游可以实时读取"""
+        class CountingStream(io.StringIO):
+            flushes = 0
+
+            def flush(self):
+                CountingStream.flushes += 1
+                super().flush()
+
+        stream = CountingStream()
+        writer = cli.RecordWriter(stream, 'jsonl')
+        writer.write_all({'n': i} for i in range(5))
+
+        assert CountingStream.flushes == 5
+        assert writer.count == 5
+
+
+class TestRouteCommands:
+    """路由子命令测试"""
+
+    def test_route_list(self):
+        """route list 输出解析后的路由记录"""
+        with patch('netkit.services.route.route_manager.RouteManager.get_system_routes',
+                   return_value={'success': True, 'raw_output': SAMPLE_ROUTE_OUTPUT}):
+            code, text = run_cli(['route', 'list'])
+
+        assert code == cli.EXIT_OK
+        records = parse_jsonl(text)
+        assert [r['network_destination'] for r in records] == ['0.0.0.0', '127.0.0.0', '10.10.0.0']
+        assert records[2]['cidr_network'] == '10.10.0.0/16'
+
+    def test_route_list_failure(self):
+        """获取路由表失败时返回失败退出码"""
+        with patch('netkit.services.route.route_manager.RouteManager.get_system_routes',
+                   return_value={'success': False, 'error': '权限不足'}):
+            code, text = run_cli(['route', 'list'])
+
+        assert code == cli.EXIT_FAILURE
+        assert text == ''
+
+    def test_route_add_validation_error(self):
+        """参数校验失败时输出失败结果"""
+        code, text = run_cli(['route', 'add', 'bad', '255.255.255.0', '192.168.1.1'])
+
+        assert code == cli.EXIT_FAILURE
+        assert parse_jsonl(text)[0]['success'] is False
+
+
+class TestHeadless:
+    """无界面运行测试"""
+
+    def test_cli_does_not_import_gui(self):
+        """运行子命令不加载tkinter或GUI模块"""
+        script = (
+            "import sys, io, json\n"
+            "from netkit.cli import main\n"
+            "main(['subnet', 'info', '10.0.0.1', '/8'], out=io.StringIO())\n"
+            "print(json.dumps(sorted(m for m in sys.modules "
+            "if m.split('.')[0] in ('tkinter', '_tkinter', 'ttkbootstrap', 'gui'))))\n"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                                text=True, cwd=PROJECT_ROOT, timeout=60)
+
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+    def test_module_entry_point(self):
+        """python -m netkit 可以直接运行"""
+        result = subprocess.run(
+            [sys.executable, '-m', 'netkit', 'subnet', 'info', '172.16.5.4', '255.255.0.0'],
+            capture_output=True, text=True, cwd=PROJECT_ROOT, timeout=60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert json.loads(result.stdout)['cidr_notation'] == '172.16.0.0/16'
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时回归测试
+确保导入子网计算模块不会连带加载WMI/COM等Windows专用模块
+"""
+
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# import netkit.services.subnet 的耗时预算(秒)
+IMPORT_BUDGET_SECONDS = 0.3
+
+HEAVY_MODULES = ['wmi', 'pythoncom', 'netkit.services.netconfig', 'netkit.services.ping', 'tkinter']
+
+PROBE_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+import netkit.services.subnet
+from netkit.services.subnet import SubnetCalculator
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+
+def run_in_fresh_interpreter(script):
+    """在新的解释器中执行脚本并解析JSON输出"""
+    result = subprocess.run(
+        [sys.executable, '-c', script],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    """导入耗时测试"""
+    
+    def test_subnet_import_does_not_load_heavy_modules(self):
+        """导入子网模块不加载网卡配置、Ping等子系统"""
+        data = run_in_fresh_interpreter(PROBE_SCRIPT)
+        
+        loaded = [name for name in HEAVY_MODULES if name in data['modules']]
+        assert loaded == []
+    
+    @pytest.mark.benchmark
+    def test_subnet_import_within_budget(self):
+        """导入子网模块的耗时在预算内（取多次中的最小值以减少抖动）"""
+        timings = [run_in_fresh_interpreter(PROBE_SCRIPT)['elapsed'] for _ in range(3)]
+        
+        assert min(timings) < IMPORT_BUDGET_SECONDS, f"导入耗时 {min(timings):.3f}s 超出预算"
+    
+    def test_lazy_attributes_still_available(self):
+        """延迟导入后原有的包级接口仍可用"""
+        data = run_in_fresh_interpreter("""
+import json, sys
+import netkit
+from netkit.services.ping import PingService, parse_ip_range
+from netkit.services.route import RouteService
+ok = netkit.services.subnet.SubnetCalculator.__name__ == 'SubnetCalculator'
+print(json.dumps({'ok': ok, 'netconfig': 'netkit.services.netconfig' in sys.modules}))
+""")
+        
+        assert data == {'ok': True, 'netconfig': False}
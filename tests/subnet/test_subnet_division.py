@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+子网划分分页与流式导出测试
+"""
+
+import csv
+import io
+import time
+import pytest
+
+from netkit.services.subnet import SubnetCalculator, SubnetDivision
+from gui.views.subnet.division_format import (
+    HEADER,
+    SEPARATOR,
+    ListPages,
+    format_row,
+    write_division,
+)
+
+
+class CountingWriter(io.StringIO):
+    """记录写入次数的流"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestSubnetDivision:
+    """按需生成的划分结果测试"""
+
+    def setup_method(self):
+        self.calculator = SubnetCalculator()
+
+    def test_matches_divide_subnet(self):
+        """分页结果与一次性划分结果一致"""
+        division = self.calculator.plan_division("172.16.0.0", "/20", "hosts", 30)
+        expected = self.calculator.divide_subnet("172.16.0.0", "/20", "hosts", 30)
+
+        assert isinstance(division, SubnetDivision)
+        assert len(division) == len(expected) == 128
+        assert division.page(0, 128) == expected
+        assert division.page(120, 50) == expected[120:]
+        assert list(division) == expected
+
+    def test_subnet_count_mode_truncates(self):
+        """按子网数量划分时只返回所需数量"""
+        division = self.calculator.plan_division("192.168.1.0", "24", "subnets", 5)
+
+        assert len(division) == 5
+        assert division.page(4, 10)[0]['cidr_notation'] == "192.168.1.128/27"
+
+    def test_huge_division_is_lazy(self):
+        """/8划分为/30时不展开四百万个子网"""
+        start = time.perf_counter()
+        division = self.calculator.plan_division("10.0.0.0", "8", "hosts", 2)
+        last = division.page(len(division) - 1, 10)
+        elapsed = time.perf_counter() - start
+
+        assert len(division) == 2 ** 22
+        assert last == [self.calculator._format_subnet(division.subnet(2 ** 22 - 1))]
+        assert last[0]['cidr_notation'] == "10.255.255.252/30"
+        assert last[0]['host_range'] == "10.255.255.253 - 10.255.255.254"
+        assert elapsed < 0.1
+
+    def test_subnet_index_out_of_range(self):
+        """越界序号抛出IndexError"""
+        division = self.calculator.plan_division("192.168.1.0", "24", "subnets", 4)
+
+        with pytest.raises(IndexError):
+            division.subnet(4)
+        assert division.page(10, 5) == []
+
+    def test_errors_preserved(self):
+        """无法划分时的错误信息不变"""
+        with pytest.raises(ValueError, match="超出了原网络容量"):
+            self.calculator.plan_division("192.168.1.0", "24", "hosts", 300)
+
+
+class TestDivisionExport:
+    """流式导出测试"""
+
+    def setup_method(self):
+        self.calculator = SubnetCalculator()
+
+    def test_text_export(self):
+        """文本导出包含表头和每个子网一行"""
+        division = self.calculator.plan_division("192.168.1.0", "24", "subnets", 4)
+        stream = io.StringIO()
+
+        assert write_division(division, stream) == 4
+        lines = stream.getvalue().splitlines()
+        assert lines[:2] == [HEADER, SEPARATOR]
+        assert lines[2] == format_row(1, division.page(0, 1)[0])
+        assert lines[-1].startswith("4    192.168.1.192")
+
+    def test_csv_export(self):
+        """CSV导出按列写出"""
+        division = self.calculator.plan_division("10.0.0.0", "16", "subnets", 3)
+        stream = io.StringIO()
+
+        write_division(division, stream, fmt='csv')
+        rows = list(csv.reader(io.StringIO(stream.getvalue())))
+
+        assert rows[0][:2] == ['序号', '子网地址']
+        assert rows[1][:3] == ['1', '10.0.0.0/18', '10.0.0.0']
+        assert len(rows) == 4
+
+    def test_streams_page_by_page(self):
+        """按页写出，写入次数与页数相当，不一次拼接全部内容"""
+        division = self.calculator.plan_division("10.0.0.0", "12", "hosts", 2)
+        stream = CountingWriter()
+
+        written = write_division(division, stream, page_size=1000)
+
+        assert written == len(division) == 2 ** 18
+        assert stream.writes == 1 + 2 ** 18 // 1000 + 1
+
+    def test_list_source(self):
+        """已展开的列表也可作为结果源"""
+        results = self.calculator.divide_subnet("192.168.1.0", "24", "subnets", 2)
+        source = ListPages(results)
+        stream = io.StringIO()
+
+        assert len(source) == 2
+        assert source.page(1, 10) == results[1:]
+        assert write_division(source, stream) == 2
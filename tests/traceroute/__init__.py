@@ -0,0 +1 @@
+# NetKit 路由跟踪测试模块
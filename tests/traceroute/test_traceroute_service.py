@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+路由跟踪服务测试
+用模拟网络代替原始套接字：按TTL决定由哪一跳应答，应答按设定的延迟到达
+"""
+
+import heapq
+import socket
+import struct
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from netkit.services.traceroute import TracerouteService, TracerouteEngine, HopStats
+from netkit.services.traceroute.icmp_transport import (
+    build_echo_request,
+    checksum,
+    parse_icmp_packet,
+)
+
+DESTINATION = '203.0.113.10'
+ROUTERS = ['192.168.1.1', '10.10.0.1', '172.16.5.1', '198.51.100.1']
+
+
+class SimulatedNetwork:
+    """
+    模拟网络：第n跳(n<=路由器数)以time exceeded应答，之后由目标以回显应答
+
+    Args:
+        routers: 路径上的路由器地址
+        destination: 目标地址
+        latency: 每跳增加的单程时延(秒)
+        silent: 不发送ICMP应答的TTL
+        drop: drop(ttl, send_count) 为True时丢弃这次探测
+        unreachable_at: 该TTL的路由器返回目的不可达
+    """
+
+    def __init__(self, routers=ROUTERS, destination=DESTINATION, latency=0.01,
+                 silent=(), drop=None, unreachable_at=None):
+        self.routers = routers
+        self.destination = destination
+        self.latency = latency
+        self.silent = set(silent)
+        self.drop = drop
+        self.unreachable_at = unreachable_at
+        self.sends = {}
+        self.queue = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def send(self, destination, ttl, ident, seq):
+        sent = time.monotonic()
+        count = self.sends.get(ttl, 0)
+        self.sends[ttl] = count + 1
+        if ttl in self.silent or (self.drop and self.drop(ttl, count)):
+            return sent
+
+        hops = min(ttl, len(self.routers) + 1)
+        if self.unreachable_at and ttl >= self.unreachable_at:
+            source, reply_type = self.routers[self.unreachable_at - 1], 'unreachable'
+            hops = self.unreachable_at
+        elif ttl <= len(self.routers):
+            source, reply_type = self.routers[ttl - 1], 'time_exceeded'
+        else:
+            source, reply_type = destination, 'echo_reply'
+
+        due = sent + 2 * self.latency * hops
+        with self.lock:
+            heapq.heappush(self.queue, (due, seq, {'type': reply_type, 'source': source,
+                                                   'ident': ident, 'seq': seq}))
+        return sent
+
+    def inject(self, reply, delay=0.0):
+        """注入一个无关的应答"""
+        with self.lock:
+            heapq.heappush(self.queue, (time.monotonic() + delay, -1, reply))
+
+    def receive(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            if not self.queue or self.queue[0][0] > deadline:
+                due = None
+            else:
+                due, _, reply = heapq.heappop(self.queue)
+        if due is None:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            return None
+        time.sleep(max(0.0, due - time.monotonic()))
+        return dict(reply, received=due)
+
+    def close(self):
+        self.closed = True
+
+
+def make_service(network):
+    return TracerouteService(transport_factory=lambda address: network)
+
+
+class TestIcmpPackets:
+    """ICMP报文构造与解析测试"""
+
+    @staticmethod
+    def ip_header(source, destination, protocol=socket.IPPROTO_ICMP):
+        return struct.pack('!BBHHHBBH4s4s', 0x45, 0, 0, 0, 0, 64, protocol, 0,
+                           socket.inet_aton(source), socket.inet_aton(destination))
+
+    def test_echo_request_checksum(self):
+        """回显请求的校验和使整个报文校验为0"""
+        packet = build_echo_request(0x1234, 7)
+        assert checksum(packet) == 0
+        assert struct.unpack_from('!BBHHH', packet)[3:] == (0x1234, 7)
+
+    def test_parse_echo_reply(self):
+        reply = bytearray(build_echo_request(0x1234, 7))
+        reply[0] = 0
+        packet = self.ip_header(DESTINATION, '192.168.1.100') + bytes(reply)
+
+        assert parse_icmp_packet(packet) == {
+            'type': 'echo_reply', 'source': DESTINATION, 'ident': 0x1234, 'seq': 7
+        }
+
+    def test_parse_time_exceeded_quotes_original(self):
+        """time exceeded从引用的原始报文中取出标识符和序号"""
+        original = self.ip_header('192.168.1.100', DESTINATION) + build_echo_request(0x1234, 42)[:8]
+        icmp = struct.pack('!BBHI', 11, 0, 0, 0) + original
+        packet = self.ip_header('10.10.0.1', '192.168.1.100') + icmp
+
+        assert parse_icmp_packet(packet) == {
+            'type': 'time_exceeded', 'source': '10.10.0.1', 'ident': 0x1234, 'seq': 42
+        }
+
+    def test_ignores_unrelated_packets(self):
+        """其他ICMP类型和引用UDP报文的错误被忽略"""
+        redirect = self.ip_header('10.0.0.1', '10.0.0.2') + struct.pack('!BBHI', 5, 0, 0, 0)
+        udp_error = (self.ip_header('10.0.0.1', '10.0.0.2')
+                     + struct.pack('!BBHI', 3, 3, 0, 0)
+                     + self.ip_header('10.0.0.2', '8.8.8.8', socket.IPPROTO_UDP) + b'\x00' * 8)
+
+        assert parse_icmp_packet(redirect) is None
+        assert parse_icmp_packet(udp_error) is None
+        assert parse_icmp_packet(b'\x45') is None
+
+
+class TestTrace:
+    """单轮路由跟踪测试"""
+
+    def test_full_path(self):
+        """各跳按TTL顺序返回，到达目标"""
+        result = make_service(SimulatedNetwork()).trace(DESTINATION)
+
+        assert result['success'] and result['reached']
+        assert [hop['address'] for hop in result['hops']] == ROUTERS + [DESTINATION]
+        assert [hop['type'] for hop in result['hops']][-2:] == ['time_exceeded', 'echo_reply']
+        assert result['hops'][0]['rtt'] == pytest.approx(20, abs=10)
+
+    def test_parallel_probes(self):
+        """全部TTL同时探测，耗时约为最远一跳的往返时间而非逐跳之和"""
+        network = SimulatedNetwork(latency=0.05)
+
+        result = make_service(network).trace(DESTINATION, max_hops=30, timeout=3000)
+
+        # 逐跳探测需要 0.1+0.2+0.3+0.4+0.5 = 1.5秒
+        assert result['elapsed'] < 0.8
+        assert set(network.sends) == set(range(1, 31))
+
+    def test_silent_hop_waits_for_timeout(self):
+        """不应答的路由器显示为空，其余各跳正常"""
+        result = make_service(SimulatedNetwork(silent={2})).trace(DESTINATION, timeout=300)
+
+        assert result['reached']
+        assert result['hops'][1] == {'ttl': 2, 'address': None, 'rtt': None, 'type': None}
+        assert result['hops'][2]['address'] == ROUTERS[2]
+        assert result['elapsed'] >= 0.3
+
+    def test_unreachable_ends_path(self):
+        """中途的目的不可达结束路径，未到达目标"""
+        result = make_service(SimulatedNetwork(unreachable_at=3)).trace(DESTINATION)
+
+        assert result['reached'] is False
+        assert [hop['address'] for hop in result['hops']] == ROUTERS[:3]
+        assert result['hops'][-1]['type'] == 'unreachable'
+
+    def test_foreign_replies_ignored(self):
+        """标识符或序号不匹配的应答不计入"""
+        network = SimulatedNetwork()
+        engine = TracerouteEngine(network, DESTINATION, max_hops=8, timeout=1.0, ident=100)
+        network.inject({'type': 'time_exceeded', 'source': '6.6.6.6', 'ident': 101, 'seq': 1})
+        network.inject({'type': 'time_exceeded', 'source': '6.6.6.7', 'ident': 100, 'seq': 999})
+
+        result = engine.probe_round()
+
+        assert '6.6.6.6' not in [hop['address'] for hop in result['hops']]
+        assert '6.6.6.7' not in [hop['address'] for hop in result['hops']]
+        assert result['hops'][0]['address'] == ROUTERS[0]
+
+    def test_max_hops_clamped_to_ttl_range(self):
+        """最大跳数限制在1-255，不会发出TTL字段放不下的探测"""
+        network = SimulatedNetwork(silent=range(1, 300))
+
+        assert TracerouteEngine(network, DESTINATION, max_hops=1000, timeout=0.05).probe_round()['hops'] == []
+        assert max(network.sends) == 255
+        assert TracerouteEngine(network, DESTINATION, max_hops=0).max_hops == 1
+
+    def test_resolution_error(self):
+        """无法解析的主机返回错误"""
+        result = make_service(SimulatedNetwork()).trace('no-such-host.invalid')
+
+        assert result['success'] is False
+        assert '无法解析主机' in result['error']
+
+    def test_permission_error(self):
+        """没有原始套接字权限时给出提示"""
+        def deny(address):
+            raise PermissionError("Operation not permitted")
+
+        result = TracerouteService(transport_factory=deny).trace(DESTINATION)
+
+        assert result['success'] is False
+        assert result['error'] == "发送ICMP探测需要管理员权限"
+
+
+class TestMTR:
+    """连续跟踪测试"""
+
+    def test_loss_and_latency_per_hop(self):
+        """每跳统计丢包率和延迟"""
+        # 第2跳每隔一轮丢一次
+        network = SimulatedNetwork(latency=0.002, drop=lambda ttl, count: ttl == 2 and count % 2 == 1)
+        rounds = []
+
+        result = make_service(network).mtr(
+            DESTINATION, rounds=4, interval=10, timeout=200,
+            progress_callback=lambda number, hops: rounds.append(number)
+        )
+
+        assert result['success'] and result['reached']
+        assert rounds == [1, 2, 3, 4]
+        hops = {hop['ttl']: hop for hop in result['hops']}
+        assert len(hops) == 5
+        assert hops[1]['loss'] == 0.0 and hops[1]['received'] == 4
+        assert hops[2]['loss'] == 50.0 and hops[2]['address'] == ROUTERS[1]
+        assert hops[5]['address'] == DESTINATION
+        assert hops[1]['best'] <= hops[1]['avg'] <= hops[1]['worst']
+        assert network.closed
+
+    def test_lost_destination_reply(self):
+        """目标对某轮的应答丢失时不多出一跳，记为目标的丢包"""
+        network = SimulatedNetwork(latency=0.002, drop=lambda ttl, count: ttl == 5 and count == 1)
+
+        result = make_service(network).mtr(DESTINATION, rounds=4, interval=10, timeout=200)
+
+        assert [hop['ttl'] for hop in result['hops']] == [1, 2, 3, 4, 5]
+        assert result['hops'][-1]['address'] == DESTINATION
+        assert result['hops'][-1]['loss'] == 25.0
+
+    def test_stop(self):
+        """stop()结束无限轮次的连续跟踪"""
+        service = make_service(SimulatedNetwork(latency=0.001))
+        threading.Timer(0.2, service.stop).start()
+
+        result = service.mtr(DESTINATION, rounds=None, interval=50, timeout=100)
+
+        assert result['success']
+        assert 1 <= result['rounds'] < 20
+
+
+class TestHopStats:
+    """单跳环形缓冲测试"""
+
+    def test_ring_buffer_window(self):
+        """只统计最近history次探测"""
+        stats = HopStats(3, history=4)
+        for rtt in (None, None, 10.0, 20.0, 30.0, None):
+            stats.add('10.0.0.1' if rtt else None, rtt)
+
+        summary = stats.summary()
+        assert summary['sent'] == 4
+        assert summary['received'] == 3
+        assert summary['loss'] == 25.0
+        assert summary['last'] is None
+        assert (summary['best'], summary['worst'], summary['avg']) == (10.0, 30.0, 20.0)
+        assert summary['address'] == '10.0.0.1'
+
+    def test_empty(self):
+        summary = HopStats(1).summary()
+        assert summary['sent'] == 0 and summary['loss'] == 0.0 and summary['avg'] is None
+
+
+class TestTraceCommand:
+    """trace子命令测试"""
+
+    def test_trace_outputs_hops(self):
+        """每跳输出一条记录，到达目标返回0"""
+        import io
+        import json
+        from netkit import cli
+
+        with patch('netkit.services.traceroute.traceroute_service.IcmpTransport',
+                   lambda address: SimulatedNetwork(latency=0.001)):
+            out = io.StringIO()
+            code = cli.main(['trace', DESTINATION], out=out)
+
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert code == cli.EXIT_OK
+        assert [record['ttl'] for record in records] == [1, 2, 3, 4, 5]
+        assert records[-1]['address'] == DESTINATION
+
+    @pytest.mark.parametrize('value', ['0', '256', '-1'])
+    def test_max_hops_out_of_range(self, value):
+        """--max-hops 超出1-255时报参数错误"""
+        from netkit import cli
+
+        with pytest.raises(SystemExit) as exc:
+            cli.main(['trace', DESTINATION, '--max-hops', value])
+        assert exc.value.code == cli.EXIT_USAGE
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令执行服务测试
+使用 /bin/sh 和一个用Python实现的假shell验证哨兵切分、异常恢复和回退，
+并对比长驻会话与逐条创建进程执行1000条命令的耗时
+"""
+
+import re
+import sys
+import json
+import base64
+import time
+import shutil
+import subprocess
+import pytest
+
+from netkit.utils.command_runner import (
+    CommandRunner,
+    PosixShellDialect,
+    PowerShellDialect,
+    ShellDialect,
+    ShellSession,
+    SessionError,
+)
+
+pytestmark = pytest.mark.skipif(shutil.which('sh') is None, reason="需要POSIX sh")
+
+# 假shell：每行一个JSON请求，按脚本化规则输出，遇到 crash 直接退出
+FAKE_SHELL = r"""
+import sys, json
+for raw in sys.stdin:
+    request = json.loads(raw)
+    command = request['command']
+    if command == 'crash':
+        sys.exit(3)
+    if command.startswith('say '):
+        out, err, rc = command[4:], '', 0
+    elif command.startswith('fail '):
+        out, err, rc = '', command[5:], int(command.split()[-1])
+    else:
+        out, err, rc = '', 'unknown command', 127
+    sys.stdout.write(out + '\n' + request['sentinel'] + ' ' + str(rc) + '\n')
+    sys.stdout.flush()
+    sys.stderr.write(err + '\n' + request['sentinel'] + '\n')
+    sys.stderr.flush()
+"""
+
+
+class FakeShellDialect(ShellDialect):
+    """驱动假shell的方言"""
+
+    name = 'fake'
+
+    def __init__(self):
+        self.argv = [sys.executable, '-u', '-c', FAKE_SHELL]
+
+    def quote(self, arg):
+        return arg
+
+    def wrap(self, command, sentinel):
+        return json.dumps({'command': command, 'sentinel': sentinel}) + '\n'
+
+
+@pytest.fixture
+def runner():
+    runner = CommandRunner(PosixShellDialect(), persistent=True)
+    yield runner
+    runner.close()
+
+
+class TestShellSession:
+    """sh长驻会话测试"""
+
+    def test_output_and_exit_codes(self, runner):
+        """输出、错误输出和退出码按命令切分"""
+        first = runner.run('echo hello; echo oops >&2; exit_code() { return 3; }; exit_code')
+        second = runner.run(['printf', '%s', 'no newline'])
+
+        assert (first.returncode, first.stdout, first.stderr) == (3, 'hello\n', 'oops\n')
+        assert (second.returncode, second.stdout, second.stderr) == (0, 'no newline', '')
+        assert runner.get_stats()['session_runs'] == 2
+        assert runner.get_stats()['oneshot_runs'] == 0
+
+    def test_arguments_are_quoted(self, runner):
+        """参数列表中的空格和引号原样传递"""
+        result = runner.run(['printf', '%s|', "Local Area Connection", "it's", '$HOME'])
+
+        assert result.stdout == "Local Area Connection|it's|$HOME|"
+
+    def test_command_cannot_consume_following_commands(self, runner):
+        """读标准输入的命令不会吃掉后续送入的命令"""
+        runner.run(['cat'])
+        assert runner.run(['echo', 'still here']).stdout == 'still here\n'
+
+    def test_state_persists_between_commands(self, runner):
+        """同一会话中的命令在同一个shell进程中执行"""
+        first = runner.run('echo $$').stdout
+        second = runner.run('echo $$').stdout
+
+        assert first == second
+
+    def test_timeout_restarts_session(self, runner):
+        """超时后结束会话，下一条命令在新会话中执行"""
+        with pytest.raises(subprocess.TimeoutExpired):
+            runner.run(['sleep', '5'], timeout=0.2)
+
+        assert runner.run(['echo', 'ok'], timeout=5).stdout == 'ok\n'
+        assert runner.get_stats()['restarts'] == 1
+
+    def test_decoding(self, runner):
+        """按调用方指定的编码解码输出"""
+        result = runner.run(['printf', '\\344\\275\\240\\345\\245\\275'], encoding='utf-8')
+        gbk = runner.run(['printf', '\\304\\343\\272\\303'], encoding='gbk')
+
+        assert result.stdout == '你好'
+        assert gbk.stdout == '你好'
+
+    def test_non_ascii_arguments(self, runner):
+        """非ASCII参数（如连接名"以太网"）原样传给命令"""
+        result = runner.run(['printf', '%s|', '以太网', 'WLAN 2'], encoding='utf-8')
+
+        assert result.stdout == '以太网|WLAN 2|'
+
+
+class TestPowerShellDialect:
+    """PowerShell方言测试"""
+
+    def test_non_ascii_command_sent_as_ascii(self):
+        """送入标准输入的内容是纯ASCII，会话内还原出原始命令"""
+        dialect = PowerShellDialect()
+        command = dialect.join(['netsh', 'interface', 'ip', 'set', 'address', 'name=以太网', "it's"])
+
+        wrapped = dialect.wrap(command, '__NETKIT_x_1__')
+        assert wrapped.isascii()
+        payload = re.search(r"FromBase64String\('([A-Za-z0-9+/=]+)'\)", wrapped).group(1)
+
+        assert base64.b64decode(payload).decode('utf-16-le') == \
+            "& 'netsh' 'interface' 'ip' 'set' 'address' 'name=以太网' 'it''s'"
+        assert wrapped.count('\n') == 1
+
+
+class TestFakeShell:
+    """假shell测试"""
+
+    def test_sentinel_protocol(self):
+        """按哨兵切分假shell的输出"""
+        runner = CommandRunner(FakeShellDialect(), persistent=True)
+        try:
+            ok = runner.run('say hi')
+            failed = runner.run('fail denied 5')
+            unknown = runner.run('bogus')
+        finally:
+            runner.close()
+
+        assert (ok.returncode, ok.stdout, ok.stderr) == (0, 'hi', '')
+        assert (failed.returncode, failed.stderr) == (5, 'denied 5')
+        assert unknown.returncode == 127
+
+    def test_crash_during_command_is_not_retried(self):
+        """命令执行过程中shell退出时返回失败，不重复执行，下一条命令重新启动会话"""
+        runner = CommandRunner(FakeShellDialect(), persistent=True)
+        try:
+            crashed = runner.run('crash')
+            after = runner.run('say back')
+        finally:
+            runner.close()
+
+        assert crashed.returncode == -1
+        assert after.stdout == 'back'
+        assert runner.get_stats()['oneshot_runs'] == 0
+
+    def test_unavailable_shell_falls_back_to_oneshot(self):
+        """shell无法启动时回退为单次执行"""
+        runner = CommandRunner(PosixShellDialect(['/nonexistent/shell']), persistent=True)
+
+        result = runner.run([sys.executable, '-c', 'print("fallback")'])
+
+        assert result.stdout.strip() == 'fallback'
+        assert runner.get_stats()['fallbacks'] == 1
+        assert runner.get_stats()['oneshot_runs'] == 1
+
+    def test_send_to_dead_session_raises(self):
+        """会话未启动时送入命令抛出SessionError"""
+        with pytest.raises(SessionError):
+            ShellSession(FakeShellDialect()).send('say hi')
+
+    def test_persistent_disabled(self):
+        """关闭长驻会话时每条命令单独执行"""
+        runner = CommandRunner(PosixShellDialect(), persistent=False)
+
+        assert runner.run(['echo', 'x']).stdout == 'x\n'
+        assert runner.get_stats() == {'session_runs': 0, 'oneshot_runs': 1, 'fallbacks': 0, 'restarts': 0}
+
+
+class TestBenchmark:
+    """长驻会话性能测试"""
+
+    @pytest.mark.benchmark
+    def test_1000_commands(self):
+        """长驻会话执行1000条命令比逐条创建进程快"""
+        count = 1000
+        session_runner = CommandRunner(PosixShellDialect(), persistent=True)
+        oneshot_runner = CommandRunner(PosixShellDialect(), persistent=False)
+        try:
+            start = time.perf_counter()
+            for i in range(count):
+                assert session_runner.run(['echo', str(i)]).stdout == f'{i}\n'
+            session_elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(count):
+                oneshot_runner.run(['echo', str(i)])
+            oneshot_elapsed = time.perf_counter() - start
+        finally:
+            session_runner.close()
+
+        print(f"\n1000条命令: 长驻会话 {session_elapsed * 1000:.0f}ms, "
+              f"逐条执行 {oneshot_elapsed * 1000:.0f}ms, "
+              f"加速 {oneshot_elapsed / session_elapsed:.1f}x")
+        assert session_elapsed < oneshot_elapsed
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+控制台输出解码测试
+"""
+
+import time
+import pytest
+
+from netkit.utils import console_encoding
+from netkit.utils.console_encoding import (
+    OutputDecoder,
+    detect_console_encoding,
+    normalize_encoding,
+    set_console_encoding,
+    get_output_decoder,
+)
+
+GBK_PING_OUTPUT = (
+    "正在 Ping 192.168.1.1 具有 32 字节的数据:\r\n"
+    "来自 192.168.1.1 的回复: 字节=32 时间<1ms TTL=64\r\n"
+    "192.168.1.1 的 Ping 统计信息:\r\n"
+    "    数据包: 已发送 = 4，已接收 = 4，丢失 = 0 (0% 丢失)，\r\n"
+).encode('gbk')
+
+
+@pytest.fixture
+def restore_global_decoder():
+    yield
+    set_console_encoding(None)
+
+
+class TestDetection:
+    """代码页检测测试"""
+
+    def test_env_override(self, monkeypatch):
+        """环境变量覆盖检测结果"""
+        monkeypatch.setenv(console_encoding.ENCODING_ENV, 'cp936')
+        assert detect_console_encoding() == 'gbk'
+
+    def test_invalid_override_ignored(self, monkeypatch):
+        """无效的覆盖值被忽略"""
+        monkeypatch.setenv(console_encoding.ENCODING_ENV, 'no-such-codec')
+        assert detect_console_encoding()
+
+    def test_normalize(self):
+        """代码页名称规范化"""
+        assert normalize_encoding('cp65001') == 'utf-8'
+        assert normalize_encoding('CP936') == 'gbk'
+        assert normalize_encoding('latin1') == normalize_encoding('iso-8859-1')
+
+
+class TestOutputDecoder:
+    """解码器测试"""
+
+    def test_primary_hit(self):
+        """主编码解码成功时不计回退"""
+        decoder = OutputDecoder('gbk')
+
+        assert decoder.decode(GBK_PING_OUTPUT).startswith('正在 Ping')
+        stats = decoder.get_stats()
+        assert stats['decodes'] == 1
+        assert stats['fallbacks'] == 0
+        assert stats['encoding'] == 'gbk'
+
+    def test_fallback_counted(self):
+        """主编码失败时回退并按编码计数"""
+        decoder = OutputDecoder('utf-8')
+
+        assert '来自' in decoder.decode(GBK_PING_OUTPUT)
+        assert decoder.decode(b'plain ascii') == 'plain ascii'
+        stats = decoder.get_stats()
+        assert stats['fallbacks'] == 1
+        assert stats['fallback_encodings'] == {'gbk': 1}
+
+    def test_replacement_as_last_resort(self):
+        """所有编码都失败时用替换字符解码"""
+        decoder = OutputDecoder('utf-8', fallbacks=('ascii',))
+
+        assert decoder.decode(b'ok \xff') == 'ok �'
+        assert decoder.get_stats()['replacements'] == 1
+
+    def test_empty_output(self):
+        """空输出返回空字符串"""
+        assert OutputDecoder('utf-8').decode(b'') == ''
+        assert OutputDecoder('utf-8').decode(None) == ''
+
+    def test_global_override(self, restore_global_decoder):
+        """覆盖全局解码器后PingExecutor使用新的编码"""
+        from netkit.services.ping.ping_executor import PingExecutor
+
+        set_console_encoding('gbk')
+        text = PingExecutor()._decode_output(GBK_PING_OUTPUT)
+
+        assert '字节=32' in text
+        assert get_output_decoder().get_stats()['fallbacks'] == 0
+
+    @pytest.mark.benchmark
+    def test_faster_than_trial_chain(self):
+        """单一编码解码比逐个尝试编码快"""
+        iterations = 20000
+
+        def trial_chain(data):
+            for encoding in ('utf-8', 'gbk', 'cp936', 'latin1'):
+                try:
+                    return data.decode(encoding)
+                except UnicodeDecodeError:
+                    continue
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            trial_chain(GBK_PING_OUTPUT)
+        chain_elapsed = time.perf_counter() - start
+
+        decoder = OutputDecoder('gbk')
+        start = time.perf_counter()
+        for _ in range(iterations):
+            decoder.decode(GBK_PING_OUTPUT)
+        decoder_elapsed = time.perf_counter() - start
+
+        assert decoder.decode(GBK_PING_OUTPUT) == trial_chain(GBK_PING_OUTPUT)
+        assert decoder_elapsed < chain_elapsed
@@ -5,15 +5,56 @@
 """
 
 import pytest
+import platform
+import struct
+import threading
+import time
 from unittest.mock import Mock, patch
 
 # 导入网络监控模块
 try:
-    from netkit.utils.network_monitor import NetworkMonitor
+    from netkit.utils.network_monitor import NetworkMonitor, EventCoalescer
 except ImportError:
     # 如果模块还未实现，创建占位测试
     NetworkMonitor = None
 
+from netkit.utils.monitor_backends import (
+    MonitorBackend,
+    NetlinkMonitorBackend,
+    PollingMonitorBackend,
+    parse_netlink_messages,
+    RTM_NEWLINK,
+    RTM_NEWADDR,
+    RTM_NEWROUTE,
+    NLMSG_DONE,
+    RTA_OIF,
+)
+
+
+def _nlmsg(msg_type, payload):
+    """构造一条netlink消息（含4字节对齐填充）"""
+    length = 16 + len(payload)
+    padding = b'\x00' * (((length + 3) & ~3) - length)
+    return struct.pack('=IHHII', length, msg_type, 0, 0, 0) + payload + padding
+
+
+class FakeBackend(MonitorBackend):
+    """按脚本发出事件的假后端"""
+    
+    name = "fake"
+    
+    def __init__(self, events):
+        self.events = events
+    
+    def is_available(self):
+        return True
+    
+    def run(self, emit, should_stop):
+        for event_type, adapters in self.events:
+            emit(event_type, adapters)
+        while not should_stop():
+            time.sleep(0.01)
+
 
 class TestNetworkMonitor:
     """网络监控工具测试"""
@@ -41,6 +82,213 @@ class TestNetworkMonitor:
         assert True, "网络监控测试占位符"
 
 
+
+class TestNetlinkParsing:
+    """rtnetlink消息解析测试"""
+    
+    def test_parse_link_addr_route(self):
+        """解析链路、地址、路由三类消息"""
+        link = _nlmsg(RTM_NEWLINK, struct.pack('=BxHiII', 0, 1, 3, 0, 0))
+        addr = _nlmsg(RTM_NEWADDR, struct.pack('=BBBBI', 2, 24, 0, 0, 4))
+        route_payload = struct.pack('=BBBBBBBBI', 2, 0, 0, 0, 254, 3, 0, 1, 0)
+        route_payload += struct.pack('=HHi', 8, RTA_OIF, 7)
+        route = _nlmsg(RTM_NEWROUTE, route_payload)
+        done = _nlmsg(NLMSG_DONE, b'')
+        
+        events = parse_netlink_messages(link + addr + route + done)
+        
+        assert [index for _, index in events] == [3, 4, 7]
+        assert len({event_type for event_type, _ in events}) == 3
+    
+    def test_parse_truncated_data(self):
+        """截断的数据报不应抛出异常"""
+        link = _nlmsg(RTM_NEWLINK, struct.pack('=BxHiII', 0, 1, 3, 0, 0))
+        assert parse_netlink_messages(link[:10]) == []
+        assert parse_netlink_messages(b'') == []
+    
+    def test_netlink_socket_open(self):
+        """Linux上可以绑定rtnetlink组播组"""
+        backend = NetlinkMonitorBackend()
+        if not backend.is_available():
+            pytest.skip("非Linux平台")
+        sock = backend.open_socket()
+        try:
+            assert sock.getsockname()[1] & NetlinkMonitorBackend.GROUPS
+        finally:
+            sock.close()
+
+
+class TestPollingBackend:
+    """指纹轮询后端测试"""
+    
+    def test_backoff_and_reset(self):
+        """空闲时指数退避，检测到变化后恢复最小间隔"""
+        backend = PollingMonitorBackend(min_interval=1, max_interval=8)
+        intervals = [backend.next_interval(False) for _ in range(5)]
+        assert intervals == [2, 4, 8, 8, 8]
+        assert backend.next_interval(True) == 1
+    
+    def test_diff_fingerprints(self):
+        """指纹差异只报告变化的接口"""
+        old = {'eth0': (2, 'up'), 'wlan0': (3, 'up')}
+        new = {'eth0': (2, 'down'), 'wlan0': (3, 'up'), 'tun0': (5, 'up')}
+        assert PollingMonitorBackend.diff_fingerprints(old, new) == {'eth0', 'tun0'}
+    
+    def test_fingerprint_without_subprocess(self):
+        """指纹获取不启动子进程，也不做主机名解析"""
+        with patch('subprocess.run') as mock_run, patch('subprocess.Popen') as mock_popen, \
+             patch('socket.getaddrinfo') as mock_resolve:
+            fingerprint = PollingMonitorBackend().get_fingerprint()
+        mock_run.assert_not_called()
+        mock_popen.assert_not_called()
+        if platform.system() == 'Linux':
+            mock_resolve.assert_not_called()
+            assert PollingMonitorBackend.ADDRESSES_KEY not in fingerprint
+        else:
+            assert PollingMonitorBackend.ADDRESSES_KEY in fingerprint
+    
+    @pytest.mark.skipif(platform.system() != 'Linux', reason="按网卡读取地址仅支持Linux")
+    def test_fingerprint_includes_interface_addresses(self):
+        """地址按网卡记录，地址变化归属到具体网卡"""
+        fingerprint = PollingMonitorBackend().get_fingerprint()
+        assert '127.0.0.1' in fingerprint['lo']
+    
+    def test_hostname_lookup_cached(self):
+        """无法按网卡读取地址时，主机名只查询一次"""
+        backend = PollingMonitorBackend()
+        with patch.object(PollingMonitorBackend, '_read_proc_ipv6', return_value=None), \
+             patch('socket.gethostname', return_value='host') as mock_hostname, \
+             patch('socket.getaddrinfo', return_value=[(2, 1, 6, '', ('192.0.2.5', 0))]):
+            first = backend.get_fingerprint()
+            backend.get_fingerprint()
+        assert first[PollingMonitorBackend.ADDRESSES_KEY] == ('192.0.2.5',)
+        assert mock_hostname.call_count == 1
+    
+    def test_run_emits_changed_adapters(self):
+        """轮询检测到变化时上报受影响的接口"""
+        backend = PollingMonitorBackend(min_interval=0.01, max_interval=0.01)
+        fingerprints = iter([{'eth0': (1, 'up')}, {'eth0': (1, 'down')}])
+        backend.get_fingerprint = lambda: next(fingerprints)
+        emitted = []
+        
+        def emit(event_type, adapters):
+            emitted.append(adapters)
+        
+        backend.run(emit, lambda: len(emitted) > 0, sleep=lambda _: None)
+        assert emitted == [{'eth0'}]
+
+
+class TestMonitorBackendSelection:
+    """监听器后端选择测试"""
+    
+    def test_fallback_to_next_backend(self):
+        """后端失败时切换到下一个可用后端"""
+        broken = FakeBackend([])
+        broken.run = Mock(side_effect=OSError("boom"))
+        fake = FakeBackend([("网络地址变化", {'eth0'})])
+        monitor = NetworkMonitor(backends=[broken, fake])
+        received = threading.Event()
+        monitor.add_callback(lambda event_type: received.set())
+        
+        monitor.start_monitoring()
+        try:
+            assert received.wait(1.0)
+            assert monitor.get_monitor_info()['backend'] == "fake"
+            assert monitor.last_event_adapters == {'eth0'}
+        finally:
+            monitor.stop_monitoring()
+    
+    def test_late_event_after_stop_dropped(self):
+        """停止后到达的后端事件被丢弃，不会重新启动合并线程"""
+        monitor = NetworkMonitor(backends=[FakeBackend([])])
+        received = []
+        monitor.add_callback(received.append)
+        monitor.start_monitoring()
+        monitor.stop_monitoring()
+        
+        monitor._on_backend_event("网络地址变化", {'eth0'})
+        
+        assert monitor.coalescer is None
+        assert received == []
+
+
+class TestEventCoalescer:
+    """后沿事件合并测试"""
+    
+    def test_burst_fires_once_with_union(self):
+        """突发事件合并为一次分发，并携带全部网卡"""
+        dispatched = []
+        done = threading.Event()
+        
+        def dispatch(event):
+            dispatched.append(event)
+            done.set()
+        
+        coalescer = EventCoalescer(dispatch, settle_interval=0.05, max_wait=1.0)
+        coalescer.start()
+        try:
+            coalescer.submit("网络地址变化", {'eth0'})
+            coalescer.submit("路由变化", {'eth1'})
+            coalescer.submit("网络地址变化", {'eth0', 'wlan0'})
+            assert done.wait(1.0)
+            time.sleep(0.1)
+        finally:
+            coalescer.stop()
+        
+        assert len(dispatched) == 1
+        event = dispatched[0]
+        assert event.adapters == {'eth0', 'eth1', 'wlan0'}
+        assert event.event_types == ["网络地址变化", "路由变化"]
+        assert "路由变化" in event  # 兼容字符串回调
+    
+    def test_trailing_event_not_lost(self):
+        """静默期内到达的最后事件不会被丢弃"""
+        dispatched = []
+        coalescer = EventCoalescer(dispatched.append, settle_interval=0.05, max_wait=1.0)
+        coalescer.start()
+        try:
+            coalescer.submit("网络地址变化", {'eth0'})
+            time.sleep(0.15)
+            coalescer.submit("网络适配器状态变化", {'eth1'})
+            time.sleep(0.15)
+        finally:
+            coalescer.stop()
+        
+        assert [set(e.adapters) for e in dispatched] == [{'eth0'}, {'eth1'}]
+    
+    def test_max_wait_ceiling(self):
+        """持续突发在max_wait后强制分发"""
+        dispatched = []
+        coalescer = EventCoalescer(dispatched.append, settle_interval=0.1, max_wait=0.2)
+        coalescer.start()
+        try:
+            start = time.monotonic()
+            while time.monotonic() - start < 0.35:
+                coalescer.submit("网络地址变化", {'eth0'})
+                time.sleep(0.02)
+            assert len(dispatched) >= 1
+        finally:
+            coalescer.stop()
+    
+    def test_slow_callback_does_not_block_submit(self):
+        """慢回调不阻塞事件提交"""
+        release = threading.Event()
+        coalescer = EventCoalescer(lambda event: release.wait(1.0),
+                                   settle_interval=0.01, max_wait=0.05)
+        coalescer.start()
+        try:
+            coalescer.submit("网络地址变化", {'eth0'})
+            time.sleep(0.1)  # 回调此时阻塞在工作线程中
+            start = time.monotonic()
+            for _ in range(100):
+                coalescer.submit("路由变化", {'eth1'})
+            assert time.monotonic() - start < 0.05
+            assert coalescer.has_pending()
+        finally:
+            release.set()
+            coalescer.stop()
+
+
 if __name__ == "__main__":
     # 运行网络监控测试
     pytest.main([__file__, "-v"])
\ No newline at end of file
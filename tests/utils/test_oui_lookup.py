@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OUI厂商数据库测试
+"""
+
+import os
+import time
+import pytest
+
+from netkit.utils.oui_lookup import (
+    OUIDatabase,
+    DEFAULT_DB_PATH,
+    mac_to_oui,
+    parse_ieee_registry,
+    compile_oui_database
+)
+
+
+IEEE_CSV = [
+    'Registry,Assignment,Organization Name,Organization Address\n',
+    'MA-L,00155D,Microsoft Corporation,One Microsoft Way Redmond WA US 98052\n',
+    'MA-L,00E04C,REALTEK SEMICONDUCTOR CORP.,"No. 2, Innovation Road II Hsinchu TW 300"\n',
+    'MA-L,B827EB,Raspberry Pi Foundation,Mitchell Wood House Caldecote GB CB23 7NU\n',
+    'MA-M,70B3D5F,Some MA-M Vendor,Nowhere\n',
+]
+
+IEEE_TXT = [
+    'OUI/MA-L                                                    Organization\n',
+    '00-00-0C   (hex)\t\tCisco Systems, Inc\n',
+    '00000C     (base 16)\t\tCisco Systems, Inc\n',
+    '00-50-56   (hex)\t\tVMware, Inc.\n',
+]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "oui.bin")
+    compile_oui_database(parse_ieee_registry(IEEE_CSV), path)
+    return path
+
+
+class TestOUIParsing:
+    """注册表解析测试"""
+    
+    def test_mac_to_oui_formats(self):
+        """支持多种MAC格式"""
+        assert mac_to_oui("00-15-5D-01-02-03") == 0x00155D
+        assert mac_to_oui("00:15:5d:01:02:03") == 0x00155D
+        assert mac_to_oui("0015.5d01.0203") == 0x00155D
+        assert mac_to_oui("未知") is None
+        assert mac_to_oui("") is None
+    
+    def test_parse_csv_only_ma_l(self):
+        """CSV格式只取MA-L条目"""
+        entries = list(parse_ieee_registry(IEEE_CSV))
+        
+        assert entries == [
+            (0x00155D, "Microsoft Corporation"),
+            (0x00E04C, "REALTEK SEMICONDUCTOR CORP."),
+            (0xB827EB, "Raspberry Pi Foundation"),
+        ]
+    
+    def test_parse_txt(self):
+        """TXT格式解析(hex)行"""
+        entries = list(parse_ieee_registry(IEEE_TXT))
+        
+        assert entries == [(0x00000C, "Cisco Systems, Inc"), (0x005056, "VMware, Inc.")]
+
+
+class TestOUIDatabase:
+    """二进制数据库查询测试"""
+    
+    def test_lookup(self, db_path):
+        """按MAC查询厂商"""
+        db = OUIDatabase(db_path)
+        
+        assert len(db) == 3
+        assert db.lookup("00:15:5D:AA:BB:CC") == "Microsoft Corporation"
+        assert db.lookup("B8-27-EB-00-00-01") == "Raspberry Pi Foundation"
+        assert db.lookup("00:11:22:33:44:55") is None
+        db.close()
+    
+    def test_locally_administered_mac(self, db_path):
+        """本地管理地址没有厂商"""
+        db = OUIDatabase(db_path)
+        assert db.lookup("02:15:5D:AA:BB:CC") is None
+        db.close()
+    
+    def test_missing_or_invalid_file(self, tmp_path):
+        """数据库文件缺失或损坏时查询返回None"""
+        missing = OUIDatabase(str(tmp_path / "missing.bin"))
+        broken_path = tmp_path / "broken.bin"
+        broken_path.write_bytes(b"not a database at all")
+        broken = OUIDatabase(str(broken_path))
+        
+        assert missing.lookup("00:15:5D:AA:BB:CC") is None
+        assert broken.lookup("00:15:5D:AA:BB:CC") is None
+    
+    def test_strings_deduplicated(self, tmp_path):
+        """相同厂商名只存一份"""
+        path = str(tmp_path / "dup.bin")
+        entries = [(i, "Same Vendor Name") for i in range(100)]
+        compile_oui_database(entries, path)
+        
+        assert os.path.getsize(path) < 16 + 100 * 8 + 64
+        db = OUIDatabase(path)
+        assert db.lookup_oui(42) == "Same Vendor Name"
+        db.close()
+    
+    def test_bundled_database(self):
+        """随包附带的数据库可用"""
+        db = OUIDatabase(DEFAULT_DB_PATH)
+        
+        assert len(db) > 0
+        assert db.lookup("00:15:5D:00:00:01") == "Microsoft Corporation"
+        db.close()
+    
+    @pytest.mark.benchmark
+    def test_lookup_speed_full_registry_size(self, tmp_path):
+        """与完整IEEE注册表同规模(约4万条)的查询耗时"""
+        path = str(tmp_path / "large.bin")
+        compile_oui_database(((i * 3, f"Vendor {i % 5000}") for i in range(40000)), path)
+        db = OUIDatabase(path)
+        macs = [f"{i * 3:06X}001122" for i in range(0, 40000, 40)]
+        
+        start = time.perf_counter()
+        for mac in macs:
+            assert db.lookup(mac) is not None
+        per_lookup = (time.perf_counter() - start) / len(macs)
+        
+        print(f"\n40000条记录，单次查询 {per_lookup * 1e6:.1f}μs")
+        assert per_lookup < 50e-6
+        db.close()